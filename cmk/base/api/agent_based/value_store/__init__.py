@@ -41,13 +41,23 @@ the check function is called.
 
 .. autoclass:: ValueStoreManager
 
+
+Processes checking many hosts can collect the changes of the hosts and write
+them together.
+
+
+.. autofunction:: batched_value_store_writes
+
 """
 
-from ._global_state import get_value_store, load_host_value_store
-from ._utils import ValueStoreManager
+from ._global_state import batched_value_store_writes, get_value_store, load_host_value_store
+from ._utils import ValueStoreFormat, ValueStoreManager, ValueStoreWriteBatch
 
 __all__ = [
+    "batched_value_store_writes",
     "get_value_store",
     "load_host_value_store",
+    "ValueStoreFormat",
     "ValueStoreManager",
+    "ValueStoreWriteBatch",
 ]
@@ -6,16 +6,17 @@
 This module keeps the global state of the ValueStore.
 """
 
-from collections.abc import Generator, MutableMapping
+from collections.abc import Generator, Iterator, MutableMapping
 from contextlib import contextmanager
 from typing import Any
 
 from cmk.utils.exceptions import MKGeneralException
 from cmk.utils.hostaddress import HostName
 
-from ._utils import ValueStoreManager
+from ._utils import ValueStoreFormat, ValueStoreManager, ValueStoreWriteBatch
 
 _active_host_value_store: ValueStoreManager | None = None
+_write_batch: ValueStoreWriteBatch | None = None
 
 
 # Caveat: this function (and its docstring) is part of the public Check API.
@@ -38,6 +39,7 @@ def load_host_value_store(
     host_name: HostName,
     *,
     store_changes: bool,
+    storage_format: ValueStoreFormat = "standard",
 ) -> Generator[ValueStoreManager, None, None]:
     """Create and load the value store for the host"""
     global _active_host_value_store
@@ -45,10 +47,30 @@ def load_host_value_store(
     pushed_back_store = _active_host_value_store
 
     try:
-        _active_host_value_store = ValueStoreManager(host_name)
+        _active_host_value_store = ValueStoreManager(
+            host_name, storage_format=storage_format, write_batch=_write_batch
+        )
         yield _active_host_value_store
 
         if store_changes:
             _active_host_value_store.save()
     finally:
         _active_host_value_store = pushed_back_store
+
+
+@contextmanager
+def batched_value_store_writes(max_hosts: int = 1000) -> Iterator[ValueStoreWriteBatch]:
+    """Collect the changes of the value stores loaded in the context and write them together
+
+    The changes are written when the batch contains the changes of max_hosts hosts, when the
+    batch is flushed and at the end of the context.
+    """
+    global _write_batch
+
+    pushed_back_batch = _write_batch
+    _write_batch = write_batch = ValueStoreWriteBatch(max_hosts)
+    try:
+        yield write_batch
+    finally:
+        _write_batch = pushed_back_batch
+        write_batch.flush()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Binary, journaled storage of the values of a host
+
+The values are stored in a binary file which starts with a header followed by records. Every
+record contains the removed keys and the updated values of one synchronization, so a
+synchronization only appends the changes to the file instead of writing all values. The
+records are encoded with marshal, which keeps the types of the values and is much faster
+than evaluating their representations. The file is compacted, i.e. replaced by a file with a
+single record containing all values, after a number of records or as soon as the appended
+records are larger than the first record. The latter happens quickly for counters, which
+change with every check.
+
+The header contains an ID of the file which changes with every compaction. A process
+remembers up to which position it has read the file and only reads the records appended
+since then, as long as the file has not been compacted in the meantime.
+"""
+
+import marshal
+import os
+import struct
+from ast import literal_eval
+from collections.abc import Callable, Container, Hashable, Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import Any, Final, TypeVar
+
+import cmk.utils.store as store
+from cmk.utils.exceptions import MKGeneralException
+
+MAGIC = b"CMKVS1"
+_HEADER = struct.Struct("<6s8s")  # magic, file ID
+_RECORD_LENGTH = struct.Struct("<I")
+
+# The number of records after which the file is compacted
+MAX_RECORDS = 32
+
+_TKey = TypeVar("_TKey", bound=Hashable)
+_TValue = TypeVar("_TValue")
+
+
+def encode_record(removed: Iterable[Hashable], updated: Iterable[tuple[Hashable, object]]) -> bytes:
+    """Encode the changes of a synchronization as record
+
+    >>> decode_records(encode_record([("a", "b")], [(("c", None), (1.5, [2]))]))
+    ([([('a', 'b')], [(('c', None), (1.5, [2]))])], 0)
+    """
+    record = (tuple(removed), tuple(updated))
+    try:
+        payload = marshal.dumps(record)
+    except ValueError:
+        # Instances of subclasses of the builtin types, e.g. of str, cannot be marshalled.
+        # Store them like they are stored as representation.
+        payload = marshal.dumps(literal_eval(repr(record)))
+    return _RECORD_LENGTH.pack(len(payload)) + payload
+
+
+def decode_records(
+    data: bytes,
+) -> tuple[list[tuple[list[Hashable], list[tuple[Hashable, Any]]]], int]:
+    """Decode the complete records, the number of bytes of an incomplete last record
+
+    An incomplete record is left by a process which was interrupted while appending it.
+    """
+    records = []
+    position = 0
+    while position + _RECORD_LENGTH.size <= len(data):
+        (length,) = _RECORD_LENGTH.unpack_from(data, position)
+        start = position + _RECORD_LENGTH.size
+        if start + length > len(data):
+            break
+        removed, updated = marshal.loads(data[start : start + length])
+        records.append((list(removed), list(updated)))
+        position = start + length
+    return records, len(data) - position
+
+
+def read_journal_file(path: Path) -> dict[Any, Any]:
+    """The values stored in the file, e.g. for migrating them to another format"""
+    data: dict[Any, Any] = {}
+    content = path.read_bytes()
+    if content:
+        _check_header(content[: _HEADER.size])
+        _apply(data, decode_records(content[_HEADER.size :])[0])
+    return data
+
+
+def _check_header(header: bytes) -> bytes:
+    if len(header) < _HEADER.size:
+        raise ValueError("incomplete header")
+    magic, file_id = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("not a value store journal")
+    return file_id
+
+
+def _apply(
+    data: dict[Any, Any], records: Iterable[tuple[list[Hashable], list[tuple[Hashable, Any]]]]
+) -> None:
+    for removed, updated in records:
+        for key in removed:
+            data.pop(key, None)
+        data.update(updated)
+
+
+class StaticJournaledMapping(Mapping[_TKey, _TValue]):
+    """Represents the values stored in a journal file
+
+    This class provides the same interface as the _StaticDiskSyncedMapping of the values stored
+    as representation. The values of a file in that format at the legacy path are taken over.
+    """
+
+    def __init__(
+        self,
+        *,
+        path: Path,
+        log_debug: Callable[[str], None],
+        legacy_path: Path | None = None,
+        legacy_deserializer: Callable[[str], Mapping[_TKey, _TValue]] = literal_eval,
+    ) -> None:
+        self._path: Final = path
+        self._legacy_path: Final = legacy_path
+        self._legacy_deserializer: Final = legacy_deserializer
+        self._log_debug = log_debug
+        self._data: dict[_TKey, _TValue] = {}
+        # What has been read from the file so far
+        self._file_id: bytes | None = None
+        self._stat: tuple[int, int, int] | None = None
+        self._position = 0
+        self._num_records = 0
+        self._first_record_size = 0
+        self._incomplete = 0
+        self.disksync()
+
+    def __getitem__(self, key: _TKey) -> _TValue:
+        return self._data.__getitem__(key)
+
+    def __iter__(self) -> Iterator[_TKey]:
+        return self._data.__iter__()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def disksync(
+        self,
+        *,
+        removed: Container[_TKey] = (),
+        updated: Iterable[tuple[_TKey, _TValue]] = (),
+    ) -> None:
+        """Re-load and write the changes of the stored values
+
+        Only the records appended by other processes since the last synchronization are read.
+        The changes are appended as a new record.
+        """
+        self._log_debug("synchronizing")
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+
+        with store.locked(self._path):
+            try:
+                self._load()
+
+                updated = list(updated)
+                legacy_path = (
+                    self._legacy_path
+                    if self._legacy_path is not None and self._legacy_path.exists()
+                    else None
+                )
+                if legacy_path is not None:
+                    self._log_debug("taking over values from %s" % legacy_path)
+                    legacy_data = self._legacy_deserializer(
+                        store.load_text_from_file(legacy_path, default="{}", lock=False)
+                    )
+                    updated = [*legacy_data.items(), *updated]
+
+                removed_keys = [k for k in self._data if k in removed]
+                if removed_keys or updated or legacy_path is not None:
+                    for key in removed_keys:
+                        del self._data[key]
+                    self._data.update(updated)
+                    record = encode_record(removed_keys, updated)
+                    if (
+                        legacy_path is not None
+                        or self._incomplete
+                        or self._needs_compaction(len(record))
+                    ):
+                        self._compact()
+                    else:
+                        self._append(record)
+
+                if legacy_path is not None:
+                    legacy_path.unlink()
+            except Exception as exc:
+                raise MKGeneralException from exc
+
+    def _load(self) -> None:
+        stat = self._path.stat()
+        current = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if current == self._stat:
+            self._log_debug("already loaded")
+            return
+
+        self._log_debug("loading from disk")
+        with self._path.open("rb") as f:
+            header = f.read(_HEADER.size)
+            if not header:
+                # Created by the lock
+                self._data, self._file_id, self._num_records = {}, None, 0
+                self._position, self._first_record_size, self._incomplete = 0, 0, 0
+                self._stat = current
+                return
+
+            file_id = _check_header(header)
+            if file_id == self._file_id and stat.st_size >= self._position:
+                f.seek(self._position)
+                content = f.read()
+            else:
+                self._data, self._file_id, self._num_records = {}, file_id, 0
+                self._position = _HEADER.size
+                content = f.read()
+                self._first_record_size = (
+                    _RECORD_LENGTH.size + _RECORD_LENGTH.unpack_from(content)[0]
+                    if len(content) >= _RECORD_LENGTH.size
+                    else 0
+                )
+
+        records, self._incomplete = decode_records(content)
+        _apply(self._data, records)
+        self._num_records += len(records)
+        self._position += len(content) - self._incomplete
+        self._stat = current
+
+    def _append(self, record: bytes) -> None:
+        self._log_debug("appending to disk")
+        with self._path.open("ab") as f:
+            if self._file_id is None:
+                self._file_id = os.urandom(8)
+                f.write(_HEADER.pack(MAGIC, self._file_id))
+                self._position = _HEADER.size
+                self._first_record_size = len(record)
+            f.write(record)
+        self._position += len(record)
+        self._num_records += 1
+        self._update_stat()
+
+    def _compact(self) -> None:
+        self._log_debug("compacting on disk")
+        self._file_id = os.urandom(8)
+        record = encode_record((), self._data.items())
+        store.save_bytes_to_file(self._path, _HEADER.pack(MAGIC, self._file_id) + record)
+        self._position = _HEADER.size + len(record)
+        self._num_records = 1
+        self._first_record_size = len(record)
+        self._update_stat()
+
+    def _needs_compaction(self, record_size: int) -> bool:
+        if self._file_id is None:
+            return False
+        appended_size = self._position - _HEADER.size - self._first_record_size + record_size
+        return self._num_records >= MAX_RECORDS or appended_size > self._first_record_size
+
+    def _update_stat(self) -> None:
+        stat = self._path.stat()
+        self._stat = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
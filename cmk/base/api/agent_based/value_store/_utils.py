@@ -15,7 +15,7 @@ from collections.abc import (
 )
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Final, TypeVar
+from typing import Any, Final, Literal, TypeVar
 
 import cmk.utils.cleanup
 import cmk.utils.paths
@@ -27,6 +27,11 @@ from cmk.utils.servicename import Item
 
 from cmk.checkengine.checking import CheckPluginName, ServiceID
 
+from ._journal import read_journal_file, StaticJournaledMapping
+
+# The values are either stored as representation ("standard") or in a binary journal
+ValueStoreFormat = Literal["standard", "binary"]
+
 _PluginName = str
 _UserKey = str
 _ValueStoreKey = tuple[HostName, _PluginName, Item, _UserKey]
@@ -165,7 +170,7 @@ class _DiskSyncedMapping(MutableMapping[_TKey, _TValue]):  # pylint: disable=too
         self,
         *,
         dynamic: _DynamicDiskSyncedMapping[_TKey, _TValue],
-        static: _StaticDiskSyncedMapping[_TKey, _TValue],
+        static: _StaticDiskSyncedMapping[_TKey, _TValue] | StaticJournaledMapping[_TKey, _TValue],
     ) -> None:
         self._dynamic = dynamic
         self.static = static
@@ -261,6 +266,48 @@ class _ValueStore(MutableMapping[_UserKey, Any]):  # pylint: disable=too-many-an
         return sum(1 for _ in self)
 
 
+def _log_debug(msg: str) -> None:
+    logger.debug("value store: %s", msg)
+
+
+class ValueStoreWriteBatch:
+    """Collects the changed value stores of several hosts and writes them together
+
+    Processes checking many hosts one after another, like the keepalive checkers, don't
+    have to write the values of a host after every check. The value store of a host which is
+    checked again before the changes are written is taken from the batch.
+    """
+
+    def __init__(self, max_hosts: int) -> None:
+        self._max_hosts = max_hosts
+        self._pending: dict[HostName, _DiskSyncedMapping[_ValueStoreKey, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def pending(self, host_name: HostName) -> _DiskSyncedMapping[_ValueStoreKey, Any] | None:
+        return self._pending.get(host_name)
+
+    def add(
+        self, host_name: HostName, value_store: _DiskSyncedMapping[_ValueStoreKey, Any]
+    ) -> None:
+        self._pending[host_name] = value_store
+        if len(self._pending) >= self._max_hosts:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the changes of all hosts, the first error is raised after trying all hosts"""
+        pending, self._pending = self._pending, {}
+        error: Exception | None = None
+        for value_store in pending.values():
+            try:
+                value_store.commit()
+            except Exception as exc:
+                error = error or exc
+        if error is not None:
+            raise error
+
+
 class ValueStoreManager:
     """Provide the ValueStores for one host
 
@@ -276,15 +323,54 @@ class ValueStoreManager:
 
     STORAGE_PATH = Path(cmk.utils.paths.counters_dir)
 
-    def __init__(self, host_name: HostName) -> None:
-        self._value_store: _DiskSyncedMapping[_ValueStoreKey, Any] = _DiskSyncedMapping.make(
-            path=self.STORAGE_PATH / str(host_name),
-            log_debug=lambda x: logger.debug("value store: %s", x),
+    def __init__(
+        self,
+        host_name: HostName,
+        *,
+        storage_format: ValueStoreFormat = "standard",
+        write_batch: ValueStoreWriteBatch | None = None,
+    ) -> None:
+        self._write_batch = write_batch
+        pending = None if write_batch is None else write_batch.pending(host_name)
+        if pending is not None:
+            pending.static.disksync()
+            self._value_store = pending
+        else:
+            self._value_store = self._load(host_name, storage_format)
+        self.active_service_interface: _ValueStore | None = None
+        self._host_name = host_name
+
+    @classmethod
+    def journal_path(cls, host_name: HostName) -> Path:
+        return cls.STORAGE_PATH / f"{host_name}.journal"
+
+    @classmethod
+    def _load(
+        cls, host_name: HostName, storage_format: ValueStoreFormat
+    ) -> _DiskSyncedMapping[_ValueStoreKey, Any]:
+        path = cls.STORAGE_PATH / str(host_name)
+        journal_path = cls.journal_path(host_name)
+
+        if storage_format == "binary":
+            return _DiskSyncedMapping(
+                dynamic=_DynamicDiskSyncedMapping(),
+                static=StaticJournaledMapping(
+                    path=journal_path, log_debug=_log_debug, legacy_path=path
+                ),
+            )
+
+        if not path.exists() and journal_path.exists():
+            # The binary format has been used before
+            with store.locked(journal_path):
+                store.save_text_to_file(path, repr(read_journal_file(journal_path)))
+                journal_path.unlink()
+
+        return _DiskSyncedMapping.make(
+            path=path,
+            log_debug=_log_debug,
             serializer=repr,
             deserializer=literal_eval,
         )
-        self.active_service_interface: _ValueStore | None = None
-        self._host_name = host_name
 
     @contextmanager
     def namespace(self, service_id: ServiceID, host_name: HostName | None = None) -> Iterator[None]:
@@ -304,6 +390,12 @@ class ValueStoreManager:
             self.active_service_interface = old_sif
 
     def save(self) -> None:
-        """Write all current values of this host to disk"""
-        if isinstance(self._value_store, _DiskSyncedMapping):
+        """Write all current values of this host to disk
+
+        In case of a write batch, the values are written together with the ones of the other
+        hosts of the batch.
+        """
+        if self._write_batch is not None:
+            self._write_batch.add(self._host_name, self._value_store)
+        elif isinstance(self._value_store, _DiskSyncedMapping):
             self._value_store.commit()
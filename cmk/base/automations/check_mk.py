@@ -487,7 +487,7 @@ def _execute_discovery(
         else config.lookup_ip_address(config_cache, host_name)
     )
     with plugin_contexts.current_host(host_name), load_host_value_store(
-        host_name, store_changes=False
+        host_name, store_changes=False, storage_format=config.value_store_format
     ) as value_store_manager:
         is_cluster = config_cache.is_cluster(host_name)
         check_plugins = CheckPluginMapper(
@@ -933,6 +933,14 @@ class AutomationRenameHosts(Automation):
         for d in ["cache", "counters"]:
             if self._rename_host_file(str(tmp_dir / d), oldname, newname):
                 actions.append(d)
+        # The binary value store format
+        if (
+            self._rename_host_file(
+                str(tmp_dir / "counters"), oldname + ".journal", newname + ".journal"
+            )
+            and "counters" not in actions
+        ):
+            actions.append("counters")
 
         if self._rename_host_dir(str(tmp_dir / "piggyback"), oldname, newname):
             actions.append("piggyback-load")
@@ -1413,6 +1421,7 @@ class AutomationDeleteHosts(ABCDeleteHosts, Automation):
             f"{precompiled_hostchecks_dir}/{hostname}.py",
             f"{autochecks_dir}/{hostname}.mk",
             f"{counters_dir}/{hostname}",
+            f"{counters_dir}/{hostname}.journal",
             f"{tcp_cache_dir}/{hostname}",
             f"{var_dir}/persisted/{hostname}",
             f"{var_dir}/inventory/{hostname}",
@@ -1454,6 +1463,7 @@ class AutomationDeleteHostsKnownRemote(ABCDeleteHosts, Automation):
             f"{precompiled_hostchecks_dir}/{hostname}.py",
             f"{autochecks_dir}/{hostname}.mk",
             f"{counters_dir}/{hostname}",
+            f"{counters_dir}/{hostname}.journal",
             f"{tcp_cache_dir}/{hostname}",
             f"{var_dir}/persisted/{hostname}",
             f"{var_dir}/inventory/{hostname}",
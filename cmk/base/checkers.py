@@ -10,6 +10,8 @@ from __future__ import annotations
 import functools
 import itertools
 import logging
+import queue
+import threading
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
 from functools import partial
 from typing import Final
@@ -31,7 +33,7 @@ from cmk.utils.timeperiod import timeperiod_active
 
 from cmk.snmplib import SNMPBackendEnum, SNMPRawData
 
-from cmk.fetchers import Fetcher, get_raw_data, Mode
+from cmk.fetchers import Fetcher, FetcherType, get_raw_data, Mode
 from cmk.fetchers.filecache import FileCache, FileCacheOptions, MaxAge
 
 from cmk.checkengine.checking import (
@@ -88,19 +90,98 @@ __all__ = [
 ]
 
 
+_FetchedSource = tuple[SourceInfo, result.Result[AgentRawData | SNMPRawData, Exception], Snapshot]
+
+# These fetchers share global state, e.g. the SNMP scan cache, and are run one after another
+_SERIAL_FETCHER_TYPES: Final = frozenset({FetcherType.IPMI, FetcherType.SNMP})
+
+
 def _fetch_all(
-    sources: Iterable[Source], *, simulation: bool, file_cache_options: FileCacheOptions, mode: Mode
-) -> Sequence[tuple[SourceInfo, result.Result[AgentRawData | SNMPRawData, Exception], Snapshot,]]:
+    sources: Iterable[Source],
+    *,
+    simulation: bool,
+    file_cache_options: FileCacheOptions,
+    mode: Mode,
+    max_threads: int = 1,
+    deadline: float | None = None,
+) -> Sequence[_FetchedSource]:
     console.verbose("%s+%s %s\n", tty.yellow, tty.normal, "Fetching data".upper())
-    return [
-        _do_fetch(
+    fetches = [
+        (
             source.source_info(),
             source.file_cache(simulation=simulation, file_cache_options=file_cache_options),
             source.fetcher(),
-            mode=mode,
         )
         for source in sources
     ]
+    if max_threads <= 1 and deadline is None:
+        return [
+            _do_fetch(source_info, file_cache, fetcher, mode=mode)
+            for source_info, file_cache, fetcher in fetches
+        ]
+    return _fetch_concurrently(fetches, mode=mode, max_threads=max_threads, deadline=deadline)
+
+
+def _fetch_concurrently(
+    fetches: Sequence[tuple[SourceInfo, FileCache, Fetcher]],
+    *,
+    mode: Mode,
+    max_threads: int,
+    deadline: float | None,
+) -> Sequence[_FetchedSource]:
+    """Fetch the sources in threads and wait for them until the deadline
+
+    The check latency is the one of the slowest source instead of the sum of all of them. The
+    fetchers mostly wait for the network or for programs, so threads are sufficient. The
+    sources not fetched within the deadline are reported as timed out, their threads are
+    abandoned.
+    """
+    tasks: queue.SimpleQueue[Sequence[int]] = queue.SimpleQueue()
+    serial = []
+    for n, (source_info, _file_cache, _fetcher) in enumerate(fetches):
+        if source_info.fetcher_type in _SERIAL_FETCHER_TYPES:
+            serial.append(n)
+        else:
+            tasks.put((n,))
+    if serial:
+        tasks.put(serial)
+    num_threads = max(1, min(max_threads, tasks.qsize()))
+
+    fetched: dict[int, _FetchedSource] = {}
+    finished = threading.Condition()
+
+    def work() -> None:
+        while True:
+            try:
+                task = tasks.get_nowait()
+            except queue.Empty:
+                return
+            for n in task:
+                source_info, file_cache, fetcher = fetches[n]
+                fetched_source = _do_fetch(
+                    source_info, file_cache, fetcher, mode=mode, per_thread=True
+                )
+                with finished:
+                    fetched[n] = fetched_source
+                    finished.notify()
+
+    for _n in range(num_threads):
+        # Daemon threads: a hanging fetcher must not keep the process alive
+        threading.Thread(target=work, name="fetcher", daemon=True).start()
+
+    with finished:
+        finished.wait_for(lambda: len(fetched) == len(fetches), timeout=deadline)
+        return [
+            fetched.get(n)
+            or (
+                source_info,
+                result.Error(
+                    MKTimeout(f"{source_info}: no data within the deadline of {deadline} seconds")
+                ),
+                Snapshot.null(),
+            )
+            for n, (source_info, _file_cache, _fetcher) in enumerate(fetches)
+        ]
 
 
 def _do_fetch(
@@ -109,9 +190,10 @@ def _do_fetch(
     fetcher: Fetcher,
     *,
     mode: Mode,
-) -> tuple[SourceInfo, result.Result[AgentRawData | SNMPRawData, Exception], Snapshot,]:
+    per_thread: bool = False,
+) -> _FetchedSource:
     console.vverbose(f"  Source: {source_info}\n")
-    with CPUTracker() as tracker:
+    with CPUTracker(per_thread=per_thread) as tracker:
         raw_data = get_raw_data(file_cache, fetcher, mode)
     return source_info, raw_data, tracker.duration
 
@@ -240,6 +322,8 @@ class CMKFetcher:
         selected_sections: SectionNameCollection,
         simulation_mode: bool,
         max_cachefile_age: MaxAge | None = None,
+        max_threads: int = 1,
+        deadline: float | None = None,
     ) -> None:
         self.config_cache: Final = config_cache
         self.file_cache_options: Final = file_cache_options
@@ -249,6 +333,8 @@ class CMKFetcher:
         self.selected_sections: Final = selected_sections
         self.simulation_mode: Final = simulation_mode
         self.max_cachefile_age: Final = max_cachefile_age
+        self.max_threads: Final = max_threads
+        self.deadline: Final = deadline
 
     def __call__(
         self, host_name: HostName, *, ip_address: HostAddress | None
@@ -292,6 +378,8 @@ class CMKFetcher:
             simulation=self.simulation_mode,
             file_cache_options=self.file_cache_options,
             mode=self.mode,
+            max_threads=self.max_threads,
+            deadline=self.deadline,
         )
 
 
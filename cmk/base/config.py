@@ -10,6 +10,7 @@ import copy
 import dataclasses
 import enum
 import functools
+import hashlib
 import ipaddress
 import itertools
 import logging
@@ -95,6 +96,7 @@ from cmk.utils.store.host_storage import (
     apply_hosts_file_to_object,
     ContactgroupName,
     get_host_storage_loaders,
+    StorageFormat,
 )
 from cmk.utils.structured_data import RawIntervalFromConfig
 from cmk.utils.tags import ComputedDataSources, TagGroupID, TagID
@@ -497,10 +499,16 @@ def load(
 ) -> None:
     _initialize_config()
 
-    changed_var_names = _load_config(with_conf_d, exclude_parents_mk)
+    config_file_paths = get_config_file_paths(with_conf_d)
+    changed_var_names = _load_config(config_file_paths, exclude_parents_mk)
     if changed_vars_handler is not None:
         changed_vars_handler(changed_var_names)
 
+    global _loaded_config_fingerprint
+    _loaded_config_fingerprint = _compute_config_fingerprint(
+        config_file_paths, with_conf_d, exclude_parents_mk
+    )
+
     _initialize_derived_config_variables()
 
     _perform_post_config_loading_actions()
@@ -529,9 +537,44 @@ def load_packed_config(config_path: ConfigPath) -> None:
 
 
 def _initialize_config() -> None:
+    global _loaded_config_fingerprint
+    _loaded_config_fingerprint = None
     load_default_config()
 
 
+# Identifies the configuration files read by load(). None in case the configuration
+# has not been read from the configuration files (e.g. the packed config).
+_loaded_config_fingerprint: str | None = None
+
+
+def loaded_from_config_files() -> bool:
+    return _loaded_config_fingerprint is not None
+
+
+def _compute_config_fingerprint(
+    config_file_paths: Iterable[Path], with_conf_d: bool, exclude_parents_mk: bool
+) -> str:
+    """Fingerprint of the configuration files based on their modification times and sizes"""
+    paths = [cmk.utils.paths.make_experimental_config_file()]
+    for path in config_file_paths:
+        if path.name == "hosts.mk":
+            # The hosts of a folder may be read from the file of any host storage format
+            paths += [
+                path.with_suffix(storage_format.extension()) for storage_format in StorageFormat
+            ]
+        else:
+            paths.append(path)
+
+    fingerprint = hashlib.sha256(repr((with_conf_d, exclude_parents_mk)).encode())
+    for path in paths:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        fingerprint.update(f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}\0".encode())
+    return fingerprint.hexdigest()
+
+
 def _perform_post_config_loading_actions() -> None:
     """These tasks must be performed after loading the Check_MK base configuration"""
     # First cleanup things (needed for e.g. reloading the config)
@@ -541,6 +584,8 @@ def _perform_post_config_loading_actions() -> None:
     _collect_parameter_rulesets_from_globals(global_dict)
     _transform_plugin_names_from_160_to_170(global_dict)
 
+    piggyback.set_storage(piggyback_storage)
+
     get_config_cache().initialize()
 
 
@@ -600,7 +645,7 @@ def _load_config_file(file_to_load: Path, into_dict: dict[str, Any]) -> None:
     exec(file_to_load.read_text(), into_dict, into_dict)  # nosec B102 # BNS:aee528
 
 
-def _load_config(with_conf_d: bool, exclude_parents_mk: bool) -> set[str]:
+def _load_config(config_file_paths: Iterable[Path], exclude_parents_mk: bool) -> set[str]:
     helper_vars = {
         "FOLDER_PATH": None,
     }
@@ -623,7 +668,7 @@ def _load_config(with_conf_d: bool, exclude_parents_mk: bool) -> set[str]:
 
     host_storage_loaders = get_host_storage_loaders(config_storage_format)
     config_dir_path = Path(cmk.utils.paths.check_mk_config_dir)
-    for path in get_config_file_paths(with_conf_d):
+    for path in config_file_paths:
         # During parent scan mode we must not read in old version of parents.mk!
         if exclude_parents_mk and path.name == "parents.mk":
             continue
@@ -927,7 +972,7 @@ def set_use_core_config(
 
 
 def strip_tags(tagged_hostlist: list[str]) -> list[HostName]:
-    cache = cache_manager.obtain_cache("strip_tags")
+    cache = cache_manager.obtain_bounded_cache("strip_tags", max_entries=_MAX_CACHED_HOSTS)
 
     cache_id = tuple(tagged_hostlist)
     with contextlib.suppress(KeyError):
@@ -1278,6 +1323,12 @@ def _format_item_with_template(template: str, item: Item) -> str:
         return f"{template} {item or ''}".strip()
 
 
+# The caches live as long as the process, which is long for the keepalive helpers.
+# They are bounded to the working set of a large site.
+_MAX_CACHED_HOSTS = 100000
+_MAX_CACHED_SERVICE_DESCRIPTIONS = 500000
+
+
 def get_final_service_description(hostname: HostName, description: ServiceName) -> ServiceName:
     translations = get_service_translations(hostname)
     # Note: at least strip the service description.
@@ -1290,7 +1341,9 @@ def get_final_service_description(hostname: HostName, description: ServiceName)
     )
 
     # Sanitize: remove illegal characters from a service description
-    cache = cache_manager.obtain_cache("final_service_description")
+    cache = cache_manager.obtain_bounded_cache(
+        "final_service_description", max_entries=_MAX_CACHED_SERVICE_DESCRIPTIONS
+    )
     with contextlib.suppress(KeyError):
         return cache[description]
 
@@ -1366,7 +1419,9 @@ def get_piggyback_translations(hostname: HostName) -> cmk.utils.translations.Tra
 
 
 def get_service_translations(hostname: HostName) -> cmk.utils.translations.TranslationOptions:
-    translations_cache = cache_manager.obtain_cache("service_description_translations")
+    translations_cache = cache_manager.obtain_bounded_cache(
+        "service_description_translations", max_entries=_MAX_CACHED_HOSTS
+    )
     with contextlib.suppress(KeyError):
         return translations_cache[hostname]
 
@@ -2133,6 +2188,13 @@ class ConfigCache:
             clusters_of=self._clusters_of_cache,
             nodes_of=self._nodes_of_cache,
             all_configured_hosts=self._all_configured_hosts,
+            matching_hosts_cache=(
+                None
+                if _loaded_config_fingerprint is None
+                else ruleset_matcher.MatchingHostsCacheFile(
+                    cmk.utils.paths.ruleset_matcher_cache_file, _loaded_config_fingerprint
+                )
+            ),
         )
 
         self._all_active_clusters = set(
@@ -2149,7 +2211,10 @@ class ConfigCache:
 
     def _initialize_caches(self) -> None:
         self.invalidate_host_config()
-        self._check_table_cache = cache_manager.obtain_cache("check_tables")
+        # A check table per filter mode and handling of ignored services of a host
+        self._check_table_cache = cache_manager.obtain_bounded_cache(
+            "check_tables", max_entries=4 * _MAX_CACHED_HOSTS
+        )
 
         self._cache_section_name_of: dict[CheckPluginNameStr, str] = {}
 
@@ -362,6 +362,10 @@ def _create_core_config(
 
     cmk.utils.password_store.save_for_helpers(config_path)
 
+    # The config creation has evaluated the rulesets of all hosts. Make the result
+    # available to the helpers and automations working with this configuration.
+    config_cache.ruleset_matcher.ruleset_optimizer.save_matching_hosts_cache()
+
 
 def _verify_non_deprecated_checkgroups() -> None:
     """Verify that the user has no deprecated check groups configured."""
@@ -5,15 +5,18 @@
 """Code for support of Nagios (and compatible) cores"""
 
 import base64
+import hashlib
+import multiprocessing
+import multiprocessing.pool
 import os
 import py_compile
 import socket
 import sys
 from collections import Counter
-from collections.abc import Mapping
+from collections.abc import Callable, Iterable, Mapping, Sequence
 from io import StringIO
 from pathlib import Path
-from typing import Any, cast, IO, Literal
+from typing import Any, cast, IO, Literal, NamedTuple
 
 import cmk.utils.config_path
 import cmk.utils.config_warnings as config_warnings
@@ -21,6 +24,7 @@ import cmk.utils.password_store
 import cmk.utils.paths
 import cmk.utils.store as store
 import cmk.utils.tty as tty
+import cmk.utils.version as cmk_version
 from cmk.utils.check_utils import section_name_of
 from cmk.utils.config_path import VersionedConfigPath
 from cmk.utils.exceptions import MKGeneralException
@@ -171,6 +175,7 @@ def create_config(
 
     config_cache = config.get_config_cache()
 
+    create_all_hosts = hostnames is None
     if hostnames is None:
         hostnames = list(config_cache.all_active_hosts())
 
@@ -182,10 +187,17 @@ def create_config(
 
     licensing_counter = Counter("services")
     all_host_labels: dict[HostName, CollectedHostLabels] = {}
-    for hostname in sorted(hostnames):
-        all_host_labels[hostname] = _create_nagios_config_host(
-            cfg, config_cache, hostname, stored_passwords, licensing_counter
-        )
+    if config.core_config_workers > 0 and create_all_hosts:
+        host_configs = _create_host_configs(config_cache, hostnames, stored_passwords)
+        for hostname in sorted(hostnames):
+            all_host_labels[hostname] = _add_host_config(
+                cfg, host_configs[hostname], licensing_counter
+            )
+    else:
+        for hostname in sorted(hostnames):
+            all_host_labels[hostname] = _create_nagios_config_host(
+                cfg, config_cache, hostname, stored_passwords, licensing_counter
+            )
 
     _validate_licensing(licensing_handler, licensing_counter)
 
@@ -237,6 +249,266 @@ def _create_nagios_config_host(
     )
 
 
+class HostConfig(NamedTuple):
+    """The objects of a host together with the objects they need to be defined globally
+
+    The host check commands are numbered within the configuration of the host. They get their
+    final numbers when the configurations of the hosts are put together.
+    """
+
+    objects: str
+    host_labels: CollectedHostLabels
+    hostgroups: frozenset[HostgroupName]
+    servicegroups: frozenset[ServicegroupName]
+    contactgroups: frozenset[ContactgroupName]
+    checknames: frozenset[CheckPluginName]
+    active_checks: frozenset[CheckPluginNameStr]
+    custom_commands: frozenset[CoreCommandName]
+    hostcheck_commands: Sequence[tuple[CoreCommand, str]]
+    num_services: int
+    warnings: Sequence[str]
+
+
+def _create_host_config(
+    config_cache: ConfigCache, hostname: HostName, stored_passwords: Mapping[str, str]
+) -> HostConfig:
+    outfile = StringIO()
+    cfg = NagiosConfig(outfile, [hostname])
+    license_counter: Counter = Counter()
+    num_warnings = len(config_warnings.g_configuration_warnings)
+    host_labels = _create_nagios_config_host(
+        cfg, config_cache, hostname, stored_passwords, license_counter
+    )
+    return HostConfig(
+        objects=outfile.getvalue(),
+        host_labels=host_labels,
+        hostgroups=frozenset(cfg.hostgroups_to_define),
+        servicegroups=frozenset(cfg.servicegroups_to_define),
+        contactgroups=frozenset(cfg.contactgroups_to_define),
+        checknames=frozenset(cfg.checknames_to_define),
+        active_checks=frozenset(cfg.active_checks_to_define),
+        custom_commands=frozenset(cfg.custom_commands_to_define),
+        hostcheck_commands=cfg.hostcheck_commands_to_define,
+        num_services=license_counter["services"],
+        warnings=config_warnings.g_configuration_warnings[num_warnings:],
+    )
+
+
+def _add_host_config(
+    cfg: NagiosConfig, host_config: HostConfig, license_counter: Counter
+) -> CollectedHostLabels:
+    objects = host_config.objects
+    offset = len(cfg.hostcheck_commands_to_define)
+    if offset:
+        # Renumber from the highest number on, the new numbers are higher than the old ones
+        for number in range(len(host_config.hostcheck_commands), 0, -1):
+            objects = objects.replace(
+                " check-mk-host-custom-%d\n" % number,
+                " check-mk-host-custom-%d\n" % (number + offset),
+            )
+    cfg.write(objects)
+
+    cfg.hostgroups_to_define.update(host_config.hostgroups)
+    cfg.servicegroups_to_define.update(host_config.servicegroups)
+    cfg.contactgroups_to_define.update(host_config.contactgroups)
+    cfg.checknames_to_define.update(host_config.checknames)
+    cfg.active_checks_to_define.update(host_config.active_checks)
+    cfg.custom_commands_to_define.update(host_config.custom_commands)
+    cfg.hostcheck_commands_to_define.extend(
+        ("check-mk-host-custom-%d" % (number + offset), command_line)
+        for number, (_command, command_line) in enumerate(host_config.hostcheck_commands, 1)
+    )
+    license_counter["services"] += host_config.num_services
+    return host_config.host_labels
+
+
+def _create_host_configs(
+    config_cache: ConfigCache, hostnames: Sequence[HostName], stored_passwords: Mapping[str, str]
+) -> dict[HostName, HostConfig]:
+    """Create the configurations of the hosts in worker processes
+
+    The configurations are kept between the runs, only the configurations of the hosts whose
+    inputs have changed are created again. This depends on the DNS cache, hosts without cached
+    IP addresses would otherwise be resolved on every run. The configurations of hosts with
+    configuration warnings are not kept, their problems are reported on every run.
+    """
+    use_cache = config.use_dns_cache and config.loaded_from_config_files()
+    fingerprints = (
+        _host_config_fingerprints(config_cache, hostnames, stored_passwords) if use_cache else {}
+    )
+    cached = _load_host_config_cache() if use_cache else {}
+
+    host_configs: dict[HostName, HostConfig] = {}
+    for hostname, fingerprint in fingerprints.items():
+        if (entry := cached.get(hostname)) is not None and entry[0] == fingerprint:
+            host_configs[hostname] = entry[1]
+
+    hostnames_to_create = [hostname for hostname in hostnames if hostname not in host_configs]
+    console.verbose(
+        "Creating the configuration of %d of %d hosts\n",
+        len(hostnames_to_create),
+        len(hostnames),
+    )
+    if hostnames_to_create:
+        num_workers = min(config.core_config_workers, len(hostnames_to_create))
+        with _worker_pool(num_workers, _init_config_worker, config_cache, stored_passwords) as pool:
+            for hostname, host_config in zip(
+                hostnames_to_create,
+                pool.imap(
+                    _create_host_config_in_worker,
+                    hostnames_to_create,
+                    chunksize=_chunk_size(len(hostnames_to_create), num_workers),
+                ),
+            ):
+                # The workers have already shown the warnings
+                config_warnings.g_configuration_warnings.extend(host_config.warnings)
+                host_configs[hostname] = host_config
+
+    if use_cache:
+        _save_host_config_cache(
+            {
+                hostname: (fingerprints[hostname], host_config)
+                for hostname, host_config in host_configs.items()
+                if not host_config.warnings
+            }
+        )
+    return host_configs
+
+
+def _load_host_config_cache() -> dict[HostName, tuple[str, HostConfig]]:
+    try:
+        return store.load_object_from_pickle_file(
+            cmk.utils.paths.nagios_host_config_cache_file, default={}
+        )
+    except Exception:
+        # Created by another version or broken, the configurations are simply created again
+        if cmk.utils.debug.enabled():
+            raise
+        return {}
+
+
+def _save_host_config_cache(host_configs: Mapping[HostName, tuple[str, HostConfig]]) -> None:
+    store.save_object_to_pickle_file(cmk.utils.paths.nagios_host_config_cache_file, host_configs)
+
+
+def _host_config_fingerprints(
+    config_cache: ConfigCache, hostnames: Sequence[HostName], stored_passwords: Mapping[str, str]
+) -> dict[HostName, str]:
+    """Fingerprints of the inputs of the host configurations
+
+    The configuration of a host depends on the global configuration, the host storage files of
+    its folder, its discovered services and host labels and its cached IP addresses. The
+    configurations of clusters and their nodes depend on the inputs of each other. Files are
+    identified by their modification times and sizes.
+    """
+    host_files = _host_storage_files(hostnames)
+    global_fingerprint = _global_config_fingerprint(
+        stored_passwords, {path for paths in host_files.values() for path in paths}
+    )
+
+    host_inputs: dict[HostName, str] = {}
+
+    def inputs_of(hostname: HostName) -> str:
+        if (inputs := host_inputs.get(hostname)) is None:
+            inputs = host_inputs[hostname] = repr(
+                (
+                    hostname,
+                    [_file_fingerprint(path) for path in host_files.get(hostname, ())],
+                    _file_fingerprint(Path(cmk.utils.paths.autochecks_dir, f"{hostname}.mk")),
+                    _file_fingerprint(
+                        cmk.utils.paths.discovered_host_labels_dir / f"{hostname}.mk"
+                    ),
+                    ip_lookup.cached_ip_addresses(hostname),
+                )
+            )
+        return inputs
+
+    fingerprints = {}
+    for hostname in hostnames:
+        fingerprint = hashlib.sha256(global_fingerprint.encode())
+        for related in [
+            hostname,
+            *sorted(config_cache.nodes_of(hostname) or ()),
+            *sorted(config_cache.clusters_of(hostname)),
+        ]:
+            fingerprint.update(inputs_of(related).encode())
+        fingerprints[hostname] = fingerprint.hexdigest()
+    return fingerprints
+
+
+def _host_storage_files(hostnames: Iterable[HostName]) -> dict[HostName, Sequence[Path]]:
+    config_dir = Path(cmk.utils.paths.check_mk_config_dir)
+    files_of_folders: dict[Path, Sequence[Path]] = {}
+    host_files = {}
+    for hostname in hostnames:
+        if (host_path := config.host_paths.get(hostname)) is None:
+            continue
+        folder = (config_dir / host_path.lstrip("/")).parent
+        if (files := files_of_folders.get(folder)) is None:
+            files = files_of_folders[folder] = sorted(folder.glob("hosts.*"))
+        host_files[hostname] = files
+    return host_files
+
+
+def _global_config_fingerprint(stored_passwords: Mapping[str, str], host_files: set[Path]) -> str:
+    """Fingerprint of everything the configuration of all hosts depends on
+
+    These are the loaded configuration files apart from the host storage files, the stored
+    passwords and the local extensions, e.g. legacy checks and plugins. Other files of the
+    configuration directory, e.g. the folder attributes changing with the number of hosts in
+    the folder, are not loaded.
+    """
+    fingerprint = hashlib.sha256(
+        repr((cmk_version.__version__, sorted(stored_passwords.items()))).encode()
+    )
+    paths = [
+        *config.get_config_file_paths(with_conf_d=True),
+        cmk.utils.paths.make_experimental_config_file(),
+        *sorted(Path(cmk.utils.paths.local_share_dir).rglob("*")),
+        *sorted(Path(cmk.utils.paths.local_lib_dir).rglob("*")),
+    ]
+    for path in paths:
+        if path not in host_files:
+            fingerprint.update(repr(_file_fingerprint(path)).encode())
+    return fingerprint.hexdigest()
+
+
+def _file_fingerprint(path: Path) -> tuple[str, int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+
+def _worker_pool(
+    num_workers: int, initializer: Callable[..., None], *initargs: object
+) -> multiprocessing.pool.Pool:
+    # Forking shares the loaded configuration and the config cache with the workers
+    return multiprocessing.get_context("fork").Pool(num_workers, initializer, initargs)
+
+
+def _chunk_size(num_hosts: int, num_workers: int) -> int:
+    # Several chunks per worker to even out the differences between the hosts
+    return max(1, num_hosts // (num_workers * 4))
+
+
+_worker_config_cache: ConfigCache | None = None
+_worker_stored_passwords: Mapping[str, str] = {}
+_worker_config_path: VersionedConfigPath | None = None
+
+
+def _init_config_worker(config_cache: ConfigCache, stored_passwords: Mapping[str, str]) -> None:
+    global _worker_config_cache, _worker_stored_passwords
+    _worker_config_cache = config_cache
+    _worker_stored_passwords = stored_passwords
+
+
+def _create_host_config_in_worker(hostname: HostName) -> HostConfig:
+    assert _worker_config_cache is not None
+    return _create_host_config(_worker_config_cache, hostname, _worker_stored_passwords)
+
+
 def _create_nagios_host_spec(  # pylint: disable=too-many-branches
     cfg: NagiosConfig, config_cache: ConfigCache, hostname: HostName, attrs: ObjectAttributes
 ) -> ObjectSpec:
@@ -1094,27 +1366,26 @@ def _precompile_hostchecks(config_path: VersionedConfigPath) -> None:
 
     console.verbose("Precompiling host checks...\n")
 
-    host_check_store = HostCheckStore()
-    for hostname in config_cache.all_active_hosts():
-        try:
-            console.verbose(
-                "%s%s%-16s%s:",
-                tty.bold,
-                tty.blue,
-                hostname,
-                tty.normal,
-                stream=sys.stderr,
-            )
-            host_check = _dump_precompiled_hostcheck(
-                config_cache,
-                config_path,
-                hostname,
-            )
-            if host_check is None:
-                console.verbose("(no Checkmk checks)\n")
-                continue
+    hostnames = list(config_cache.all_active_hosts())
+    if config.core_config_workers > 0 and hostnames:
+        num_workers = min(config.core_config_workers, len(hostnames))
+        with _worker_pool(num_workers, _init_precompile_worker, config_cache, config_path) as pool:
+            for hostname, error in zip(
+                hostnames,
+                pool.imap(
+                    _precompile_hostcheck_in_worker,
+                    hostnames,
+                    chunksize=_chunk_size(len(hostnames), num_workers),
+                ),
+            ):
+                if error is not None:
+                    console.error(f"Error precompiling checks for host {hostname}: {error}\n")
+                    sys.exit(5)
+        return
 
-            host_check_store.write(config_path, hostname, host_check)
+    for hostname in hostnames:
+        try:
+            _precompile_hostcheck(config_cache, config_path, hostname)
         except Exception as e:
             if cmk.utils.debug.enabled():
                 raise
@@ -1122,6 +1393,47 @@ def _precompile_hostchecks(config_path: VersionedConfigPath) -> None:
             sys.exit(5)
 
 
+def _precompile_hostcheck(
+    config_cache: ConfigCache, config_path: VersionedConfigPath, hostname: HostName
+) -> None:
+    console.verbose(
+        "%s%s%-16s%s:",
+        tty.bold,
+        tty.blue,
+        hostname,
+        tty.normal,
+        stream=sys.stderr,
+    )
+    host_check = _dump_precompiled_hostcheck(
+        config_cache,
+        config_path,
+        hostname,
+    )
+    if host_check is None:
+        console.verbose("(no Checkmk checks)\n")
+        return
+
+    HostCheckStore().write(config_path, hostname, host_check)
+
+
+def _init_precompile_worker(config_cache: ConfigCache, config_path: VersionedConfigPath) -> None:
+    global _worker_config_cache, _worker_config_path
+    _worker_config_cache = config_cache
+    _worker_config_path = config_path
+
+
+def _precompile_hostcheck_in_worker(hostname: HostName) -> str | None:
+    """Precompile the host check, the error message in case of an error"""
+    assert _worker_config_cache is not None and _worker_config_path is not None
+    try:
+        _precompile_hostcheck(_worker_config_cache, _worker_config_path, hostname)
+    except Exception as e:
+        if cmk.utils.debug.enabled():
+            raise
+        return str(e)
+    return None
+
+
 def _dump_precompiled_hostcheck(  # pylint: disable=too-many-branches
     config_cache: ConfigCache,
     config_path: VersionedConfigPath,
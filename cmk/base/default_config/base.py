@@ -51,6 +51,10 @@ tcp_connect_timeout = 5.0
 tcp_connect_timeouts: list[RuleSpec[float]] = []
 use_dns_cache = True  # prevent DNS by using own cache file
 delay_precompile = False  # delay Python compilation to Nagios execution
+core_config_workers = 0  # processes creating the Nagios configuration of the hosts
+fetcher_threads = 1  # threads fetching the data sources of a host concurrently
+fetcher_deadline: float | None = None  # seconds to wait for the data sources of a host
+prediction_workers = 1  # processes precomputing the predictive levels
 restart_locking: Literal["abort", "wait"] | None = "abort"
 check_submission: Literal["file", "pipe"] = "file"
 default_host_group = "check_mk"
@@ -58,6 +62,7 @@ default_host_group = "check_mk"
 check_max_cachefile_age = 0  # per default do not use cache files when checking
 cluster_max_cachefile_age = 90  # secs.
 piggyback_max_cachefile_age = 3600  # secs
+piggyback_storage: Literal["files", "database"] = "files"
 # Ruleset for translating piggyback host names
 piggyback_translation: list[RuleSpec[TranslationOptions]] = []
 # Ruleset for translating service descriptions
@@ -338,5 +343,6 @@ aggr_summary_hostname = "%s-s"
 status_data_inventory: list[RuleSpec[object]] = []
 logwatch_rules: list[RuleSpec[object]] = []
 config_storage_format: Literal["standard", "raw", "pickle"] = "pickle"
+value_store_format: Literal["standard", "binary"] = "standard"
 
 automatic_host_removal: list[RuleSpec[object]] = []
@@ -15,7 +15,7 @@ from typing import Any, NamedTuple
 import cmk.utils.debug
 import cmk.utils.paths
 import cmk.utils.store as store
-from cmk.utils.caching import cache_manager
+from cmk.utils.caching import BoundedCache, cache_manager
 from cmk.utils.exceptions import MKIPAddressLookupError, MKTerminate, MKTimeout
 from cmk.utils.hostaddress import HostAddress, HostName
 from cmk.utils.log import console
@@ -138,6 +138,10 @@ def lookup_ip_address(
     )
 
 
+# The lookups are cached as long as the process lives, bounded to the hosts of a large site
+_MAX_CACHED_LOOKUPS = 200000
+
+
 # Variables needed during the renaming of hosts (see automation.py)
 def cached_dns_lookup(
     hostname: HostName | HostAddress,
@@ -157,9 +161,9 @@ def cached_dns_lookup(
 
     2) inner layer: see _file_cached_dns_lookup
     """
-    cache: dict[
+    cache: BoundedCache[
         tuple[HostName | HostAddress, socket.AddressFamily], HostAddress | None
-    ] = cache_manager.obtain_cache("cached_dns_lookup")
+    ] = cache_manager.obtain_bounded_cache("cached_dns_lookup", max_entries=_MAX_CACHED_LOOKUPS)
     cache_id = hostname, family
 
     # Address has already been resolved in prior call to this function?
@@ -356,6 +360,12 @@ def _get_ip_lookup_cache() -> IPLookupCache:
     return cache
 
 
+def cached_ip_addresses(host_name: HostName) -> tuple[HostAddress | None, HostAddress | None]:
+    """The IPv4 and IPv6 address of the host in the file based DNS cache"""
+    cache = _get_ip_lookup_cache()
+    return cache.get((host_name, socket.AF_INET)), cache.get((host_name, socket.AF_INET6))
+
+
 def update_dns_cache(
     *,
     ip_lookup_configs: Iterable[IPLookupConfig],
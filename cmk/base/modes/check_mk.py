@@ -23,6 +23,7 @@ import cmk.utils.debug
 import cmk.utils.log as log
 import cmk.utils.paths
 import cmk.utils.piggyback as piggyback
+import cmk.utils.prediction as prediction
 import cmk.utils.store as store
 import cmk.utils.tty as tty
 import cmk.utils.version as cmk_version
@@ -883,6 +884,45 @@ modes.register(
     )
 )
 
+# .
+#   .--compute-predictions-------------------------------------------------.
+#   |                                       _  _        _                  |
+#   |                _ __   _ __   ___   __| |(_)  ___ | |_                |
+#   |               | '_ \ | '__| / _ \ / _` || | / __|| __|               |
+#   |               | |_) || |   |  __/| (_| || || (__ | |_                |
+#   |               | .__/ |_|    \___| \__,_||_| \___| \__|               |
+#   |               |_|                                                    |
+#   '----------------------------------------------------------------------'
+
+# The precomputation is run hourly, see the cron job cmk_predictions
+_PREDICTION_LOOKAHEAD = 3600
+
+
+def mode_compute_predictions() -> int:
+    failures = prediction.precompute_predictions(
+        prediction.PREDICTION_DIR,
+        int(time.time()),
+        _PREDICTION_LOOKAHEAD,
+        max_workers=config.prediction_workers,
+    )
+    return 1 if failures else 0
+
+
+modes.register(
+    Mode(
+        long_option="compute-predictions",
+        handler_function=mode_compute_predictions,
+        short_help="Compute the predictive levels needed within the next hour",
+        long_help=[
+            "Computes the predictions of the predictive levels ahead of the checks: all "
+            "predictions which become outdated within the next hour and the predictions of the "
+            "time groups starting within the next hour. The predictions are computed by up to "
+            "prediction_workers processes at the same time.",
+        ],
+        needs_checks=False,
+    )
+)
+
 # .
 #   .--scan-parents--------------------------------------------------------.
 #   |                                                         _            |
@@ -1204,12 +1244,16 @@ def mode_flush(hosts: list[HostName]) -> None:  # pylint: disable=too-many-branc
         flushed = False
 
         # counters
-        try:
-            os.remove(cmk.utils.paths.counters_dir + "/" + host)
+        counters_removed = False
+        for counters_file in [host, host + ".journal"]:
+            try:
+                os.remove(cmk.utils.paths.counters_dir + "/" + counters_file)
+                counters_removed = True
+            except OSError:
+                pass
+        if counters_removed:
             out.output(tty.bold + tty.blue + " counters")
             flushed = True
-        except OSError:
-            pass
 
         # cache files
         d = 0
@@ -2100,6 +2144,8 @@ def mode_check(
         on_error=OnError.RAISE,
         selected_sections=selected_sections,
         simulation_mode=config.simulation_mode,
+        max_threads=config.fetcher_threads,
+        deadline=config.fetcher_deadline,
     )
     parser = CMKParser(
         config_cache,
@@ -2131,10 +2177,11 @@ def mode_check(
         ]
     ] = ()
     with error_handler, plugin_contexts.current_host(hostname), load_host_value_store(
-        hostname, store_changes=not dry_run
+        hostname, store_changes=not dry_run, storage_format=config.value_store_format
     ) as value_store_manager:
         console.vverbose("Checkmk version %s\n", cmk_version.__version__)
-        fetched = fetcher(hostname, ip_address=ipaddress)
+        with CPUTracker() as fetch_tracker:
+            fetched = fetcher(hostname, ip_address=ipaddress)
         check_plugins = CheckPluginMapper(
             config_cache,
             value_store_manager,
@@ -2175,7 +2222,7 @@ def mode_check(
         check_result = ActiveCheckResult.from_subresults(
             check_result,
             make_timing_results(
-                tracker.duration,
+                fetch_tracker.duration + tracker.duration,
                 tuple((f[0], f[2]) for f in fetched),
                 perfdata_with_times=config.check_mk_perfdata_with_times,
             ),
@@ -392,6 +392,7 @@ def notification_analyse_backlog(nr: int) -> NotifyAnalysisInfo | None:
 # TODO: Make use of the generic do_keepalive() mechanism?
 def notify_keepalive() -> None:
     cmk.base.utils.register_sigint_handler()
+    cmk.base.utils.register_sigusr1_cache_stats_handler()
     events.event_keepalive(
         event_function=notify_notify,
         call_every_loop=send_ripe_bulks,
@@ -5,10 +5,12 @@
 """This is an unsorted collection of functions which are needed in
 Check_MK modules and/or cmk.base modules code."""
 
+import logging
 import signal
 from types import FrameType
 from typing import NoReturn
 
+from cmk.utils.caching import cache_manager
 from cmk.utils.exceptions import MKTerminate
 
 # .
@@ -31,3 +33,14 @@ def _handle_keepalive_interrupt(signum: int, frame: FrameType | None) -> NoRetur
 
 def register_sigint_handler() -> None:
     signal.signal(signal.SIGINT, _handle_keepalive_interrupt)
+
+
+# register SIGUSR1 handler for inspecting the caches of long running processes
+def _handle_cache_stats_request(signum: int, frame: FrameType | None) -> None:
+    logger = logging.getLogger("cmk.base")
+    logger.warning("=== CACHE STATISTICS ===")
+    cache_manager.log_stats(logger, logging.WARNING)
+
+
+def register_sigusr1_cache_stats_handler() -> None:
+    signal.signal(signal.SIGUSR1, _handle_cache_stats_request)
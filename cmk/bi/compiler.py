@@ -6,9 +6,11 @@
 from __future__ import annotations
 
 import ast
+import multiprocessing
 import os
 import pickle
 import time
+from collections.abc import Iterable, Mapping
 from pathlib import Path
 
 from redis import Redis
@@ -23,9 +25,15 @@ from cmk.utils.redis import get_redis_client
 
 from cmk.bi.aggregation import BIAggregation
 from cmk.bi.data_fetcher import BIStructureFetcher, get_cache_dir, SiteProgramStart
+from cmk.bi.dependencies import (
+    BIAggregationDependencies,
+    BIRecordingSearcher,
+    changed_hosts,
+    config_fingerprint,
+    host_fingerprints,
+)
 from cmk.bi.lib import SitesCallback
 from cmk.bi.packs import BIAggregationPacks
-from cmk.bi.searcher import BISearcher
 from cmk.bi.trees import BICompiledAggregation, BICompiledRule, FrozenBIInfo
 from cmk.bi.type_defs import frozen_aggregations_dir
 
@@ -36,15 +44,27 @@ class ConfigStatus(TypedDict):
     online_sites: set[SiteProgramStart]
 
 
+class CompilationDependencies(TypedDict):
+    host_fingerprints: dict[str, str]
+    aggregations: dict[str, BIAggregationDependencies]
+
+
 class BICompiler:
-    def __init__(self, bi_configuration_file: str, sites_callback: SitesCallback) -> None:
+    def __init__(
+        self,
+        bi_configuration_file: str,
+        sites_callback: SitesCallback,
+        compilation_workers: int = 0,
+    ) -> None:
         self._sites_callback = sites_callback
         self._bi_configuration_file = bi_configuration_file
+        self._compilation_workers = compilation_workers
 
         self._logger = logger.getChild("bi.compiler")
         self._compiled_aggregations: dict[str, BICompiledAggregation] = {}
         self._path_compilation_lock = Path(get_cache_dir(), "compilation.LOCK")
         self._path_compilation_timestamp = Path(get_cache_dir(), "last_compilation")
+        self._path_compilation_dependencies = Path(get_cache_dir(), "compilation_dependencies")
         self._path_compiled_aggregations = Path(get_cache_dir(), "compiled_aggregations")
         self._path_compiled_aggregations.mkdir(parents=True, exist_ok=True)
 
@@ -54,7 +74,7 @@ class BICompiler:
     def _setup(self) -> None:
         self._bi_packs = BIAggregationPacks(self._bi_configuration_file)
         self._bi_structure_fetcher = BIStructureFetcher(self._sites_callback)
-        self.bi_searcher = BISearcher()
+        self.bi_searcher = BIRecordingSearcher()
 
     @property
     def compiled_aggregations(self) -> dict[str, BICompiledAggregation]:
@@ -216,25 +236,7 @@ class BICompiler:
                 return
 
             self.prepare_for_compilation(current_configstatus["online_sites"])
-
-            # Compile the raw tree
-            all_aggregations_by_id: dict[str, BIAggregation] = {
-                x.id: x for x in self._bi_packs.get_all_aggregations()
-            }
-            for aggregation in all_aggregations_by_id.values():
-                start = time.time()
-                self._compiled_aggregations[aggregation.id] = aggregation.compile(self.bi_searcher)
-                self._logger.debug(f"Compilation of {aggregation.id} took {time.time() - start:f}")
-            self._verify_aggregation_title_uniqueness(self._compiled_aggregations)
-
-            for aggr_id, compiled_aggr in self._compiled_aggregations.items():
-                start = time.time()
-                result = compiled_aggr.serialize()
-                self._logger.debug(
-                    "Schema dump %s took config took %f (%d branches)"
-                    % (aggr_id, time.time() - start, len(compiled_aggr.branches))
-                )
-                self._save_data(self._path_compiled_aggregations.joinpath(aggr_id), result)
+            self._compile_changed_aggregations()
 
             self._compiled_aggregations = self._manage_frozen_branches(self._compiled_aggregations)
             self._generate_part_of_aggregation_lookup(self._compiled_aggregations)
@@ -246,6 +248,105 @@ class BICompiler:
             str(self._path_compilation_timestamp), str(current_configstatus["configfile_timestamp"])
         )
 
+    def _compile_changed_aggregations(self) -> None:
+        """Compile the aggregations whose configuration or structure data changed
+
+        The other aggregations are loaded from their last compilation, see cmk.bi.dependencies.
+        """
+        previous = self._load_compilation_dependencies()
+        current_host_fingerprints = host_fingerprints(self._bi_structure_fetcher.hosts)
+        changed = changed_hosts(
+            previous["host_fingerprints"],
+            current_host_fingerprints,
+            self._bi_structure_fetcher.hosts,
+        )
+        self._logger.debug("%d hosts changed since the last compilation" % len(changed))
+
+        dependencies: dict[str, BIAggregationDependencies] = {}
+        required: dict[str, str] = {}
+        self._compiled_aggregations = {}
+        for aggregation in self._bi_packs.get_all_aggregations():
+            fingerprint = config_fingerprint(self._bi_packs, aggregation)
+            path = self._path_compiled_aggregations.joinpath(aggregation.id)
+            last = previous["aggregations"].get(aggregation.id)
+            if (
+                last is None
+                or last.config_fingerprint != fingerprint
+                or last.affected_by(changed)
+                or not path.exists()
+            ):
+                required[aggregation.id] = fingerprint
+                continue
+            self._compiled_aggregations[aggregation.id] = BIAggregation.create_trees_from_schema(
+                self._load_data(path)
+            )
+            dependencies[aggregation.id] = last
+
+        self._logger.debug(
+            "Compiling %d of %d aggregations"
+            % (len(required), len(required) + len(self._compiled_aggregations))
+        )
+        compiled: dict[str, dict] = {}
+        for aggr_id, result, aggregation_dependencies in self._compile_aggregations(required):
+            compiled[aggr_id] = result
+            dependencies[aggr_id] = aggregation_dependencies
+            self._compiled_aggregations[aggr_id] = BIAggregation.create_trees_from_schema(result)
+        self._verify_aggregation_title_uniqueness(self._compiled_aggregations)
+
+        for aggr_id, result in compiled.items():
+            self._save_data(self._path_compiled_aggregations.joinpath(aggr_id), result)
+        self._save_data(
+            self._path_compilation_dependencies,
+            CompilationDependencies(
+                host_fingerprints=current_host_fingerprints, aggregations=dependencies
+            ),
+        )
+
+    def _compile_aggregations(
+        self, required: Mapping[str, str]
+    ) -> Iterable[tuple[str, dict, BIAggregationDependencies]]:
+        if self._compilation_workers <= 1 or len(required) <= 1:
+            return [self._compile_aggregation(*item) for item in required.items()]
+
+        global _worker_compiler
+        _worker_compiler = self
+        try:
+            # Forking shares the structure data and the configuration with the workers
+            with multiprocessing.get_context("fork").Pool(
+                min(self._compilation_workers, len(required))
+            ) as pool:
+                return pool.starmap(_compile_aggregation_in_worker, required.items(), chunksize=1)
+        finally:
+            _worker_compiler = None
+
+    def _compile_aggregation(
+        self, aggr_id: str, fingerprint: str
+    ) -> tuple[str, dict, BIAggregationDependencies]:
+        start = time.time()
+        self.bi_searcher.start_recording()
+        compiled_aggr = self._bi_packs.get_aggregation_mandatory(aggr_id).compile(self.bi_searcher)
+        dependencies = self.bi_searcher.dependencies(fingerprint)
+        self._logger.debug(f"Compilation of {aggr_id} took {time.time() - start:f}")
+
+        start = time.time()
+        result = compiled_aggr.serialize()
+        self._logger.debug(
+            "Schema dump %s took config took %f (%d branches)"
+            % (aggr_id, time.time() - start, len(compiled_aggr.branches))
+        )
+        return aggr_id, result, dependencies
+
+    def _load_compilation_dependencies(self) -> CompilationDependencies:
+        try:
+            return store.load_object_from_pickle_file(
+                self._path_compilation_dependencies,
+                default=CompilationDependencies(host_fingerprints={}, aggregations={}),
+            )
+        except Exception as e:
+            # E.g. written by another version, everything is compiled again
+            self._logger.warning("Can not load the compilation dependencies %s" % str(e))
+            return CompilationDependencies(host_fingerprints={}, aggregations={})
+
     def _cleanup_vanished_aggregations(self) -> None:
         valid_aggregations = list(self._compiled_aggregations.keys())
         for path_object in self._path_compiled_aggregations.iterdir():
@@ -421,3 +522,15 @@ class BICompiler:
             pipeline.delete(*obsolete_keys)
 
         pipeline.execute()
+
+
+_worker_compiler: BICompiler | None = None
+
+
+def _compile_aggregation_in_worker(
+    aggr_id: str, fingerprint: str
+) -> tuple[str, dict, BIAggregationDependencies]:
+    assert _worker_compiler is not None
+    return _worker_compiler._compile_aggregation(  # pylint: disable=protected-access
+        aggr_id, fingerprint
+    )
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Dependencies of the compiled aggregations on the structure data
+
+An aggregation only accesses the structure data through the searcher. While an aggregation is
+compiled, the searcher records the search conditions, the host name patterns and the host
+names it was asked for, together with the hosts it found. A changed host, i.e. a host which
+has been added, removed or whose structure data changed, can only change the compiled
+aggregation if it was found during the last compilation or if it is found by one of the
+recorded searches now. All other searches return the same results as before, so the
+aggregation is compiled to the same result.
+"""
+
+import hashlib
+import json
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+from cmk.bi.aggregation import BIAggregation
+from cmk.bi.lib import BIHostData, BIHostSearchMatch
+from cmk.bi.packs import BIAggregationPacks
+from cmk.bi.searcher import BISearcher
+
+
+@dataclass(frozen=True)
+class BIAggregationDependencies:
+    config_fingerprint: str
+    host_names: frozenset[str] = frozenset()
+    host_conditions: tuple[dict, ...] = ()
+    host_name_patterns: frozenset[str] = frozenset()
+
+    def affected_by(self, changed_hosts: Mapping[str, BIHostData | None]) -> bool:
+        """Whether the changed hosts, by their current data, may change the compiled aggregation"""
+        if not self.host_names.isdisjoint(changed_hosts):
+            return True
+
+        searcher = BISearcher()
+        searcher.set_hosts({k: v for k, v in changed_hosts.items() if v is not None})
+        if not searcher.hosts:
+            return False
+        return any(searcher.search_hosts(conditions) for conditions in self.host_conditions) or any(
+            searcher.get_host_name_matches(list(searcher.hosts.values()), pattern)[0]
+            for pattern in self.host_name_patterns
+        )
+
+
+@dataclass
+class _Recording:
+    host_names: set[str] = field(default_factory=set)
+    host_conditions: dict[str, dict] = field(default_factory=dict)
+    host_name_patterns: set[str] = field(default_factory=set)
+
+
+class _RecordingHosts(dict[str, BIHostData]):
+    """The structure data of the hosts, remembering which hosts have been asked for
+
+    Iterating over all hosts is not recorded, the callers filter them with the recorded
+    searches of the searcher.
+    """
+
+    def __init__(self, hosts: Mapping[str, BIHostData], recording: _Recording) -> None:
+        super().__init__(hosts)
+        self.recording = recording
+
+    def __getitem__(self, host_name: str) -> BIHostData:
+        self.recording.host_names.add(host_name)
+        return super().__getitem__(host_name)
+
+    def __contains__(self, host_name: object) -> bool:
+        if isinstance(host_name, str):
+            self.recording.host_names.add(host_name)
+        return super().__contains__(host_name)
+
+    def get(self, host_name: str, default: BIHostData | None = None) -> BIHostData | None:  # type: ignore[override]
+        self.recording.host_names.add(host_name)
+        return super().get(host_name, default)
+
+
+class BIRecordingSearcher(BISearcher):
+    """A searcher which records the dependencies of the aggregation compiled with it"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._recording = _Recording()
+
+    def set_hosts(self, hosts: dict[str, BIHostData]) -> None:
+        super().set_hosts(_RecordingHosts(hosts, self._recording))
+
+    def start_recording(self) -> None:
+        self._recording.host_names.clear()
+        self._recording.host_conditions.clear()
+        self._recording.host_name_patterns.clear()
+
+    def dependencies(self, config_fingerprint: str) -> BIAggregationDependencies:
+        """The dependencies recorded since the recording has been started"""
+        return BIAggregationDependencies(
+            config_fingerprint,
+            frozenset(self._recording.host_names),
+            tuple(self._recording.host_conditions.values()),
+            frozenset(self._recording.host_name_patterns),
+        )
+
+    def search_hosts(self, conditions: dict) -> list[BIHostSearchMatch]:
+        self._recording.host_conditions.setdefault(
+            json.dumps(conditions, sort_keys=True, default=repr), conditions
+        )
+        matches = super().search_hosts(conditions)
+        self._recording.host_names.update(match.host.name for match in matches)
+        return matches
+
+    def get_host_name_matches(
+        self, hosts: list[BIHostData], pattern: str
+    ) -> tuple[list[BIHostData], dict]:
+        self._recording.host_name_patterns.add(pattern)
+        matched_hosts, matched_re_groups = super().get_host_name_matches(hosts, pattern)
+        self._recording.host_names.update(host.name for host in matched_hosts)
+        return matched_hosts, matched_re_groups
+
+
+def config_fingerprint(bi_packs: BIAggregationPacks, bi_aggregation: BIAggregation) -> str:
+    """The fingerprint of the configuration of the aggregation and of the rules it calls"""
+    config = [
+        bi_aggregation.serialize(),
+        *(
+            bi_packs.get_rule_mandatory(rule_id).serialize()
+            for rule_id in sorted(bi_packs.get_rule_ids_of_aggregation(bi_aggregation.id))
+        ),
+    ]
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=repr).encode()).hexdigest()
+
+
+def host_fingerprints(hosts: Mapping[str, BIHostData]) -> dict[str, str]:
+    return {host_name: _host_fingerprint(host) for host_name, host in hosts.items()}
+
+
+def _host_fingerprint(host: BIHostData) -> str:
+    # The sets are sorted, their order differs between processes
+    return hashlib.sha256(
+        repr(
+            (
+                host.site_id,
+                sorted(host.tags),
+                sorted(host.labels.items()),
+                host.folder,
+                sorted(
+                    (description, sorted(service.tags), sorted(service.labels.items()))
+                    for description, service in host.services.items()
+                ),
+                host.children,
+                host.parents,
+                host.alias,
+                host.name,
+            )
+        ).encode()
+    ).hexdigest()
+
+
+def changed_hosts(
+    previous: Mapping[str, str], current: Mapping[str, str], hosts: Mapping[str, BIHostData]
+) -> dict[str, BIHostData | None]:
+    """The current data of the added, removed and changed hosts, None for the removed ones"""
+    return {
+        host_name: hosts.get(host_name)
+        for host_name in previous.keys() | current.keys()
+        if previous.get(host_name) != current.get(host_name)
+    }
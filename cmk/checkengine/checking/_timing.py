@@ -24,9 +24,13 @@ def make_timing_results(
     *,
     perfdata_with_times: bool,
 ) -> ActiveCheckResult:
+    """The times of the check, including the fetching, and of the fetching of every source
+
+    The times of the sources do not necessarily add up to the times of the fetching, the
+    sources may have been fetched concurrently.
+    """
     summary: DefaultDict[str, Snapshot] = defaultdict(Snapshot.null)
     for source, duration in fetched:
-        total_times += duration
         with suppress(KeyError):
             summary[
                 {
@@ -35,6 +35,7 @@ def default_config() -> ConfigFromWATO:
         "actions": [],
         "debug_rules": False,
         "rule_optimizer": True,
+        "parsing_workers": 0,
         "log_level": {
             "cmk.mkeventd": logging.INFO,
             "cmk.mkeventd.EventServer": logging.INFO,
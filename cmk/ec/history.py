@@ -5,16 +5,20 @@
 
 import contextlib
 import datetime
+import json
 import os
 import shlex
 import subprocess
 import threading
 import time
-from collections.abc import Callable, Iterable, Sequence
+import zlib
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
 from logging import Logger
 from pathlib import Path
 from typing import Any, assert_never, Literal
 
+from cmk.utils.caching import BoundedCache
 from cmk.utils.log import VERBOSE
 from cmk.utils.render import date_and_time
 
@@ -63,35 +67,46 @@ class History:
         self._lock = threading.Lock()
         self._mongodb = MongoDB()
         self._active_history_period = ActiveHistoryPeriod()
+        self._segments = HistorySegments(settings.paths.history_dir.value, history_columns, logger)
         self.reload_configuration(config)
 
     def reload_configuration(self, config: Config) -> None:
         self._config = config
         if self._config["archive_mode"] == "mongodb":
             _reload_configuration_mongodb(self)
+        elif self._config["archive_mode"] == "segments":
+            _reload_configuration_segments(self)
         else:
             _reload_configuration_files(self)
 
     def flush(self) -> None:
         if self._config["archive_mode"] == "mongodb":
             _flush_mongodb(self)
+        elif self._config["archive_mode"] == "segments":
+            _flush_segments(self)
         else:
             _flush_files(self)
 
     def add(self, event: Event, what: HistoryWhat, who: str = "", addinfo: str = "") -> None:
         if self._config["archive_mode"] == "mongodb":
             _add_mongodb(self, event, what, who, addinfo)
+        elif self._config["archive_mode"] == "segments":
+            _add_segments(self, event, what, who, addinfo)
         else:
             _add_files(self, event, what, who, addinfo)
 
     def get(self, query: QueryGET) -> Iterable[Any]:
         if self._config["archive_mode"] == "mongodb":
             return _get_mongodb(self, query)
+        if self._config["archive_mode"] == "segments":
+            return _get_segments(self, query)
         return _get_files(self, self._logger, query)
 
     def housekeeping(self) -> None:
         if self._config["archive_mode"] == "mongodb":
             _housekeeping_mongodb(self)
+        elif self._config["archive_mode"] == "segments":
+            _housekeeping_segments(self)
         else:
             _housekeeping_files(self)
 
@@ -694,3 +709,602 @@ def _get_logfile_timespan(path: Path) -> tuple[float | None, float | None]:
     except Exception:
         last_entry = None
     return first_entry, last_entry
+
+
+# .
+#   .--Segments------------------------------------------------------------.
+#   |             ____                                  _                  |
+#   |            / ___|  ___  __ _ _ __ ___   ___ _ __ | |_ ___            |
+#   |            \___ \ / _ \/ _` | '_ ` _ \ / _ \ '_ \| __/ __|           |
+#   |             ___) |  __/ (_| | | | | | |  __/ | | | |_\__ \           |
+#   |            |____/ \___|\__, |_| |_| |_|\___|_| |_|\__|___/           |
+#   |                        |___/                                         |
+#   +----------------------------------------------------------------------+
+#   | The Event Log Archive can be stored in indexed segments instead of   |
+#   | plain files, this section contains the code of these segments.       |
+#   '----------------------------------------------------------------------'
+
+
+def _reload_configuration_segments(history: History) -> None:
+    pass
+
+
+def _flush_segments(history: History) -> None:
+    history._segments.expire(None)
+
+
+def _housekeeping_segments(history: History) -> None:
+    try:
+        history._segments.expire(time.time() - history._config["history_lifetime"] * 86400)
+    except Exception as e:
+        if history._settings.options.debug:
+            raise
+        history._logger.warning(f"Error expiring history segments: {e}")
+
+
+def _add_segments(
+    history: History, event: Event, what: HistoryWhat, who: str, addinfo: str
+) -> None:
+    _log_event(history._config, history._logger, event, what, who, addinfo)
+    history._segments.add(
+        _current_history_period(history._config),
+        [time.time(), scrub_string(what), scrub_string(who), scrub_string(addinfo)]
+        + [
+            event.get(colname[6:], defval)  # drop "event_"
+            for colname, defval in history._event_columns
+        ],
+    )
+
+
+def _get_segments(history: History, query: QueryGET) -> Iterable[Any]:
+    history._logger.debug("Filters: %r", query.filters)
+    history._logger.debug("Limit: %r", query.limit)
+    return history._segments.get(query.filters, query.filter_row, query.limit)
+
+
+# Number of history entries per block. The entries of a block are written at once, the
+# blocks are the unit of the index and of reading the segments.
+_SEGMENT_BLOCK_SIZE = 1024
+
+# The columns which have their (case insensitive) values indexed per block, see SegmentBlock.
+_INDEXED_VALUE_COLUMNS = {
+    "event_host": "host_bits",
+    "event_rule_id": "rule_id_bits",
+    "event_application": "application_bits",
+}
+_VALUE_BITS = 4096
+
+
+@dataclass(frozen=True)
+class SegmentBlock:
+    """The index entry of a block of history entries
+
+    Besides the location of the block in the blocks file of its segment it contains the
+    ranges of the history lines, times and event IDs of the entries. The hosts, rule IDs and
+    applications of the entries are summarized in bitmaps of a fixed size (see _value_bits),
+    so the index stays small even for many different hosts. Queries use all of this to skip
+    the blocks which can not contain matching entries.
+    """
+
+    offset: int
+    length: int
+    first_line: int
+    count: int
+    min_time: float
+    max_time: float
+    min_event_id: int
+    max_event_id: int
+    host_bits: int
+    rule_id_bits: int
+    application_bits: int
+
+    @property
+    def last_line(self) -> int:
+        return self.first_line + self.count - 1
+
+    def serialize(self) -> str:
+        return json.dumps(
+            {
+                "offset": self.offset,
+                "length": self.length,
+                "first_line": self.first_line,
+                "count": self.count,
+                "min_time": self.min_time,
+                "max_time": self.max_time,
+                "min_event_id": self.min_event_id,
+                "max_event_id": self.max_event_id,
+                "host_bits": f"{self.host_bits:x}",
+                "rule_id_bits": f"{self.rule_id_bits:x}",
+                "application_bits": f"{self.application_bits:x}",
+            }
+        )
+
+    @classmethod
+    def deserialize(cls, raw: str) -> "SegmentBlock":
+        spec = json.loads(raw)
+        return cls(
+            offset=spec["offset"],
+            length=spec["length"],
+            first_line=spec["first_line"],
+            count=spec["count"],
+            min_time=spec["min_time"],
+            max_time=spec["max_time"],
+            min_event_id=spec["min_event_id"],
+            max_event_id=spec["max_event_id"],
+            host_bits=int(spec["host_bits"], 16),
+            rule_id_bits=int(spec["rule_id_bits"], 16),
+            application_bits=int(spec["application_bits"], 16),
+        )
+
+
+def _value_bits(value: object) -> int:
+    """The bits of a value in the bitmaps of the index entries of the blocks
+
+    A block may contain a value if all of its bits are set in the bitmap of the block.
+
+    >>> _value_bits("MyHost") == _value_bits("myhost")
+    True
+    >>> bin(_value_bits("myhost")).count("1") <= 3
+    True
+    """
+    raw = str(value).lower().encode("utf-8")
+    checksum = zlib.crc32(raw)
+    return (
+        (1 << checksum % _VALUE_BITS)
+        | (1 << (checksum >> 10) % _VALUE_BITS)
+        | (1 << zlib.adler32(raw) % _VALUE_BITS)
+    )
+
+
+def _values_bits(values: Iterable[object]) -> int:
+    bits = 0
+    for value in set(values):
+        bits |= _value_bits(value)
+    return bits
+
+
+class _Segment:
+    """The history entries of one history period
+
+    The entries are appended to the tail file (one JSON list per line) until there are
+    enough of them for a block, which is then appended to the blocks file (see
+    _encode_block) and the index entry of the block is appended to the index file.
+    """
+
+    def __init__(self, directory: Path, period: int, first_line: int) -> None:
+        self.period = period
+        self.blocks_path = directory / f"{period}.blocks"
+        self.index_path = directory / f"{period}.index"
+        self.tail_path = directory / f"{period}.tail"
+        self.first_line = first_line
+        self.blocks: list[SegmentBlock] = []
+        self.tail: list[list[Any]] = []
+        self.min_time: float | None = None
+        self.max_time: float | None = None
+
+    def paths(self) -> Sequence[Path]:
+        return [self.blocks_path, self.index_path, self.tail_path]
+
+    def next_line(self) -> int:
+        if self.tail:
+            return self.tail[-1][0] + 1
+        if self.blocks:
+            return self.blocks[-1].last_line + 1
+        return self.first_line
+
+    def add_time_range(self, min_time: float, max_time: float) -> None:
+        self.min_time = min_time if self.min_time is None else min(self.min_time, min_time)
+        self.max_time = max_time if self.max_time is None else max(self.max_time, max_time)
+
+
+def _encode_block(column_names: Sequence[str], columns: Sequence[Sequence[Any]]) -> bytes:
+    """Compress the columns of a block separately, so they can be decoded separately
+
+    The block starts with a line containing the names and the compressed sizes of the
+    columns and whether they contain sequences (which are tuples in the history entries, but
+    lists in JSON), followed by the compressed JSON lists of the column values.
+    """
+    chunks = [zlib.compress(json.dumps(values).encode("utf-8")) for values in columns]
+    header = json.dumps(
+        [
+            [name, len(chunk), any(isinstance(value, (list, tuple)) for value in values)]
+            for name, chunk, values in zip(column_names, chunks, columns)
+        ]
+    )
+    return b"".join([header.encode("utf-8"), b"\n", *chunks])
+
+
+class _DecodedBlock:
+    """The columns of a block, decoded when they are needed for the first time"""
+
+    def __init__(self, raw: bytes, block: SegmentBlock, history_columns: Columns) -> None:
+        header_end = raw.index(b"\n")
+        self._chunks: dict[str, tuple[memoryview, bool]] = {}
+        offset = header_end + 1
+        for name, length, has_sequences in json.loads(raw[:header_end]):
+            self._chunks[name] = memoryview(raw)[offset : offset + length], has_sequences
+            offset += length
+        self._defaults = dict(history_columns)
+        self._columns: dict[str, list[Any]] = {
+            "history_line": list(range(block.first_line, block.first_line + block.count))
+        }
+        self._count = block.count
+
+    def column(self, name: str) -> list[Any]:
+        if (values := self._columns.get(name)) is None:
+            if (chunk := self._chunks.get(name)) is None:
+                values = [self._defaults[name]] * self._count
+            else:
+                values = json.loads(zlib.decompress(chunk[0]))
+                if chunk[1]:
+                    values = _tuples_from_json(values)
+            self._columns[name] = values
+        return values
+
+
+class HistorySegments:
+    """The event history in indexed, time partitioned segments (archive mode "segments")
+
+    There is one segment per history period (see history_rotation), consisting of the files
+    <period>.blocks, <period>.index and <period>.tail in the history directory. The history
+    lines are numbered consecutively over all segments. The indexes of the segments are kept
+    in memory, so queries only read the blocks which may contain matching entries and
+    evaluate the filters on them column by column.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        history_columns: Columns,
+        logger: Logger,
+        block_size: int = _SEGMENT_BLOCK_SIZE,
+    ) -> None:
+        self._directory = directory
+        self._history_columns = history_columns
+        self._column_names = [name for name, _defval in history_columns]
+        self._column_defaults = dict(history_columns)
+        self._column_indices = {name: index for index, name in enumerate(self._column_names)}
+        self._logger = logger
+        self._block_size = block_size
+        self._lock = threading.Lock()
+        self._segments: dict[int, _Segment] | None = None  # loaded on first use
+        self._block_cache: BoundedCache[tuple[int, int], _DecodedBlock] = BoundedCache(
+            max_entries=64
+        )
+        self.blocks_read = 0
+        self.blocks_skipped = 0
+
+    def add(self, period: int, values: Sequence[Any]) -> None:
+        """Append a history entry (all history columns except the line number)"""
+        with self._lock:
+            segment = self._active_segment(period)
+            row = [segment.next_line(), *values]
+            with segment.tail_path.open(mode="a", encoding="utf-8") as f:
+                f.write(json.dumps(row) + "\n")
+            segment.tail.append(row)
+            segment.add_time_range(row[1], row[1])
+            if len(segment.tail) >= self._block_size:
+                self._seal(segment)
+
+    def get(
+        self,
+        filters: Sequence[tuple[str, OperatorName, Callable[[Any], bool], Any]],
+        filter_row: Callable[[Sequence[Any]], bool],
+        limit: int | None,
+    ) -> list[list[Any]]:
+        """Return the matching history entries, the youngest ones first"""
+        block_filter = _SegmentBlockFilter(filters)
+        with self._lock:
+            segments = [
+                (
+                    segment,
+                    (segment.min_time, segment.max_time),
+                    list(segment.blocks),
+                    list(segment.tail),
+                )
+                for _period, segment in sorted(self._loaded().items(), reverse=True)
+            ]
+
+        entries: list[list[Any]] = []
+        for segment, time_range, blocks, tail in segments:
+            if not block_filter.matches_time_range(time_range):
+                self._logger.debug(
+                    "skipping history segment %s because of time filters", segment.period
+                )
+                continue
+            for row in reversed(tail):
+                if limit is not None and len(entries) >= limit:
+                    return entries
+                if filter_row(row):
+                    entries.append(list(row))
+            for block in reversed(blocks):
+                if limit is not None and len(entries) >= limit:
+                    return entries
+                if not block_filter.matches(block):
+                    self.blocks_skipped += 1
+                    continue
+                decoded = self._read_block(segment, block)
+                positions = _matching_positions(decoded, filters, block.count)
+                if limit is not None:
+                    positions = positions[: limit - len(entries)]
+                if positions:
+                    columns = [decoded.column(name) for name in self._column_names]
+                    entries.extend(
+                        [values[position] for values in columns] for position in positions
+                    )
+        return entries
+
+    def expire(self, min_time: float | None) -> None:
+        """Delete the segments without entries younger than min_time, all for None"""
+        with self._lock:
+            segments = self._loaded()
+            for period, segment in sorted(segments.items()):
+                if min_time is not None and (
+                    segment.max_time is None or segment.max_time >= min_time
+                ):
+                    continue
+                self._logger.info(
+                    "Deleting history segment %s (last entry %s)",
+                    period,
+                    "none" if segment.max_time is None else date_and_time(segment.max_time),
+                )
+                for path in segment.paths():
+                    path.unlink(missing_ok=True)
+                del segments[period]
+            self._block_cache = BoundedCache(max_entries=64)
+
+    def _loaded(self) -> dict[int, _Segment]:
+        if self._segments is None:
+            self._segments = self._load()
+        return self._segments
+
+    def _active_segment(self, period: int) -> _Segment:
+        """Return the segment to log into, a newer one wins like with the history files"""
+        segments = self._loaded()
+        newest = max(segments, default=None)
+        if newest is not None and newest >= period:
+            return segments[newest]
+        first_line = 1
+        if newest is not None:
+            self._seal(segments[newest])
+            first_line = segments[newest].next_line()
+        self._directory.mkdir(parents=True, exist_ok=True)
+        segment = segments[period] = _Segment(self._directory, period, first_line)
+        return segment
+
+    def _seal(self, segment: _Segment) -> None:
+        """Move the entries of the tail file to a new block"""
+        if not segment.tail:
+            return
+        rows = segment.tail
+        columns = list(zip(*rows))
+        data = _encode_block(self._column_names[1:], columns[1:])
+        with segment.blocks_path.open(mode="ab") as f:
+            offset = f.tell()
+            f.write(data)
+
+        times = columns[self._column_indices["history_time"]]
+        event_ids = columns[self._column_indices["event_id"]]
+        value_bits = {
+            name: _values_bits(columns[self._column_indices[name]])
+            for name in _INDEXED_VALUE_COLUMNS
+        }
+        block = SegmentBlock(
+            offset=offset,
+            length=len(data),
+            first_line=rows[0][0],
+            count=len(rows),
+            min_time=min(times),
+            max_time=max(times),
+            min_event_id=min(event_ids),
+            max_event_id=max(event_ids),
+            host_bits=value_bits["event_host"],
+            rule_id_bits=value_bits["event_rule_id"],
+            application_bits=value_bits["event_application"],
+        )
+        with segment.index_path.open(mode="a", encoding="utf-8") as f:
+            f.write(block.serialize() + "\n")
+        segment.blocks.append(block)
+        segment.tail = []
+        segment.tail_path.write_bytes(b"")
+
+    def _read_block(self, segment: _Segment, block: SegmentBlock) -> _DecodedBlock:
+        key = (segment.period, block.offset)
+        with self._lock:
+            if (decoded := self._block_cache.get(key)) is not None:
+                return decoded
+
+        with segment.blocks_path.open(mode="rb") as f:
+            f.seek(block.offset)
+            decoded = _DecodedBlock(f.read(block.length), block, self._history_columns)
+        self.blocks_read += 1
+
+        with self._lock:
+            self._block_cache[key] = decoded
+        return decoded
+
+    def _load(self) -> dict[int, _Segment]:
+        if not self._directory.exists():
+            return {}
+        periods = sorted(
+            {
+                int(path.stem)
+                for pattern in ("*.index", "*.tail")
+                for path in self._directory.glob(pattern)
+                if path.stem.isdigit()
+            }
+        )
+        segments: dict[int, _Segment] = {}
+        first_line = 1
+        for period in periods:
+            segment = segments[period] = _Segment(self._directory, period, first_line)
+            self._load_index(segment)
+            self._load_tail(segment)
+            first_line = segment.next_line()
+        # Only the segment of the active history period collects new entries
+        for period in periods[:-1]:
+            self._seal(segments[period])
+        return segments
+
+    def _load_index(self, segment: _Segment) -> None:
+        """Load the index of the complete blocks, dropping the ones of an interrupted write"""
+        try:
+            size = segment.blocks_path.stat().st_size
+            lines = segment.index_path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            size, lines = 0, []
+
+        for line in lines:
+            try:
+                block = SegmentBlock.deserialize(line)
+            except (ValueError, KeyError, TypeError):
+                break
+            if block.offset + block.length > size:
+                break
+            segment.blocks.append(block)
+            segment.add_time_range(block.min_time, block.max_time)
+
+        if len(segment.blocks) < len(lines):
+            self._logger.warning(
+                "Dropping %d incomplete blocks of history segment %s",
+                len(lines) - len(segment.blocks),
+                segment.period,
+            )
+            segment.index_path.write_text(
+                "".join(block.serialize() + "\n" for block in segment.blocks), encoding="utf-8"
+            )
+        end = segment.blocks[-1].offset + segment.blocks[-1].length if segment.blocks else 0
+        if size > end:
+            os.truncate(segment.blocks_path, end)
+
+    def _load_tail(self, segment: _Segment) -> None:
+        """Load the entries of the tail, skipping the ones already moved to a block"""
+        try:
+            lines = segment.tail_path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return
+
+        num_columns = len(self._column_names)
+        for line in lines:
+            try:
+                row = _tuples_from_json(json.loads(line))
+            except ValueError:
+                self._logger.warning(
+                    "Invalid line '%s' in history segment %s", line, segment.tail_path
+                )
+                continue
+            if row[0] < segment.next_line():
+                continue
+            row += [self._column_defaults[name] for name in self._column_names[len(row) :]]
+            del row[num_columns:]
+            segment.tail.append(row)
+            segment.add_time_range(row[1], row[1])
+
+
+def _tuples_from_json(values: list[Any]) -> list[Any]:
+    """JSON knows no tuples, the sequences in the history entries are tuples"""
+    return [tuple(value) if isinstance(value, list) else value for value in values]
+
+
+def _matching_positions(
+    decoded: _DecodedBlock,
+    filters: Sequence[tuple[str, OperatorName, Callable[[Any], bool], Any]],
+    count: int,
+) -> list[int]:
+    """Apply the filters column by column, the youngest entries first
+
+    Only the columns needed by the filters are decoded, and only until no entry is left.
+    """
+    positions = list(range(count - 1, -1, -1))
+    for column_name, _operator_name, predicate, _argument in filters:
+        if not positions:
+            break
+        values = decoded.column(column_name)
+        positions = [position for position in positions if predicate(values[position])]
+    return positions
+
+
+class _SegmentBlockFilter:
+    """Decides on the index entries whether a block may contain entries matching the filters"""
+
+    def __init__(
+        self, filters: Sequence[tuple[str, OperatorName, Callable[[Any], bool], Any]]
+    ) -> None:
+        self._time_range = _filter_range(filters, "history_time")
+        self._line_range = _filter_range(filters, "history_line")
+        self._event_id_range = _filter_range(filters, "event_id")
+        # attribute of SegmentBlock -> bits of the possible values, any of them must be set
+        self._value_bits = {
+            attribute: [_value_bits(value) for value in values]
+            for column_name, attribute in _INDEXED_VALUE_COLUMNS.items()
+            if (values := _filter_values(filters, column_name)) is not None
+        }
+
+    def matches_time_range(self, time_range: tuple[float | None, float | None]) -> bool:
+        return _intersects(self._time_range, time_range)
+
+    def matches(self, block: SegmentBlock) -> bool:
+        return (
+            _intersects(self._time_range, (block.min_time, block.max_time))
+            and _intersects(self._line_range, (block.first_line, block.last_line))
+            and _intersects(self._event_id_range, (block.min_event_id, block.max_event_id))
+            and all(
+                any(bits & block_bits == bits for bits in value_bits)
+                for attribute, value_bits in self._value_bits.items()
+                for block_bits in [getattr(block, attribute)]
+            )
+        )
+
+
+def _filter_range(
+    filters: Iterable[tuple[str, OperatorName, Callable[[Any], bool], Any]], column: str
+) -> tuple[float | None, float | None]:
+    """The range of values of the column which may be accepted by the filters
+
+    >>> _filter_range([("event_id", ">", lambda x: True, 4), ("event_id", "<=", lambda x: True, 9),
+    ...                ("event_host", "=", lambda x: True, "a")], "event_id")
+    (4, 9)
+    >>> _filter_range([("event_id", "in", lambda x: True, [7, 2])], "event_id")
+    (2, 7)
+    """
+    lower: float | None = None
+    upper: float | None = None
+    for column_name, operator_name, _predicate, argument in filters:
+        if column_name != column:
+            continue
+        if operator_name == "in":
+            if not argument:
+                continue
+            low, high = min(argument), max(argument)
+        else:
+            low = argument if operator_name in ("=", ">", ">=") else None
+            high = argument if operator_name in ("=", "<", "<=") else None
+        if low is not None:
+            lower = low if lower is None else max(lower, low)
+        if high is not None:
+            upper = high if upper is None else min(upper, high)
+    return lower, upper
+
+
+def _filter_values(
+    filters: Iterable[tuple[str, OperatorName, Callable[[Any], bool], Any]], column: str
+) -> frozenset[str] | None:
+    """The lower cased values of the column which may be accepted by the filters, None for all
+
+    >>> sorted(_filter_values([("event_host", "in", lambda x: True, ["A", "b"])], "event_host"))
+    ['a', 'b']
+    >>> _filter_values([("event_host", "~", lambda x: True, "a.*")], "event_host") is None
+    True
+    """
+    result: frozenset[str] | None = None
+    for column_name, operator_name, _predicate, argument in filters:
+        if column_name != column:
+            continue
+        if operator_name in ("=", "=~"):
+            values = frozenset([str(argument).lower()])
+        elif operator_name == "in":
+            values = frozenset(str(value).lower() for value in argument)
+        else:
+            continue
+        result = values if result is None else result & values
+    return result
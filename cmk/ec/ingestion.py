@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Buffering of the received messages between the sockets and the event processing
+
+Whenever a UDP socket (syslog or SNMP traps) of the event server is readable, all waiting
+datagrams are received at once and queued in the IngestionQueue. This keeps the socket
+buffers of the kernel empty during message storms, so the messages are not silently
+dropped by the kernel. The event server processes the queued messages in batches. Stream
+connections and the event pipe are only read while the queue has room, their senders are
+slowed down by the kernel instead. The messages read from them which do not fit into the
+queue anymore are kept by the event server until there is room. When the queue is full,
+received datagrams are dropped and counted.
+"""
+
+from __future__ import annotations
+
+import collections
+import socket
+import threading
+from collections.abc import Iterable
+from typing import NamedTuple
+
+
+class ReceivedMessage(NamedTuple):
+    """A syslog message or an SNMP trap waiting to be processed"""
+
+    data: bytes
+    address: tuple[str, int] | None
+    is_trap: bool = False
+
+
+class IngestionQueue:
+    """A bounded FIFO of received messages, keeping track of its highest fill level
+
+    The queue is filled and emptied by the event server thread, its fill level is read by the
+    status server thread.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.peak = 0
+        self._messages: collections.deque[ReceivedMessage] = collections.deque()
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._messages)
+
+    def has_room(self) -> bool:
+        with self._condition:
+            return len(self._messages) < self.capacity
+
+    def put(self, messages: Iterable[ReceivedMessage]) -> list[ReceivedMessage]:
+        """Queue the messages as long as there is room and return the ones not queued"""
+        rejected = []
+        with self._condition:
+            for message in messages:
+                if len(self._messages) < self.capacity:
+                    self._messages.append(message)
+                else:
+                    rejected.append(message)
+            self.peak = max(self.peak, len(self._messages))
+            self._condition.notify_all()
+        return rejected
+
+    def get_batch(self, max_messages: int) -> list[ReceivedMessage]:
+        with self._condition:
+            return [
+                self._messages.popleft()
+                for _unused in range(min(max_messages, len(self._messages)))
+            ]
+
+
+def receive_datagrams(
+    sock: socket.socket, bufsize: int, max_datagrams: int
+) -> list[tuple[bytes, object]]:
+    """Receive the datagrams waiting on a non-blocking socket, at most max_datagrams
+
+    Python offers no recvmmsg(), so this is a loop of recvfrom() until the socket is empty.
+    """
+    datagrams: list[tuple[bytes, object]] = []
+    while len(datagrams) < max_datagrams:
+        try:
+            datagrams.append(sock.recvfrom(bufsize))
+        except (BlockingIOError, InterruptedError):
+            break
+    return datagrams
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Journal of the changes of the event status for the replication
+
+A replication slave pulls the event status from its master every few seconds. Instead of the
+complete event status, the master only sends the events which have been created, changed or
+removed since the last sync of the slave. For that, the event status of the master records
+the IDs of the changed and removed events in a journal, every change gets the next sequence
+number. The slave sends the position of the event status it has, i.e. the ID of the journal
+and the sequence number, and gets the changes after that position.
+
+The journal is only kept in memory, it gets a new random ID whenever the complete event
+status is replaced (restart, flush, ...). The removed events are only remembered for a
+limited number of removals. A slave whose position is not covered by the journal gets the
+complete event status.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import NamedTuple
+
+# The number of removed events remembered by the journal
+_MAX_REMOVED = 100000
+
+
+class JournalPosition(NamedTuple):
+    journal_id: str
+    sequence: int
+
+
+class EventJournal:
+    """The sequence numbers of the latest changes of the events, by event ID"""
+
+    def __init__(self, max_removed: int = _MAX_REMOVED) -> None:
+        self.journal_id = os.urandom(8).hex()
+        self.sequence = 0
+        self._max_removed = max_removed
+        # Both ordered by sequence number, the oldest change first
+        self._changed: dict[int, int] = {}
+        self._removed: dict[int, int] = {}
+        # The lowest position changes can be computed for
+        self._first_sequence = 0
+
+    def position(self) -> JournalPosition:
+        return JournalPosition(self.journal_id, self.sequence)
+
+    def changed(self, event_id: int) -> None:
+        """Record the creation or a change of an event"""
+        self.sequence += 1
+        self._changed.pop(event_id, None)
+        self._changed[event_id] = self.sequence
+
+    def removed(self, event_id: int) -> None:
+        self.sequence += 1
+        self._changed.pop(event_id, None)
+        self._removed[event_id] = self.sequence
+        if len(self._removed) > self._max_removed:
+            # Positions before this removal cannot be served anymore
+            oldest_id = next(iter(self._removed))
+            self._first_sequence = self._removed.pop(oldest_id)
+
+    def covers(self, position: JournalPosition) -> bool:
+        """Whether the changes after the position are known"""
+        return (
+            position.journal_id == self.journal_id
+            and self._first_sequence <= position.sequence <= self.sequence
+        )
+
+    def changes_since(self, sequence: int) -> tuple[list[int], list[int]]:
+        """The IDs of the events changed and removed after the sequence number
+
+        >>> journal = EventJournal()
+        >>> for event_id in (1, 2, 3):
+        ...     journal.changed(event_id)
+        >>> journal.removed(2)
+        >>> journal.changed(1)
+        >>> journal.changes_since(0)
+        ([3, 1], [2])
+        >>> journal.changes_since(3)
+        ([1], [2])
+        >>> journal.changes_since(5)
+        ([], [])
+        """
+        return _newer_than(self._changed, sequence), _newer_than(self._removed, sequence)
+
+
+def _newer_than(sequences: dict[int, int], sequence: int) -> list[int]:
+    # Copy the items first, the dict may be changed by another thread
+    newer = []
+    for event_id, event_sequence in reversed(list(sequences.items())):
+        if event_sequence <= sequence:
+            break
+        newer.append(event_id)
+    newer.reverse()
+    return newer
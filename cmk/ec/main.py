@@ -22,6 +22,7 @@ import json
 import os
 import pprint
 import select
+import selectors
 import signal
 import socket
 import sys
@@ -29,6 +30,7 @@ import threading
 import time
 import traceback
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures.process import BrokenProcessPool
 from logging import getLogger, Logger
 from pathlib import Path
 from types import FrameType
@@ -59,9 +61,20 @@ from .event import create_events_from_syslog_messages, Event, scrub_string
 from .helpers import ECLock, parse_bytes_into_syslog_messages
 from .history import ActiveHistoryPeriod, Columns, get_logfile, History, HistoryWhat, quote_tab
 from .host_config import HostConfig
+from .ingestion import IngestionQueue, receive_datagrams, ReceivedMessage
+from .journal import EventJournal, JournalPosition
+from .parsing_workers import ParsingWorkers, RuleMatches, RuleSnapshot
 from .perfcounters import Perfcounters
 from .query import filter_operator_in, MKClientError, Query, QueryCOMMAND, QueryGET, QueryREPLICATE
-from .rule_matcher import compile_rule, match, MatchFailure, MatchResult, MatchSuccess, RuleMatcher
+from .rule_matcher import (
+    compile_rule,
+    match,
+    MatchFailure,
+    MatchResult,
+    MatchSuccess,
+    RuleMatcher,
+    RulePrefilter,
+)
 from .rule_packs import load_config as load_config_using
 from .settings import FileDescriptor, PortNumber, Settings
 from .settings import settings as create_settings
@@ -75,6 +88,16 @@ class PackedEventStatus(TypedDict):
     interval_starts: dict[str, int]
 
 
+class PackedEventStatusDelta(TypedDict):
+    """The changes of the event status after a journal position, see cmk.ec.journal"""
+
+    next_event_id: int
+    changed_events: list[Event]
+    removed_events: list[int]
+    rule_stats: dict[str, int]
+    interval_starts: dict[str, int]
+
+
 class SlaveStatus(TypedDict):
     last_master_down: float | None
     last_sync: float
@@ -88,6 +111,17 @@ Response = Iterable[list[object]] | dict[str, object] | None
 
 LimitKind = Literal["overall", "by_rule", "by_host"]
 
+# The number of received messages the event server queues before it drops datagrams, see
+# cmk.ec.ingestion, the number of datagrams it receives at once and the number of queued
+# messages it processes at once.
+_INGESTION_QUEUE_SIZE = 100000
+_MAX_DATAGRAMS_PER_RECEIVE = 1000
+_INGESTION_BATCH_SIZE = 500
+
+# The interval of a replication slave for pulling the complete event status instead of the
+# changes only, see cmk.ec.journal
+_FULL_REPLICATION_INTERVAL = 600
+
 
 class SyslogPriority:
     NAMES: Mapping[int, str] = {
@@ -432,13 +466,20 @@ class EventServer(ECServerThread):
         self._syslog_udp: socket.socket | None = None
         self._syslog_tcp: socket.socket | None = None
         self._snmp_trap_socket: socket.socket | None = None
+        self._ingestion_queue = IngestionQueue(_INGESTION_QUEUE_SIZE)
+        self._parsing_workers: ParsingWorkers | None = None
 
         self._rules: list[Rule] = []
+        # Changes whenever the rules are compiled, see ParsingWorkers
+        self._rules_generation = 0
         self._rule_by_id: dict[str | None, Rule] = {}
         self._rule_hash: dict[int, dict[int, Any]] = {}
         self._hash_stats: list[list[int]] = []  # facility/priority
         for _unused_facility in range(32):
             self._hash_stats.append([0] * 8)
+        self._rule_prefilter = RulePrefilter([])
+        # Number of messages, rules in the hash and rules left by the prefilter
+        self._prefilter_stats = [0, 0, 0]
 
         self.host_config = HostConfig(self._logger)
         self._perfcounters = perfcounters
@@ -476,6 +517,7 @@ class EventServer(ECServerThread):
                 Perfcounters.status_columns(),
                 cls._replication_columns(),
                 cls._event_limit_columns(),
+                cls._ingestion_columns(),
             )
         )
 
@@ -506,12 +548,20 @@ class EventServer(ECServerThread):
             ("status_event_limit_active_overall", False),
         ]
 
+    @classmethod
+    def _ingestion_columns(cls) -> Columns:
+        return [
+            ("status_ingestion_queue_length", 0),
+            ("status_ingestion_queue_peak", 0),
+        ]
+
     def get_status(self) -> list[list[object]]:
         row: list[object] = []
         row += self._add_general_status()
         row += self._perfcounters.get_status()
         row += self._add_replication_status()
         row += self._add_event_limit_status()
+        row += self._add_ingestion_status()
         return [row]
 
     def _add_general_status(self) -> list[object]:
@@ -544,6 +594,9 @@ class EventServer(ECServerThread):
             self.is_overall_event_limit_active(),
         ]
 
+    def _add_ingestion_status(self) -> list[object]:
+        return [len(self._ingestion_queue), self._ingestion_queue.peak]
+
     def create_pipe(self) -> None:
         path = self.settings.paths.event_pipe.value
         with contextlib.suppress(Exception):
@@ -702,110 +755,232 @@ class EventServer(ECServerThread):
 
     def serve(self) -> None:  # pylint: disable=too-many-branches
         pipe = self.open_pipe()
-        listen_list = [
-            f
+        with selectors.DefaultSelector() as selector:
             for f in (
                 pipe,
                 self._syslog_udp,
                 self._syslog_tcp,
                 self._eventsocket,
                 self._snmp_trap_socket,
-            )
-            if f is not None
-        ]
-        client_sockets: dict[FileDescr, tuple[socket.socket, tuple[str, int] | None, bytes]] = {}
-        select_timeout = 1
-        while not self._terminate_event.is_set():
-            try:
-                readable: list[FileDescr | socket.socket] = select.select(
-                    listen_list + list(client_sockets.keys()), [], [], select_timeout
-                )[0]
-            except OSError as e:
-                if e.args[0] != errno.EINTR:
-                    raise
-                continue
-            address: tuple[str, int] | None  # host/port
-            data: bytes | None = None
-
-            # Accept new connection on event unix socket
-            if self._eventsocket in readable:
-                client_socket, remote_address = self._eventsocket.accept()
-                # We have a AF_UNIX socket, so the remote address is a str, which is always ''.
-                if not (isinstance(remote_address, str) and remote_address == ""):
-                    raise ValueError(
-                        f"Invalid remote address '{remote_address!r}' for event socket"
+            ):
+                if f is not None:
+                    selector.register(f, selectors.EVENT_READ)
+            for datagram_socket in (self._syslog_udp, self._snmp_trap_socket):
+                if datagram_socket is not None:
+                    datagram_socket.setblocking(False)
+
+            client_sockets: dict[socket.socket, tuple[tuple[str, int] | None, bytes]] = {}
+            # Messages already read from the connections or the pipe which did not fit into the
+            # ingestion queue
+            pending: list[ReceivedMessage] = []
+            select_timeout = 1
+            while not self._terminate_event.is_set():
+                pending = self._ingestion_queue.put(pending)
+                # Do not wait for new data as long as there are queued messages to process
+                readable = {
+                    key.fileobj
+                    for key, _mask in selector.select(
+                        0 if self._ingestion_queue or pending else select_timeout
                     )
-                client_sockets[client_socket.fileno()] = (client_socket, None, b"")
-
-            # Same for the TCP syslog socket
-            if self._syslog_tcp is not None and self._syslog_tcp in readable:
-                client_socket, address = self._syslog_tcp.accept()
-                client_sockets[client_socket.fileno()] = (
-                    client_socket,
-                    parse_address("syslog socket (TCP)", address),
-                    b"",
-                )
+                }
+                address: tuple[str, int] | None  # host/port
+
+                # Accept new connection on event unix socket
+                if self._eventsocket in readable:
+                    client_socket, remote_address = self._eventsocket.accept()
+                    # We have a AF_UNIX socket, so the remote address is a str, which is always ''.
+                    if not (isinstance(remote_address, str) and remote_address == ""):
+                        raise ValueError(
+                            f"Invalid remote address '{remote_address!r}' for event socket"
+                        )
+                    client_sockets[client_socket] = (None, b"")
+                    selector.register(client_socket, selectors.EVENT_READ)
+
+                # Same for the TCP syslog socket
+                if self._syslog_tcp is not None and self._syslog_tcp in readable:
+                    client_socket, address = self._syslog_tcp.accept()
+                    client_sockets[client_socket] = (
+                        parse_address("syslog socket (TCP)", address),
+                        b"",
+                    )
+                    selector.register(client_socket, selectors.EVENT_READ)
+
+                # Read data from existing event unix socket connections and from the pipe only
+                # if there is room for the messages, their senders have to wait otherwise.
+                # NOTE: We modify client_socket in the loop, so we need to copy below!
+                for cs, (address, previous_data) in list(client_sockets.items()):
+                    if cs in readable and not pending and self._ingestion_queue.has_room():
+                        data = previous_data
+                        # Receive next part of data
+                        try:
+                            data += cs.recv(65536)
+                        except Exception:
+                            self._logger.exception("Exception during syslog socket_tcp recv")
+
+                        if not data:
+                            selector.unregister(cs)
+                            cs.close()
+                            del client_sockets[cs]
+
+                        messages, unprocessed = parse_bytes_into_syslog_messages(data)
+                        pending += self._ingestion_queue.put(
+                            ReceivedMessage(message, address) for message in messages
+                        )
+                        if unprocessed:
+                            client_sockets[cs] = (address, unprocessed)
 
-            # Read data from existing event unix socket connections
-            # NOTE: We modify client_socket in the loop, so we need to copy below!
-            for fd, (cs, address, previous_data) in list(client_sockets.items()):
-                if fd in readable:
-                    data = previous_data
-                    # Receive next part of data
+                # Read data from pipe
+                if pipe in readable and not pending and self._ingestion_queue.has_room():
+                    data = b""
                     try:
-                        data += cs.recv(4096)
+                        data = os.read(pipe, 65536)
                     except Exception:
-                        self._logger.exception("Exception during syslog socket_tcp recv")
+                        self._logger.exception("General exception during pipe os.read")
 
                     if not data:
-                        cs.close()
-                        del client_sockets[fd]
+                        selector.unregister(pipe)
+                        os.close(pipe)
+                        pipe = self.open_pipe()
+                        selector.register(pipe, selectors.EVENT_READ)
 
                     messages, unprocessed = parse_bytes_into_syslog_messages(data)
-                    self.process_syslog_messages(messages, address)
+                    pending += self._ingestion_queue.put(
+                        ReceivedMessage(message, None) for message in messages
+                    )
                     if unprocessed:
-                        client_sockets[fd] = (cs, address, unprocessed)
+                        self._logger.warning("Ignoring incomplete message '%r' from pipe", data)
 
-            # Read data from pipe
-            if pipe in readable:
-                data = b""
-                try:
-                    data = os.read(pipe, 4096)
-                except Exception:
-                    self._logger.exception("General exception during pipe os.read")
-
-                if not data:
-                    os.close(pipe)
-                    listen_list.remove(pipe)
-                    listen_list.append(self.open_pipe())
-
-                messages, unprocessed = parse_bytes_into_syslog_messages(data)
-                self.process_syslog_messages(messages, None)
-                if unprocessed:
-                    self._logger.warning("Ignoring incomplete message '%r' from pipe", data)
-
-            # Read events from builtin syslog server
-            if self._syslog_udp is not None and self._syslog_udp in readable:
-                message, address = self._syslog_udp.recvfrom(4096)
-                self.process_syslog_messages(
-                    [message], parse_address("syslog socket (UDP)", address)
+                # Read events from builtin syslog server
+                if self._syslog_udp is not None and self._syslog_udp in readable:
+                    self._receive_datagrams(self._syslog_udp, 4096, "syslog socket (UDP)", False)
+
+                # Read events from builtin snmptrap server
+                if self._snmp_trap_socket is not None and self._snmp_trap_socket in readable:
+                    self._receive_datagrams(self._snmp_trap_socket, 65535, "SNMP trap", True)
+
+                self.process_ingestion_queue()
+
+                if spool_files := sorted(
+                    self.settings.paths.spool_dir.value.glob("[!.]*"),
+                    key=lambda x: x.stat().st_mtime,
+                ):
+                    self.process_syslog_messages(spool_files[0].read_bytes().splitlines(), None)
+                    spool_files[0].unlink()
+                    select_timeout = 0  # enable fast processing to process further files
+                else:
+                    select_timeout = 1  # restore default select timeout
+
+            self._stop_parsing_workers()
+
+    def _receive_datagrams(
+        self, datagram_socket: socket.socket, bufsize: int, what: str, is_trap: bool
+    ) -> None:
+        """Queue all datagrams waiting on the socket, dropping the ones which do not fit"""
+        if dropped := len(
+            self._ingestion_queue.put(
+                ReceivedMessage(data, parse_address(what, address), is_trap)
+                for data, address in receive_datagrams(
+                    datagram_socket, bufsize, _MAX_DATAGRAMS_PER_RECEIVE
                 )
+            )
+        ):
+            self._perfcounters.count("ingestion_drops", dropped)
+
+    def process_ingestion_queue(self) -> None:
+        """Process the next batch of queued messages
 
-            # Read events from builtin snmptrap server
-            if self._snmp_trap_socket is not None and self._snmp_trap_socket in readable:
-                message, address = self._snmp_trap_socket.recvfrom(65535)
+        The event status is locked once for the whole batch instead of once per message.
+        Status queries and commands have to wait until the batch is processed.
+        """
+        if (parsing_workers := self._current_parsing_workers()) is None:
+            if batch := self._ingestion_queue.get_batch(_INGESTION_BATCH_SIZE):
+                with self._event_status.lock:
+                    self.process_potential_event_instrumented(
+                        (event, None) for event in self._create_events_from_messages(batch)
+                    )
+        elif batch := self._ingestion_queue.get_batch(
+            _INGESTION_BATCH_SIZE * parsing_workers.num_workers
+        ):
+            with self._event_status.lock:
                 self.process_potential_event_instrumented(
-                    self.create_events_from_trap(message, parse_address("SNMP trap", address))
+                    self._prepare_events(parsing_workers, batch)
                 )
 
-            if spool_files := sorted(
-                self.settings.paths.spool_dir.value.glob("[!.]*"), key=lambda x: x.stat().st_mtime
-            ):
-                self.process_syslog_messages(spool_files[0].read_bytes().splitlines(), None)
-                spool_files[0].unlink()
-                select_timeout = 0  # enable fast processing to process further files
+    def _current_parsing_workers(self) -> ParsingWorkers | None:
+        """The parsing workers for the current rules, (re)started when needed
+
+        The rules are not evaluated in the workers when debugging them, the rule matching has
+        to log its details.
+        """
+        num_workers = 0 if self._config["debug_rules"] else self._config["parsing_workers"]
+        if self._parsing_workers is not None and (
+            self._parsing_workers.num_workers != num_workers
+            or self._parsing_workers.generation != self._rules_generation
+        ):
+            self._stop_parsing_workers()
+        if self._parsing_workers is None and num_workers > 0:
+            with self._lock_configuration:
+                self._parsing_workers = ParsingWorkers(num_workers, self._rule_snapshot())
+            self._logger.info(
+                "Started %d parsing workers for the rules of generation %d",
+                num_workers,
+                self._parsing_workers.generation,
+            )
+        return self._parsing_workers
+
+    def _rule_snapshot(self) -> RuleSnapshot:
+        positions = {id(rule): position for position, rule in enumerate(self._rules)}
+        return RuleSnapshot(
+            generation=self._rules_generation,
+            rules=self._rules,
+            masks=(
+                [(positions[id(rule)], mask) for rule, mask in self._rule_hash_masks()]
+                if self._config["rule_optimizer"]
+                else None
+            ),
+            hostname_translation=self._config["hostname_translation"],
+            site=omd_site(),
+        )
+
+    def _stop_parsing_workers(self) -> None:
+        if self._parsing_workers is not None:
+            self._parsing_workers.shutdown()
+            self._parsing_workers = None
+
+    def _prepare_events(
+        self, parsing_workers: ParsingWorkers, messages: Sequence[ReceivedMessage]
+    ) -> Iterator[tuple[Event, RuleMatches | None]]:
+        """Parse the messages and pre-evaluate the rules in the parsing workers
+
+        When the workers fail, the remaining messages are processed without them.
+        """
+        prepared_events = parsing_workers.prepare(messages)
+        for position, message in enumerate(messages):
+            try:
+                prepared = next(prepared_events)
+            except BrokenProcessPool:
+                self._logger.exception("Parsing workers failed, processing without them")
+                self._stop_parsing_workers()
+                yield from (
+                    (event, None)
+                    for event in self._create_events_from_messages(messages[position:])
+                )
+                return
+            if prepared is None:
+                yield from ((event, None) for event in self._create_events_from_messages([message]))
             else:
-                select_timeout = 1  # restore default select timeout
+                yield prepared
+
+    def _create_events_from_messages(self, messages: Iterable[ReceivedMessage]) -> Iterator[Event]:
+        logger = self._logger if self._config["debug_rules"] else None
+        for message in messages:
+            if message.is_trap:
+                assert message.address is not None
+                yield from self.create_events_from_trap(message.data, message.address)
+            else:
+                yield from create_events_from_syslog_messages(
+                    [message.data], message.address, logger
+                )
 
     def create_events_from_trap(self, data: bytes, address: tuple[str, int]) -> Iterator[Event]:
         try:
@@ -814,27 +989,36 @@ class EventServer(ECServerThread):
         except Exception:
             self._logger.exception("exception while handling an SNMP trap, skipping this one")
 
-    def process_potential_event_instrumented(self, events: Iterable[Event]) -> None:
+    def process_potential_event_instrumented(
+        self, events: Iterable[tuple[Event, RuleMatches | None]]
+    ) -> None:
         """
         Processes incoming data, just a wrapper between the real data and the
         handler function to record some statistics etc.
         """
-        for event in events:
-            self._perfcounters.count("messages")
-            before = time.time()
-            # In replication slave mode (when not took over), ignore all events
-            if not is_replication_slave(self._config) or self._slave_status["mode"] != "sync":
-                self.process_potential_event(event)
-            elif self.settings.options.debug:
-                self._logger.info("Replication: we are in slave mode, ignoring event")
-            elapsed = time.time() - before
-            self._perfcounters.count_time("processing", elapsed)
+        # The perfcounters are updated once for all events to keep the locking overhead low
+        num_messages = 0
+        processing_times: list[float] = []
+        try:
+            for event, rule_matches in events:
+                num_messages += 1
+                before = time.time()
+                # In replication slave mode (when not took over), ignore all events
+                if not is_replication_slave(self._config) or self._slave_status["mode"] != "sync":
+                    self.process_potential_event(event, rule_matches)
+                elif self.settings.options.debug:
+                    self._logger.info("Replication: we are in slave mode, ignoring event")
+                processing_times.append(time.time() - before)
+        finally:
+            self._perfcounters.count("messages", num_messages)
+            self._perfcounters.count_times("processing", processing_times)
 
     def process_syslog_messages(
         self, messages: Iterable[bytes], address: tuple[str, int] | None
     ) -> None:
         self.process_potential_event_instrumented(
-            create_events_from_syslog_messages(
+            (event, None)
+            for event in create_events_from_syslog_messages(
                 messages, address, self._logger if self._config["debug_rules"] else None
             )
         )
@@ -931,6 +1115,7 @@ class EventServer(ECServerThread):
                             event["last_token"] = (
                                 last_token + new_tokens * secs_per_token
                             )  # not now! would be unfair
+                            self._event_status.event_changed(event)
                             if event["count"] == 0:
                                 self._logger.info(
                                     "Rule %s/%s, event %d: again without allowed rate, dropping event",
@@ -965,6 +1150,7 @@ class EventServer(ECServerThread):
                         event["rule_id"],
                     )
                     event["phase"] = "open"
+                    self._event_status.event_changed(event)
                     self._history.add(event, "DELAYOVER")
                     if rule:
                         event_has_opened(
@@ -1045,9 +1231,8 @@ class EventServer(ECServerThread):
                 # First look for case 1: rule that already have at least one hit
                 # and this events in the state "counting" exist.
                 events_to_delete: list[tuple[Event, HistoryWhat]] = []
-                events = self._event_status.events()
-                for event in events:
-                    if event["rule_id"] == rule["id"] and event["phase"] == "counting":
+                for event in self._event_status.events_of_rule(rule["id"]):
+                    if event["phase"] == "counting":
                         # time has elapsed. Now lets see if we have reached
                         # the necessary count:
                         if event["count"] < expected_count:  # no -> trigger alarm
@@ -1100,10 +1285,8 @@ class EventServer(ECServerThread):
             merge, reset_ack = merge
 
         if merge != "never":
-            for event in self._event_status.events():
-                if event["rule_id"] == rule["id"] and (
-                    event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked")
-                ):
+            for event in self._event_status.events_of_rule(rule["id"]):
+                if event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked"):
                     merge_event = event
                     break
 
@@ -1122,6 +1305,7 @@ class EventServer(ECServerThread):
             # Better rewrite (again). Rule might have changed. Also we have changed
             # the text and the user might have his own text added via set_text.
             self.rewrite_event(rule, merge_event, {}, set_first=False)
+            self._event_status.event_changed(merge_event)
             self._history.add(merge_event, "COUNTFAILED")
         else:
             # Create artificial event from scratch. Make sure that all important
@@ -1160,6 +1344,7 @@ class EventServer(ECServerThread):
                 rule,
                 event,
             )
+            self._event_status.event_changed(event)
             if rule.get("autodelete"):
                 event["phase"] = "closed"
                 self._event_status.remove_event(event, "AUTODELETE")
@@ -1181,6 +1366,7 @@ class EventServer(ECServerThread):
         self, rule_packs: Sequence[ECRulePack]
     ) -> None:
         """Precompile regular expressions and similar stuff."""
+        self._rules_generation += 1
         self._rules = []
         self._rule_by_id = {}
         # Speedup-Hash for rule execution
@@ -1234,6 +1420,7 @@ class EventServer(ECServerThread):
             "Compiled %d active rules (ignoring %d disabled rules)", count_rules, count_disabled
         )
         if self._config["rule_optimizer"]:
+            self._rule_prefilter = RulePrefilter(self._rule_hash_masks())
             self._logger.info(
                 "Rule hash: %d rules - %d hashed, %d unspecific",
                 len(self._rules),
@@ -1248,6 +1435,17 @@ class EventServer(ECServerThread):
                     ]
                     self._logger.info(" %-12s: %s", SyslogFacility(facility), " ".join(stats))
 
+    def _rule_hash_masks(self) -> Iterator[tuple[Rule, int]]:
+        """The rules with the facilities and priorities they are hashed for as bit mask"""
+        masks: dict[int, int] = {}
+        for facility, prio_hash in self._rule_hash.items():
+            for priority, rules in prio_hash.items():
+                for rule in rules:
+                    masks[id(rule)] = masks.get(id(rule), 0) | 1 << (facility * 8 + priority)
+        for rule in self._rules:
+            if id(rule) in masks:
+                yield rule, masks[id(rule)]
+
     def hash_rule(self, rule: Rule) -> None:
         """Construct rule hash for faster execution."""
         facility = rule.get("match_facility")
@@ -1303,33 +1501,71 @@ class EventServer(ECServerThread):
                 (100.0 * count / float(total_count)),
             )
 
-    def process_potential_event(self, event: Event) -> None:  # pylint: disable=too-many-branches
-        self.do_translate_hostname(event)
+        messages, hashed, prefiltered = self._prefilter_stats
+        if messages:
+            self._logger.info(
+                "Rules per message: %d rules, %.1f after facility/priority, %.1f after prefilter "
+                "(%.1f skipped by prefilter)",
+                len(self._rule_prefilter),
+                hashed / messages,
+                prefiltered / messages,
+                (hashed - prefiltered) / messages,
+            )
+
+    def process_potential_event(  # pylint: disable=too-many-branches
+        self, event: Event, rule_matches: RuleMatches | None = None
+    ) -> None:
+        """Process an event, using the rule matches pre-evaluated by a parsing worker if any
+
+        The pre-evaluated matches are ignored if the rules have been compiled again since.
+        """
+        if rule_matches is not None and rule_matches.generation == self._rules_generation:
+            event["host"] = rule_matches.host
+        else:
+            rule_matches = None
+            self.do_translate_hostname(event)
 
         # Log all incoming messages into a syslog-like text file if that is enabled
         if self._config["log_messages"]:
             self.log_message(event)
 
-        # Rule optimizer
+        # Rule optimizer, the rules are paired with their pre-evaluated match result if any
+        rule_candidates: Sequence[tuple[Rule, MatchResult | None]]
+        if rule_matches is not None:
+            rule_candidates = [
+                (self._rules[position], result) for position, result in rule_matches.results
+            ]
+            num_candidates = rule_matches.num_candidates
+        elif self._config["rule_optimizer"]:
+            rule_candidates = [(rule, None) for rule in self._rule_prefilter.candidates(event)]
+            num_candidates = len(rule_candidates)
+        else:
+            rule_candidates = [(rule, None) for rule in self._rules]
         if self._config["rule_optimizer"]:
             self._hash_stats[event["facility"]][event["priority"]] += 1
-            rule_candidates = self._rule_hash.get(event["facility"], {}).get(event["priority"], [])
-        else:
-            rule_candidates = self._rules
+            self._prefilter_stats[0] += 1
+            self._prefilter_stats[1] += len(
+                self._rule_hash.get(event["facility"], {}).get(event["priority"], [])
+            )
+            self._prefilter_stats[2] += num_candidates
 
         skip_pack = None
-        for rule in rule_candidates:
+        for rule, known_result in rule_candidates:
             if skip_pack and rule["pack"] == skip_pack:
                 continue  # still in the rule pack that we want to skip
             skip_pack = None  # new pack, reset skipping
 
-            try:
-                result = self.event_rule_matches(rule, event)
-            except Exception as e:
-                result = MatchFailure(
-                    reason=f"Rule would match, but due to inverted matching does not. {e}"
-                )
-                self._logger.exception(result.reason)
+            if known_result is not None:
+                self._perfcounters.count("rule_tries")
+                result = known_result
+            else:
+                try:
+                    result = self.event_rule_matches(rule, event)
+                except Exception as e:
+                    result = MatchFailure(
+                        reason=f"Rule would match, but due to inverted matching does not. {e}"
+                    )
+                    self._logger.exception(result.reason)
 
             if isinstance(result, MatchSuccess):
                 self._perfcounters.count("rule_hits")
@@ -1421,6 +1657,7 @@ class EventServer(ECServerThread):
                             )
 
                         self._history.add(existing_event, "COUNTREACHED")
+                        self._event_status.event_changed(existing_event)
 
                         if "delay" not in rule and rule.get("autodelete"):
                             existing_event["phase"] = "closed"
@@ -1450,6 +1687,7 @@ class EventServer(ECServerThread):
                             rule,
                             event,
                         )
+                        self._event_status.event_changed(event)
                         if rule.get("autodelete"):
                             event["phase"] = "closed"
                             with self._event_status.lock:
@@ -2392,12 +2630,13 @@ class StatusServer(ECServerThread):
                 event["contact"] = contact
             if user:
                 event["owner"] = user
+            self._event_status.event_changed(event)
             self._history.add(event, "UPDATE", user)
 
     def handle_command_create(self, arguments: list[str]) -> None:
-        # Would rather use process_syslog_messages(), but we are already
-        # holding self._event_status.lock and it's sub functions are setting
-        # self._event_status.lock too. The lock can not be allocated twice.
+        # Would rather use process_syslog_messages(), but the messages are
+        # ingested by the event server, which processes them in batches,
+        # each one holding self._event_status.lock.
         with open(str(self.settings.paths.event_pipe.value), "wb") as pipe:
             pipe.write(f'{";".join(arguments)}\n'.encode())
 
@@ -2410,6 +2649,7 @@ class StatusServer(ECServerThread):
             event["state"] = int(newstate)
             if user:
                 event["owner"] = user
+            self._event_status.event_changed(event)
             self._history.add(event, "CHANGESTATE", user)
 
     def handle_command_reload(self) -> None:
@@ -2457,6 +2697,7 @@ class StatusServer(ECServerThread):
         event: Event | None = self._event_status.event(int(event_id))
         if user and event is not None:
             event["owner"] = user
+            self._event_status.event_changed(event)
 
         # TODO: De-duplicate code from do_event_actions()
         if action_id == "@NOTIFY" and event is not None:
@@ -2493,6 +2734,7 @@ class StatusServer(ECServerThread):
             self._slave_status["mode"] = "sync"
         elif new_mode == "takeover":
             self._slave_status["mode"] = "takeover"
+            self._event_status.replicated_position = None
         else:
             raise MKClientError(
                 f"Invalid target mode {new_mode}: allowed are only 'sync' and 'takeover'"
@@ -2501,9 +2743,17 @@ class StatusServer(ECServerThread):
         self._logger.info("Switched replication mode to '%s' by external command.", new_mode)
 
     def handle_replicate(self, argument: str, client_ip: str) -> Response:
-        # Last time our slave got a config update
+        # Last time our slave got a config update, optionally followed by the journal
+        # position of the events of the slave
         try:
-            last_update = int(argument)
+            match argument.split():
+                case [last_update_text]:
+                    position = None
+                case [last_update_text, journal_id, sequence]:
+                    position = JournalPosition(journal_id, int(sequence))
+                case _:
+                    raise ValueError(argument)
+            last_update = int(last_update_text)
             if self.settings.options.debug:
                 self._logger.info(
                     "Replication: sync request from %s, last update %d seconds ago",
@@ -2514,7 +2764,7 @@ class StatusServer(ECServerThread):
         except (ValueError, OverflowError) as e:
             raise MKClientError("Invalid arguments to command REPLICATE") from e
         return replication_send(
-            self._config, self._lock_configuration, self._event_status, last_update
+            self._config, self._lock_configuration, self._event_status, last_update, position
         )
 
 
@@ -2640,6 +2890,13 @@ def run_eventd(  # pylint: disable=too-many-branches
 #   '----------------------------------------------------------------------'
 
 
+def _remove_from_index(index: dict[Any, dict[int, Event]], key: object, event_id: int) -> None:
+    events = index[key]
+    del events[event_id]
+    if not events:
+        del index[key]
+
+
 class EventStatus:
     """
     Keeps the current Event-Status.
@@ -2657,7 +2914,8 @@ class EventStatus:
         self.settings = settings
         self._config = config
         self._perfcounters = perfcounters
-        self.lock = threading.Lock()
+        # Reentrant: A batch of messages is processed with the lock held
+        self.lock = threading.RLock()
         self._history = history
         self._logger = logger
         self.flush()
@@ -2667,12 +2925,18 @@ class EventStatus:
 
     def flush(self) -> None:
         # TODO: Improve types!
-        self._events: list[Event] = []
+        self._events: dict[int, Event] = {}
         self._next_event_id = 1
         self._rule_stats: dict[str, int] = {}
         # needed for expecting rules
         self._interval_starts: dict[str, int] = {}
         self._initialize_event_limit_status()
+        # The changes of the events for the replication slaves
+        self.journal = EventJournal()
+        # Replication slave: the position of the master journal the events are replicated
+        # from and the time the complete event status was replicated last
+        self.replicated_position: JournalPosition | None = None
+        self.last_full_replication = 0.0
 
         # TODO: might introduce some performance counters, like:
         # - number of received messages
@@ -2681,13 +2945,14 @@ class EventStatus:
 
     def events(self) -> list[Event]:
         # TODO: Improve type!
-        return self._events
+        return list(self._events.values())
 
     def event(self, eid: int) -> Event | None:
-        for event in self._events:
-            if event["id"] == eid:
-                return event
-        return None
+        return self._events.get(eid)
+
+    def events_of_rule(self, rule_id: str | None) -> list[Event]:
+        """The events created by a rule, the oldest one first"""
+        return list(self._events_by_rule.get(rule_id, {}).values())
 
     def interval_start(self, rule_id: str, interval: int) -> int:
         """
@@ -2736,16 +3001,68 @@ class EventStatus:
     def pack_status(self) -> PackedEventStatus:
         return {
             "next_event_id": self._next_event_id,
-            "events": self._events,
+            "events": list(self._events.values()),
             "rule_stats": self._rule_stats,
             "interval_starts": self._interval_starts,
         }
 
     def unpack_status(self, status: PackedEventStatus) -> None:
         self._next_event_id = status["next_event_id"]
-        self._events = status["events"]
+        self._events = {event["id"]: event for event in status["events"]}
         self._rule_stats = status["rule_stats"]
         self._interval_starts = status["interval_starts"]
+        self._initialize_event_limit_status()
+        self.journal = EventJournal()
+
+    def pack_status_delta(self, sequence: int) -> PackedEventStatusDelta:
+        """The changes after the sequence number of the journal"""
+        changed, removed = self.journal.changes_since(sequence)
+        return {
+            "next_event_id": self._next_event_id,
+            "changed_events": [
+                self._events[event_id] for event_id in sorted(changed) if event_id in self._events
+            ],
+            "removed_events": removed,
+            "rule_stats": self._rule_stats,
+            "interval_starts": self._interval_starts,
+        }
+
+    def unpack_status_delta(self, delta: PackedEventStatusDelta) -> None:
+        """Apply the changes packed by pack_status_delta() of the master"""
+        self._next_event_id = delta["next_event_id"]
+        for event_id in delta["removed_events"]:
+            if (event := self._events.pop(event_id, None)) is not None:
+                self.num_existing_events -= 1
+                self._count_event_remove(event)
+                self.journal.removed(event_id)
+        # The events are sorted by ID, new events are appended like on the master
+        for event in delta["changed_events"]:
+            self._replace_event(event)
+            self.journal.changed(event["id"])
+        self._rule_stats = delta["rule_stats"]
+        self._interval_starts = delta["interval_starts"]
+
+    def _replace_event(self, event: Event) -> None:
+        previous = self._events.get(event["id"])
+        self._events[event["id"]] = event
+        if previous is None:
+            self.num_existing_events += 1
+            self._count_event_add(event)
+            return
+        rule_id, host, core_host = self._indexed_keys[event["id"]]
+        if rule_id != event["rule_id"]:
+            self._count_event_remove(previous)
+            self._count_event_add(event)
+            return
+        # Like count_event_up() on the master, the event keeps its place among the events of
+        # the rule and is moved to the end of the events of the host if it has changed
+        self._events_by_rule[rule_id][event["id"]] = event
+        if (host, core_host) == (event["host"], event["core_host"]):
+            self._events_by_host[host][event["id"]] = event
+            self._events_by_rule_and_host[(rule_id, host)][event["id"]] = event
+        else:
+            self._count_event_host_remove(previous)
+            self._count_event_host_add(event)
 
     def save_status(self) -> None:
         now = time.time()
@@ -2775,7 +3092,7 @@ class EventStatus:
             try:
                 status = ast.literal_eval(path.read_text(encoding="utf-8"))
                 self._next_event_id = status["next_event_id"]
-                self._events = status["events"]
+                self._events = {event["id"]: event for event in status["events"]}
                 self._rule_stats = status["rule_stats"]
                 self._interval_starts = status.get("interval_starts", {})
                 self._logger.info("Loaded event state from %s.", path)
@@ -2784,7 +3101,7 @@ class EventStatus:
                 raise
 
         # Add new columns and fix broken events
-        for event in self._events:
+        for event in self._events.values():
             event.setdefault("ipaddress", "")
             event.setdefault("host", HostName(""))
             event.setdefault("application", "")
@@ -2801,43 +3118,72 @@ class EventStatus:
         """
         Called on Event Console initialization from status file to initialize
         the current event limit state -> Sets internal counters which are
-        updated during runtime.
+        updated during runtime. The indexes of the events are built as well.
         """
         self.num_existing_events = len(self._events)
 
         self.num_existing_events_by_host: dict[tuple[str, HostName | None], int] = {}
         self.num_existing_events_by_rule: dict[Any, int] = {}
-        for event in self._events:
+        # The events are indexed by rule and host, so that the processing of a message
+        # does not need to look at all events. The inner dicts map the event IDs to
+        # the events, the oldest one first (like self._events).
+        self._events_by_rule: dict[Any, dict[int, Event]] = {}
+        self._events_by_host: dict[str, dict[int, Event]] = {}
+        self._events_by_rule_and_host: dict[tuple[Any, str], dict[int, Event]] = {}
+        # The keys the events are indexed and counted with
+        self._indexed_keys: dict[int, tuple[Any, str, HostName | None]] = {}
+        for event in self._events.values():
             self._count_event_add(event)
 
     def _count_event_add(self, event: Event) -> None:
-        host_key = (event["host"], event["core_host"])
-        if host_key not in self.num_existing_events_by_host:
-            self.num_existing_events_by_host[host_key] = 1
-        else:
-            self.num_existing_events_by_host[host_key] += 1
-
+        self._events_by_rule.setdefault(event["rule_id"], {})[event["id"]] = event
         if event["rule_id"] not in self.num_existing_events_by_rule:
             self.num_existing_events_by_rule[event["rule_id"]] = 1
         else:
             self.num_existing_events_by_rule[event["rule_id"]] += 1
+        self._count_event_host_add(event)
+
+    def _count_event_host_add(self, event: Event) -> None:
+        rule_id, host, core_host = self._indexed_keys[event["id"]] = (
+            event["rule_id"],
+            event["host"],
+            event["core_host"],
+        )
+        self._events_by_host.setdefault(host, {})[event["id"]] = event
+        self._events_by_rule_and_host.setdefault((rule_id, host), {})[event["id"]] = event
+        host_key = (host, core_host)
+        if host_key not in self.num_existing_events_by_host:
+            self.num_existing_events_by_host[host_key] = 1
+        else:
+            self.num_existing_events_by_host[host_key] += 1
 
     def _count_event_remove(self, event: Event) -> None:
-        host_key = (event["host"], event["core_host"])
+        rule_id = self._count_event_host_remove(event)
+        _remove_from_index(self._events_by_rule, rule_id, event["id"])
+        self.num_existing_events_by_rule[rule_id] -= 1
 
-        self.num_existing_events -= 1
-        self.num_existing_events_by_host[host_key] -= 1
-        self.num_existing_events_by_rule[event["rule_id"]] -= 1
+    def _count_event_host_remove(self, event: Event) -> Any:
+        rule_id, host, core_host = self._indexed_keys.pop(event["id"])
+        _remove_from_index(self._events_by_host, host, event["id"])
+        _remove_from_index(self._events_by_rule_and_host, (rule_id, host), event["id"])
+        self.num_existing_events_by_host[(host, core_host)] -= 1
+        return rule_id
 
     def new_event(self, event: Event) -> None:
         self._perfcounters.count("events")
         event["id"] = self._next_event_id
         self._next_event_id += 1
-        self._events.append(event)
+        self._events[event["id"]] = event
         self.num_existing_events += 1
         self._count_event_add(event)
+        self.journal.changed(event["id"])
         self._history.add(event, "NEW")
 
+    def event_changed(self, event: Event) -> None:
+        """Record the change of an existing event for the replication"""
+        if self._events.get(event["id"]) is event:
+            self.journal.changed(event["id"])
+
     def archive_event(self, event: Event) -> None:
         self._perfcounters.count("events")
         event["id"] = self._next_event_id
@@ -2846,18 +3192,20 @@ class EventStatus:
         self._history.add(event, "ARCHIVED")
 
     def remove_event(self, event: Event, delete_reason: HistoryWhat, user: str = "") -> None:
-        try:
-            self._events.remove(event)
-            self._history.add(event, delete_reason, user)
-            self._count_event_remove(event)
-        except ValueError:
-            self._logger.exception("Cannot remove event %d: not present", event["id"])
+        if self._events.get(event["id"]) is not event:
+            self._logger.error("Cannot remove event %d: not present", event["id"])
+            return
+        del self._events[event["id"]]
+        self._history.add(event, delete_reason, user)
+        self.num_existing_events -= 1
+        self._count_event_remove(event)
+        self.journal.removed(event["id"])
 
     # protected by self.lock
     def remove_oldest_event(self, ty: LimitKind, event: Event) -> None:
         if ty == "overall":
             self._logger.log(VERBOSE, "  Removing oldest event")
-            oldest_event = self._events[0]
+            oldest_event = next(iter(self._events.values()))
             self.remove_event(oldest_event, "AUTODELETE")
         elif ty == "by_rule" and event["rule_id"] is not None:
             self._logger.log(VERBOSE, '  Removing oldest event of rule "%s"', event["rule_id"])
@@ -2868,17 +3216,15 @@ class EventStatus:
 
     # protected by self.lock
     def _remove_oldest_event_of_rule(self, rule_id: str) -> None:
-        for event in self._events:
-            if event["rule_id"] == rule_id:
-                self.remove_event(event, "AUTODELETE")
-                return
+        for event in self._events_by_rule.get(rule_id, {}).values():
+            self.remove_event(event, "AUTODELETE")
+            return
 
     # protected by self.lock
     def _remove_oldest_event_of_host(self, hostname: str) -> None:
-        for event in self._events:
-            if event["host"] == hostname:
-                self.remove_event(event, "AUTODELETE")
-                return
+        for event in self._events_by_host.get(hostname, {}).values():
+            self.remove_event(event, "AUTODELETE")
+            return
 
     # protected by self.lock
     def get_num_existing_events_by(self, ty: LimitKind, event: Event) -> int:
@@ -2905,11 +3251,19 @@ class EventStatus:
         of the same "breed" as a new event.
         """
         with self.lock:
+            # Only events of the host of the cancelling event can be cancelled. When
+            # debugging the rules, all events of the rule are checked to log why they
+            # are not cancelled.
+            candidates = (
+                self._events_by_rule.get(rule["id"], {})
+                if self._config["debug_rules"]
+                else self._events_by_rule_and_host.get(
+                    (rule["id"], self._cancelling_host(match_groups, new_event, rule)), {}
+                )
+            )
             to_delete = []
-            for event in self._events:
-                if event["rule_id"] == rule["id"] and self.cancelling_match(
-                    match_groups, new_event, event, rule
-                ):
+            for event in list(candidates.values()):
+                if self.cancelling_match(match_groups, new_event, event, rule):
                     # Fill a few fields of the cancelled event with data from
                     # the cancelling event so that action scripts have useful
                     # values and the logfile entry if more relevant.
@@ -2961,21 +3315,7 @@ class EventStatus:
     ) -> bool:
         debug = self._config["debug_rules"]
 
-        # The match_groups of the canceling match only contain the *_ok match groups
-        # Since the rewrite definitions are based on the positive match, we need to
-        # create some missing keys. O.o
-        match_groups["match_groups_message"] = match_groups.get("match_groups_message_ok", ())
-        match_groups["match_groups_syslog_application"] = match_groups.get(
-            "match_groups_syslog_application_ok", ()
-        )
-
-        # Note: before we compare host and application we need to
-        # apply the rewrite rules to the event. Because if in the previous
-        # the hostname was rewritten, it wouldn't match anymore here.
-        host = new_event["host"]
-        if "set_host" in rule:
-            host = HostName(replace_groups(rule["set_host"], host, match_groups))
-
+        host = self._cancelling_host(match_groups, new_event, rule)
         if event["host"] != host:
             if debug:
                 self._logger.info(
@@ -3061,6 +3401,24 @@ class EventStatus:
 
         return True
 
+    @staticmethod
+    def _cancelling_host(match_groups: MatchGroups, new_event: Event, rule: Rule) -> HostName:
+        # The match_groups of the canceling match only contain the *_ok match groups
+        # Since the rewrite definitions are based on the positive match, we need to
+        # create some missing keys. O.o
+        match_groups["match_groups_message"] = match_groups.get("match_groups_message_ok", ())
+        match_groups["match_groups_syslog_application"] = match_groups.get(
+            "match_groups_syslog_application_ok", ()
+        )
+
+        # Note: before we compare host and application we need to
+        # apply the rewrite rules to the event. Because if in the previous
+        # the hostname was rewritten, it wouldn't match anymore here.
+        host = new_event["host"]
+        if "set_host" in rule:
+            host = HostName(replace_groups(rule["set_host"], host, match_groups))
+        return host
+
     def count_rule_match(self, rule_id: str) -> None:
         with self.lock:
             self._rule_stats.setdefault(rule_id, 0)
@@ -3085,10 +3443,18 @@ class EventStatus:
                 preserve["contact"] = found["contact"]
         found.update(event)
         found.update(preserve)
+        self.journal.changed(found["id"])
+        indexed_key = self._indexed_keys.get(found["id"])
+        if indexed_key is not None and indexed_key[1:] != (found["host"], found["core_host"]):
+            # The existing event takes over the host of the new occurrence. The
+            # rule of both is the same, the event keeps its place among the
+            # events of the rule.
+            self._count_event_host_remove(found)
+            self._count_event_host_add(found)
 
     def count_expected_event(self, event_server: EventServer, event: Event) -> None:
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"] and ev["phase"] == "counting":
+        for ev in self.events_of_rule(event["rule_id"]):
+            if ev["phase"] == "counting":
                 self.count_event_up(ev, event)
                 return
 
@@ -3107,31 +3473,35 @@ class EventStatus:
         since the event has been created because the count was too
         low in the specified period of time.
         """
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"]:
-                if ev["phase"] == "ack" and not count["count_ack"]:
-                    continue  # skip acknowledged events
+        candidates = (
+            self._events_by_rule_and_host.get((event["rule_id"], event["host"]), {})
+            if count["separate_host"]
+            else self._events_by_rule.get(event["rule_id"], {})
+        )
+        for ev in candidates.values():
+            if ev["phase"] == "ack" and not count["count_ack"]:
+                continue  # skip acknowledged events
 
-                if count["separate_host"] and ev["host"] != event["host"]:
-                    continue  # treat events with separated hosts separately
+            if count["separate_host"] and ev["host"] != event["host"]:
+                continue  # treat events with separated hosts separately
 
-                if count["separate_application"] and ev["application"] != event["application"]:
-                    continue  # same for application
+            if count["separate_application"] and ev["application"] != event["application"]:
+                continue  # same for application
 
-                if count["separate_match_groups"] and ev["match_groups"] != event["match_groups"]:
-                    continue
+            if count["separate_match_groups"] and ev["match_groups"] != event["match_groups"]:
+                continue
 
-                count_duration = count.get("count_duration")
-                if count_duration is not None and ev["first"] + count_duration < event["time"]:
-                    # Counting has been discontinued on this event after a certain time
-                    continue
+            count_duration = count.get("count_duration")
+            if count_duration is not None and ev["first"] + count_duration < event["time"]:
+                # Counting has been discontinued on this event after a certain time
+                continue
 
-                if ev["host_in_downtime"] != event["host_in_downtime"]:
-                    continue  # treat events with different downtime states separately
+            if ev["host_in_downtime"] != event["host_in_downtime"]:
+                continue  # treat events with different downtime states separately
 
-                found = ev
-                self.count_event_up(found, event)
-                break
+            found = ev
+            self.count_event_up(found, event)
+            break
         else:
             event["count"] = 1
             event["phase"] = "counting"
@@ -3141,11 +3511,12 @@ class EventStatus:
         # Did we just count the event that was just one too much?
         if found["phase"] == "counting" and found["count"] >= count["count"]:
             found["phase"] = "open"
+            self.journal.changed(found["id"])
             return found  # do event action, return found copy of event
         return None  # do not do event action
 
     def delete_events_by(self, predicate: Callable[[Event], bool], user: str) -> None:
-        for event in self._events[:]:
+        for event in list(self._events.values()):
             if predicate(event):
                 event["phase"] = "closed"
                 if user:
@@ -3153,7 +3524,7 @@ class EventStatus:
                 self.remove_event(event, "DELETE", user)
 
     def get_events(self) -> list[Any]:
-        return self._events
+        return list(self._events.values())
 
     def get_rule_stats(self) -> Iterable[Any]:
         return sorted(self._rule_stats.items(), key=lambda x: x[0])
@@ -3189,11 +3560,22 @@ def replication_allow_command(config: Config, command: str, slave_status: SlaveS
 
 
 def replication_send(
-    config: Config, lock_configuration: ECLock, event_status: EventStatus, last_update: int
+    config: Config,
+    lock_configuration: ECLock,
+    event_status: EventStatus,
+    last_update: int,
+    position: JournalPosition | None = None,
 ) -> dict[str, object]:
-    response: dict[str, object] = {}
+    """The state for a slave, only the changes of the events if its position is known"""
+    response: dict[str, object] = {
+        "time": time.time(),
+        "journal": tuple(event_status.journal.position()),
+    }
     with lock_configuration:
-        response["status"] = event_status.pack_status()
+        if position is not None and event_status.journal.covers(position):
+            response["delta"] = event_status.pack_status_delta(position.sequence)
+        else:
+            response["status"] = event_status.pack_status()
         if last_update < config["last_reload"]:
             response["rules"] = config[
                 "rules"
@@ -3241,8 +3623,21 @@ def replication_pull(  # pylint: disable=too-many-branches
     if need_sync:
         with event_status.lock, lock_configuration:
             try:
-                new_state = get_state_from_master(config, slave_status)
+                # Only the changes of the events are pulled while continuously in sync, the
+                # complete state from time to time. The position is forgotten on takeover.
+                position = (
+                    event_status.replicated_position
+                    if mode == "sync"
+                    and now - event_status.last_full_replication < _FULL_REPLICATION_INTERVAL
+                    else None
+                )
+                new_state, size = get_state_from_master(config, slave_status, position)
                 replication_update_state(settings, config, event_status, event_server, new_state)
+                perfcounters.count("replication_bytes", size)
+                if "time" in new_state:
+                    perfcounters.count_time(
+                        "replication_lag", max(0.0, time.time() - new_state["time"])
+                    )
                 if repl_settings.get("logging"):
                     logger.info("Successfully synchronized with master")
                 slave_status["last_sync"] = now
@@ -3291,6 +3686,8 @@ def replication_pull(  # pylint: disable=too-many-branches
                                 offline,
                             )
                             slave_status["mode"] = "takeover"
+                            # The events are changed locally from now on
+                            event_status.replicated_position = None
 
             save_slave_status(settings, slave_status)
 
@@ -3312,7 +3709,15 @@ def replication_update_state(
         config["actions"] = new_state["actions"]
 
     # Update to the masters' event state
-    event_status.unpack_status(new_state["status"])
+    if "delta" in new_state:
+        event_status.unpack_status_delta(new_state["delta"])
+    else:
+        event_status.unpack_status(new_state["status"])
+        event_status.last_full_replication = time.time()
+    # Masters before the journal do not send a position
+    event_status.replicated_position = (
+        JournalPosition(*new_state["journal"]) if "journal" in new_state else None
+    )
 
 
 def save_master_config(settings: Settings, new_state: dict[str, object]) -> None:
@@ -3350,17 +3755,24 @@ def load_master_config(settings: Settings, config: ConfigFromWATO, logger: Logge
             logger.error("Replication: no previously saved master state available")
 
 
-def get_state_from_master(config: Config, slave_status: SlaveStatus) -> Any:
+def get_state_from_master(
+    config: Config, slave_status: SlaveStatus, position: JournalPosition | None = None
+) -> tuple[Any, int]:
+    """The state of the master and the size of its response
+
+    Only the changes of the events after the journal position are requested if one is given.
+    """
     repl_settings = config["replication"]
     if repl_settings is None:
         raise ValueError("no replication settings")
+    request = b"REPLICATE %d" % (slave_status["last_sync"] if slave_status["last_sync"] else 0)
+    if position is not None:
+        request += b" %s %d" % (position.journal_id.encode(), position.sequence)
     try:
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sock.settimeout(repl_settings["connect_timeout"])
         sock.connect(repl_settings["master"])
-        sock.sendall(
-            b"REPLICATE %d\n" % (slave_status["last_sync"] if slave_status["last_sync"] else 0)
-        )
+        sock.sendall(request + b"\n")
         sock.shutdown(socket.SHUT_WR)
 
         response_text = b""
@@ -3370,7 +3782,7 @@ def get_state_from_master(config: Config, slave_status: SlaveStatus) -> Any:
             if not chunk:
                 break
 
-        return ast.literal_eval(response_text.decode("utf-8"))
+        return ast.literal_eval(response_text.decode("utf-8")), len(response_text)
     except SyntaxError as e:
         raise Exception(
             f"Invalid response from event daemon: <pre>{repr(response_text)}</pre>"
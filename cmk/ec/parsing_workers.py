@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Parsing and rule matching of syslog messages in worker processes
+
+Parsing the received syslog messages and matching them against the rules is done by the
+event server thread and is limited to one CPU by the GIL. When parsing workers are
+configured, the batches of received messages are split into chunks which are handed over to
+a pool of worker processes. Every worker owns a copy of the compiled rules. It parses the
+messages, translates the host names, preselects the rule candidates and evaluates the
+conditions of the candidates. The results are returned in the order of the messages, so the
+order of the messages of every source is kept.
+
+The event server thread still owns the event status. It applies the pre-evaluated results and
+evaluates the rules a worker could not decide, i.e. the rules depending on time periods,
+which are only known to the core. SNMP traps are not handed over, they are parsed by the
+event server thread.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import multiprocessing
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from livestatus import SiteId
+
+from cmk.utils.hostaddress import HostName
+from cmk.utils.timeperiod import TimeperiodName
+from cmk.utils.translations import translate_hostname, TranslationOptions
+
+from .config import Rule
+from .event import create_event_from_syslog_message, Event
+from .ingestion import ReceivedMessage
+from .rule_matcher import MatchResult, MatchSuccess, RuleMatcher, RulePrefilter
+
+# The number of messages handed over to a worker at once
+CHUNK_SIZE = 100
+
+
+class RuleSnapshot(NamedTuple):
+    """The configuration the workers need for parsing and matching
+
+    The generation identifies the compiled rules, it changes whenever they are compiled.
+    """
+
+    generation: int
+    rules: Sequence[Rule]
+    # The positions of the hashed rules with their facility/priority masks, None if the rule
+    # optimizer is disabled
+    masks: Sequence[tuple[int, int]] | None
+    hostname_translation: TranslationOptions
+    site: SiteId
+
+
+class RuleMatches(NamedTuple):
+    """The rule candidates of an event as evaluated by a worker
+
+    The results contain the positions of the candidates in the rules, in order, up to the
+    first rule the event is finally processed by. The result is None for the rules which
+    have to be evaluated by the event server.
+    """
+
+    generation: int
+    host: HostName  # the translated host name
+    num_candidates: int
+    results: Sequence[tuple[int, MatchResult | None]]
+
+
+class PreparedEvent(NamedTuple):
+    event: Event  # with the host name as received
+    matches: RuleMatches
+
+
+class ParsingWorkers:
+    """A pool of worker processes for the rules of a generation"""
+
+    def __init__(self, num_workers: int, snapshot: RuleSnapshot) -> None:
+        self.num_workers = num_workers
+        self.generation = snapshot.generation
+        # The event server is multi-threaded, forking it for the workers is not safe
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_init_worker,
+            initargs=(snapshot,),
+        )
+
+    def prepare(self, messages: Sequence[ReceivedMessage]) -> Iterator[PreparedEvent | None]:
+        """Prepare the messages in the workers, None for the SNMP traps
+
+        The results are yielded in the order of the messages as soon as the chunk of a message
+        is done. Raises BrokenProcessPool when a worker died.
+        """
+        for prepared in self._executor.map(
+            _prepare_messages,
+            [messages[n : n + CHUNK_SIZE] for n in range(0, len(messages), CHUNK_SIZE)],
+        ):
+            yield from prepared
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class MessagePreparer:
+    """The part of the event processing done by a worker"""
+
+    def __init__(self, snapshot: RuleSnapshot) -> None:
+        self._generation = snapshot.generation
+        self._rules = snapshot.rules
+        self._hostname_translation = snapshot.hostname_translation
+        self._prefilter = (
+            None
+            if snapshot.masks is None
+            else RulePrefilter((self._rules[position], mask) for position, mask in snapshot.masks)
+        )
+        self._positions = {id(rule): position for position, rule in enumerate(self._rules)}
+        self._rule_matcher = RuleMatcher(
+            logger=None,
+            omd_site_id=snapshot.site,
+            is_active_time_period=_unknown_time_period,
+        )
+
+    def prepare(self, message: ReceivedMessage) -> PreparedEvent | None:
+        if message.is_trap:
+            return None
+        event = create_event_from_syslog_message(message.data, message.address, None)
+        try:
+            host = translate_hostname(self._hostname_translation, event["host"])
+        except Exception:
+            host = HostName("")
+        translated = event.copy()
+        translated["host"] = host
+
+        candidates = (
+            self._rules if self._prefilter is None else self._prefilter.candidates(translated)
+        )
+        results: list[tuple[int, MatchResult | None]] = []
+        for rule in candidates:
+            result = self._rule_matches(rule, translated)
+            results.append((self._positions[id(rule)], result))
+            # Only rules skipping the rest of their pack are followed by further rules
+            if isinstance(result, MatchSuccess) and rule.get("drop") != "skip_pack":
+                break
+        return PreparedEvent(event, RuleMatches(self._generation, host, len(candidates), results))
+
+    def _rule_matches(self, rule: Rule, event: Event) -> MatchResult | None:
+        if "match_timeperiod" in rule:
+            return None
+        # Errors are left to the event server, which logs them
+        with contextlib.suppress(Exception):
+            return self._rule_matcher.event_rule_matches(rule, event)
+        return None
+
+
+def _unknown_time_period(name: TimeperiodName) -> bool:
+    raise RuntimeError(f"Time period {name} is only known to the event server")
+
+
+_preparer: MessagePreparer | None = None
+
+
+def _init_worker(snapshot: RuleSnapshot) -> None:
+    global _preparer
+    _preparer = MessagePreparer(snapshot)
+
+
+def _prepare_messages(messages: Sequence[ReceivedMessage]) -> list[PreparedEvent | None]:
+    assert _preparer is not None
+    return [_preparer.prepare(message) for message in messages]
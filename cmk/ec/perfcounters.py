@@ -5,6 +5,7 @@
 from __future__ import annotations
 
 import time
+from collections.abc import Iterable
 from logging import Logger
 
 from .helpers import ECLock
@@ -27,6 +28,8 @@ class Perfcounters:
         "overflows",
         "events",
         "connects",
+        "ingestion_drops",
+        "replication_bytes",
     ]
 
     # Average processing times
@@ -34,6 +37,7 @@ class Perfcounters:
         "processing": 0.99,  # event processing
         "sync": 0.95,  # Replication sync
         "request": 0.95,  # Client requests
+        "replication_lag": 0.95,  # Age of the replicated state when it is applied
     }
 
     # TODO: Why aren't self._times / self._rates / ... not initialized with their defaults?
@@ -50,16 +54,20 @@ class Perfcounters:
 
         self._logger = logger.getChild("Perfcounters")
 
-    def count(self, counter: str) -> None:
+    def count(self, counter: str, num: int = 1) -> None:
         with self._lock:
-            self._counters[counter] += 1
+            self._counters[counter] += num
 
     def count_time(self, counter: str, ptime: float) -> None:
+        self.count_times(counter, [ptime])
+
+    def count_times(self, counter: str, ptimes: Iterable[float]) -> None:
         with self._lock:
-            if counter in self._times:
-                self._times[counter] = lerp(ptime, self._times[counter], self._weights[counter])
-            else:
-                self._times[counter] = ptime
+            for ptime in ptimes:
+                if counter in self._times:
+                    self._times[counter] = lerp(ptime, self._times[counter], self._weights[counter])
+                else:
+                    self._times[counter] = ptime
 
     def do_statistics(self) -> None:
         with self._lock:
@@ -7,9 +7,10 @@ from __future__ import annotations
 
 import ipaddress
 import re
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass
 from logging import Logger
+from re import _parser as re_parser  # type: ignore[attr-defined]
 from typing import Literal, NamedTuple
 
 from livestatus import SiteId
@@ -99,6 +100,193 @@ def compile_rule(rule: Rule) -> None:
         compile_state_pattern(state_patterns, "0")
 
 
+def required_literal(pattern: TextPattern) -> str | None:
+    """Returns a (lower case) literal contained in every text matching the pattern
+
+    For regular expressions this is the longest literal in the sequence of
+    the outermost level. Only ASCII literals are returned, see normalize_text().
+
+    >>> required_literal("foo bar")
+    'foo bar'
+    >>> required_literal(re.compile(r"^Disk (sd[a-z]+) FAILED: .*error", re.IGNORECASE))
+    ' failed: '
+    >>> required_literal(re.compile(r"foo|bar", re.IGNORECASE)) is None
+    True
+    """
+    if isinstance(pattern, str):
+        return pattern if pattern.isascii() else None
+
+    try:
+        parsed = re_parser.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return None
+
+    longest = ""
+    current: list[str] = []
+    for op, av in parsed:
+        if op is re_parser.LITERAL and chr(av).isascii():
+            current.append(chr(av).lower())
+            continue
+        if len(current) > len(longest):
+            longest = "".join(current)
+        current = []
+    if len(current) > len(longest):
+        longest = "".join(current)
+    return longest or None
+
+
+def normalize_text(text: str) -> str:
+    """Prepares a text for looking up the required literals
+
+    Matching case insensitively, the regular expressions match four non-ASCII
+    letters with ASCII letters. Two of them are not lowered to the ASCII
+    letters.
+
+    >>> normalize_text("Dıſk")
+    'disk'
+    """
+    lowered = text.lower()
+    if lowered.isascii():
+        return lowered
+    return lowered.replace("\u0131", "i").replace("\u017f", "s")
+
+
+class _LiteralIndex:
+    """Finds the literals contained in a text
+
+    The literals are indexed by their first three characters (the shorter
+    literals by themselves). Every substring of the text of these lengths is
+    looked up once, independent of the number of literals. Only the literals
+    sharing their prefix with a substring are compared with the whole text.
+    """
+
+    _PREFIX_LENGTH = 3
+
+    def __init__(self) -> None:
+        self._by_prefix: dict[str, list[tuple[str, int]]] = {}
+        self._prefix_lengths: set[int] = set()
+
+    def add(self, literal: str, position: int) -> None:
+        prefix = literal[: self._PREFIX_LENGTH]
+        self._by_prefix.setdefault(prefix, []).append((literal, position))
+        self._prefix_lengths.add(len(prefix))
+
+    def find(self, text: str) -> Iterator[int]:
+        """Returns the positions of the literals contained in the text"""
+        prefixes = {
+            text[i : i + length] for length in self._prefix_lengths for i in range(len(text))
+        }
+        for prefix in prefixes:
+            for literal, position in self._by_prefix.get(prefix, ()):
+                if literal in text:
+                    yield position
+
+
+class RulePrefilter:
+    """Preselects the rules which may match an event
+
+    Every rule is indexed by a condition an event has to fulfill to match the
+    rule: Its exact host name or a literal contained in the message text, the
+    syslog application or the host name (extracted from the patterns of the
+    rule). Only the rules whose condition is fulfilled by an event and the
+    rules without such a condition need to be matched against the event. The
+    rules are further restricted to the syslog facilities and priorities they
+    are hashed for, see EventServer.hash_rule().
+    """
+
+    def __init__(self, rules: Iterable[tuple[Rule, int]]) -> None:
+        """Indexes the rules, the facility/priority mask of a rule has the bit
+        facility * 8 + priority set for the syslog facilities and priorities the
+        rule needs to be checked for."""
+        self._rules: list[Rule] = []
+        self._masks: list[int] = []
+        self._unindexed: list[int] = []
+        self._by_host: dict[str, list[int]] = {}
+        self._host_literals = _LiteralIndex()
+        self._text_literals = _LiteralIndex()
+        self._application_literals = _LiteralIndex()
+        for position, (rule, mask) in enumerate(rules):
+            self._rules.append(rule)
+            self._masks.append(mask)
+            self._add(rule, position)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def _add(self, rule: Rule, position: int) -> None:
+        if rule.get("invert_matching"):
+            self._unindexed.append(position)
+            return
+
+        host_pattern = rule.get("match_host")
+        if isinstance(host_pattern, str):
+            self._by_host.setdefault(host_pattern, []).append(position)
+            return
+
+        # The literals one of which is contained in every matching text (the
+        # positive or the cancelling pattern)
+        text_literals = _required_literals(
+            rule.get("match"), rule.get("match_ok"), "match_ok" in rule
+        )
+        application_literals = _required_literals(
+            rule.get("match_application"),
+            rule.get("cancel_application"),
+            "cancel_application" in rule,
+            required="match_application" in rule,
+        )
+        host_literal = required_literal(host_pattern) if host_pattern is not None else None
+
+        candidates: list[tuple[_LiteralIndex, list[str]]] = [
+            (index, literals)
+            for index, literals in (
+                (self._text_literals, text_literals),
+                (self._application_literals, application_literals),
+                (self._host_literals, [host_literal] if host_literal else []),
+            )
+            if literals
+        ]
+        if not candidates:
+            self._unindexed.append(position)
+            return
+
+        # Index by the most specific condition
+        index, literals = max(candidates, key=lambda c: min(len(l) for l in c[1]))
+        for literal in literals:
+            index.add(literal, position)
+
+    def candidates(self, event: Event) -> list[Rule]:
+        """Returns the rules which may match the event, in the order of the rules"""
+        positions = set(self._unindexed)
+        positions.update(self._by_host.get(event["host"].lower(), ()))
+        positions.update(self._host_literals.find(normalize_text(event["host"])))
+        positions.update(self._text_literals.find(normalize_text(event["text"])))
+        positions.update(self._application_literals.find(normalize_text(event["application"])))
+        bit = 1 << (event["facility"] * 8 + event["priority"])
+        return [self._rules[p] for p in sorted(positions) if self._masks[p] & bit]
+
+
+def _required_literals(
+    pattern: TextPattern | None,
+    alternative_pattern: TextPattern | None,
+    has_alternative: bool,
+    required: bool = True,
+) -> list[str]:
+    """Returns literals one of which is contained in every text matching one of the patterns"""
+    literals = []
+    if required:
+        if pattern is None or (literal := required_literal(pattern)) is None:
+            return []  # no pattern: matches everything
+        literals.append(literal)
+    if has_alternative:
+        if (
+            alternative_pattern is None
+            or (literal := required_literal(alternative_pattern)) is None
+        ):
+            return []
+        literals.append(literal)
+    return literals
+
+
 def match(pattern: TextPattern | None, text: str, complete: bool) -> TextMatchResult:
     """Performs an EC style matching test of pattern on text
 
@@ -4,7 +4,7 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import subprocess
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator, Sequence
 
 import cmk.utils.tty as tty
 from cmk.utils.exceptions import MKGeneralException, MKSNMPError, MKTimeout
@@ -91,6 +91,92 @@ class ClassicSNMPBackend(SNMPBackend):
         table_base_oid: str | None = None,
         context_name: str | None = None,
     ) -> SNMPRowInfo:
+        return [
+            (varbind[0], varbind[1])
+            for varbind in self._run_walk_command(self._snmp_walk_command(context_name), [oid])
+            if varbind is not None and varbind[1] is not None
+        ]
+
+    def walk_columns(
+        self,
+        oids: Sequence[OID],
+        section_name: SectionName | None = None,
+        table_base_oid: OID | None = None,
+        context_name: SNMPContextName | None = None,
+    ) -> Sequence[SNMPRowInfo]:
+        """Walk the columns together with interleaved GETBULK requests
+
+        Every request asks for the next bulk walk size (max-repetitions) rows of all columns
+        not yet complete. A column is complete as soon as the agent answers with an OID out of
+        its subtree, the end of the MIB view or an OID already returned. The walk stops early
+        only if a response does not contain anything for the columns. Columns without any row
+        are walked on their own, for snmpwalk to fall back to a GET of the OID just like for a
+        single column.
+
+        Each request spawns an snmpbulkget process, so there are less processes than with one
+        snmpbulkwalk per column as long as the table has less rows than columns times the bulk
+        walk size. Without bulk walk the columns are walked one after the other.
+        """
+        if len(oids) < 2 or not self.config.is_bulkwalk_host:
+            return super().walk_columns(oids, section_name, table_base_oid, context_name)
+
+        rowinfos: list[SNMPRowInfo] = [[] for _oid in oids]
+        seen: list[set[OID]] = [set() for _oid in oids]
+        # The columns not yet complete and the OID to continue them from
+        next_oids = dict(enumerate(oids))
+        while next_oids:
+            indexes = list(next_oids)
+            varbinds = self._run_walk_command(
+                self._snmp_base_command("bulkget", context_name),
+                [next_oids[index] for index in indexes],
+            )
+            # The variable bindings of the response are ordered by repetition, then by column.
+            # The agent may answer with less repetitions than requested, the columns without
+            # a variable binding are requested again.
+            progressed = False
+            for position, varbind in enumerate(varbinds):
+                if varbind is None:
+                    # The columns of the following variable bindings are unknown
+                    break
+                index = indexes[position % len(indexes)]
+                if index not in next_oids:
+                    continue
+                row_oid, value = varbind
+                progressed = True
+                if (
+                    value is None
+                    or not row_oid.startswith(oids[index] + ".")
+                    # Some agents repeat OIDs, do not walk in circles
+                    or row_oid in seen[index]
+                ):
+                    del next_oids[index]
+                    continue
+                rowinfos[index].append((row_oid, value))
+                seen[index].add(row_oid)
+                next_oids[index] = row_oid
+
+            if not progressed:
+                console.vverbose(
+                    "No progress walking %s, keeping the rows fetched so far.\n"
+                    % ", ".join(next_oids.values())
+                )
+                break
+
+        return [
+            rowinfo
+            or self.walk(
+                oid,
+                section_name=section_name,
+                table_base_oid=table_base_oid,
+                context_name=context_name,
+            )
+            for oid, rowinfo in zip(oids, rowinfos)
+        ]
+
+    def _run_walk_command(
+        self, command: list[str], oids: Sequence[OID]
+    ) -> list[tuple[OID, SNMPRawValue | None] | None]:
+        """Run a walk or bulk get, see _get_varbinds_from_walk_output"""
         protospec = self._snmp_proto_spec()
 
         ipaddress = self.config.ipaddress or "0.0.0.0"
@@ -98,11 +184,10 @@ class ClassicSNMPBackend(SNMPBackend):
             ipaddress = "[" + ipaddress + "]"
 
         portspec = self._snmp_port_spec()
-        command = self._snmp_walk_command(context_name)
-        command += ["-OQ", "-OU", "-On", "-Ot", f"{protospec}{ipaddress}{portspec}", oid]
+        command = command + ["-OQ", "-OU", "-On", "-Ot", f"{protospec}{ipaddress}{portspec}", *oids]
         console.vverbose("Running '%s'\n" % subprocess.list2cmdline(command))
 
-        rowinfo: SNMPRowInfo = []
+        varbinds: list[tuple[OID, SNMPRawValue | None] | None] = []
         with subprocess.Popen(
             command,
             close_fds=True,
@@ -114,7 +199,7 @@ class ClassicSNMPBackend(SNMPBackend):
             assert snmp_process.stdout
             assert snmp_process.stderr
             try:
-                rowinfo = self._get_rowinfo_from_walk_output(snmp_process.stdout)
+                varbinds = list(self._get_varbinds_from_walk_output(snmp_process.stdout))
                 error = snmp_process.stderr.read()
             except MKTimeout:
                 snmp_process.kill()
@@ -132,16 +217,29 @@ class ClassicSNMPBackend(SNMPBackend):
                     snmp_process.returncode,
                 )
             )
-        return rowinfo
+        return varbinds
 
     def _get_rowinfo_from_walk_output(self, lines: Iterable[str]) -> SNMPRowInfo:
+        return [
+            (varbind[0], varbind[1])
+            for varbind in self._get_varbinds_from_walk_output(lines)
+            if varbind is not None and varbind[1] is not None
+        ]
+
+    def _get_varbinds_from_walk_output(
+        self, lines: Iterable[str]
+    ) -> Iterator[tuple[OID, SNMPRawValue | None] | None]:
+        """The variable bindings in the order of the output
+
+        The value is None for the ends of the MIB view, the variable binding itself for lines
+        which can not be parsed.
+        """
         # Ugly(1): in some cases snmpwalk inserts line feed within one
         # dataset. This happens for example on hexdump outputs longer
         # than a few bytes. Those dumps are enclosed in double quotes.
         # So if the value begins with a double quote, but the line
         # does not end with a double quote, we take the next line(s) as
         # a continuation line.
-        rowinfo = []
         line_iter = iter(lines)
         while True:
             try:
@@ -149,9 +247,13 @@ class ClassicSNMPBackend(SNMPBackend):
             except StopIteration:
                 break
 
+            if not line:
+                continue
+
             parts = line.split("=", 1)
             if len(parts) < 2:
-                continue  # broken line, must contain =
+                yield None  # broken line, must contain =
+                continue
             oid = parts[0].strip()
             value = parts[1].strip()
             # Filter out silly error messages from snmpwalk >:-P
@@ -161,6 +263,7 @@ class ClassicSNMPBackend(SNMPBackend):
                 or value.startswith("No Such Object available")
                 or value.startswith("No Such Instance currently exists")
             ):
+                yield oid, None
                 continue
 
             if value == '"' or (
@@ -171,8 +274,7 @@ class ClassicSNMPBackend(SNMPBackend):
                     value += " " + nextline
                     if value[-1] == '"':
                         break
-            rowinfo.append((oid, strip_snmp_value(value)))
-        return rowinfo
+            yield oid, strip_snmp_value(value)
 
     def _snmp_proto_spec(self) -> str:
         if self.config.is_ipv6_primary:
@@ -212,6 +314,9 @@ class ClassicSNMPBackend(SNMPBackend):
             command = ["snmpget"]
         elif what == "getnext":
             command = ["snmpgetnext", "-Cf"]
+        elif what == "bulkget":
+            command = ["snmpbulkget"]
+            options += ["-Cn0", "-Cr%d" % self.config.bulk_walk_size_of]
         elif self.config.is_bulkwalk_host:
             command = ["snmpbulkwalk"]
 
@@ -4,7 +4,11 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 """Abstract classes and types."""
 
+import bisect
 import logging
+import mmap
+import re
+from array import array
 from collections.abc import Sequence
 from pathlib import Path
 from typing import Final
@@ -12,6 +16,7 @@ from typing import Final
 import cmk.utils.agent_simulator as agent_simulator
 import cmk.utils.paths
 from cmk.utils.agentdatatype import AgentRawData
+from cmk.utils.caching import cache_manager
 from cmk.utils.exceptions import MKGeneralException, MKSNMPError
 from cmk.utils.log import console
 from cmk.utils.sectionname import SectionName
@@ -22,6 +27,86 @@ from ._utils import strip_snmp_value
 
 __all__ = ["StoredWalkSNMPBackend"]
 
+# The indexes keep the walk files mapped, so don't keep too many of them.
+_MAX_CACHED_WALK_INDEXES = 32
+
+
+class _WalkIndex:
+    """Record offsets of a memory mapped walk file
+
+    The walk files are sorted by OID, as written by snmpwalk. The index only
+    holds the byte offsets of the records, the OIDs are parsed into integer
+    tuples while bisecting, and the values are only read for the rows that
+    are returned.
+    """
+
+    # A record starts at every line starting with a dot. Following lines not
+    # starting with a dot belong to the value of the previous record.
+    _RECORD_START = re.compile(rb"^\.", re.MULTILINE)
+
+    def __init__(self, path: Path) -> None:
+        stat = path.stat()
+        self.signature: Final = (stat.st_mtime_ns, stat.st_size)
+        self._data = self._map(path)
+        self._starts: Final = array(
+            "Q", (m.start() for m in self._RECORD_START.finditer(self._data))
+        )
+        self._starts.append(len(self._data))
+        self._records: Final = range(len(self._starts) - 1)
+
+    @staticmethod
+    def _map(path: Path) -> mmap.mmap | bytes:
+        with path.open("rb") as f:
+            try:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Empty files can not be mapped
+                return b""
+
+    def _split(self, index: int) -> list[bytes]:
+        return self._data[self._starts[index] : self._starts[index + 1]].split(None, 1)
+
+    def _oid(self, index: int) -> tuple[int, ...]:
+        return _oid_to_tuple(self._split(index)[0].decode())
+
+    def rows(self, oid_prefix: OID, include_prefix: bool) -> SNMPRowInfo:
+        """All rows of OIDs below oid_prefix, in the order of the file"""
+        prefix = _oid_to_tuple(oid_prefix)
+
+        def key(index: int) -> tuple[int, ...]:
+            return self._oid(index)[: len(prefix)]
+
+        begin = bisect.bisect_left(self._records, prefix, key=key)
+        end = bisect.bisect_right(self._records, prefix, lo=begin, key=key)
+        if not include_prefix:
+            while begin < end and self._oid(begin) == prefix:
+                begin += 1
+        return [self._row(index) for index in range(begin, end)]
+
+    def _row(self, index: int) -> tuple[OID, SNMPRawValue]:
+        parts = self._split(index)
+        value = agent_simulator.process(AgentRawData(parts[1])).decode() if len(parts) > 1 else ""
+        # Fix for missing starting oids
+        return "." + parts[0].decode().lstrip("."), strip_snmp_value(value)
+
+
+def _oid_to_tuple(oid: OID) -> tuple[int, ...]:
+    try:
+        return tuple(map(int, oid.strip(".").split(".")))
+    except Exception:
+        raise MKGeneralException("Invalid OID %s" % oid)
+
+
+def _get_walk_index(path: Path) -> _WalkIndex:
+    """The index of the walk file, which is rebuilt when the file has changed"""
+    cache = cache_manager.obtain_bounded_cache(
+        "stored_walk_indexes", max_entries=_MAX_CACHED_WALK_INDEXES
+    )
+    stat = path.stat()
+    if (index := cache.get(path)) is None or index.signature != (stat.st_mtime_ns, stat.st_size):
+        console.vverbose(f"  Indexing {path}\n")
+        index = cache[path] = _WalkIndex(path)
+    return index
+
 
 class StoredWalkSNMPBackend(SNMPBackend):
     def __init__(
@@ -62,34 +147,14 @@ class StoredWalkSNMPBackend(SNMPBackend):
             dot_star = False
 
         console.vverbose(f"  Loading {oid}")
-        lines = self.read_walk_data()
-
-        begin = 0
-        end = len(lines)
-        hit = None
-        while end - begin > 0:
-            current = (begin + end) // 2
-            parts = lines[current].split(None, 1)
-            comp = parts[0]
-            hit = StoredWalkSNMPBackend._compare_oids(oid_prefix, comp)
-            if hit == 0:
-                break
-            if hit == 1:  # we are too low
-                begin = current + 1
-            else:
-                end = current
-
-        if hit != 0:
-            return []  # not found
-
-        rowinfo = StoredWalkSNMPBackend._collect_until(oid, oid_prefix, lines, current, -1)
-        rowinfo.reverse()
-        rowinfo += StoredWalkSNMPBackend._collect_until(oid, oid_prefix, lines, current + 1, 1)
-
-        if dot_star:
-            return [rowinfo[0]]
-
-        return rowinfo
+        try:
+            index = _get_walk_index(self.path)
+        except OSError:
+            raise MKSNMPError("No snmpwalk file %s" % self.path)
+
+        # OID.* requests the first OID below OID, but not OID itself
+        rowinfo = index.rows(oid_prefix, include_prefix=not dot_star)
+        return rowinfo[:1] if dot_star else rowinfo
 
     @staticmethod
     def read_walk_from_path(path: Path) -> Sequence[str]:
@@ -110,55 +175,3 @@ class StoredWalkSNMPBackend(SNMPBackend):
             return self.read_walk_from_path(self.path)
         except OSError:
             raise MKSNMPError("No snmpwalk file %s" % self.path)
-
-    @staticmethod
-    def _compare_oids(a: OID, b: OID) -> int:
-        aa = StoredWalkSNMPBackend._to_bin_string(a)
-        bb = StoredWalkSNMPBackend._to_bin_string(b)
-        if len(aa) <= len(bb) and bb[: len(aa)] == aa:
-            result = 0
-        else:
-            result = (aa > bb) - (aa < bb)
-        return result
-
-    @staticmethod
-    def _to_bin_string(oid: OID) -> tuple[int, ...]:
-        try:
-            return tuple(map(int, oid.strip(".").split(".")))
-        except Exception:
-            raise MKGeneralException("Invalid OID %s" % oid)
-
-    @staticmethod
-    def _collect_until(
-        oid: OID, oid_prefix: OID, lines: Sequence[str], index: int, direction: int
-    ) -> SNMPRowInfo:
-        rows = []
-        # Handle case, where we run after the end of the lines list
-        if index >= len(lines):
-            if direction > 0:
-                return []
-            index -= 1
-        while True:
-            line = lines[index]
-            parts = line.split(None, 1)
-            o = parts[0]
-            if o.startswith("."):
-                o = o[1:]
-            if o == oid or o.startswith(oid_prefix + "."):
-                if len(parts) > 1:
-                    # FIXME: This encoding ping-pong is horrible...
-                    value = agent_simulator.process(
-                        AgentRawData(
-                            parts[1].encode(),
-                        ),
-                    ).decode()
-                else:
-                    value = ""
-                # Fix for missing starting oids
-                rows.append(("." + o, strip_snmp_value(value)))
-                index += direction
-                if index < 0 or index >= len(lines):
-                    break
-            else:
-                break
-        return rows
@@ -3,6 +3,7 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+from cmk.gui.config import active_config
 from cmk.gui.hooks import request_memoize
 from cmk.gui.i18n import _
 
@@ -24,4 +25,5 @@ def _get_cached_bi_compiler() -> BICompiler:
     return BICompiler(
         BIManager.bi_configuration_file(),
         SitesCallback(all_sites_with_id_and_online, bi_livestatus_query, _),
+        compilation_workers=active_config.bi_compilation_workers,
     )
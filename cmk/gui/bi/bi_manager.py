@@ -9,6 +9,7 @@ from livestatus import LivestatusOutputFormat, LivestatusResponse, SiteId
 from cmk.utils.paths import default_config_dir
 
 from cmk.gui import sites
+from cmk.gui.config import active_config
 from cmk.gui.i18n import _
 
 from cmk.bi.compiler import BICompiler
@@ -20,7 +21,11 @@ from cmk.bi.lib import SitesCallback
 class BIManager:
     def __init__(self) -> None:
         sites_callback = SitesCallback(all_sites_with_id_and_online, bi_livestatus_query, _)
-        self.compiler = BICompiler(self.bi_configuration_file(), sites_callback)
+        self.compiler = BICompiler(
+            self.bi_configuration_file(),
+            sites_callback,
+            compilation_workers=active_config.bi_compilation_workers,
+        )
         self.compiler.load_compiled_aggregations()
         self.status_fetcher = BIStatusFetcher(sites_callback)
         self.computer = BIComputer(self.compiler.compiled_aggregations, self.status_fetcher)
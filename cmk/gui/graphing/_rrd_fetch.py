@@ -6,10 +6,10 @@
 
 
 import collections
-import contextlib
 import time
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
 from dataclasses import dataclass
+from typing import Literal
 
 import livestatus
 from livestatus import SiteId
@@ -18,10 +18,11 @@ import cmk.utils.version as cmk_version
 from cmk.utils.exceptions import MKGeneralException
 from cmk.utils.hostaddress import HostName
 from cmk.utils.metrics import MetricName
-from cmk.utils.prediction import livestatus_lql, TimeSeries, TimeSeriesValues
+from cmk.utils.prediction import lq_logic, TimeSeries, TimeSeriesValues
 from cmk.utils.servicename import ServiceName
 
 import cmk.gui.sites as sites
+from cmk.gui.hooks import request_memoize
 from cmk.gui.i18n import _
 from cmk.gui.type_defs import ColumnName
 
@@ -35,7 +36,7 @@ from ._graph_specification import (
     MetricOpScalar,
     MetricOpTransformation,
 )
-from ._timeseries import op_func_wrapper, time_series_operators
+from ._timeseries import merge_time_series_values
 from ._type_defs import GraphConsoldiationFunction
 from ._unit_info import unit_info
 from ._utils import (
@@ -75,15 +76,14 @@ def fetch_rrd_data_for_graph(
         if isinstance(entry, NeededElementForRRDDataKey)
     )
     rrd_data: RRDData = {}
-    for (site, host_name, service_description), metrics in by_service.items():
-        with contextlib.suppress(livestatus.MKLivestatusNotFoundError):
-            for (perfvar, cf, scale), data in fetch_rrd_data(
-                site, host_name, service_description, metrics, graph_recipe, graph_data_range
-            ):
-                rrd_data[(site, host_name, service_description, perfvar, cf, scale)] = TimeSeries(
-                    data,
-                    conversion=unit_conversion,
-                )
+    for (site, host_name, service_description), fetched in fetch_rrd_data_of_services(
+        by_service, graph_recipe.consolidation_function, graph_data_range
+    ).items():
+        for (perfvar, cf, scale), data in fetched:
+            rrd_data[(site, host_name, service_description, perfvar, cf, scale)] = TimeSeries(
+                data,
+                conversion=unit_conversion,
+            )
     _align_and_resample_rrds(rrd_data, graph_recipe.consolidation_function)
     _chop_last_empty_step(graph_data_range, rrd_data)
 
@@ -263,6 +263,40 @@ def fetch_rrd_data(
     graph_recipe: GraphRecipe,
     graph_data_range: GraphDataRange,
 ) -> list[tuple[MetricProperties, TimeSeriesValues]]:
+    service = (site, host_name, service_description)
+    if (
+        fetched := fetch_rrd_data_of_services(
+            {service: metrics}, graph_recipe.consolidation_function, graph_data_range
+        ).get(service)
+    ) is None:
+        raise livestatus.MKLivestatusNotFoundError()
+    return fetched
+
+
+_ServiceKey = tuple[SiteId, HostName, ServiceName]
+
+
+@request_memoize()
+def _rrd_data_cache() -> dict[tuple[_ServiceKey, ColumnName], TimeSeriesValues]:
+    """The RRD data fetched during the current request, by service and RRD column
+
+    The RRD columns contain the metric, the consolidation, the time range and the step.
+    """
+    return {}
+
+
+def fetch_rrd_data_of_services(
+    metrics_by_service: Mapping[_ServiceKey, Iterable[MetricProperties]],
+    rrd_consolidation: GraphConsoldiationFunction | None,
+    graph_data_range: GraphDataRange,
+) -> dict[_ServiceKey, list[tuple[MetricProperties, TimeSeriesValues]]]:
+    """Fetch the RRD data of many services with few Livestatus queries
+
+    The services needing the same RRD columns, e.g. the services of a combined graph, are
+    fetched with one query, which is sent to all their sites at the same time. RRD data
+    already fetched during the current request is not fetched again. Services which do not
+    exist are left out.
+    """
     start_time, end_time = graph_data_range["time_range"]
 
     step = graph_data_range["step"]
@@ -271,11 +305,79 @@ def fetch_rrd_data(
         step = max(1, step)
 
     point_range = ":".join(map(str, (start_time, end_time, step)))
-    lql_columns = list(rrd_columns(metrics, graph_recipe.consolidation_function, point_range))
-    query = livestatus_lql([host_name], lql_columns, service_description)
+    cache = _rrd_data_cache()
 
-    with sites.only_sites(site):
-        return list(zip(metrics, sites.live().query_row(query)))
+    columns_by_service = {
+        service: list(zip(metrics, rrd_columns(metrics, rrd_consolidation, point_range)))
+        for service, metrics in ((s, list(m)) for s, m in metrics_by_service.items())
+    }
+
+    services_by_missing_columns: dict[
+        tuple[ColumnName, ...], list[_ServiceKey]
+    ] = collections.defaultdict(list)
+    for service, columns in columns_by_service.items():
+        if missing := tuple(sorted({c for _m, c in columns if (service, c) not in cache})):
+            services_by_missing_columns[missing].append(service)
+
+    for missing, services in services_by_missing_columns.items():
+        _fetch_rrd_columns(services, list(missing), cache)
+
+    return {
+        service: [(metric, cache[(service, column)]) for metric, column in columns]
+        for service, columns in columns_by_service.items()
+        if all((service, column) in cache for _metric, column in columns)
+    }
+
+
+def _fetch_rrd_columns(
+    services: Sequence[_ServiceKey],
+    columns: Sequence[ColumnName],
+    cache: dict[tuple[_ServiceKey, ColumnName], TimeSeriesValues],
+) -> None:
+    """Fetch the same RRD columns of the services, one query per table"""
+    for table, table_services in (
+        ("hosts", {s for s in services if s[2] == "_HOST_"}),
+        ("services", {s for s in services if s[2] != "_HOST_"}),
+    ):
+        if not table_services:
+            continue
+
+        query = _rrd_columns_query(table, sorted(table_services), columns)
+        with sites.only_sites(sorted({site for site, _h, _s in table_services})):
+            with sites.prepend_site():
+                rows = sites.live().query(query)
+
+        for site, host_name, *data in rows:
+            service_description = "_HOST_" if table == "hosts" else data.pop(0)
+            if (service := (site, host_name, service_description)) not in table_services:
+                continue
+            for column, values in zip(columns, data):
+                if values is None:
+                    raise MKGeneralException(_("Cannot retrieve historic data with Nagios core"))
+                cache[(service, column)] = values
+
+
+def _rrd_columns_query(
+    table: Literal["hosts", "services"],
+    services: Sequence[_ServiceKey],
+    columns: Sequence[ColumnName],
+) -> str:
+    if table == "hosts":
+        return f"GET hosts\nColumns: host_name {' '.join(columns)}\n" + lq_logic(
+            "Filter: host_name =", sorted({host_name for _s, host_name, _d in services}), "Or"
+        )
+
+    filters = sorted(
+        {
+            f"Filter: host_name = {livestatus.lqencode(host_name)}\n"
+            f"Filter: service_description = {livestatus.lqencode(service_description)}\n"
+            for _site, host_name, service_description in services
+        }
+    )
+    query = f"GET services\nColumns: host_name service_description {' '.join(columns)}\n"
+    if len(filters) == 1:
+        return query + filters[0]
+    return query + "".join(f"{f}And: 2\n" for f in filters) + f"Or: {len(filters)}\n"
 
 
 def rrd_columns(
@@ -346,11 +448,8 @@ def translate_and_merge_rrd_columns(
     if not relevant_ts:
         return TimeSeries([0, 0, 0])
 
-    _op_title, op_func = time_series_operators()["MERGE"]
-    single_value_series = [op_func_wrapper(op_func, list(tsp)) for tsp in zip(*relevant_ts)]
-
     return TimeSeries(
-        single_value_series,
+        merge_time_series_values(relevant_ts),
         time_window=relevant_ts[0].twindow,
         conversion=_retrieve_unit_conversion_function(target_metric),
     )
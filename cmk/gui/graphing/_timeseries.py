@@ -9,9 +9,12 @@ from collections.abc import Callable, Sequence
 from itertools import chain
 from typing import TypeVar
 
+import numpy as np
+import numpy.typing as npt
+
 import cmk.utils.version as cmk_version
 from cmk.utils.exceptions import MKGeneralException
-from cmk.utils.prediction import TimeSeries, TimeSeriesValues
+from cmk.utils.prediction import TimeSeries, TimeSeriesValues, values_from_array
 
 import cmk.gui.utils.escaping as escaping
 from cmk.gui.i18n import _
@@ -151,14 +154,78 @@ def _time_series_math(
         # Silently return so to get an empty graph slot
         return None
 
-    _op_title, op_func = operators[operator_id]
     twindow = operands_evaluated[0].twindow
+    with np.errstate(all="ignore"):
+        result = _vectorized_operators()[operator_id](_operands_array(operands_evaluated))
+    return TimeSeries(values_from_array(result), twindow)
+
+
+def merge_time_series_values(series: Sequence[TimeSeries]) -> TimeSeriesValues:
+    """The first value of the series which is not None, at every point"""
+    return values_from_array(_operator_merge(_operands_array(series)))
+
 
-    return TimeSeries(
-        [op_func_wrapper(op_func, list(tsp)) for tsp in zip(*operands_evaluated)], twindow
+_Array = npt.NDArray[np.float64]
+
+
+def _operands_array(operands: Sequence[TimeSeries]) -> _Array:
+    """One row per time series, NaN for the missing values, cut to the shortest one"""
+    num_points = min(len(operand) for operand in operands)
+    return np.array([operand.values[:num_points] for operand in operands], dtype=float).reshape(
+        len(operands), num_points
     )
 
 
+# The operators evaluated on all points at once. Like the operators evaluated point by point
+# below, a point is missing if all operands are missing, or if one of them is missing for
+# the operators depending on all of them.
+def _operator_sum(operands: _Array) -> _Array:
+    return np.where(np.isnan(operands).all(axis=0), np.nan, np.nansum(operands, axis=0))
+
+
+def _operator_product(operands: _Array) -> _Array:
+    return np.prod(operands, axis=0)
+
+
+def _operator_difference(operands: _Array) -> _Array:
+    return operands[0] - operands[1]
+
+
+def _operator_fraction(operands: _Array) -> _Array:
+    return np.where(operands[1] == 0, np.nan, operands[0] / operands[1])
+
+
+def _operator_maximum(operands: _Array) -> _Array:
+    return np.fmax.reduce(operands, axis=0)
+
+
+def _operator_minimum(operands: _Array) -> _Array:
+    return np.fmin.reduce(operands, axis=0)
+
+
+def _operator_average(operands: _Array) -> _Array:
+    present = ~np.isnan(operands)
+    return np.where(present, operands, 0.0).sum(axis=0) / present.sum(axis=0)
+
+
+def _operator_merge(operands: _Array) -> _Array:
+    first_present = np.argmax(~np.isnan(operands), axis=0)
+    return operands[first_present, np.arange(operands.shape[1])]
+
+
+def _vectorized_operators() -> dict[Operators, Callable[[_Array], _Array]]:
+    return {
+        "+": _operator_sum,
+        "*": _operator_product,
+        "-": _operator_difference,
+        "/": _operator_fraction,
+        "MAX": _operator_maximum,
+        "MIN": _operator_minimum,
+        "AVERAGE": _operator_average,
+        "MERGE": _operator_merge,
+    }
+
+
 _TOperatorReturn = TypeVar("_TOperatorReturn")
 
 
@@ -229,6 +229,7 @@ def register(
     config_var_registry.register(ConfigVariableEventConsoleStatisticsInterval)
     config_var_registry.register(ConfigVariableEventConsoleLogMessages)
     config_var_registry.register(ConfigVariableEventConsoleRuleOptimizer)
+    config_var_registry.register(ConfigVariableEventConsoleParsingWorkers)
     config_var_registry.register(ConfigVariableEventConsoleActions)
     config_var_registry.register(ConfigVariableEventConsoleArchiveOrphans)
     config_var_registry.register(ConfigVariableHostnameTranslation)
@@ -4040,6 +4041,33 @@ class ConfigVariableEventConsoleRuleOptimizer(ConfigVariable):
         )
 
 
+class ConfigVariableEventConsoleParsingWorkers(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupEventConsoleGeneric
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainEventConsole
+
+    def ident(self) -> str:
+        return "parsing_workers"
+
+    def valuespec(self) -> ValueSpec:
+        return Integer(
+            title=_("Parsing workers"),
+            help=_(
+                "The number of worker processes which parse the incoming syslog messages and "
+                "match them against the rules. The processing of the matching events stays "
+                "within the event daemon, the order of the messages is kept. Use this option "
+                "if the event daemon cannot keep up with a high rate of syslog messages and "
+                "there are unused CPUs. With <tt>0</tt>, the messages are parsed by the event "
+                "daemon itself. The workers are not used while rule debugging is enabled."
+            ),
+            minvalue=0,
+            maxvalue=64,
+            unit=_("processes"),
+        )
+
+
 class ConfigVariableEventConsoleActions(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
         return ConfigVariableGroupEventConsoleGeneric
@@ -597,6 +597,8 @@ class CREConfig:
         }
     )
 
+    bi_compilation_workers: int = 0
+
     # Deprecated. Kept for compatibility.
     bi_compile_log: str | None = None
     bi_precompile_on_demand: bool = False
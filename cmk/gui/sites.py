@@ -13,6 +13,7 @@ from typing_extensions import TypedDict
 
 from livestatus import (
     ConnectedSite,
+    connection_pool,
     LivestatusOutputFormat,
     lqencode,
     MKLivestatusQueryError,
@@ -106,7 +107,9 @@ def cleanup_connections() -> Iterator[None]:
 # TODO: This is not really shutting down or closing connections. It only removes references to
 # sockets and connection classes. This should really be cleaned up (context managers, ...)
 def disconnect() -> None:
-    """Actively closes all Livestatus connections."""
+    """Actively closes all Livestatus connections.
+
+    The persistent connections are handed back to the connection pool of the process."""
     if not g:
         return
     logger.debug("Disconnecing site connections")
@@ -114,6 +117,18 @@ def disconnect() -> None:
         g.live.disconnect()
     g.pop("live", None)
     g.pop("site_status", None)
+    for socketurl, pool_stats in connection_pool.stats().items():
+        logger.debug(
+            "Connection pool %s: %d idle, %d in use, %d connects (avg %.1f ms), "
+            "reuse ratio %.2f, %d discarded",
+            socketurl,
+            pool_stats.idle,
+            pool_stats.in_use,
+            pool_stats.connects,
+            pool_stats.avg_connect_seconds * 1000,
+            pool_stats.reuse_ratio,
+            pool_stats.discarded,
+        )
 
 
 # TODO: This should live somewhere else, it's just a random helper...
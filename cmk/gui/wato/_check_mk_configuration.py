@@ -143,6 +143,7 @@ def register(
     config_variable_registry.register(ConfigVariableStartURL)
     config_variable_registry.register(ConfigVariablePageHeading)
     config_variable_registry.register(ConfigVariableBIDefaultLayout)
+    config_variable_registry.register(ConfigVariableBICompilationWorkers)
     config_variable_registry.register(ConfigVariablePagetitleDateFormat)
     config_variable_registry.register(ConfigVariableEscapePluginOutput)
     config_variable_registry.register(ConfigVariableDrawRuleIcon)
@@ -192,8 +193,14 @@ def register(
     config_variable_registry.register(ConfigVariableRestartLocking)
     config_variable_registry.register(ConfigVariableAgentSimulator)
     config_variable_registry.register(ConfigVariableDelayPrecompile)
+    config_variable_registry.register(ConfigVariableCoreConfigWorkers)
+    config_variable_registry.register(ConfigVariableValueStoreFormat)
+    config_variable_registry.register(ConfigVariableFetcherThreads)
+    config_variable_registry.register(ConfigVariableFetcherDeadline)
+    config_variable_registry.register(ConfigVariablePredictionWorkers)
     config_variable_registry.register(ConfigVariableClusterMaxCachefileAge)
     config_variable_registry.register(ConfigVariablePiggybackMaxCachefileAge)
+    config_variable_registry.register(ConfigVariablePiggybackStorage)
     config_variable_registry.register(ConfigVariableCheckMKPerfdataWithTimes)
     config_variable_registry.register(ConfigVariableUseDNSCache)
     config_variable_registry.register(ConfigVariableChooseSNMPBackend)
@@ -953,6 +960,32 @@ class ConfigVariableBIDefaultLayout(ConfigVariable):
         return [("round", _("Round")), ("straight", _("Straight")), ("elbow", _("Elbow"))]
 
 
+class ConfigVariableBICompilationWorkers(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupUserInterface
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainGUI
+
+    def ident(self) -> str:
+        return "bi_compilation_workers"
+
+    def valuespec(self) -> ValueSpec:
+        return Integer(
+            title=_("BI compilation processes"),
+            help=_(
+                "After a change of the BI configuration or of the monitored hosts, only the "
+                "aggregations affected by the change are compiled again. With more than one "
+                "process, the compilation of these aggregations is distributed to this number "
+                "of processes forked from the GUI process. This speeds up the compilation of "
+                "many aggregations on systems with several CPUs."
+            ),
+            minvalue=0,
+            maxvalue=64,
+            unit=_("processes"),
+        )
+
+
 class ConfigVariablePagetitleDateFormat(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
         return ConfigVariableGroupUserInterface
@@ -2949,6 +2982,139 @@ class ConfigVariableDelayPrecompile(ConfigVariable):
         )
 
 
+class ConfigVariableCoreConfigWorkers(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupCheckExecution
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainCore
+
+    def ident(self) -> str:
+        return "core_config_workers"
+
+    def valuespec(self) -> ValueSpec:
+        return Integer(
+            title=_("Worker processes for the Nagios configuration"),
+            help=_(
+                "The number of processes which create the Nagios configuration of the hosts and "
+                "precompile their host checks when activating the changes. The configuration of "
+                "the hosts is kept between the activations, only the hosts affected by a change "
+                "are created again. With <tt>0</tt>, the configuration of all hosts is created "
+                "one after another by the activating process. This option has no effect with the "
+                "Checkmk Micro Core."
+            ),
+            minvalue=0,
+            maxvalue=64,
+            unit=_("processes"),
+        )
+
+
+class ConfigVariableValueStoreFormat(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupCheckExecution
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainCore
+
+    def ident(self) -> str:
+        return "value_store_format"
+
+    def valuespec(self) -> ValueSpec:
+        return DropdownChoice(
+            title=_("Storage format of counters and other check states"),
+            help=_(
+                "The checks keep counters and other states between two check executions in "
+                "a file per host. In the standard format, all values of a host are read and "
+                "written as text on every check execution. The binary format only appends the "
+                "changed values to the file and is considerably faster for hosts with many "
+                "services. The values are taken over when the format is changed."
+            ),
+            choices=[
+                ("standard", _("Standard")),
+                ("binary", _("Binary")),
+            ],
+        )
+
+
+class ConfigVariableFetcherThreads(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupCheckExecution
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainCore
+
+    def ident(self) -> str:
+        return "fetcher_threads"
+
+    def valuespec(self) -> ValueSpec:
+        return Integer(
+            title=_("Concurrent fetching of the data sources of a host"),
+            help=_(
+                "The number of data sources of a host, e.g. the agent and special agents, which "
+                "are fetched at the same time during a check. The check then takes as long as "
+                "the slowest data source instead of the sum of all of them. SNMP and IPMI "
+                "sources are always fetched one after another. With <tt>1</tt>, all data "
+                "sources are fetched one after another."
+            ),
+            minvalue=1,
+            maxvalue=32,
+            unit=_("sources"),
+        )
+
+
+class ConfigVariableFetcherDeadline(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupCheckExecution
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainCore
+
+    def ident(self) -> str:
+        return "fetcher_deadline"
+
+    def valuespec(self) -> ValueSpec:
+        return Optional(
+            valuespec=Float(
+                minvalue=1.0,
+                unit=_("seconds"),
+                display_format="%.1f",
+            ),
+            title=_("Deadline for fetching the data sources of a host"),
+            help=_(
+                "The check of a host stops waiting for its data sources after this time. The "
+                "data sources which did not deliver their data until then are reported as timed "
+                "out, the results of the other data sources are processed. The data sources are "
+                "fetched in the background for this, also if they are fetched one after another."
+            ),
+            none_label=_("(wait for all data sources)"),
+        )
+
+
+class ConfigVariablePredictionWorkers(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupCheckExecution
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainCore
+
+    def ident(self) -> str:
+        return "prediction_workers"
+
+    def valuespec(self) -> ValueSpec:
+        return Integer(
+            title=_("Concurrent computation of predictive levels"),
+            help=_(
+                "The predictions of the predictive levels are computed hourly in the background, "
+                "ahead of the checks needing them. This is the number of processes computing "
+                "predictions at the same time. The checks use an outdated prediction until it "
+                "has been refreshed."
+            ),
+            minvalue=1,
+            maxvalue=64,
+            unit=_("processes"),
+        )
+
+
 class ConfigVariableClusterMaxCachefileAge(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
         return ConfigVariableGroupCheckExecution
@@ -2994,6 +3160,34 @@ class ConfigVariablePiggybackMaxCachefileAge(ConfigVariable):
         )
 
 
+class ConfigVariablePiggybackStorage(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupCheckExecution
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainCore
+
+    def ident(self) -> str:
+        return "piggyback_storage"
+
+    def valuespec(self) -> ValueSpec:
+        return DropdownChoice(
+            title=_("Storage of piggyback data"),
+            help=_(
+                "By default, the piggyback data of every piggybacked host is stored in a file "
+                "per source host. Sources sending data for thousands of hosts, e.g. vSphere "
+                "servers, then write thousands of files on every check execution. The database "
+                "stores the data of all hosts of a source at once and is considerably faster "
+                "for such sources. The piggyback data is read from both storages, so the "
+                "piggybacked hosts keep their data when the storage is changed."
+            ),
+            choices=[
+                ("files", _("Files")),
+                ("database", _("Database")),
+            ],
+        )
+
+
 class ConfigVariableCheckMKPerfdataWithTimes(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
         return ConfigVariableGroupCheckExecution
@@ -26,14 +26,16 @@ import os
 import re
 import shutil
 import subprocess
+import tempfile
 import time
 import traceback
+import uuid
 from collections.abc import Callable, Iterable, Iterator, Mapping, MutableMapping, Sequence
 from dataclasses import asdict, dataclass
 from itertools import filterfalse
 from multiprocessing.pool import AsyncResult, ThreadPool
 from pathlib import Path
-from typing import Any, NamedTuple
+from typing import Any, BinaryIO, NamedTuple
 
 from setproctitle import setthreadtitle
 from typing_extensions import TypedDict
@@ -134,6 +136,11 @@ ACTIVATION_TIME_RESTART = "restart"
 ACTIVATION_TIME_SYNC = "sync"
 ACTIVATION_TIME_PROFILE_SYNC = "profile-sync"
 
+# The size of the chunks the sync archive is uploaded to the remote sites in and the number of
+# attempts for uploading a chunk
+SYNC_ARCHIVE_CHUNK_SIZE = 4 * 1024 * 1024
+SYNC_ARCHIVE_CHUNK_ATTEMPTS = 3
+
 ACTIVATION_TMP_BASE_DIR = str(cmk.utils.paths.tmp_dir / "wato/activation")
 ACTIVATION_PERISTED_DIR = cmk.utils.paths.var_dir + "/wato/activation"
 
@@ -635,15 +642,31 @@ def _synchronize_files(
     remote_config_generation: int,
     site_config_dir: Path,
 ) -> None:
-    """Pack the files in a simple tar archive and send it to the remote site
+    """Pack the files in a compressed tar archive and send it to the remote site
 
-    We build a simple tar archive containing all files to be synchronized.  The list of file to
-    be deleted and the current config generation is handed over using dedicated HTTP parameters.
+    We build a gzip compressed tar archive containing all files to be synchronized. It is written
+    to a temporary file and uploaded in chunks, so the memory needed does not depend on the size
+    of the archive. The list of file to be deleted and the current config generation is handed
+    over using dedicated HTTP parameters together with the ID of the uploaded archive.
     """
-
-    sync_archive = _get_sync_archive(files_to_sync, site_config_dir)
-
     site = get_site_config(site_id)
+    archive_vars: list[tuple[str, str]] = []
+    files = None
+    with tempfile.TemporaryFile(dir=cmk.utils.paths.tmp_dir) as sync_archive:
+        _write_sync_archive(files_to_sync, site_config_dir, sync_archive)
+        transfer_id = uuid.uuid4().hex
+        try:
+            size = _upload_sync_archive(site_id, transfer_id, sync_archive)
+            archive_vars = [
+                ("sync_archive_transfer", transfer_id),
+                ("sync_archive_size", str(size)),
+            ]
+        except cmk.gui.watolib.automations.MKAutomationException as e:
+            if "Invalid automation command: receive-config-sync-chunk" not in "%s" % e:
+                raise
+            # Remote sites of older versions receive the uncompressed archive at once
+            files = {"sync_archive": io.BytesIO(_get_sync_archive(files_to_sync, site_config_dir))}
+
     response = cmk.gui.watolib.automations.do_remote_automation(
         site,
         "receive-config-sync",
@@ -651,14 +674,61 @@ def _synchronize_files(
             ("site_id", site_id),
             ("to_delete", repr(files_to_delete)),
             ("config_generation", "%d" % remote_config_generation),
+            *archive_vars,
         ],
-        files={"sync_archive": io.BytesIO(sync_archive)},
+        files=files,
     )
 
     if response is not True:
         raise MKGeneralException(_("Failed to synchronize with site: %s") % response)
 
 
+def _upload_sync_archive(site_id: SiteId, transfer_id: str, sync_archive: BinaryIO) -> int:
+    """Upload the archive in chunks to the remote site and return its size
+
+    Every chunk is sent together with its offset and checksum. The remote site answers with the
+    size of the archive it has received so far, a failed chunk is sent again from there.
+    """
+    site = get_site_config(site_id)
+    size = sync_archive.seek(0, os.SEEK_END)
+    offset = 0
+    failed_attempts = 0
+    while offset < size:
+        sync_archive.seek(offset)
+        chunk = sync_archive.read(SYNC_ARCHIVE_CHUNK_SIZE)
+        try:
+            response = cmk.gui.watolib.automations.do_remote_automation(
+                site,
+                "receive-config-sync-chunk",
+                [
+                    ("site_id", site_id),
+                    ("transfer_id", transfer_id),
+                    ("offset", str(offset)),
+                    ("checksum", hashlib.sha256(chunk).hexdigest()),
+                ],
+                files={"chunk": io.BytesIO(chunk)},
+            )
+        except Exception as e:
+            failed_attempts += 1
+            if (
+                failed_attempts >= SYNC_ARCHIVE_CHUNK_ATTEMPTS
+                or "Invalid automation command" in "%s" % e
+            ):
+                raise
+            logger.getChild(f"site[{site_id}]").warning(
+                "Failed to upload the sync archive at offset %d, trying again: %s", offset, e
+            )
+            continue
+
+        if not isinstance(response, int) or response > size:
+            raise MKGeneralException(
+                _("Invalid response to the sync archive upload: %r") % response
+            )
+        offset = response
+        failed_attempts = 0
+    return size
+
+
 @dataclass(frozen=True)
 class SyncState:
     central_file_infos: ConfigSyncFileInfos
@@ -684,7 +754,11 @@ def fetch_sync_state(
         remote_file_infos, remote_config_generation = _get_config_sync_state(
             site_id, replication_paths
         )
-        site_logger.debug("Received %d file infos from remote", len(remote_file_infos))
+        site_logger.debug(
+            "Received %d file infos from remote, fetching the sync state took %.4f",
+            len(remote_file_infos),
+            time.time() - sync_start,
+        )
 
         return (
             SyncState(
@@ -713,7 +787,9 @@ def calc_sync_delta(
     try:
         _set_sync_state(site_activation_state, _("Computing differences"))
 
+        start = time.time()
         sync_delta = get_file_names_to_sync(site_id, site_logger, sync_state, file_filter_func)
+        site_logger.debug("Computing the differences took %.4f", time.time() - start)
 
         site_logger.debug("New files to be synchronized: %r", sync_delta.to_sync_new)
         site_logger.debug("Changed files to be synchronized: %r", sync_delta.to_sync_changed)
@@ -755,6 +831,7 @@ def synchronize_files(
                 len(sync_delta.to_delete),
             ),
         )
+        start = time.time()
         _synchronize_files(
             site_id,
             sync_delta.to_sync_new + sync_delta.to_sync_changed,
@@ -762,6 +839,7 @@ def synchronize_files(
             remote_config_generation,
             site_config_dir,
         )
+        site_logger.debug("Transferring the files took %.4f", time.time() - start)
         site_logger.debug("Finished config sync")
         return site_activation_state
     except Exception as e:
@@ -913,6 +991,7 @@ def activate_remote_changes(
     site_logger = logger.getChild(f"site[{site_id}]")
 
     try:
+        start = time.time()
         _set_result(site_activation_state, PHASE_FINISHING, _("Finalizing"))
         site_changes_activate_until = activate_changes.get_changes_to_activate(site_id)
 
@@ -927,6 +1006,7 @@ def activate_remote_changes(
             _confirm_activated_changes(site_id, site_changes_activate_until)
 
         _set_done_result(configuration_warnings, site_activation_state)
+        site_logger.debug("Activating the changes took %.4f", time.time() - start)
         return site_activation_state
     except Exception as e:
         _handle_activation_changes_exception(site_logger, str(e), site_activation_state)
@@ -2014,6 +2094,7 @@ class ReplicationPathType(enum.StrEnum):
 
 def _get_config_sync_file_infos_per_inode(
     replication_paths: Sequence[ReplicationPath],
+    hash_cache: ConfigSyncHashCache | None = None,
 ) -> Mapping[int, ConfigSyncFileInfo]:
     inode_sync_states = {}
 
@@ -2025,11 +2106,11 @@ def _get_config_sync_file_infos_per_inode(
 
         if replication_path.ty == ReplicationPathType.FILE:
             inode_sync_states[os.stat(replication_path_full).st_ino] = _get_config_sync_file_info(
-                replication_path_full
+                replication_path_full, hash_cache
             )
         elif replication_path.ty == ReplicationPathType.DIR:
             _get_replication_dir_config_sync_file_infos_per_inode(
-                inode_sync_states, replication_path_full, replication_path.excludes
+                inode_sync_states, replication_path_full, replication_path.excludes, hash_cache
             )
         else:
             raise NotImplementedError()
@@ -2041,6 +2122,7 @@ def _get_replication_dir_config_sync_file_infos_per_inode(
     inode_sync_states: MutableMapping[int, ConfigSyncFileInfo],
     replication_path: str,
     replication_path_excludes: Sequence[str],
+    hash_cache: ConfigSyncHashCache | None = None,
 ) -> None:
     # Use os functionality instead of pathlib since it is faster
     for root, dir_names, file_names in os.walk(replication_path):
@@ -2055,12 +2137,16 @@ def _get_replication_dir_config_sync_file_infos_per_inode(
                 and os.path.islink(dir_path)
                 and not dir_name == GENERAL_DIR_EXCLUDE
             ):
-                inode_sync_states[os.stat(dir_path).st_ino] = _get_config_sync_file_info(dir_path)
+                inode_sync_states[os.stat(dir_path).st_ino] = _get_config_sync_file_info(
+                    dir_path, hash_cache
+                )
 
         for file_name in file_names:
             file_path = os.path.join(root, file_name)
             if os.path.exists(file_path):
-                inode_sync_states[os.stat(file_path).st_ino] = _get_config_sync_file_info(file_path)
+                inode_sync_states[os.stat(file_path).st_ino] = _get_config_sync_file_info(
+                    file_path, hash_cache
+                )
 
 
 def _prepare_for_activation_tasks(
@@ -2069,8 +2155,10 @@ def _prepare_for_activation_tasks(
     site_snapshot_settings: Mapping[SiteId, SnapshotSettings],
     time_started: float,
 ) -> tuple[Mapping[SiteId, ConfigSyncFileInfos], Mapping[SiteId, SiteActivationState]]:
+    start = time.time()
+    hash_cache = ConfigSyncHashCache.load()
     config_sync_file_infos_per_inode = _get_config_sync_file_infos_per_inode(
-        get_replication_paths()
+        get_replication_paths(), hash_cache
     )
     central_file_infos_per_site = {}
     site_activation_states_per_site = {}
@@ -2088,13 +2176,15 @@ def _prepare_for_activation_tasks(
 
             if activate_changes.is_sync_needed(site_id):
                 central_file_infos_per_site[site_id] = _get_site_central_file_infos(
-                    site_id, snapshot_settings, config_sync_file_infos_per_inode
+                    site_id, snapshot_settings, config_sync_file_infos_per_inode, hash_cache
                 )
         except Exception as e:
             _handle_activation_changes_exception(
                 logger.getChild(f"site[{site_id}]"), str(e), site_activation_state
             )
             _cleanup_activation(site_id, activation_id)
+    hash_cache.save()
+    logger.debug("Computing the central file infos took %.4f (%s)", time.time() - start, hash_cache)
     return central_file_infos_per_site, site_activation_states_per_site
 
 
@@ -2102,6 +2192,7 @@ def _get_site_central_file_infos(
     site_id: SiteId,
     snapshot_settings: SnapshotSettings,
     config_sync_file_infos_per_inode: Mapping[int, ConfigSyncFileInfo],
+    hash_cache: ConfigSyncHashCache | None = None,
 ) -> ConfigSyncFileInfos:
     # In case we experience performance issues here, we could postpone the hashing of the
     # central files to only be done ad-hoc in get_file_names_to_sync when the other attributes
@@ -2112,6 +2203,7 @@ def _get_site_central_file_infos(
         snapshot_settings.snapshot_components,
         site_config_dir,
         config_sync_file_infos_per_inode,
+        hash_cache,
     )
 
     logger.getChild(f"site[{site_id}]").debug(
@@ -2757,8 +2849,7 @@ def _get_sync_archive(to_sync: list[str], base_dir: Path) -> bytes:
         check=False,
     )
 
-    # Since we don't stream the archive to the remote site (we could probably do this) it should be
-    # no problem to buffer it in memory for the moment
+    # Only used for remote sites of older versions, which receive the archive at once
 
     if completed_process.returncode:
         raise MKGeneralException(
@@ -2769,20 +2860,52 @@ def _get_sync_archive(to_sync: list[str], base_dir: Path) -> bytes:
     return completed_process.stdout
 
 
-def _unpack_sync_archive(sync_archive: bytes, base_dir: Path) -> None:
+def _write_sync_archive(to_sync: list[str], base_dir: Path, sync_archive: BinaryIO) -> None:
+    """Write the gzip compressed archive of the files to the given file"""
+    # Use native tar instead of python tarfile for performance reasons
     completed_process = subprocess.run(
         [
             "tar",
-            "-x",
+            "-c",
+            "-z",
             "-C",
             str(base_dir),
             "-f",
             "-",
+            "--null",
+            "-T",
+            "-",
+            "--preserve-permissions",
+        ],
+        input=b"\0".join(f.encode() for f in to_sync),
+        stdout=sync_archive,
+        stderr=subprocess.PIPE,
+        close_fds=True,
+        shell=False,
+        check=False,
+    )
+
+    if completed_process.returncode:
+        raise MKGeneralException(
+            _("Failed to create sync archive [%d]: %s")
+            % (completed_process.returncode, completed_process.stderr.decode())
+        )
+
+
+def _unpack_sync_archive(sync_archive: bytes | Path, base_dir: Path) -> None:
+    """Unpack the archive, either an uncompressed one or a file uploaded in chunks"""
+    completed_process = subprocess.run(
+        [
+            "tar",
+            "-x",
+            "-C",
+            str(base_dir),
+            *(["-z", "-f", str(sync_archive)] if isinstance(sync_archive, Path) else ["-f", "-"]),
             "-U",
             "--recursive-unlink",
             "--preserve-permissions",
         ],
-        input=sync_archive,
+        input=None if isinstance(sync_archive, Path) else sync_archive,
         capture_output=True,
         close_fds=True,
         shell=False,
@@ -2842,7 +2965,13 @@ class AutomationGetConfigSyncState(AutomationCommand):
 
     def execute(self, api_request: list[ReplicationPath]) -> GetConfigSyncStateResponse:
         with store.lock_checkmk_configuration():
-            file_infos = _get_config_sync_file_infos(api_request, base_dir=cmk.utils.paths.omd_root)
+            start = time.time()
+            hash_cache = ConfigSyncHashCache.load()
+            file_infos = _get_config_sync_file_infos(
+                api_request, base_dir=cmk.utils.paths.omd_root, hash_cache=hash_cache
+            )
+            hash_cache.save()
+            logger.debug("Computing the file infos took %.4f (%s)", time.time() - start, hash_cache)
             transport_file_infos = {
                 k: (v.st_mode, v.st_size, v.link_target, v.file_hash) for k, v in file_infos.items()
             }
@@ -2882,13 +3011,15 @@ def _get_config_sync_file_infos(
     replication_paths: list[ReplicationPath],
     base_dir: Path,
     config_sync_file_infos_per_inode: Mapping[int, ConfigSyncFileInfo] | None = None,
+    hash_cache: ConfigSyncHashCache | None = None,
 ) -> ConfigSyncFileInfos:
     """Scans the given replication paths for the information needed for the config sync
 
     It produces a dictionary of sync file infos. One entry is created for each file.  Directories
     are not added to the dictionary unless it is a symlink.
     Since files to be synced for different site are copied as hardlink, the sync file infos can be
-    precomputed and the relevant info then identified via the files inode
+    precomputed and the relevant info then identified via the files inode. The hashes of the files
+    are taken from the hash cache, if given, as long as the files are unchanged.
     """
     if config_sync_file_infos_per_inode is None:
         config_sync_file_infos_per_inode = {}
@@ -2901,7 +3032,9 @@ def _get_config_sync_file_infos(
             continue  # Only report back existing things
 
         if replication_path.ty == ReplicationPathType.FILE:
-            infos[replication_path.site_path] = _get_config_sync_file_info(replication_path_full)
+            infos[replication_path.site_path] = _get_config_sync_file_info(
+                replication_path_full, hash_cache
+            )
 
         elif replication_path.ty == ReplicationPathType.DIR:
             _get_replication_dir_config_sync_file_infos(
@@ -2910,6 +3043,7 @@ def _get_config_sync_file_infos(
                 base_dir,
                 replication_path_full,
                 replication_path.excludes,
+                hash_cache,
             )
         else:
             raise NotImplementedError()
@@ -2922,6 +3056,7 @@ def _get_replication_dir_config_sync_file_infos(
     base_dir: Path,
     replication_path: str,
     replication_path_excludes: Sequence[str],
+    hash_cache: ConfigSyncHashCache | None = None,
 ) -> None:
     # Use os functionality instead of pathlib since it is faster
     for root, dir_names, file_names in os.walk(replication_path):
@@ -2941,19 +3076,29 @@ def _get_replication_dir_config_sync_file_infos(
                 ):
                     infos[valid_site_path] = sync_file_info
                 else:
-                    infos[valid_site_path] = _get_config_sync_file_info(config_sync_path)
+                    infos[valid_site_path] = _get_config_sync_file_info(
+                        config_sync_path, hash_cache
+                    )
             except FileNotFoundError:  # e.g. broken symlinks
-                infos[valid_site_path] = _get_config_sync_file_info(config_sync_path)
+                infos[valid_site_path] = _get_config_sync_file_info(config_sync_path, hash_cache)
 
 
-def _get_config_sync_file_info(file_path: str) -> ConfigSyncFileInfo:
+def _get_config_sync_file_info(
+    file_path: str, hash_cache: ConfigSyncHashCache | None = None
+) -> ConfigSyncFileInfo:
     stat = os.lstat(file_path)
     is_symlink = os.path.islink(file_path)
+    if is_symlink:
+        file_hash = None
+    elif hash_cache is None:
+        file_hash = _create_config_sync_file_hash(file_path)
+    else:
+        file_hash = hash_cache.file_hash(file_path, stat)
     return ConfigSyncFileInfo(
         stat.st_mode,
         stat.st_size,
         os.readlink(str(file_path)) if is_symlink else None,
-        _create_config_sync_file_hash(file_path) if not is_symlink else None,
+        file_hash,
     )
 
 
@@ -2968,6 +3113,75 @@ def _create_config_sync_file_hash(file_path: str) -> str:
     return sha256.hexdigest()
 
 
+# Files changed less than this ago are not cached: a change within the resolution of the
+# file system timestamps after hashing them would go unnoticed (nanoseconds)
+_HASH_CACHE_MIN_AGE = 2 * 10**9
+
+
+class ConfigSyncHashCache:
+    """Persistent cache of the hashes of the files to be synchronized
+
+    Hashing all files below the replication paths dominates the computation of the differences
+    in large setups, while only a few files change between two activations. The hash of a file
+    is reused as long as its inode, size, modification and change time are unchanged. Every
+    write to a file updates its change time, which can not be set by a user.
+    """
+
+    def __init__(self, path: Path, entries: dict[str, tuple[int, int, int, int, str]]) -> None:
+        self._path = path
+        # file path -> (inode, size, mtime, ctime, hash)
+        self._entries = entries
+        self._looked_up: dict[str, tuple[int, int, int, int, str] | None] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self) -> str:
+        return f"{self.hits} cached hashes, {self.misses} files hashed"
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> ConfigSyncHashCache:
+        path = _config_sync_hash_cache_path() if path is None else path
+        try:
+            entries = store.load_object_from_pickle_file(path, default={})
+        except Exception:
+            logger.exception("error loading the config sync hash cache, starting with a new one")
+            entries = {}
+        return cls(path, entries)
+
+    def file_hash(self, file_path: str, stat: os.stat_result) -> str:
+        key = (stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+        if (entry := self._entries.get(file_path)) is not None and entry[:4] == key:
+            self.hits += 1
+            self._looked_up[file_path] = entry
+            return entry[4]
+
+        self.misses += 1
+        file_hash = _create_config_sync_file_hash(file_path)
+        self._looked_up[file_path] = (
+            (*key, file_hash) if time.time_ns() - stat.st_ctime_ns > _HASH_CACHE_MIN_AGE else None
+        )
+        return file_hash
+
+    def save(self) -> None:
+        """Save the looked up entries and the other ones of still existing files"""
+        entries = {
+            file_path: entry
+            for file_path, entry in self._entries.items()
+            if file_path not in self._looked_up and os.path.exists(file_path)
+        }
+        entries.update(
+            (file_path, entry) for file_path, entry in self._looked_up.items() if entry is not None
+        )
+        store.makedirs(self._path.parent)
+        store.save_object_to_pickle_file(self._path, entries)
+        self._entries = entries
+        self._looked_up = {}
+
+
+def _config_sync_hash_cache_path() -> Path:
+    return wato_var_dir() / "config_sync_hashes.pkl"
+
+
 def update_config_generation() -> None:
     """Increase the config generation ID
 
@@ -2990,11 +3204,91 @@ def _config_generation_path() -> Path:
 
 class ReceiveConfigSyncRequest(NamedTuple):
     site_id: SiteId
-    sync_archive: bytes
+    # The uncompressed archive or the compressed one uploaded in chunks before
+    sync_archive: bytes | Path
     to_delete: list[str]
     config_generation: int
 
 
+class ReceiveConfigSyncChunkRequest(NamedTuple):
+    site_id: SiteId
+    transfer_id: str
+    offset: int
+    checksum: str
+    chunk: bytes
+
+
+# Uploaded sync archives are removed after this time in case the activation did not finish
+_SYNC_ARCHIVE_MAX_AGE = 86400
+
+
+def _sync_archive_upload_dir() -> Path:
+    return cmk.utils.paths.tmp_dir / "wato/sync_archives"
+
+
+def _sync_archive_upload_path(transfer_id: str) -> Path:
+    if not re.fullmatch("[0-9a-f]{32}", transfer_id):
+        raise MKGeneralException(_("Invalid sync archive transfer ID: %s") % transfer_id)
+    return _sync_archive_upload_dir() / transfer_id
+
+
+@automation_command_registry.register
+class AutomationReceiveConfigSyncChunk(AutomationCommand):
+    """Called on remote site from a central site to upload a chunk of the sync archive
+
+    The chunk is written at the given offset of the uploaded archive, everything after the offset
+    is replaced. The response is the size of the uploaded archive, the central site continues
+    the upload from there.
+    """
+
+    def command_name(self) -> str:
+        return "receive-config-sync-chunk"
+
+    def get_request(self) -> ReceiveConfigSyncChunkRequest:
+        site_id = SiteId(_request.get_ascii_input_mandatory("site_id"))
+        verify_remote_site_config(site_id)
+
+        return ReceiveConfigSyncChunkRequest(
+            site_id,
+            _request.get_ascii_input_mandatory("transfer_id"),
+            _request.get_integer_input_mandatory("offset"),
+            _request.get_ascii_input_mandatory("checksum"),
+            _request.uploaded_file("chunk")[2],
+        )
+
+    def execute(self, api_request: ReceiveConfigSyncChunkRequest) -> int:
+        path = _sync_archive_upload_path(api_request.transfer_id)
+        if api_request.offset == 0:
+            _cleanup_sync_archive_uploads()
+        size = path.stat().st_size if path.exists() else 0
+        if api_request.offset > size:
+            return size
+
+        if hashlib.sha256(api_request.chunk).hexdigest() != api_request.checksum:
+            raise MKGeneralException(
+                _("The checksum of the sync archive chunk at offset %d does not match")
+                % api_request.offset
+            )
+
+        store.makedirs(path.parent)
+        with path.open("r+b" if path.exists() else "wb") as f:
+            f.truncate(api_request.offset)
+            f.seek(api_request.offset)
+            f.write(api_request.chunk)
+        return api_request.offset + len(api_request.chunk)
+
+
+def _cleanup_sync_archive_uploads() -> None:
+    if not (upload_dir := _sync_archive_upload_dir()).exists():
+        return
+    for path in upload_dir.iterdir():
+        try:
+            if time.time() - path.stat().st_mtime > _SYNC_ARCHIVE_MAX_AGE:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+
 @automation_command_registry.register
 class AutomationReceiveConfigSync(AutomationCommand):
     """Called on remote site from a central site to update the Checkmk configuration
@@ -3002,6 +3296,9 @@ class AutomationReceiveConfigSync(AutomationCommand):
     The central site hands over a tar archive with the files to be written and a list of
     files to be deleted. The configuration generation is used to validate that no modification has
     been made between the two sync steps (get-config-sync-state and this autmoation).
+
+    The archive is either uploaded before with receive-config-sync-chunk or, by central sites of
+    older versions, sent with this request.
     """
 
     def command_name(self) -> str:
@@ -3011,14 +3308,30 @@ class AutomationReceiveConfigSync(AutomationCommand):
         site_id = SiteId(_request.get_ascii_input_mandatory("site_id"))
         verify_remote_site_config(site_id)
 
+        sync_archive: bytes | Path
+        if transfer_id := _request.get_ascii_input("sync_archive_transfer"):
+            sync_archive = _sync_archive_upload_path(transfer_id)
+            size = sync_archive.stat().st_size if sync_archive.exists() else 0
+            if size != _request.get_integer_input_mandatory("sync_archive_size"):
+                raise MKGeneralException(_("The sync archive has not been uploaded completely"))
+        else:
+            sync_archive = _request.uploaded_file("sync_archive")[2]
+
         return ReceiveConfigSyncRequest(
             site_id,
-            _request.uploaded_file("sync_archive")[2],
+            sync_archive,
             ast.literal_eval(_request.get_str_input_mandatory("to_delete")),
             _request.get_integer_input_mandatory("config_generation"),
         )
 
     def execute(self, api_request: ReceiveConfigSyncRequest) -> bool:
+        try:
+            return self._execute(api_request)
+        finally:
+            if isinstance(api_request.sync_archive, Path):
+                api_request.sync_archive.unlink(missing_ok=True)
+
+    def _execute(self, api_request: ReceiveConfigSyncRequest) -> bool:
         with store.lock_checkmk_configuration():
             if api_request.config_generation != _get_current_config_generation():
                 raise MKGeneralException(
@@ -3038,7 +3351,9 @@ class AutomationReceiveConfigSync(AutomationCommand):
             logger.debug("Done")
             return True
 
-    def _update_config_on_remote_site(self, sync_archive: bytes, to_delete: list[str]) -> None:
+    def _update_config_on_remote_site(
+        self, sync_archive: bytes | Path, to_delete: list[str]
+    ) -> None:
         """Use the given tar archive and list of files to be deleted to update the local files"""
         base_dir = cmk.utils.paths.omd_root
 
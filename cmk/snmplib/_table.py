@@ -56,6 +56,19 @@ def get_snmp_table(
     max_len = 0
     max_len_col = -1
 
+    # Fetch all columns at once, the backend may be able to walk them together
+    rowinfos = _get_snmpwalks(
+        section_name,
+        tree.base,
+        [
+            (f"{tree.base}.{oid.column}", oid.save_to_cache)
+            for oid in tree.oids
+            if not isinstance(oid.column, SpecialColumn)
+        ],
+        walk_cache=walk_cache,
+        backend=backend,
+    )
+
     for oid in tree.oids:
         fetchoid: OID = f"{tree.base}.{oid.column}"
         # column may be integer or string like "1.5.4.2.3"
@@ -76,14 +89,7 @@ def get_snmp_table(
             index_column = len(columns)
             index_format = oid.column
         else:
-            rowinfo = _get_snmpwalk(
-                section_name,
-                tree.base,
-                fetchoid,
-                walk_cache=walk_cache,
-                save_walk_cache=oid.save_to_cache,
-                backend=backend,
-            )
+            rowinfo = rowinfos[fetchoid]
             if len(rowinfo) > max_len:
                 max_len_col = len(columns)
 
@@ -154,72 +160,77 @@ def _oid_to_intlist(oid: OID) -> list[int]:
     return list(map(int, oid.split("."))) if oid else []
 
 
-def _cmp_oids(o1: OID, o2: OID) -> int:
-    return (_oid_to_intlist(o1) > _oid_to_intlist(o2)) - (_oid_to_intlist(o1) < _oid_to_intlist(o2))
-
-
 def _key_oids(o1: OID) -> list[int]:
     return _oid_to_intlist(o1)
 
 
-def _key_oid_pairs(pair1: tuple[OID, SNMPRawValue]) -> list[int]:
-    return _oid_to_intlist(pair1[0].lstrip("."))
-
-
-def _get_snmpwalk(
+def _get_snmpwalks(
     section_name: SectionName | None,
     base: str,
-    fetchoid: OID,
+    fetchoids: Sequence[tuple[OID, bool]],
     *,
     walk_cache: MutableMapping[str, tuple[bool, SNMPRowInfo]],
-    save_walk_cache: bool,
     backend: SNMPBackend,
-) -> SNMPRowInfo:
-    with contextlib.suppress(KeyError):
-        cache_info = walk_cache[fetchoid][1]
-        console.vverbose(f"Already fetched OID: {fetchoid}\n")
-        return cache_info
-    info = _perform_snmpwalk(section_name, base, fetchoid, backend=backend)
-    walk_cache[fetchoid] = (save_walk_cache, info)
-    return info
-
-
-def _perform_snmpwalk(
+) -> dict[OID, SNMPRowInfo]:
+    """Returns the rows of the OIDs, fetchoids are pairs of OID and whether to save the walk"""
+    rowinfos: dict[OID, SNMPRowInfo] = {}
+    save_walk_cache: dict[OID, bool] = {}
+    for fetchoid, save in fetchoids:
+        with contextlib.suppress(KeyError):
+            rowinfos[fetchoid] = walk_cache[fetchoid][1]
+            console.vverbose(f"Already fetched OID: {fetchoid}\n")
+            continue
+        save_walk_cache.setdefault(fetchoid, save)
+
+    if not save_walk_cache:
+        return rowinfos
+
+    for fetchoid, info in zip(
+        save_walk_cache,
+        _perform_snmpwalks(section_name, base, list(save_walk_cache), backend=backend),
+    ):
+        walk_cache[fetchoid] = (save_walk_cache[fetchoid], info)
+        rowinfos[fetchoid] = info
+    return rowinfos
+
+
+def _perform_snmpwalks(
     section_name: SectionName | None,
     base_oid: str,
-    fetchoid: OID,
+    fetchoids: Sequence[OID],
     *,
     backend: SNMPBackend,
-) -> SNMPRowInfo:
-    added_oids: set[OID] = set()
-    rowinfo: SNMPRowInfo = []
+) -> Sequence[SNMPRowInfo]:
+    added_oids: list[set[OID]] = [set() for _oid in fetchoids]
+    rowinfos: list[SNMPRowInfo] = [[] for _oid in fetchoids]
 
     for context_name in backend.config.snmpv3_contexts_of(section_name):
-        rows = backend.walk(
-            oid=fetchoid,
+        columns = backend.walk_columns(
+            oids=fetchoids,
             section_name=section_name,
             table_base_oid=base_oid,
             context_name=context_name,
         )
 
-        # I've seen a broken device (Mikrotik Router), that broke after an
-        # update to RouterOS v6.22. It would return 9 time the same OID when
-        # .1.3.6.1.2.1.1.1.0 was being walked. We try to detect these situations
-        # by removing any duplicate OID information
-        if len(rows) > 1 and rows[0][0] == rows[1][0]:
-            console.vverbose(
-                "Detected broken SNMP agent. Ignoring duplicate OID %s.\n" % rows[0][0]
-            )
-            rows = rows[:1]
+        for rows, rowinfo, added in zip(columns, rowinfos, added_oids):
+            # I've seen a broken device (Mikrotik Router), that broke after an
+            # update to RouterOS v6.22. It would return 9 time the same OID when
+            # .1.3.6.1.2.1.1.1.0 was being walked. We try to detect these situations
+            # by removing any duplicate OID information
+            if len(rows) > 1 and rows[0][0] == rows[1][0]:
+                console.vverbose(
+                    "Detected broken SNMP agent. Ignoring duplicate OID %s.\n" % rows[0][0]
+                )
+                rows = rows[:1]
 
-        for row_oid, val in rows:
-            if row_oid in added_oids:
-                console.vverbose(f"Duplicate OID found: {row_oid} ({val!r})\n")
-            else:
-                rowinfo.append((row_oid, val))
-                added_oids.add(row_oid)
+            for row_oid, val in rows:
+                if row_oid in added:
+                    console.vverbose(f"Duplicate OID found: {row_oid} ({val!r})\n")
+                else:
+                    rowinfo.append((row_oid, val))
+                    added.add(row_oid)
 
-    return rowinfo
+    return rowinfos
 
 
 def _sanitize_snmp_encoding(
@@ -248,59 +259,33 @@ def _decode_column(
 
 def _sanitize_snmp_table_columns(columns: _ResultColumnsUnsanitized) -> _ResultColumnsSanitized:
     # First compute the complete list of end-oids appearing in the output
-    # by looping all results and putting the endoids to a flat list
-    endoids: list[OID] = []
-    for fetchoid, row_info, value_encoding in columns:
+    # by looping all results and putting the endoids to a flat list. The
+    # dict is used as an ordered set here.
+    values_by_endoid: list[dict[OID, SNMPRawValue]] = []
+    all_endoids: dict[OID, None] = {}
+    for fetchoid, row_info, _value_encoding in columns:
+        column_values: dict[OID, SNMPRawValue] = {}
         for o, value in row_info:
-            endoid = _extract_end_oid(fetchoid, o)
-            if endoid not in endoids:
-                endoids.append(endoid)
+            column_values.setdefault(_extract_end_oid(fetchoid, o), value)
+        values_by_endoid.append(column_values)
+        all_endoids.update(dict.fromkeys(column_values))
+    endoids = list(all_endoids)
 
     # The list needs to be sorted to prevent problems when the first
     # column has missing values in the middle of the tree.
     if not _are_ascending_oids(endoids):
         endoids.sort(key=_key_oids)
-        need_sort = True
-    else:
-        need_sort = False
 
     # Now fill gaps in columns where some endois are missing
-    new_columns: _ResultColumnsSanitized = []
-    for fetchoid, row_info, value_encoding in columns:
-        # It might happen that end OIDs are not ordered. Fix the OID sorting to make
-        # it comparable to the already sorted endoids list. Otherwise we would get
-        # some mixups when filling gaps
-        if need_sort:
-            row_info.sort(key=_key_oid_pairs)
-
-        i = 0
-        new_column = []
-        # Loop all lines to fill holes in the middle of the list. All
-        # columns check the following lines for the correct endoid. If
-        # an endoid differs empty values are added until the hole is filled
-        for o, value in row_info:
-            eo = _extract_end_oid(fetchoid, o)
-            if len(row_info) != len(endoids):
-                while i < len(endoids) and endoids[i] != eo:
-                    new_column.append(b"")  # (beginoid + '.' +endoids[i], "" ) )
-                    i += 1
-            new_column.append(value)
-            i += 1
-
-        # At the end check if trailing OIDs are missing
-        while i < len(endoids):
-            new_column.append(b"")  # (beginoid + '.' +endoids[i], "") )
-            i += 1
-        new_columns.append((new_column, value_encoding))
-
-    return new_columns
+    return [
+        ([column_values.get(endoid, b"") for endoid in endoids], value_encoding)
+        for (_fetchoid, _row_info, value_encoding), column_values in zip(columns, values_by_endoid)
+    ]
 
 
 def _are_ascending_oids(oid_list: list[OID]) -> bool:
-    for a in range(len(oid_list) - 1):
-        if _cmp_oids(oid_list[a], oid_list[a + 1]) > 0:  # == 0 should never happen
-            return False
-    return True
+    keys = [_key_oids(oid) for oid in oid_list]
+    return all(a <= b for a, b in zip(keys, keys[1:]))  # == should never happen
 
 
 def _construct_snmp_table_of_rows(columns: _ResultColumnsDecoded) -> Sequence[SNMPTable]:
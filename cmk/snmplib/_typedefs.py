@@ -157,6 +157,29 @@ class SNMPBackend(abc.ABC):
     ) -> SNMPRowInfo:
         return []
 
+    def walk_columns(
+        self,
+        oids: Sequence[OID],
+        section_name: SectionName | None = None,
+        table_base_oid: OID | None = None,
+        context_name: SNMPContextName | None = None,
+    ) -> Sequence[SNMPRowInfo]:
+        """Walk several columns of the same table, returns the rows of every column
+
+        Backends able to fetch the columns in a single walk session (interleaved
+        GETBULK requests on all column OIDs) should override this. The default
+        implementation walks one column after the other.
+        """
+        return [
+            self.walk(
+                oid,
+                section_name=section_name,
+                table_base_oid=table_base_oid,
+                context_name=context_name,
+            )
+            for oid in oids
+        ]
+
 
 class SpecialColumn(enum.IntEnum):
     # Until we remove all but the first, its worth having an enum
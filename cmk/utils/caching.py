@@ -7,14 +7,24 @@
 from __future__ import annotations
 
 import collections
-from collections.abc import Callable
+import logging
+import sys
+import time
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
 from functools import lru_cache, wraps
-from typing import ParamSpec, TypeVar
+from typing import Final, Generic, overload, ParamSpec, TypeVar
 
 import cmk.utils.misc
+import cmk.utils.render as render
 
 P = ParamSpec("P")
 R = TypeVar("R")
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+D = TypeVar("D")
+
+_NO_DEFAULT: Final = object()
 
 
 # Used as decorator wrapper for functools.lru_cache in order to bind the cache to an instance method
@@ -41,26 +51,101 @@ def instance_method_lru_cache(
     return wrap
 
 
+@dataclass(frozen=True)
+class CacheStats:
+    """Usage of a cache since its creation
+
+    The hit, miss and eviction counters are only maintained by the bounded
+    caches, the plain dict caches are not instrumented (None).
+    """
+
+    entries: int
+    approx_bytes: int
+    hits: int | None = None
+    misses: int | None = None
+    evictions: int | None = None
+
+    @property
+    def hit_ratio(self) -> float | None:
+        if self.hits is None or self.misses is None or not self.hits + self.misses:
+            return None
+        return self.hits / (self.hits + self.misses)
+
+
 class CacheManager:
     def __init__(self) -> None:
         self._caches: dict[str, DictCache] = collections.defaultdict(DictCache)
+        self._bounded_caches: dict[str, BoundedCache] = {}
 
     def __contains__(self, name: str) -> bool:
-        return name in self._caches
+        return name in self._caches or name in self._bounded_caches
 
     def obtain_cache(self, name: str) -> DictCache:
         """get or create cache with provided name"""
+        if name in self._bounded_caches:
+            raise ValueError(f"Cache {name!r} is a bounded cache")
         return self._caches[name]
 
+    def obtain_bounded_cache(
+        self,
+        name: str,
+        *,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        ttl: float | None = None,
+    ) -> BoundedCache:
+        """get or create bounded cache with provided name
+
+        The limits are only applied when the cache is created.
+        """
+        try:
+            return self._bounded_caches[name]
+        except KeyError:
+            if name in self._caches:
+                raise ValueError(f"Cache {name!r} is not a bounded cache")
+            return self._bounded_caches.setdefault(
+                name, BoundedCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+            )
+
     def clear(self) -> None:
         self._caches.clear()
+        self._bounded_caches.clear()
 
     def clear_all(self) -> None:
         for cache in self._caches.values():
             cache.clear()
+        for bounded_cache in self._bounded_caches.values():
+            bounded_cache.clear()
 
     def dump_sizes(self) -> dict[str, int]:
-        return {name: cmk.utils.misc.total_size(cache) for name, cache in self._caches.items()}
+        return {
+            **{name: cmk.utils.misc.total_size(cache) for name, cache in self._caches.items()},
+            **{name: cache.approx_bytes for name, cache in self._bounded_caches.items()},
+        }
+
+    def dump_stats(self) -> dict[str, CacheStats]:
+        return {
+            **{
+                name: CacheStats(entries=len(cache), approx_bytes=cmk.utils.misc.total_size(cache))
+                for name, cache in self._caches.items()
+            },
+            **{name: cache.stats() for name, cache in self._bounded_caches.items()},
+        }
+
+    def log_stats(self, logger: logging.Logger, level: int = logging.INFO) -> None:
+        for name, stats in sorted(
+            self.dump_stats().items(), key=lambda x: x[1].approx_bytes, reverse=True
+        ):
+            logger.log(
+                level,
+                "%10s %8d entries, hits: %s, misses: %s, evictions: %s %s",
+                render.fmt_bytes(stats.approx_bytes),
+                stats.entries,
+                "-" if stats.hits is None else stats.hits,
+                "-" if stats.misses is None else stats.misses,
+                "-" if stats.evictions is None else stats.evictions,
+                name,
+            )
 
 
 class DictCache(dict):
@@ -87,6 +172,141 @@ class DictCache(dict):
         self.set_not_populated()
 
 
+class BoundedCache(Generic[K, V]):
+    """A size limited cache with least recently used eviction
+
+    Offers the subset of the dict interface used with the DictCache. The cache
+    is limited by the number of entries and by the approximate size of the
+    entries, which is the shallow size of key and value (the sizes of nested
+    objects are not taken into account to keep the accounting cheap). Entries
+    older than ttl seconds are treated as missing.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        ttl: float | None = None,
+    ) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        # key -> (value, approximate size, time of insertion)
+        self._data: collections.OrderedDict[K, tuple[V, int, float]] = collections.OrderedDict()
+        self._populated = False
+        self.approx_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return self._lookup(key, count=False) is not None
+
+    def __getitem__(self, key: K) -> V:
+        if (entry := self._lookup(key, count=True)) is None:
+            raise KeyError(key)
+        return entry[0]
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        if (entry := self._lookup(key, count=True)) is None:
+            return default
+        return entry[0]
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self._remove(key)
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        self._data[key] = (value, size, time.monotonic())
+        self.approx_bytes += size
+        self._evict()
+
+    def setdefault(self, key: K, value: V) -> V:
+        if (entry := self._lookup(key, count=False)) is not None:
+            return entry[0]
+        self[key] = value
+        return value
+
+    @overload
+    def pop(self, key: K) -> V:
+        ...
+
+    @overload
+    def pop(self, key: K, default: D) -> V | D:
+        ...
+
+    def pop(self, key: K, default: object = _NO_DEFAULT) -> object:
+        try:
+            value, size, _inserted = self._data.pop(key)
+        except KeyError:
+            if default is _NO_DEFAULT:
+                raise
+            return default
+        self.approx_bytes -= size
+        return value
+
+    def _lookup(self, key: K, *, count: bool) -> tuple[V, int, float] | None:
+        try:
+            entry = self._data[key]
+        except KeyError:
+            self.misses += count
+            return None
+
+        if self._ttl is not None and time.monotonic() - entry[2] > self._ttl:
+            self._remove(key)
+            self.evictions += 1
+            self.misses += count
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += count
+        return entry
+
+    def _remove(self, key: K) -> None:
+        if (entry := self._data.pop(key, None)) is not None:
+            self.approx_bytes -= entry[1]
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self._max_entries is not None and len(self._data) > self._max_entries)
+            or (self._max_bytes is not None and self.approx_bytes > self._max_bytes)
+        ):
+            _key, (_value, size, _inserted) = self._data.popitem(last=False)
+            self.approx_bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            entries=len(self._data),
+            approx_bytes=self.approx_bytes,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+        )
+
+    def is_empty(self) -> bool:
+        """Whether or not there is something in the collection at the moment"""
+        return not self._data
+
+    def is_populated(self) -> bool:
+        """See DictCache.is_populated()"""
+        return self._populated
+
+    def set_populated(self) -> None:
+        self._populated = True
+
+    def set_not_populated(self) -> None:
+        self._populated = False
+
+    def clear(self) -> None:
+        """Drop all entries, the counters are kept"""
+        self._data.clear()
+        self.approx_bytes = 0
+        self.set_not_populated()
+
+
 # This cache manager holds all caches that rely on the configuration
 # and have to be flushed once the configuration is reloaded in the
 # keepalive mode
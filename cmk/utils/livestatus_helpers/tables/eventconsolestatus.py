@@ -31,6 +31,13 @@ class Eventconsolestatus(Table):
     )
     """The average event rate"""
 
+    status_average_ingestion_drop_rate = Column(
+        'status_average_ingestion_drop_rate',
+        col_type='float',
+        description='The average ingestion drop rate',
+    )
+    """The average ingestion drop rate"""
+
     status_average_message_rate = Column(
         'status_average_message_rate',
         col_type='float',
@@ -52,6 +59,20 @@ class Eventconsolestatus(Table):
     )
     """The average incoming message processing time"""
 
+    status_average_replication_byte_rate = Column(
+        'status_average_replication_byte_rate',
+        col_type='float',
+        description='The average replication byte rate',
+    )
+    """The average replication byte rate"""
+
+    status_average_replication_lag_time = Column(
+        'status_average_replication_lag_time',
+        col_type='float',
+        description='The average age of the replicated state when it is applied',
+    )
+    """The average age of the replicated state when it is applied"""
+
     status_average_request_time = Column(
         'status_average_request_time',
         col_type='float',
@@ -171,6 +192,34 @@ class Eventconsolestatus(Table):
     )
     """The number of events received since startup of the Event Console"""
 
+    status_ingestion_drop_rate = Column(
+        'status_ingestion_drop_rate',
+        col_type='float',
+        description='The ingestion drop rate',
+    )
+    """The ingestion drop rate"""
+
+    status_ingestion_drops = Column(
+        'status_ingestion_drops',
+        col_type='int',
+        description='The number of received messages dropped because the queue of messages waiting to be processed was full',
+    )
+    """The number of received messages dropped because the queue of messages waiting to be processed was full"""
+
+    status_ingestion_queue_length = Column(
+        'status_ingestion_queue_length',
+        col_type='int',
+        description='The number of received messages waiting to be processed',
+    )
+    """The number of received messages waiting to be processed"""
+
+    status_ingestion_queue_peak = Column(
+        'status_ingestion_queue_peak',
+        col_type='int',
+        description='The highest number of received messages waiting to be processed since startup of the Event Console',
+    )
+    """The highest number of received messages waiting to be processed since startup of the Event Console"""
+
     status_message_rate = Column(
         'status_message_rate',
         col_type='float',
@@ -206,6 +255,20 @@ class Eventconsolestatus(Table):
     )
     """The number of message overflows, i.e. messages simply dropped due to an overflow of the Event Console"""
 
+    status_replication_byte_rate = Column(
+        'status_replication_byte_rate',
+        col_type='float',
+        description='The replication byte rate',
+    )
+    """The replication byte rate"""
+
+    status_replication_bytes = Column(
+        'status_replication_bytes',
+        col_type='int',
+        description='The number of bytes received from the master by the replication since startup of the Event Console',
+    )
+    """The number of bytes received from the master by the replication since startup of the Event Console"""
+
     status_replication_last_sync = Column(
         'status_replication_last_sync',
         col_type='time',
@@ -6,12 +6,15 @@
 import errno
 import logging
 import os
+import sqlite3
 import tempfile
+import threading
+import time
 from collections.abc import Container, Iterable, Iterator, Mapping, Sequence
 from contextlib import suppress
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Final, NamedTuple
+from typing import Final, Literal, NamedTuple
 
 import cmk.utils
 import cmk.utils.paths
@@ -49,6 +52,35 @@ PiggybackTimeSettings = Sequence[_PiggybackTimeSetting]
 
 _PiggybackTimeSettingsMap = Mapping[tuple[str | None, str], int]
 
+# "files": one file per source and piggybacked host, see the terminology below
+# "database": one SQLite database with a row per source and piggybacked host
+PiggybackStorage = Literal["files", "database"]
+
+# Compared to the last piggyback data sent by the source, the piggyback data of a piggybacked host
+# is from a source not sending piggyback data, was not updated by the source or is up to date
+_SourceStatus = Literal["not_sending", "not_updated", "updated"]
+
+
+class _DatabaseEntry(NamedTuple):
+    mtime: float
+    # The last contact with the source, None if it is not sending piggyback data
+    source_status_mtime: float | None
+
+
+_storage: PiggybackStorage = "files"
+
+
+def set_storage(storage: PiggybackStorage) -> None:
+    """Set the storage the piggyback data is stored to
+
+    The piggyback data is always read from both storages, the newer data of a source wins.
+    When the storage is changed, the piggybacked hosts keep their data and the data of the
+    previous storage is removed by the clean up once it is outdated.
+    """
+    global _storage
+    _storage = storage
+
+
 # ***** Terminology *****
 # "piggybacked_host_folder":
 # - tmp/check_mk/piggyback/HOST
@@ -65,6 +97,10 @@ _PiggybackTimeSettingsMap = Mapping[tuple[str | None, str], int]
 # "source_hostname":
 # - Path(tmp/check_mk/piggyback/HOST/SOURCE).name
 # - Path(tmp/check_mk/piggyback_sources/SOURCE).name
+#
+# "piggyback_database":
+# - tmp/check_mk/piggyback.db, the storage "database" containing the piggyback data and the
+#   last contacts of the sources
 
 
 def get_piggyback_raw_data(
@@ -95,9 +131,9 @@ def get_piggyback_raw_data(
             # Raw data is always stored as bytes. Later the content is
             # converted to unicode in abstact.py:_parse_info which respects
             # 'encoding' in section options.
-            raw_data = AgentRawData(store.load_bytes_from_file(file_info.file_path))
+            raw_data = AgentRawData(_load_raw_data(file_info, piggybacked_hostname))
 
-        except OSError as e:
+        except (OSError, sqlite3.Error) as e:
             reason = f"Cannot read piggyback raw data from source '{file_info.source_hostname}'"
             piggyback_raw_data = PiggybackRawDataInfo(
                 PiggybackFileInfo(
@@ -140,19 +176,24 @@ def get_piggyback_raw_data(
     return piggyback_data
 
 
+def _load_raw_data(
+    file_info: PiggybackFileInfo, piggybacked_hostname: HostName | HostAddress
+) -> bytes:
+    if file_info.file_path == cmk.utils.paths.piggyback_database:
+        return _load_database_raw_data(file_info.source_hostname, piggybacked_hostname)
+    return store.load_bytes_from_file(file_info.file_path)
+
+
 def get_source_and_piggyback_hosts(
     time_settings: PiggybackTimeSettings,
 ) -> Iterator[tuple[HostName, HostName]]:
     """Generates all piggyback pig/piggybacked host pairs that have up-to-date data"""
 
-    for piggybacked_host_folder in _get_piggybacked_host_folders():
-        for file_info in _get_piggyback_processed_file_infos(
-            HostName(piggybacked_host_folder.name),
-            time_settings,
-        ):
+    for piggybacked_hostname in _get_piggybacked_hostnames():
+        for file_info in _get_piggyback_processed_file_infos(piggybacked_hostname, time_settings):
             if not file_info.successfully_processed:
                 continue
-            yield HostName(file_info.source_hostname), HostName(piggybacked_host_folder.name)
+            yield HostName(file_info.source_hostname), piggybacked_hostname
 
 
 def has_piggyback_raw_data(
@@ -236,13 +277,16 @@ def _get_piggyback_processed_file_infos(
     functions. Therefor all these functions needs to deal with suddenly vanishing or
     updated files/directories.
     """
-    source_hostnames = get_source_hostnames(piggybacked_hostname)
+    database_entries = _get_database_entries(piggybacked_hostname)
+    source_hostnames = list(
+        dict.fromkeys([*_get_file_source_hostnames(piggybacked_hostname), *database_entries])
+    )
     expanded_time_settings = _TimeSettingsMap(source_hostnames, piggybacked_hostname, time_settings)
     return [
-        _get_piggyback_processed_file_info(
+        _get_piggyback_processed_info(
             source_hostname,
             piggybacked_hostname=piggybacked_hostname,
-            piggyback_file_path=_get_piggybacked_file_path(source_hostname, piggybacked_hostname),
+            database_entry=database_entries.get(source_hostname),
             settings=expanded_time_settings,
         )
         for source_hostname in source_hostnames
@@ -250,6 +294,36 @@ def _get_piggyback_processed_file_infos(
     ]
 
 
+def _get_piggyback_processed_info(
+    source_hostname: HostName,
+    *,
+    piggybacked_hostname: HostName | HostAddress,
+    database_entry: _DatabaseEntry | None,
+    settings: _TimeSettingsMap,
+) -> PiggybackFileInfo:
+    piggyback_file_path = _get_piggybacked_file_path(source_hostname, piggybacked_hostname)
+    if database_entry is not None:
+        try:
+            file_mtime = piggyback_file_path.stat().st_mtime
+        except FileNotFoundError:
+            file_mtime = None
+        # The source may have sent its data to both storages, use the newer one
+        if file_mtime is None or file_mtime <= database_entry.mtime:
+            return _get_piggyback_processed_database_info(
+                source_hostname,
+                piggybacked_hostname=piggybacked_hostname,
+                database_entry=database_entry,
+                settings=settings,
+            )
+
+    return _get_piggyback_processed_file_info(
+        source_hostname,
+        piggybacked_hostname=piggybacked_hostname,
+        piggyback_file_path=piggyback_file_path,
+        settings=settings,
+    )
+
+
 def _get_piggyback_processed_file_info(
     source_hostname: HostName,
     *,
@@ -264,10 +338,63 @@ def _get_piggyback_processed_file_info(
             source_hostname, piggyback_file_path, False, "Piggyback file is missing", 0
         )
 
-    if (outdated := file_age - settings.max_cache_age(source_hostname, piggybacked_hostname)) > 0:
+    status_file_path = _get_source_status_file_path(source_hostname)
+    source_status: _SourceStatus
+    if not status_file_path.exists():
+        source_status = "not_sending"
+    elif _is_piggyback_file_outdated(status_file_path, piggyback_file_path):
+        source_status = "not_updated"
+    else:
+        source_status = "updated"
+
+    return _evaluate_piggyback_data(
+        source_hostname,
+        piggybacked_hostname=piggybacked_hostname,
+        file_path=piggyback_file_path,
+        age=file_age,
+        source_status=source_status,
+        settings=settings,
+    )
+
+
+def _get_piggyback_processed_database_info(
+    source_hostname: HostName,
+    *,
+    piggybacked_hostname: HostName | HostAddress,
+    database_entry: _DatabaseEntry,
+    settings: _TimeSettingsMap,
+) -> PiggybackFileInfo:
+    source_status: _SourceStatus
+    if database_entry.source_status_mtime is None:
+        source_status = "not_sending"
+    elif database_entry.source_status_mtime > database_entry.mtime:
+        source_status = "not_updated"
+    else:
+        source_status = "updated"
+
+    return _evaluate_piggyback_data(
+        source_hostname,
+        piggybacked_hostname=piggybacked_hostname,
+        file_path=cmk.utils.paths.piggyback_database,
+        age=time.time() - database_entry.mtime,
+        source_status=source_status,
+        settings=settings,
+    )
+
+
+def _evaluate_piggyback_data(
+    source_hostname: HostName,
+    *,
+    piggybacked_hostname: HostName | HostAddress,
+    file_path: Path,
+    age: float,
+    source_status: _SourceStatus,
+    settings: _TimeSettingsMap,
+) -> PiggybackFileInfo:
+    if (outdated := age - settings.max_cache_age(source_hostname, piggybacked_hostname)) > 0:
         return PiggybackFileInfo(
             source_hostname,
-            piggyback_file_path,
+            file_path,
             False,
             f"Piggyback file too old: {Age(outdated)}",
             0,
@@ -276,22 +403,21 @@ def _get_piggyback_processed_file_info(
     validity_period = settings.validity_period(source_hostname, piggybacked_hostname)
     validity_state = settings.validity_state(source_hostname, piggybacked_hostname)
 
-    status_file_path = _get_source_status_file_path(source_hostname)
-    if not status_file_path.exists():
-        valid_msg = _validity_period_message(file_age, validity_period)
+    if source_status == "not_sending":
+        valid_msg = _validity_period_message(age, validity_period)
         return PiggybackFileInfo(
             source_hostname,
-            piggyback_file_path,
+            file_path,
             bool(valid_msg),
             f"Source '{source_hostname}' not sending piggyback data{valid_msg}",
             validity_state if valid_msg else 0,
         )
 
-    if _is_piggyback_file_outdated(status_file_path, piggyback_file_path):
-        valid_msg = _validity_period_message(file_age, validity_period)
+    if source_status == "not_updated":
+        valid_msg = _validity_period_message(age, validity_period)
         return PiggybackFileInfo(
             source_hostname,
-            piggyback_file_path,
+            file_path,
             bool(valid_msg),
             f"Piggyback file not updated by source '{source_hostname}'{valid_msg}",
             validity_state if valid_msg else 0,
@@ -299,7 +425,7 @@ def _get_piggyback_processed_file_info(
 
     return PiggybackFileInfo(
         source_hostname,
-        piggyback_file_path,
+        file_path,
         True,
         f"Successfully processed from source '{source_hostname}'",
         0,
@@ -341,13 +467,18 @@ def remove_source_status_file(source_hostname: HostName) -> bool:
     """Remove the source_status_file of this piggyback host which will
     mark the piggyback data from this source as outdated."""
     source_status_path = _get_source_status_file_path(source_hostname)
-    return _remove_piggyback_file(source_status_path)
+    removed_file = _remove_piggyback_file(source_status_path)
+    return _remove_database_source_status(source_hostname) or removed_file
 
 
 def store_piggyback_raw_data(
     source_hostname: HostName,
     piggybacked_raw_data: Mapping[HostName, Sequence[bytes]],
 ) -> None:
+    if _storage == "database":
+        _store_database_raw_data(source_hostname, piggybacked_raw_data)
+        return
+
     piggyback_file_paths = []
     for piggybacked_hostname, lines in piggybacked_raw_data.items():
         piggyback_file_path = _get_piggybacked_file_path(source_hostname, piggybacked_hostname)
@@ -371,6 +502,8 @@ def store_piggyback_raw_data(
 
         status_file_path = _get_source_status_file_path(source_hostname)
         _store_status_file_of(status_file_path, piggyback_file_paths)
+        # The data of this source left in the storage "database" is not updated anymore
+        _remove_database_source_status(source_hostname)
     else:
         logger.debug("Received no piggyback data")
         remove_source_status_file(source_hostname)
@@ -424,15 +557,40 @@ def get_source_hostnames(
 ) -> Sequence[HostName]:
     if piggybacked_hostname is None:
         return [
-            HostName(source_host.name)
-            for piggybacked_host_folder in _get_piggybacked_host_folders()
-            for source_host in _files_in(piggybacked_host_folder)
+            *(
+                HostName(source_host.name)
+                for piggybacked_host_folder in _get_piggybacked_host_folders()
+                for source_host in _files_in(piggybacked_host_folder)
+            ),
+            *(source_hostname for _piggybacked_hostname, source_hostname in _get_database_pairs()),
         ]
 
+    return list(
+        dict.fromkeys(
+            [
+                *_get_file_source_hostnames(piggybacked_hostname),
+                *_get_database_entries(piggybacked_hostname),
+            ]
+        )
+    )
+
+
+def _get_file_source_hostnames(piggybacked_hostname: HostName | HostAddress) -> Sequence[HostName]:
     piggybacked_host_folder = cmk.utils.paths.piggyback_dir / Path(piggybacked_hostname)
     return [HostName(source_host.name) for source_host in _files_in(piggybacked_host_folder)]
 
 
+def _get_piggybacked_hostnames() -> Sequence[HostName]:
+    return list(
+        dict.fromkeys(
+            [
+                *(HostName(folder.name) for folder in _get_piggybacked_host_folders()),
+                *(piggybacked_hostname for piggybacked_hostname, _source in _get_database_pairs()),
+            ]
+        )
+    )
+
+
 def _get_piggybacked_host_folders() -> Sequence[Path]:
     return _files_in(cmk.utils.paths.piggyback_dir)
 
@@ -459,6 +617,172 @@ def _get_piggybacked_file_path(
     return cmk.utils.paths.piggyback_dir / piggybacked_hostname / source_hostname
 
 
+# .
+#   .--database------------------------------------------------------------.
+#   |                  _       _        _                                  |
+#   |               __| | __ _| |_ __ _| |__   __ _ ___  ___               |
+#   |              / _` |/ _` | __/ _` | '_ \ / _` / __|/ _ \              |
+#   |             | (_| | (_| | || (_| | |_) | (_| \__ \  __/              |
+#   |              \__,_|\__,_|\__\__,_|_.__/ \__,_|___/\___|              |
+#   |                                                                      |
+#   '----------------------------------------------------------------------'
+
+# The storage "database": a source stores the piggyback data of all its piggybacked hosts with
+# one transaction instead of one file per piggybacked host. The piggyback data of a piggybacked
+# host is looked up by the primary key instead of listing its directory.
+
+# Seconds a process waits for another process storing piggyback data
+_DATABASE_TIMEOUT = 30.0
+
+_DATABASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS piggyback (
+    piggybacked_hostname TEXT NOT NULL,
+    source_hostname TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    raw_data BLOB NOT NULL,
+    PRIMARY KEY (piggybacked_hostname, source_hostname)
+);
+CREATE INDEX IF NOT EXISTS piggyback_source_hostname ON piggyback (source_hostname);
+CREATE TABLE IF NOT EXISTS source_status (
+    source_hostname TEXT PRIMARY KEY,
+    mtime REAL NOT NULL
+);
+"""
+
+
+class _DatabaseConnection(threading.local):
+    """The connection of the current thread
+
+    A connection must not be used by another thread (the fetchers run in threads) or after
+    forking.
+    """
+
+    current: tuple[int, Path, sqlite3.Connection] | None = None
+
+
+_database_connection = _DatabaseConnection()
+
+
+def _connect_database() -> sqlite3.Connection:
+    if _database_connection.current is not None and _database_connection.current[:2] == (
+        os.getpid(),
+        cmk.utils.paths.piggyback_database,
+    ):
+        return _database_connection.current[2]
+
+    # The transactions are started explicitly. With the write-ahead log, the readers do not wait
+    # for a source storing its piggyback data.
+    connection = sqlite3.connect(
+        cmk.utils.paths.piggyback_database, timeout=_DATABASE_TIMEOUT, isolation_level=None
+    )
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(_DATABASE_SCHEMA)
+    _database_connection.current = (
+        os.getpid(),
+        cmk.utils.paths.piggyback_database,
+        connection,
+    )
+    return connection
+
+
+def _query_database(query: str, parameters: Sequence[object] = ()) -> list[tuple]:
+    if not cmk.utils.paths.piggyback_database.exists():
+        return []
+    return _connect_database().execute(query, parameters).fetchall()
+
+
+def _update_database(query: str, parameters: Iterable[Sequence[object]]) -> int:
+    store.makedirs(cmk.utils.paths.piggyback_database.parent)
+    connection = _connect_database()
+    # Committed or rolled back when leaving the context
+    with connection:
+        # A deferred transaction could not wait for the other writers
+        connection.execute("BEGIN IMMEDIATE")
+        return connection.executemany(query, parameters).rowcount
+
+
+def _get_database_entries(
+    piggybacked_hostname: HostName | HostAddress,
+) -> dict[HostName, _DatabaseEntry]:
+    return {
+        HostName(source_hostname): _DatabaseEntry(mtime, source_status_mtime)
+        for source_hostname, mtime, source_status_mtime in _query_database(
+            "SELECT source_hostname, piggyback.mtime, source_status.mtime"
+            " FROM piggyback LEFT JOIN source_status USING (source_hostname)"
+            " WHERE piggybacked_hostname = ?",
+            (str(piggybacked_hostname),),
+        )
+    }
+
+
+def _get_database_pairs() -> Sequence[tuple[HostName, HostName]]:
+    """The piggybacked hosts and their sources"""
+    return [
+        (HostName(piggybacked_hostname), HostName(source_hostname))
+        for piggybacked_hostname, source_hostname in _query_database(
+            "SELECT piggybacked_hostname, source_hostname FROM piggyback"
+        )
+    ]
+
+
+def _load_database_raw_data(
+    source_hostname: HostName, piggybacked_hostname: HostName | HostAddress
+) -> bytes:
+    rows = _query_database(
+        "SELECT raw_data FROM piggyback WHERE piggybacked_hostname = ? AND source_hostname = ?",
+        (str(piggybacked_hostname), str(source_hostname)),
+    )
+    if not rows:
+        raise FileNotFoundError(
+            errno.ENOENT, "No piggyback data", str(cmk.utils.paths.piggyback_database)
+        )
+    return rows[0][0]
+
+
+def _store_database_raw_data(
+    source_hostname: HostName,
+    piggybacked_raw_data: Mapping[HostName, Sequence[bytes]],
+) -> None:
+    # Like the status file of the storage "files", the last contact with the source is stored
+    # with the same time as the piggyback data
+    now = time.time()
+    store.makedirs(cmk.utils.paths.piggyback_database.parent)
+    connection = _connect_database()
+    with connection:
+        connection.execute("BEGIN IMMEDIATE")
+        connection.executemany(
+            "INSERT OR REPLACE INTO piggyback VALUES (?, ?, ?, ?)",
+            (
+                (str(piggybacked_hostname), str(source_hostname), now, b"%s\n" % b"\n".join(lines))
+                for piggybacked_hostname, lines in piggybacked_raw_data.items()
+            ),
+        )
+        if piggybacked_raw_data:
+            logger.log(VERBOSE, "Received piggyback data for %d hosts", len(piggybacked_raw_data))
+            connection.execute(
+                "INSERT OR REPLACE INTO source_status VALUES (?, ?)", (str(source_hostname), now)
+            )
+        else:
+            logger.debug("Received no piggyback data")
+            connection.execute(
+                "DELETE FROM source_status WHERE source_hostname = ?", (str(source_hostname),)
+            )
+
+    # The files of this source left in the storage "files" are not updated anymore
+    _remove_piggyback_file(_get_source_status_file_path(source_hostname))
+
+
+def _remove_database_source_status(source_hostname: HostName) -> bool:
+    if not cmk.utils.paths.piggyback_database.exists():
+        return False
+    return bool(
+        _update_database(
+            "DELETE FROM source_status WHERE source_hostname = ?", [(str(source_hostname),)]
+        )
+    )
+
+
 # .
 #   .--clean up------------------------------------------------------------.
 #   |                     _                                                |
@@ -488,6 +812,7 @@ def cleanup_piggyback_files(time_settings: PiggybackTimeSettings) -> None:
 
     _cleanup_old_source_status_files(piggybacked_hosts_settings)
     _cleanup_old_piggybacked_files(piggybacked_hosts_settings)
+    _cleanup_database(time_settings)
 
 
 def _get_piggybacked_hosts_settings(
@@ -587,3 +912,71 @@ def _cleanup_old_piggybacked_files(
             "Piggyback folder '%s' is empty. Removed it.",
             piggybacked_host_folder,
         )
+
+
+def _cleanup_database(time_settings: PiggybackTimeSettings) -> None:
+    """Remove the source status and the piggyback data in the database like the files
+
+    Only the rows not updated in the meantime are removed.
+    """
+    entries: dict[HostName, dict[HostName, _DatabaseEntry]] = {}
+    for piggybacked_hostname, source_hostname, mtime, source_status_mtime in _query_database(
+        "SELECT piggybacked_hostname, source_hostname, piggyback.mtime, source_status.mtime"
+        " FROM piggyback LEFT JOIN source_status USING (source_hostname)"
+    ):
+        entries.setdefault(HostName(piggybacked_hostname), {})[
+            HostName(source_hostname)
+        ] = _DatabaseEntry(mtime, source_status_mtime)
+
+    time_settings_maps = {
+        piggybacked_hostname: _TimeSettingsMap(
+            list(source_entries), piggybacked_hostname, time_settings
+        )
+        for piggybacked_hostname, source_entries in entries.items()
+    }
+
+    max_cache_age_by_sources: dict[HostName, int] = {}
+    for piggybacked_hostname, source_entries in entries.items():
+        for source_hostname in source_entries:
+            max_cache_age = time_settings_maps[piggybacked_hostname].max_cache_age(
+                source_hostname, piggybacked_hostname
+            )
+            max_cache_age_by_sources[source_hostname] = max(
+                max_cache_age, max_cache_age_by_sources.get(source_hostname, max_cache_age)
+            )
+
+    now = time.time()
+    outdated_source_status = {
+        source_hostname: entry.source_status_mtime
+        for source_entries in entries.values()
+        for source_hostname, entry in source_entries.items()
+        if entry.source_status_mtime is not None
+        and now - entry.source_status_mtime > max_cache_age_by_sources[source_hostname]
+    }
+    outdated_data = [
+        (piggybacked_hostname, source_hostname, entry.mtime)
+        for piggybacked_hostname, source_entries in entries.items()
+        for source_hostname, entry in source_entries.items()
+        if not _get_piggyback_processed_database_info(
+            source_hostname,
+            piggybacked_hostname=piggybacked_hostname,
+            database_entry=entry._replace(source_status_mtime=None)
+            if source_hostname in outdated_source_status
+            else entry,
+            settings=time_settings_maps[piggybacked_hostname],
+        ).successfully_processed
+    ]
+
+    if outdated_source_status:
+        removed = _update_database(
+            "DELETE FROM source_status WHERE source_hostname = ? AND mtime = ?",
+            [(str(s), mtime) for s, mtime in outdated_source_status.items()],
+        )
+        logger.log(VERBOSE, "Removed %d outdated piggyback source status from database", removed)
+    if outdated_data:
+        removed = _update_database(
+            "DELETE FROM piggyback"
+            " WHERE piggybacked_hostname = ? AND source_hostname = ? AND mtime = ?",
+            [(str(p), str(s), mtime) for p, s, mtime in outdated_data],
+        )
+        logger.log(VERBOSE, "Removed %d outdated piggyback data from database", removed)
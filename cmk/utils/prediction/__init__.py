@@ -6,6 +6,7 @@
 
 from ._paths import PREDICTION_DIR
 from ._plugin_interface import estimate_levels, EstimatedLevels, get_predictive_levels
+from ._precompute import precompute_predictions
 from ._prediction import (
     DataStat,
     get_rrd_data,
@@ -25,6 +26,7 @@ from ._prediction import (
     Timestamp,
     TimeWindow,
     timezone_at,
+    values_from_array,
 )
 
 __all__ = [
@@ -39,6 +41,7 @@ __all__ = [
     "PredictionStore",
     "PREDICTION_DIR",
     "PredictionParameters",
+    "precompute_predictions",
     "rrd_timestamps",
     "Seconds",
     "Timegroup",
@@ -49,4 +52,5 @@ __all__ = [
     "Timestamp",
     "TimeWindow",
     "timezone_at",
+    "values_from_array",
 ]
@@ -38,18 +38,25 @@ def _get_prediction(
 
     No prediction is available if
     * no prediction meta data file is found
-    * the prediction is outdated
+    * the prediction is outdated for longer than one slice
     * no prediction for these parameters (time group) has been made yet
     * no prediction data file is found
+
+    An outdated prediction is still used for one slice: it is refreshed by the
+    precomputation of the predictions (see cmk --compute-predictions), which may not have
+    been run yet.
     """
     if (last_info := store.get_info(timegroup)) is None:
         return None
 
     period_info = PREDICTION_PERIODS[params.period]
     now = time.time()
-    if last_info.time + period_info.valid * period_info.slice < now:
+    valid_until = last_info.time + period_info.valid * period_info.slice
+    if valid_until + period_info.slice < now:
         logger.log(VERBOSE, "Prediction of %s outdated", timegroup)
         return None
+    if valid_until < now:
+        logger.log(VERBOSE, "Prediction of %s outdated, using it until it is refreshed", timegroup)
 
     if last_info.params != params:
         logger.log(VERBOSE, "Prediction parameters have changed.")
@@ -92,6 +99,8 @@ def get_predictive_levels(
         )
     ) is None:
         info = PredictionInfo(
+            host_name=hostname,
+            service_description=service_description,
             name=timegroup,
             time=now,
             range=(current_slice_start, current_slice_end),
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Computation of the predictions ahead of the checks
+
+Computing a prediction takes the RRD data of the whole horizon, which makes the check
+computing it slow. The predictions known from the prediction directory are therefore
+computed regularly in the background: every prediction which becomes outdated until the
+next run and every prediction of a time group starting until then. The checks then find
+a valid prediction and only read it.
+"""
+
+import logging
+import multiprocessing
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import cmk.utils.debug
+from cmk.utils.log import VERBOSE
+
+from ._prediction import (
+    compute_prediction,
+    get_timegroup_relative_time,
+    PREDICTION_PERIODS,
+    PredictionInfo,
+    PredictionStore,
+    Timestamp,
+)
+
+logger = logging.getLogger("cmk.prediction")
+
+
+def precompute_predictions(
+    basedir: Path,
+    now: Timestamp,
+    lookahead: int,
+    max_workers: int = 1,
+) -> int:
+    """Compute the predictions needed until now + lookahead, return the number of failures"""
+    due = list(_due_predictions(basedir, now, lookahead))
+    logger.log(VERBOSE, "Computing %d predictions", len(due))
+    if max_workers <= 1 or len(due) <= 1:
+        failures = sum(not _compute(basedir, now, *args) for args in due)
+    else:
+        with multiprocessing.get_context("fork").Pool(min(max_workers, len(due))) as pool:
+            failures = sum(
+                not success
+                for success in pool.starmap(_compute, [(basedir, now, *args) for args in due])
+            )
+    return failures
+
+
+def _due_predictions(
+    basedir: Path, now: Timestamp, lookahead: int
+) -> Iterator[tuple[str, str, PredictionInfo]]:
+    """The host name, the service description and the info of the due predictions"""
+    known: dict[tuple[str, str, str], PredictionInfo] = {}
+    for info in _stored_infos(basedir):
+        # The check computing the prediction again stores the host and the service
+        if info.host_name is None or info.service_description is None:
+            continue
+        # The latest prediction of a metric determines the current parameters
+        key = (info.host_name, info.service_description, info.dsname)
+        if key not in known or known[key].time < info.time:
+            known[key] = info
+
+    for (host_name, service_description, dsname), latest in known.items():
+        store = PredictionStore(basedir, host_name, service_description, dsname)
+        period_info = PREDICTION_PERIODS[latest.params.period]
+        timegroups = set()
+        for timestamp in (now, now + lookahead):
+            timegroup, from_time, until_time, _rel_time = get_timegroup_relative_time(
+                timestamp, period_info
+            )
+            if timegroup in timegroups:
+                continue
+            timegroups.add(timegroup)
+
+            stored = store.get_info(timegroup)
+            if (
+                stored is not None
+                and stored.params == latest.params
+                and stored.time + period_info.valid * period_info.slice > now + lookahead
+            ):
+                continue
+
+            yield host_name, service_description, PredictionInfo(
+                host_name=host_name,
+                service_description=service_description,
+                name=timegroup,
+                time=now,
+                range=(from_time, until_time),
+                cf=latest.cf,
+                dsname=latest.dsname,
+                slice=period_info.slice,
+                params=latest.params,
+            )
+
+
+def _stored_infos(basedir: Path) -> Sequence[PredictionInfo]:
+    infos = []
+    for info_file in basedir.glob("*/*/*/*.info"):
+        try:
+            infos.append(PredictionInfo.parse_raw(info_file.read_text()))
+        except (ValueError, OSError) as e:
+            logger.log(VERBOSE, "Skipping %s: %s", info_file, e)
+    return infos
+
+
+def _compute(
+    basedir: Path, now: Timestamp, host_name: str, service_description: str, info: PredictionInfo
+) -> bool:
+    try:
+        compute_prediction(
+            info,
+            PredictionStore(basedir, host_name, service_description, info.dsname),
+            now,
+            PREDICTION_PERIODS[info.params.period],
+            host_name,
+            service_description,
+        )
+    except Exception as e:
+        if cmk.utils.debug.enabled():
+            raise
+        logger.warning(
+            "Cannot compute the prediction %s of %s/%s/%s: %s",
+            info.name,
+            host_name,
+            service_description,
+            info.dsname,
+            e,
+        )
+        return False
+    return True
@@ -4,24 +4,28 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import logging
-import math
 import time
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
 from dataclasses import dataclass
 from pathlib import Path
 from statistics import fmean
-from typing import Final, Literal, NamedTuple, NewType
+from typing import Final, Literal, NamedTuple, NewType, TYPE_CHECKING
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
 import livestatus
 
 import cmk.utils.debug
 import cmk.utils.paths
+import cmk.utils.store as store
 from cmk.utils import dateutils
 from cmk.utils.exceptions import MKGeneralException
 from cmk.utils.log import VERBOSE
 
+if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+
 logger = logging.getLogger("cmk.prediction")
 
 Seconds = int
@@ -81,6 +85,9 @@ class _PeriodInfo(NamedTuple):
 
 
 class PredictionInfo(BaseModel, frozen=True):
+    # Not known for the predictions computed before they were stored
+    host_name: str | None = None
+    service_description: str | None = None
     name: Timegroup
     time: int
     range: tuple[Timestamp, Timestamp]
@@ -137,6 +144,29 @@ def aggregation_functions(
             raise ValueError(f"Invalid Aggregation function {aggr}, only max, min, average allowed")
 
 
+def _rrd_timestamps_array(time_window: TimeWindow) -> "npt.NDArray[np.int64]":
+    # Imported here, see _data_stats
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    start, end, step = time_window
+    return np.array([], dtype=int) if step == 0 else np.arange(start, end, step) + step
+
+
+def values_from_array(array: "npt.NDArray[np.float64]") -> TimeSeriesValues:
+    """The values of a NumPy array as values of a time series, None for NaN
+
+    >>> import numpy as np
+    >>> values_from_array(np.array([1.5, np.nan, 3.0]))
+    [1.5, None, 3.0]
+    """
+    # Imported here, see _data_stats
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    values = array.astype(object)
+    values[np.isnan(array)] = None
+    return values.tolist()
+
+
 class TimeSeries:
     """Describes the returned time series returned by livestatus
 
@@ -160,7 +190,7 @@ class TimeSeries:
         self,
         data: TimeSeriesValues,
         time_window: TimeWindow | None = None,
-        conversion: Callable[[float], float] = lambda v: v,
+        conversion: Callable[[float], float] | None = None,
     ) -> None:
         if time_window is None:
             if not data or data[0] is None or data[1] is None or data[2] is None:
@@ -173,7 +203,9 @@ class TimeSeries:
         self.start = int(time_window[0])
         self.end = int(time_window[1])
         self.step = int(time_window[2])
-        self.values = [v if v is None else conversion(v) for v in data]
+        self.values = (
+            list(data) if conversion is None else [v if v is None else conversion(v) for v in data]
+        )
 
     @property
     def twindow(self) -> TimeWindow:
@@ -185,19 +217,18 @@ class TimeSeries:
         twindow : 3-tuple, (start, end, step)
              description of target time interval
         """
-        upsa = []
-        i = 0
         start, end, step = twindow
-        current_times = rrd_timestamps(self.twindow)
-        if start != self.start or end != self.end or step != self.step:
-            for t in range(start, end, step):
-                if t >= current_times[i] + shift:
-                    i += 1
-                upsa.append(self.values[i])
+        if start == self.start and end == self.end and step == self.step:
+            return self.values
 
-            return upsa
+        # Imported here, see _data_stats
+        import numpy as np  # pylint: disable=import-outside-toplevel
 
-        return self.values
+        values = np.array(self.values, dtype=float)
+        current_times = _rrd_timestamps_array(self.twindow) + shift
+        # Every target point takes the first value whose interval ends after it
+        indices = np.searchsorted(current_times, np.arange(start, end, step), side="right")
+        return values_from_array(values[np.minimum(indices, len(values) - 1)])
 
     def downsample(
         self, twindow: TimeWindow, cf: ConsolidationFunctionName | None = "max"
@@ -209,26 +240,39 @@ class TimeSeries:
         cf : str ('max', 'average', 'min')
              consolidation function imitating RRD methods
         """
-        dwsa = []
-        co: TimeSeriesValues = []
         start, end, step = twindow
-        desired_times = rrd_timestamps(twindow)
-        if start != self.start or end != self.end or step != self.step:
-            i = 0
-            for t, val in self.time_data_pairs():
-                if t > desired_times[i]:
-                    dwsa.append(aggregation_functions(co, cf))
-                    co = []
-                    i += 1
-                co.append(val)
-
-            diff_len = len(desired_times) - len(dwsa)
-            if diff_len > 0:
-                dwsa.append(aggregation_functions(co, cf))
-                dwsa += [None] * (diff_len - 1)
-
-            return dwsa
-        return self.values
+        if start == self.start and end == self.end and step == self.step:
+            return self.values
+
+        # Imported here, see _data_stats
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        desired_times = _rrd_timestamps_array(twindow)
+        times = _rrd_timestamps_array(self.twindow)
+        values = np.array(self.values, dtype=float)
+        num_values = min(len(times), len(values))
+        # Every value belongs to the first target interval ending at or after it. The values
+        # after the last target interval are dropped.
+        buckets = np.searchsorted(desired_times, times[:num_values], side="left")
+        valid = ~np.isnan(values[:num_values]) & (buckets < len(desired_times))
+        values, buckets = values[:num_values][valid], buckets[valid]
+
+        consolidated = np.full(len(desired_times), np.nan)
+        aggr = "max" if cf is None else cf.lower()
+        if aggr not in ("average", "max", "min"):
+            raise ValueError(f"Invalid Aggregation function {aggr}, only max, min, average allowed")
+        if values.size:
+            occupied, starts = np.unique(buckets, return_index=True)
+            match aggr:
+                case "average":
+                    consolidated[occupied] = np.add.reduceat(values, starts) / np.diff(
+                        starts, append=values.size
+                    )
+                case "max":
+                    consolidated[occupied] = np.maximum.reduceat(values, starts)
+                case "min":
+                    consolidated[occupied] = np.minimum.reduceat(values, starts)
+        return values_from_array(consolidated)
 
     def time_data_pairs(self) -> list[tuple[Timestamp, TimeSeriesValue]]:
         return list(zip(rrd_timestamps(self.twindow), self.values))
@@ -318,27 +362,60 @@ def get_rrd_data(
 
     """
 
+    return get_rrd_data_of_time_ranges(
+        connection,
+        hostname,
+        service_description,
+        metric_name,
+        cf,
+        [(fromtime, untiltime)],
+        max_entries,
+    )[0]
+
+
+def get_rrd_data_of_time_ranges(
+    connection: livestatus.SingleSiteConnection,
+    hostname: str,
+    service_description: str,
+    metric_name: str,
+    cf: ConsolidationFunctionName,
+    time_ranges: Sequence[TimeRange],
+    max_entries: int = 400,
+) -> list[_RRDResponse]:
+    """Fetch RRD historic metrics data of a specific service for several time ranges at once
+
+    Like get_rrd_data, but all time ranges are fetched with a single Livestatus query, every
+    time range is a column of the query.
+    """
     step = 1
     rpn = f"{metric_name}.{cf.lower()}"  # "MAX" -> "max"
-    point_range = ":".join(
-        livestatus.lqencode(str(x)) for x in (fromtime, untiltime, step, max_entries)
-    )
-    column = f"rrddata:m1:{rpn}:{point_range}"
+    columns = [
+        "rrddata:m%d:%s:%s"
+        % (
+            num,
+            rpn,
+            ":".join(livestatus.lqencode(str(x)) for x in (fromtime, untiltime, step, max_entries)),
+        )
+        for num, (fromtime, untiltime) in enumerate(time_ranges, start=1)
+    ]
 
-    lql = livestatus_lql([hostname], [column], service_description) + "OutputFormat: python\n"
+    lql = livestatus_lql([hostname], columns, service_description) + "OutputFormat: python\n"
 
     try:
-        response = connection.query_value(lql)
+        responses = connection.query_row(lql)
     except livestatus.MKLivestatusNotFoundError as e:
         if cmk.utils.debug.enabled():
             raise
         raise MKGeneralException(f"Cannot get historic metrics via Livestatus: {e}")
 
-    if response is None:
-        raise MKGeneralException("Cannot retrieve historic data with Nagios Core")
+    rrd_responses = []
+    for response in responses:
+        if response is None:
+            raise MKGeneralException("Cannot retrieve historic data with Nagios Core")
 
-    raw_start, raw_end, raw_step, *values = response
-    return _RRDResponse(int(raw_start), int(raw_end), int(raw_step), values)
+        raw_start, raw_end, raw_step, *values = response
+        rrd_responses.append(_RRDResponse(int(raw_start), int(raw_end), int(raw_step), values))
+    return rrd_responses
 
 
 class PredictionStore:
@@ -374,9 +451,11 @@ class PredictionStore:
         info: PredictionInfo,
         data: PredictionData,
     ) -> None:
+        # The files are replaced atomically, the data first: The checks may read them while
+        # the predictions are precomputed.
         self._dir.mkdir(exist_ok=True, parents=True)
-        self._info_file(info.name).write_text(info.json())
-        self._data_file(info.name).write_text(data.json())
+        store.PydanticStore(self._data_file(info.name), PredictionData).write_obj(data)
+        store.PydanticStore(self._info_file(info.name), PredictionInfo).write_obj(info)
 
     def remove_prediction(self, timegroup: Timegroup) -> None:
         self._data_file(timegroup).unlink(missing_ok=True)
@@ -388,6 +467,8 @@ class PredictionStore:
             return PredictionInfo.parse_raw(file_path.read_text())
         except FileNotFoundError:
             logger.log(VERBOSE, "No prediction info for group %s available.", timegroup)
+        except ValidationError:
+            logger.log(VERBOSE, "Unreadable prediction info for group %s.", timegroup)
         return None
 
     def get_data(self, timegroup: Timegroup) -> PredictionData | None:
@@ -408,30 +489,21 @@ def compute_prediction(
     service_description: str,
 ) -> PredictionData:
     logger.log(VERBOSE, "Calculating prediction data for time group %s", info.name)
-    prediction_store.remove_prediction(info.name)
-
     time_windows = _time_slices(now, info.params.horizon * 86400, period_info, info.name)
 
     from_time = time_windows[0][0]
-    rrd_responses = [
-        (
-            get_rrd_data(
-                livestatus.LocalConnection(),
-                hostname,
-                service_description,
-                info.dsname,
-                info.cf,
-                start,
-                end,
-            ),
-            from_time - start,
-        )
-        for start, end in time_windows
-    ]
+    rrd_responses = get_rrd_data_of_time_ranges(
+        livestatus.LocalConnection(),
+        hostname,
+        service_description,
+        info.dsname,
+        info.cf,
+        time_windows,
+    )
 
     raw_slices = [
-        (TimeSeries(list(rrd_response.values), rrd_response.window), offset)
-        for rrd_response, offset in rrd_responses
+        (TimeSeries(list(rrd_response.values), rrd_response.window), from_time - start)
+        for rrd_response, (start, _end) in zip(rrd_responses, time_windows)
     ]
 
     data_for_pred = _calculate_data_for_prediction(raw_slices)
@@ -550,35 +622,47 @@ def _calculate_data_for_prediction(
 
 def _data_stats(slices: list[TimeSeriesValues]) -> list[DataStat | None]:
     "Statistically summarize all the upsampled RRD data"
+    if not slices:
+        return []
 
-    descriptors: list[DataStat | None] = []
-
-    for time_column in zip(*slices):
-        point_line = [x for x in time_column if x is not None]
-        if point_line:
-            average = sum(point_line) / float(len(point_line))
-            descriptors.append(
-                DataStat(
-                    average=average,
-                    min_=min(point_line),
-                    max_=max(point_line),
-                    stdev=_std_dev(point_line, average),
-                )
-            )
-        else:
-            descriptors.append(None)
-
-    return descriptors
-
-
-def _std_dev(point_line: list[float], average: float) -> float | None:
-    samples = len(point_line)
-    # In the case of a single data-point an unbiased standard deviation is undefined.
-    if samples == 1:
-        return None
-    return math.sqrt(
-        abs(sum(p**2 for p in point_line) - average**2 * samples) / float(samples - 1)
+    # Imported here, it takes a while and the checks importing this module rarely need it
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    # One row per slice, the missing values are NaN
+    num_points = min((len(slice_) for slice_ in slices), default=0)
+    points = np.array([slice_[:num_points] for slice_ in slices], dtype=float).reshape(
+        len(slices), num_points
     )
+    present = ~np.isnan(points)
+    samples = present.sum(axis=0)
+    values = np.where(present, points, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        averages = values.sum(axis=0) / samples
+        # In the case of a single data-point an unbiased standard deviation is undefined.
+        stdevs = np.sqrt(
+            np.abs((values**2).sum(axis=0) - averages**2 * samples) / (samples - 1)
+        )
+    minima = np.fmin.reduce(points, axis=0)
+    maxima = np.fmax.reduce(points, axis=0)
+
+    return [
+        None
+        if num_samples == 0
+        else DataStat(
+            average=average,
+            min_=min_,
+            max_=max_,
+            stdev=None if num_samples == 1 else stdev,
+        )
+        for num_samples, average, min_, max_, stdev in zip(
+            samples.tolist(),
+            averages.tolist(),
+            minima.tolist(),
+            maxima.tolist(),
+            stdevs.tolist(),
+        )
+    ]
 
 
 def _upsample(
@@ -6,12 +6,17 @@
 
 import contextlib
 import dataclasses
+import json
+import mmap
+import struct
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
 from re import Pattern
-from typing import cast, Generic, Literal, NamedTuple, Required, TypeAlias, TypeVar
+from typing import Any, cast, Final, Generic, Literal, NamedTuple, Required, TypeAlias, TypeVar
 
 from typing_extensions import TypedDict
 
+import cmk.utils.store as store
 from cmk.utils.caching import instance_method_lru_cache
 from cmk.utils.exceptions import MKGeneralException
 from cmk.utils.hostaddress import HostAddress, HostName
@@ -32,6 +37,7 @@ from .conditions import HostOrServiceConditions, HostOrServiceConditionsSimple
 
 RulesetName = str  # Could move to a less cluttered module as it is often used on its own.
 TRuleValue = TypeVar("TRuleValue")
+_TKey = TypeVar("_TKey")
 
 # The value of `LabelConditions` may actually be something like TagCondition.
 LabelConditions = Mapping[str, str | Mapping[Literal["$ne"], str]]
@@ -131,6 +137,17 @@ def merge_cluster_labels(all_node_labels: Iterable[Iterable[HostLabel]]) -> Sequ
     return list({l.name: l for node_labels in all_node_labels for l in node_labels}.values())
 
 
+class MatchingHostsCacheFile(NamedTuple):
+    """Location of the persisted host index and the configuration it belongs to
+
+    The fingerprint identifies the loaded configuration. The cache file is
+    ignored when it was written for another configuration.
+    """
+
+    path: Path
+    config_fingerprint: str
+
+
 class RulesetMatcher:
     """Performing matching on host / service rulesets
 
@@ -148,6 +165,7 @@ class RulesetMatcher:
         all_configured_hosts: set[HostName],
         clusters_of: dict[HostName, list[HostName]],
         nodes_of: dict[HostName, list[HostName]],
+        matching_hosts_cache: MatchingHostsCacheFile | None = None,
     ) -> None:
         super().__init__()
 
@@ -161,6 +179,7 @@ class RulesetMatcher:
             all_configured_hosts,
             clusters_of,
             nodes_of,
+            matching_hosts_cache,
         )
         self.labels_of_host = self.ruleset_optimizer.labels_of_host
         self.labels_of_service = self.ruleset_optimizer.labels_of_service
@@ -461,6 +480,293 @@ _ConditionCacheID: TypeAlias = tuple[
 ]
 
 
+class _HostIndex:
+    """Inverted index from host attributes to the hosts having them
+
+    Every configured host gets a fixed position in the index. Sets of hosts
+    are represented as bitmaps (python integers with the bit of every
+    contained host set), which turns the evaluation of rule conditions into
+    a few bitwise operations instead of a loop over all hosts.
+
+    The tag and folder bitmaps are built once when the index is created.
+    Labels are expensive to compute, so the label bitmaps are built lazily
+    and only for the hosts that have been asked for.
+    """
+
+    def __init__(
+        self,
+        hosts: Sequence[HostName],
+        tags: Mapping[tuple[TagGroupID, TagID], int],
+        paths: Mapping[str, int],
+    ) -> None:
+        self.hosts: Final = hosts
+        self.tags: Final = tags
+        self.paths: Final = paths
+        self._positions: dict[HostName, int] = {hn: pos for pos, hn in enumerate(hosts)}
+
+        # Reference dirname -> hosts in this dir including subfolders
+        self._folders: dict[str, int] = {}
+        # (label name, label value) -> (hosts already looked at, hosts having the label)
+        self._labels: dict[tuple[str, str], tuple[int, int]] = {}
+
+    @classmethod
+    def build(
+        cls,
+        all_hosts: Iterable[HostName],
+        host_tags: TagsOfHosts,
+        host_paths: Mapping[HostName, str],
+    ) -> "_HostIndex":
+        hosts = sorted(all_hosts)
+        tag_positions: dict[tuple[TagGroupID, TagID], list[int]] = {}
+        path_positions: dict[str, list[int]] = {}
+        for pos, hostname in enumerate(hosts):
+            for tag in host_tags.get(hostname, {}).items():
+                tag_positions.setdefault(tag, []).append(pos)
+            path_positions.setdefault(host_paths.get(hostname, "/"), []).append(pos)
+
+        return cls(
+            hosts,
+            {tag: _bitmap(len(hosts), positions) for tag, positions in tag_positions.items()},
+            {path: _bitmap(len(hosts), positions) for path, positions in path_positions.items()},
+        )
+
+    def clear_label_caches(self) -> None:
+        self._labels.clear()
+
+    def all_hosts(self) -> int:
+        return (1 << len(self.hosts)) - 1
+
+    def bitmap_of(self, hostnames: Iterable[HostName]) -> int:
+        """Hosts that are not part of the index are ignored"""
+        return _bitmap(
+            len(self.hosts),
+            (pos for hostname in hostnames if (pos := self._positions.get(hostname)) is not None),
+        )
+
+    def hosts_of(self, bitmap: int) -> set[HostName]:
+        # The binary representation is the fastest way to find the set bits
+        # of a large python integer. Reverse it to make the index of a
+        # character equal to the position of the host.
+        bits = bin(bitmap)[:1:-1]
+        hosts = set()
+        pos = bits.find("1")
+        while pos != -1:
+            hosts.add(self.hosts[pos])
+            pos = bits.find("1", pos + 1)
+        return hosts
+
+    def hosts_within_folder(self, folder_path: str) -> int:
+        try:
+            return self._folders[folder_path]
+        except KeyError:
+            pass
+
+        bitmap = 0
+        for path in self.paths:
+            if path.startswith(folder_path):
+                bitmap |= self.paths[path]
+        self._folders[folder_path] = bitmap
+        return bitmap
+
+    def hosts_matching_tag_condition(
+        self, taggroup_id: TagGroupID, tag_condition: TagCondition
+    ) -> int:
+        """The result of negated conditions is a negative number
+
+        This way the result can be combined with any other bitmap using "&"
+        without knowing the total number of hosts.
+        """
+        if isinstance(tag_condition, dict):
+            if "$ne" in tag_condition:
+                return ~self.tags.get((taggroup_id, cast(TagConditionNE, tag_condition)["$ne"]), 0)
+
+            if "$or" in tag_condition:
+                return self._hosts_with_any_tag(
+                    taggroup_id, cast(TagConditionOR, tag_condition)["$or"]
+                )
+
+            if "$nor" in tag_condition:
+                return ~self._hosts_with_any_tag(
+                    taggroup_id, cast(TagConditionNOR, tag_condition)["$nor"]
+                )
+
+            raise NotImplementedError()
+
+        return self.tags.get((taggroup_id, tag_condition), 0)
+
+    def _hosts_with_any_tag(self, taggroup_id: TagGroupID, tag_ids: Iterable[TagID | None]) -> int:
+        bitmap = 0
+        for tag_id in tag_ids:
+            bitmap |= self.tags.get((taggroup_id, tag_id), 0)
+        return bitmap
+
+    def hosts_matching_label_condition(
+        self,
+        label_id: str,
+        label_spec: str | Mapping[Literal["$ne"], str],
+        candidates: int,
+        labels_of_host: Callable[[HostName], Labels],
+    ) -> int:
+        """Returns a bitmap which is valid for all hosts of the candidates bitmap"""
+        is_not = isinstance(label_spec, dict)
+        label_value = label_spec["$ne"] if isinstance(label_spec, dict) else label_spec
+
+        checked, matching = self._labels.get((label_id, label_value), (0, 0))
+        if unchecked := candidates & ~checked:
+            matching |= self.bitmap_of(
+                hostname
+                for hostname in self.hosts_of(unchecked)
+                if labels_of_host(hostname).get(label_id) == label_value
+            )
+            self._labels[(label_id, label_value)] = checked | unchecked, matching
+
+        return ~matching if is_not else matching
+
+
+def _bitmap(num_hosts: int, positions: Iterable[int]) -> int:
+    bits = bytearray((num_hosts + 7) // 8)
+    for pos in positions:
+        bits[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(bits, "little")
+
+
+class _PersistedBitmaps(Mapping[_TKey, int]):
+    """Bitmaps of a persisted host index, decoded on first access"""
+
+    def __init__(
+        self, decode: Callable[[int, int], int], locations: Mapping[_TKey, tuple[int, int]]
+    ) -> None:
+        self._decode = decode
+        self._locations = locations
+        self._bitmaps: dict[_TKey, int] = {}
+
+    def __getitem__(self, key: _TKey) -> int:
+        try:
+            return self._bitmaps[key]
+        except KeyError:
+            pass
+        bitmap = self._bitmaps[key] = self._decode(*self._locations[key])
+        return bitmap
+
+    def __iter__(self) -> Iterator[_TKey]:
+        return iter(self._locations)
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+
+class _PersistedHostIndex:
+    """The host index and the matching hosts of rule conditions, persisted
+    for other processes working with the same configuration
+
+    The file consists of a fixed size prefix (magic, format version, header
+    length), a JSON header and the concatenated host bitmaps. The header
+    holds the configuration fingerprint, the hosts of the index and the
+    location of the bitmap of every tag, folder and condition.
+
+    The file is memory mapped read only and the bitmaps are only decoded on
+    demand, so all processes using the cache share the same pages.
+    It is replaced atomically when written, which does not affect processes
+    that still have the previous version mapped.
+
+    The label conditions are not part of it. The labels depend on the
+    discovered host labels, which are not part of the configuration. The
+    matching hosts of the other conditions of a rule with labels are
+    persisted, only the labels are checked per process. The per ruleset
+    values are not persisted either, they are the rule values of the
+    matching hosts and cheap to put together from the persisted bitmaps.
+    """
+
+    _MAGIC = b"CMKRMHC\0"
+    _VERSION = 1
+    _PREFIX = struct.Struct("<8sII")
+
+    def __init__(self, data: mmap.mmap, payload_start: int, header: Mapping[str, Any]) -> None:
+        self._data = data
+        self._payload_start = payload_start
+        self._header = header
+        self._conditions: Mapping[str, tuple[int, int]] = {
+            key: (offset, length) for key, offset, length in header["conditions"]
+        }
+
+    @classmethod
+    def load(cls, path: Path, config_fingerprint: str) -> "_PersistedHostIndex | None":
+        try:
+            with path.open("rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, header_length = cls._PREFIX.unpack_from(data)
+            if magic != cls._MAGIC or version != cls._VERSION:
+                return None
+            header = json.loads(data[cls._PREFIX.size : cls._PREFIX.size + header_length])
+        except (OSError, ValueError, struct.error):
+            # ValueError: Empty files can not be mapped or broken header
+            return None
+
+        if header["config_fingerprint"] != config_fingerprint:
+            return None
+
+        return cls(data, cls._PREFIX.size + header_length, header)
+
+    @classmethod
+    def save(
+        cls,
+        path: Path,
+        config_fingerprint: str,
+        host_index: _HostIndex,
+        matching_hosts: Mapping[str, int],
+    ) -> None:
+        payload = bytearray()
+
+        def add(bitmap: int) -> tuple[int, int]:
+            raw = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+            offset = len(payload)
+            payload.extend(raw)
+            return offset, len(raw)
+
+        header = json.dumps(
+            {
+                "config_fingerprint": config_fingerprint,
+                "hosts": host_index.hosts,
+                "tags": [(*tag, *add(bitmap)) for tag, bitmap in host_index.tags.items()],
+                "paths": [(path, *add(bitmap)) for path, bitmap in host_index.paths.items()],
+                "conditions": [(key, *add(bitmap)) for key, bitmap in matching_hosts.items()],
+            }
+        ).encode()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        store.save_bytes_to_file(
+            path, cls._PREFIX.pack(cls._MAGIC, cls._VERSION, len(header)) + header + payload
+        )
+
+    def _bitmap(self, offset: int, length: int) -> int:
+        start = self._payload_start + offset
+        return int.from_bytes(self._data[start : start + length], "little")
+
+    def host_index(self) -> _HostIndex:
+        return _HostIndex(
+            [HostName(hn) for hn in self._header["hosts"]],
+            _PersistedBitmaps(
+                self._bitmap,
+                {
+                    (TagGroupID(taggroup_id), TagID(tag_id)): (offset, length)
+                    for taggroup_id, tag_id, offset, length in self._header["tags"]
+                },
+            ),
+            _PersistedBitmaps(
+                self._bitmap,
+                {path: (offset, length) for path, offset, length in self._header["paths"]},
+            ),
+        )
+
+    def matching_hosts(self, key: str) -> int | None:
+        try:
+            return self._bitmap(*self._conditions[key])
+        except KeyError:
+            return None
+
+    def all_matching_hosts(self) -> dict[str, int]:
+        return {key: self._bitmap(*location) for key, location in self._conditions.items()}
+
+
 class RulesetOptimizer:
     """Performs some precalculations on the configured rulesets to improve the
     processing performance"""
@@ -474,12 +780,11 @@ class RulesetOptimizer:
         all_configured_hosts: set[HostName],
         clusters_of: dict[HostName, list[HostName]],
         nodes_of: dict[HostName, list[HostName]],
+        matching_hosts_cache: MatchingHostsCacheFile | None = None,
     ) -> None:
         super().__init__()
         self._ruleset_matcher = ruleset_matcher
         self._labels = labels
-        self._host_tags = {hn: set(tags_of_host.items()) for hn, tags_of_host in host_tags.items()}
-        self._host_paths = host_paths
         self._clusters_of = clusters_of
         self._nodes_of = nodes_of
 
@@ -491,27 +796,46 @@ class RulesetOptimizer:
         # may contain a reduced set of hosts, since each process handles a subset
         self._all_processed_hosts = self._all_configured_hosts
 
-        # A factor which indicates how much hosts share the same host tag configuration (excluding folders).
-        # len(all_processed_hosts) / len(different tag combinations)
-        # It is used to determine the best rule evualation method
-        self._all_processed_hosts_similarity = 1.0
-
         self._service_ruleset_cache: dict[tuple[int, bool], PreprocessedServiceRuleset] = {}
         self._host_ruleset_cache: dict[tuple[int, bool], PreprocessedHostRuleset[object]] = {}
         self._all_matching_hosts_match_cache: dict[
             tuple[_ConditionCacheID, bool], set[HostName]
         ] = {}
 
-        # Reference dirname -> hosts in this dir including subfolders
-        self._folder_host_lookup: dict[tuple[bool, str], set[HostName]] = {}
-
-        # Provides a list of hosts with the same hosttags, excluding the folder
-        self._hosts_grouped_by_tags: dict[tuple[tuple[TagGroupID, TagID], ...], set[HostName]] = {}
-        # Reference hostname -> tag group reference
-        self._host_grouped_ref: dict[HostName, tuple[tuple[TagGroupID, TagID], ...]] = {}
+        # Matching hosts of the conditions without labels, out of all configured
+        # hosts. These only depend on the hosts, their tags and folders and can
+        # be shared with other processes, see save_matching_hosts_cache().
+        self._matching_hosts_cache = matching_hosts_cache
+        self._persisted_host_index = (
+            None
+            if matching_hosts_cache is None
+            else _PersistedHostIndex.load(
+                matching_hosts_cache.path, matching_hosts_cache.config_fingerprint
+            )
+        )
+        self._shared_matching_hosts: dict[str, int] = {}
+        self._extend_shared_matching_hosts = True
+
+        # Inverted index of the configured hosts. All host sets are represented
+        # as bitmaps over the host positions of this index.
+        self._host_index = self._load_or_build_host_index(host_tags, host_paths)
+        self._all_configured_hosts_bitmap = self._host_index.all_hosts()
+        self._all_processed_hosts_bitmap = self._all_configured_hosts_bitmap
+
+    def _load_or_build_host_index(
+        self, host_tags: TagsOfHosts, host_paths: Mapping[HostName, str]
+    ) -> _HostIndex:
+        if self._persisted_host_index is not None:
+            host_index = self._persisted_host_index.host_index()
+            # Just to be sure: The configuration fingerprint must not be the only
+            # thing keeping us from using a wrong index.
+            if len(host_index.hosts) == len(self._all_configured_hosts) and all(
+                hn in self._all_configured_hosts for hn in host_index.hosts
+            ):
+                return host_index
+            self._persisted_host_index = None
 
-        # TODO: Clean this one up?
-        self._initialize_host_lookup()
+        return _HostIndex.build(self._all_configured_hosts, host_tags, host_paths)
 
     def clear_ruleset_caches(self) -> None:
         self._host_ruleset_cache.clear()
@@ -520,6 +844,26 @@ class RulesetOptimizer:
     def clear_caches(self) -> None:
         self._host_ruleset_cache.clear()
         self._all_matching_hosts_match_cache.clear()
+        self._host_index.clear_label_caches()
+
+    def save_matching_hosts_cache(self) -> None:
+        """Make the host index and the matching hosts computed so far available
+        to other processes working with the same configuration"""
+        if self._matching_hosts_cache is None:
+            return
+
+        matching_hosts = (
+            {}
+            if self._persisted_host_index is None
+            else self._persisted_host_index.all_matching_hosts()
+        )
+        matching_hosts.update(self._shared_matching_hosts)
+        _PersistedHostIndex.save(
+            self._matching_hosts_cache.path,
+            self._matching_hosts_cache.config_fingerprint,
+            self._host_index,
+            matching_hosts,
+        )
 
     def all_processed_hosts(self) -> set[HostName]:
         """Returns a set of all processed hosts"""
@@ -542,28 +886,9 @@ class RulesetOptimizer:
         nodes_and_clusters.intersection_update(self._all_configured_hosts)
         self._all_processed_hosts = nodes_and_clusters
 
-        # The folder host lookup includes a list of all -processed- hosts within a given
-        # folder. Any update with set_all_processed hosts invalidates this cache, because
-        # the scope of relevant hosts has changed. This is -good-, since the values in this
-        # lookup are iterated one by one later on in all_matching_hosts
-        self._folder_host_lookup = {}
-
-        self._adjust_processed_hosts_similarity()
-
-    def _adjust_processed_hosts_similarity(self) -> None:
-        """This function computes the tag similarities between of the processed hosts
-        The result is a similarity factor, which helps finding the most perfomant operation
-        for the current hostset"""
-        used_groups = {
-            self._host_grouped_ref.get(hostname, ()) for hostname in self._all_processed_hosts
-        }
-
-        if not used_groups:
-            self._all_processed_hosts_similarity = 1.0
-            return
-
-        self._all_processed_hosts_similarity = (
-            1.0 * len(self._all_processed_hosts) / len(used_groups)
+        self._all_processed_hosts_bitmap = self._host_index.bitmap_of(nodes_and_clusters)
+        self._extend_shared_matching_hosts = 2 * len(nodes_and_clusters) >= len(
+            self._all_configured_hosts
         )
 
     def get_host_ruleset(
@@ -668,7 +993,7 @@ class RulesetOptimizer:
 
         return negate, regex("(?:%s)" % "|".join("(?:%s)" % p for p in pattern_parts))
 
-    def _all_matching_hosts(  # pylint: disable=too-many-branches
+    def _all_matching_hosts(
         self, condition: RuleConditionsSpec, with_foreign_hosts: bool
     ) -> set[HostName]:
         """Returns a set containing the names of hosts that match the given
@@ -693,69 +1018,104 @@ class RulesetOptimizer:
         except KeyError:
             pass
 
-        if with_foreign_hosts:
-            valid_hosts = self._all_configured_hosts
-        else:
-            valid_hosts = self._all_processed_hosts
-
-        # Thin out the valid hosts further. If the rule is located in a folder
-        # we only need the intersection of the folders hosts and the previously determined valid_hosts
-        valid_hosts = self.get_hosts_within_folder(rule_path, with_foreign_hosts).intersection(
-            valid_hosts
+        scope = (
+            self._all_configured_hosts_bitmap
+            if with_foreign_hosts
+            else self._all_processed_hosts_bitmap
         )
-
-        if tag_conditions and hostlist is None and not labels:
-            # TODO: Labels could also be optimized like the tags
-            matched_by_tags = self._match_hosts_by_tags(cache_id, valid_hosts, tag_conditions)
-            if matched_by_tags is not None:
-                return matched_by_tags
-
-        matching: set[HostName] = set()
-        only_specific_hosts = (
-            hostlist is not None
-            and not isinstance(hostlist, dict)
-            and all(not isinstance(x, dict) for x in hostlist)
+        bitmap = self._matching_hosts_bitmap_shared(
+            self._condition_cache_id(hostlist, tag_conditions, {}, rule_path)
+            if labels
+            else cache_id[0],
+            hostlist,
+            tag_conditions,
+            rule_path,
+            scope,
         )
+        # Labels depend on the discovered host labels. They can not be shared
+        # with other processes and are checked for the remaining hosts only.
+        for label_id, label_spec in labels.items():
+            if not bitmap:
+                break
+            bitmap &= self._host_index.hosts_matching_label_condition(
+                label_id, label_spec, bitmap, self.labels_of_host
+            )
 
-        if hostlist == []:
-            pass  # Empty host list -> Nothing matches
+        matching = self._host_index.hosts_of(bitmap)
+        self._all_matching_hosts_match_cache[cache_id] = matching
+        return matching
 
-        elif not tag_conditions and not labels and not hostlist:
-            # If no tags are specified and the hostlist only include @all (all hosts)
-            matching = valid_hosts
+    def _matching_hosts_bitmap_shared(
+        self,
+        condition_id: _ConditionCacheID,
+        hostlist: HostOrServiceConditions | None,
+        tag_conditions: Mapping[TagGroupID, TagCondition],
+        rule_path: str,
+        scope: int,
+    ) -> int:
+        """Look up the matching hosts in the matching hosts cache
+
+        The cache holds the matching hosts out of all configured hosts. It is
+        only extended by processes dealing with most of the configured hosts
+        anyways, so that processes dealing with a few hosts only (e.g. a check
+        of a single host) don't pay for the others.
+        """
+        key = repr(condition_id)
+        if (bitmap := self._shared_matching_hosts.get(key)) is not None:
+            return bitmap & scope
 
-        elif not tag_conditions and not labels and only_specific_hosts and hostlist is not None:
-            # If no tags are specified and there are only specific hosts we already have the matches
-            matching = valid_hosts.intersection(hostlist)
+        if (
+            self._persisted_host_index is not None
+            and (bitmap := self._persisted_host_index.matching_hosts(key)) is not None
+        ):
+            self._shared_matching_hosts[key] = bitmap
+            return bitmap & scope
 
-        else:
-            # If the rule has only exact host restrictions, we can thin out the list of hosts to check
-            if only_specific_hosts and hostlist is not None:
-                hosts_to_check = valid_hosts.intersection(hostlist)
-            else:
-                hosts_to_check = valid_hosts
-
-            for hostname in hosts_to_check:
-                # When no tag matching is requested, do not filter by tags. Accept all hosts
-                # and filter only by hostlist
-                if tag_conditions and not self.matches_host_tags(
-                    self._host_tags[hostname],
-                    tag_conditions,
-                ):
-                    continue
+        if not self._extend_shared_matching_hosts:
+            return self._matching_hosts_bitmap(hostlist, tag_conditions, rule_path, scope)
 
-                if labels:
-                    host_labels = self.labels_of_host(hostname)
-                    if not matches_labels(host_labels, labels):
-                        continue
+        bitmap = self._matching_hosts_bitmap(
+            hostlist, tag_conditions, rule_path, self._all_configured_hosts_bitmap
+        )
+        self._shared_matching_hosts[key] = bitmap
+        return bitmap & scope
 
-                if not self.matches_host_name(hostlist, hostname):
-                    continue
+    def _matching_hosts_bitmap(
+        self,
+        hostlist: HostOrServiceConditions | None,
+        tag_conditions: Mapping[TagGroupID, TagCondition],
+        rule_path: str,
+        scope: int,
+    ) -> int:
+        """Evaluate the conditions of a rule as intersections of host bitmaps
+
+        The cheap conditions (folder, tags and explicit host names) are applied
+        first. Only the remaining candidates are checked for regex host name
+        conditions, which need to look at the individual hosts.
+        """
+        if hostlist == []:
+            return 0  # Empty host list -> Nothing matches
 
-                matching.add(hostname)
+        matching = scope & self._host_index.hosts_within_folder(rule_path)
 
-        self._all_matching_hosts_match_cache[cache_id] = matching
-        return matching
+        for taggroup_id, tag_condition in tag_conditions.items():
+            if not matching:
+                return 0
+            matching &= self._host_index.hosts_matching_tag_condition(taggroup_id, tag_condition)
+
+        if not hostlist or not matching:
+            return matching
+
+        negate, host_entries = parse_negated_condition_list(hostlist)
+        if all(not isinstance(entry, dict) for entry in host_entries):
+            explicit_hosts = self._host_index.bitmap_of(cast(Iterable[HostName], host_entries))
+            return matching & ~explicit_hosts if negate else matching & explicit_hosts
+
+        return self._host_index.bitmap_of(
+            hostname
+            for hostname in self._host_index.hosts_of(matching)
+            if self.matches_host_name(hostlist, hostname)
+        )
 
     def matches_host_name(
         self, host_entries: HostOrServiceConditions | None, hostname: HostName
@@ -795,7 +1155,12 @@ class RulesetOptimizer:
     ) -> _ConditionCacheID:
         host_parts: list[str] = []
 
-        if hostlist is not None:
+        if hostlist == []:
+            # Nothing matches an empty host list. Use a regex matching nothing to
+            # not share the ID with the conditions without host_name.
+            host_parts.append("~(?!)")
+
+        elif hostlist is not None:
             negate, hostlist = parse_negated_condition_list(hostlist)
             if negate:
                 host_parts.append("!")
@@ -822,98 +1187,15 @@ class RulesetOptimizer:
             rule_path,
         )
 
-    # TODO: Generalize this optimization: Build some kind of key out of the tag conditions
-    # (positive, negative, ...). Make it work with the new tag group based "$or" handling.
-    def _match_hosts_by_tags(
-        self,
-        cache_id: tuple[_ConditionCacheID, bool],
-        valid_hosts: set[HostName],
-        tag_conditions: Mapping[TagGroupID, TagCondition],
-    ) -> set[HostName] | None:
-        matching = set()
-        negative_match_tags = set()
-        positive_match_tags = set()
-        for taggroup_id, tag_condition in tag_conditions.items():
-            if isinstance(tag_condition, dict):
-                if "$ne" in tag_condition:
-                    negative_match_tags.add(
-                        (
-                            taggroup_id,
-                            cast(TagConditionNE, tag_condition)["$ne"],
-                        )
-                    )
-                    continue
-
-                if "$or" in tag_condition:
-                    return None  # Can not be optimized, makes _all_matching_hosts proceed
-
-                if "$nor" in tag_condition:
-                    return None  # Can not be optimized, makes _all_matching_hosts proceed
-
-                raise NotImplementedError()
-
-            positive_match_tags.add((taggroup_id, tag_condition))
-
-        # TODO:
-        # if has_specific_folder_tag or self._all_processed_hosts_similarity < 3.0:
-        if self._all_processed_hosts_similarity < 3.0:
-            # Without shared folders
-            for hostname in valid_hosts:
-                if positive_match_tags <= self._host_tags[
-                    hostname
-                ] and not negative_match_tags.intersection(self._host_tags[hostname]):
-                    matching.add(hostname)
-
-            self._all_matching_hosts_match_cache[cache_id] = matching
-            return matching
-
-        # With shared folders
-        checked_hosts: set[str] = set()
-        for hostname in valid_hosts:
-            if hostname in checked_hosts:
-                continue
-
-            hosts_with_same_tag = self._filter_hosts_with_same_tags_as_host(hostname, valid_hosts)
-            checked_hosts.update(hosts_with_same_tag)
-
-            if positive_match_tags <= self._host_tags[
-                hostname
-            ] and not negative_match_tags.intersection(self._host_tags[hostname]):
-                matching.update(hosts_with_same_tag)
-
-        self._all_matching_hosts_match_cache[cache_id] = matching
-        return matching
-
-    def _filter_hosts_with_same_tags_as_host(
-        self,
-        hostname: HostName,
-        hosts: set[HostName],
-    ) -> set[HostName]:
-        return self._hosts_grouped_by_tags[self._host_grouped_ref[hostname]].intersection(hosts)
-
     def get_hosts_within_folder(self, folder_path: str, with_foreign_hosts: bool) -> set[HostName]:
-        cache_id = with_foreign_hosts, folder_path
-        if cache_id not in self._folder_host_lookup:
-            hosts_in_folder = set()
-            relevant_hosts = (
-                self._all_configured_hosts if with_foreign_hosts else self._all_processed_hosts
+        return self._host_index.hosts_of(
+            self._host_index.hosts_within_folder(folder_path)
+            & (
+                self._all_configured_hosts_bitmap
+                if with_foreign_hosts
+                else self._all_processed_hosts_bitmap
             )
-
-            for hostname in relevant_hosts:
-                host_path = self._host_paths.get(hostname, "/")
-                if host_path.startswith(folder_path):
-                    hosts_in_folder.add(hostname)
-
-            self._folder_host_lookup[cache_id] = hosts_in_folder
-            return hosts_in_folder
-
-        return self._folder_host_lookup[cache_id]
-
-    def _initialize_host_lookup(self) -> None:
-        for hostname in self._all_configured_hosts:
-            group_ref = tuple(sorted(self._host_tags[hostname]))
-            self._hosts_grouped_by_tags.setdefault(group_ref, set()).add(hostname)
-            self._host_grouped_ref[hostname] = group_ref
+        )
 
     @instance_method_lru_cache(maxsize=None)
     def labels_of_host(self, hostname: HostName) -> Labels:
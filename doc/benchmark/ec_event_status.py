@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Measure the message throughput of the Event Console event status
+
+Fills the event status with a number of open events (spread over rules and
+hosts) and processes messages like the event server does for matching rules:
+
+* count: the message is counted on the existing event of its rule and host
+* cancel: the message cancels the events of its rule and host
+
+For comparison, the time of looking up the events of the messages by scanning
+all open events (like the event status did before it indexed the events) is
+measured as well. The throughput of the event status should not depend on the
+number of open events. Run it from the repository root:
+
+    OMD_SITE=bench PYTHONPATH=. python3 doc/benchmark/ec_event_status.py --events 1000 100000
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import cmk.ec.export as ec
+from cmk.ec.config import Count, Rule
+from cmk.ec.event import Event
+from cmk.ec.main import EventStatus, make_config
+from cmk.ec.perfcounters import Perfcounters
+
+_COUNT: Count = {
+    "count": 1000000,
+    "period": 86400,
+    "algorithm": "interval",
+    "count_duration": None,
+    "count_ack": False,
+    "separate_host": True,
+    "separate_application": False,
+    "separate_match_groups": False,
+}
+
+
+class _NoHistory:
+    def add(self, event: Event, what: str, who: str = "", addinfo: str = "") -> None:
+        pass
+
+
+class _EventServer:
+    """The part of the event server used by the event status for these messages"""
+
+    def __init__(self, event_status: EventStatus) -> None:
+        self._event_status = event_status
+
+    def new_event_respecting_limits(self, event: Event) -> bool:
+        self._event_status.new_event(event)
+        return True
+
+
+def _event(rule_id: str, host: str) -> Event:
+    now = time.time()
+    return {
+        "rule_id": rule_id,
+        "host": host,
+        "core_host": host,
+        "text": "message",
+        "phase": "counting",
+        "time": now,
+        "first": now,
+        "last": now,
+        "application": "",
+        "facility": 1,
+        "priority": 3,
+        "match_groups": (),
+        "host_in_downtime": False,
+    }
+
+
+def _make_event_status(omd_root: Path, num_events: int, rules: int, hosts: int) -> EventStatus:
+    event_status = EventStatus(
+        ec.settings("bench", omd_root, omd_root / "etc/check_mk", ["mkeventd"]),
+        make_config(ec.default_config()),
+        Perfcounters(logging.getLogger("bench")),
+        _NoHistory(),  # type: ignore[arg-type]
+        logging.getLogger("bench"),
+    )
+    for num in range(num_events):
+        event_status.new_event(_event(str(num % rules), f"host{num // rules % hosts}"))
+    return event_status
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--events", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--rules", type=int, default=100)
+    parser.add_argument("--hosts", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'Open events':>12} {'count msg/s':>12} {'cancel msg/s':>13} {'scan msg/s':>11}")
+    for num_events in args.events:
+        rnd = random.Random(args.seed)
+        messages = [
+            (str(rnd.randrange(args.rules)), f"host{rnd.randrange(args.hosts)}")
+            for _ in range(args.messages)
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            event_status = _make_event_status(Path(tmp_dir), num_events, args.rules, args.hosts)
+            event_server = _EventServer(event_status)
+
+            start = time.perf_counter()
+            for rule_id, host in messages:
+                event_status.count_event(
+                    event_server, _event(rule_id, host), rule_id, _COUNT  # type: ignore[arg-type]
+                )
+            count_rate = len(messages) / (time.perf_counter() - start)
+
+            events = event_status.events()
+            start = time.perf_counter()
+            for rule_id, host in messages:
+                _found = [e for e in events if e["rule_id"] == rule_id and e["host"] == host]
+            scan_rate = len(messages) / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for rule_id, host in messages:
+                rule: Rule = {"id": rule_id}
+                event_status.cancel_events(
+                    event_server,  # type: ignore[arg-type]
+                    [],
+                    _event(rule_id, host),
+                    {"match_groups_message_ok": ()},
+                    rule,
+                )
+            cancel_rate = len(messages) / (time.perf_counter() - start)
+
+        print(f"{num_events:12d} {count_rate:12.0f} {cancel_rate:13.0f} {scan_rate:11.0f}")
+
+
+if __name__ == "__main__":
+    main()
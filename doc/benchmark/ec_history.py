@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compare the history queries of the Event Console archive modes "file" and "segments"
+
+Writes the same synthetic event history with both archive modes and runs typical
+queries of the GUI history views on them:
+
+* host: the entries of one host, limited like the GUI does
+* rule: the entries of one rule and host
+* event: the entries of one event
+* recent: the youngest entries without filters
+
+Both results are compared to make sure the segments do not change the outcome (the
+file backend may return one additional entry per file, which is cut off like the
+status table does). Run it from the repository root:
+
+    OMD_SITE=bench PYTHONPATH=. python3 doc/benchmark/ec_history.py --entries 200000
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import cmk.ec.export as ec
+from cmk.ec.history import History
+from cmk.ec.main import make_config, StatusTableEvents, StatusTableHistory
+from cmk.ec.query import QueryGET
+
+
+class _StatusServer:
+    """The part of the status server used by the queries"""
+
+    def __init__(self) -> None:
+        self._table = StatusTableHistory(logging.getLogger("bench"), None)  # type: ignore[arg-type]
+
+    def table(self, name: str) -> StatusTableHistory:
+        return self._table
+
+
+def _make_history(omd_root: Path, archive_mode: str) -> History:
+    config = make_config(ec.default_config())
+    config["archive_mode"] = archive_mode  # type: ignore[typeddict-item]
+    return History(
+        ec.settings("bench", omd_root, omd_root / "etc/check_mk", ["mkeventd"]),
+        config,
+        logging.getLogger("bench"),
+        StatusTableEvents.columns,
+        StatusTableHistory.columns,
+    )
+
+
+def _fill(history: History, num_entries: int, hosts: int, rules: int, seed: int) -> None:
+    rnd = random.Random(seed)
+    for num in range(num_entries):
+        history.add(
+            {
+                "id": num,
+                "host": f"host{rnd.randrange(hosts)}",
+                "rule_id": f"rule{rnd.randrange(rules)}",
+                "application": "app",
+                "text": f"Something happened on interface {rnd.randrange(48)}",
+                "first": 1700000000.0 + num,
+                "last": 1700000000.0 + num,
+            },
+            rnd.choice(["NEW", "DELETE", "CANCELLED"]),
+        )
+
+
+def _run(history: History, query: QueryGET) -> list[list[object]]:
+    rows = list(history.get(query))
+    return rows[: query.limit] if query.limit is not None else rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--entries", type=int, default=200000)
+    parser.add_argument("--hosts", type=int, default=2000)
+    parser.add_argument("--rules", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    status_server = _StatusServer()
+    queries = {
+        "host": ["Filter: event_host = host17", "Limit: 1000"],
+        "rule": ["Filter: event_rule_id = rule3", "Filter: event_host = host17"],
+        "event": [f"Filter: event_id = {args.entries // 3}"],
+        "recent": ["Limit: 1000"],
+    }
+
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        histories = {}
+        for archive_mode in ("file", "segments"):
+            history = histories[archive_mode] = _make_history(
+                Path(tmp_dir, archive_mode), archive_mode
+            )
+            start = time.perf_counter()
+            _fill(history, args.entries, args.hosts, args.rules, args.seed)
+            print(f"Writing {archive_mode:<8} {time.perf_counter() - start:8.3f}s")
+
+        print(f"{'Query':<8} {'file':>9} {'segments':>9}")
+        for name, headers in queries.items():
+            results = {}
+            durations = {}
+            for archive_mode, history in histories.items():
+                query = QueryGET(
+                    status_server,  # type: ignore[arg-type]
+                    ["GET history", *headers],
+                    logging.getLogger("bench"),
+                )
+                start = time.perf_counter()
+                results[archive_mode] = _run(history, query)
+                durations[archive_mode] = time.perf_counter() - start
+            print(f"{name:<8} {durations['file']:8.3f}s {durations['segments']:8.3f}s")
+            # The history lines of the file backend are the line numbers in the file and the
+            # history times differ between the writes, so compare the entries without them
+            if [r[2:] for r in results["file"]] != [r[2:] for r in results["segments"]]:
+                print(f"Mismatching results of query {name}")
+                mismatches += 1
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Measure the syslog message throughput of the event server by number of parsing workers
+
+Generates synthetic syslog messages (RFC 3164 and RFC 5424, from a number of hosts and
+applications) and a rule pack with rules matching on the message text, the host and the
+syslog application, most messages are not matched by any rule. The messages are queued and
+processed by the event server like received messages, without and with parsing workers.
+
+The events created and the rules tried in all runs are compared to make sure the workers do
+not change the outcome. The host lookups in the monitoring core are left out. Run it from the repository
+root:
+
+    OMD_SITE=bench PYTHONPATH=. python3 doc/benchmark/ec_parsing.py --workers 0 1 2 4 8
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import cmk.ec.export as ec
+from cmk.ec.config import Config, Rule
+from cmk.ec.event import Event
+from cmk.ec.helpers import ECLock
+from cmk.ec.ingestion import ReceivedMessage
+from cmk.ec.main import (
+    default_slave_status_master,
+    EventServer,
+    EventStatus,
+    make_config,
+    StatusTableEvents,
+)
+from cmk.ec.perfcounters import Perfcounters
+
+_APPLICATIONS = ["sshd", "CRON", "kernel", "postfix/smtpd", "systemd", "nginx", "java", "dhcpd"]
+_WORDS = "user session started stopped connection from port timeout disk error link up".split()
+
+
+class _NoHistory:
+    def add(self, event: Event, what: str, who: str = "", addinfo: str = "") -> None:
+        pass
+
+
+class _EventServer(EventServer):
+    def _add_core_host_to_new_event(self, event: Event) -> None:
+        event["core_host"] = None
+        event["host_in_downtime"] = False
+
+
+def _generate_messages(num_messages: int, hosts: int, rnd: random.Random) -> list[bytes]:
+    messages = []
+    for num in range(num_messages):
+        host = f"host{rnd.randrange(hosts):05d}"
+        application = rnd.choice(_APPLICATIONS)
+        text = " ".join(rnd.choices(_WORDS, k=rnd.randint(3, 12))) + f" id={num}"
+        priority = rnd.randrange(8) + 8 * rnd.choice([1, 3, 4, 10, 16, 23])
+        if num % 2:
+            messages.append(
+                f"<{priority}>Oct 18 09:10:11 {host} {application}[{num % 30000}]: {text}".encode()
+            )
+        else:
+            messages.append(
+                f"<{priority}>1 2023-10-18T09:10:11.123+02:00 {host} {application} {num % 30000}"
+                f" ID{num % 50} - {text}".encode()
+            )
+    return messages
+
+
+def _make_rules(num_rules: int, hosts: int, rnd: random.Random) -> list[Rule]:
+    rules: list[Rule] = []
+    for num in range(num_rules):
+        rule: Rule = {
+            "id": f"rule{num}",
+            "state": 1,
+            "sl": {"value": 0, "precedence": "message"},
+            "actions": [],
+            "actions_in_downtime": True,
+            "cancel_actions": [],
+            "cancel_action_phases": "always",
+            "autodelete": False,
+            "disabled": False,
+            "invert_matching": False,
+            "description": "",
+            "comment": "",
+            "docu_url": "",
+        }
+        kind = num % 4
+        if kind == 0:
+            rule["match"] = f"{rnd.choice(_WORDS)} {rnd.choice(_WORDS)} (\\w+) {rnd.choice(_WORDS)}"
+        elif kind == 1:
+            rule["match"] = f"id=\\d*{rnd.randrange(10000)}$"
+        elif kind == 2:
+            rule["match_host"] = f"host{rnd.randrange(hosts):05d}"
+            rule["match"] = rnd.choice(_WORDS)
+        else:
+            rule["match_application"] = rnd.choice(_APPLICATIONS)
+            rule["match"] = f"{rnd.choice(_WORDS)}.*{rnd.choice(_WORDS)}.*error"
+            rule["match_priority"] = (3, 0)
+        rules.append(rule)
+    return rules
+
+
+def _run(
+    omd_root: Path, config: Config, messages: list[bytes], num_workers: int
+) -> tuple[float, list[tuple[object, ...]], int]:
+    settings = ec.settings("bench", omd_root, omd_root / "etc/check_mk", ["mkeventd"])
+    logger = logging.getLogger("bench")
+    perfcounters = Perfcounters(logger)
+    history = _NoHistory()
+    event_status = EventStatus(settings, config, perfcounters, history, logger)  # type: ignore[arg-type]
+    event_server = _EventServer(
+        logger,
+        settings,
+        config,
+        default_slave_status_master(),
+        perfcounters,
+        ECLock(logger),
+        history,  # type: ignore[arg-type]
+        event_status,
+        StatusTableEvents.columns,
+        False,
+    )
+    config = config.copy()
+    config["parsing_workers"] = num_workers
+    event_server.reload_configuration(config)
+    # Start the workers before measuring
+    event_server._ingestion_queue.put([ReceivedMessage(b"warm up", None)])
+    event_server.process_ingestion_queue()
+    event_status.flush()
+    perfcounters._counters["rule_tries"] = 0
+
+    event_server._ingestion_queue.put(ReceivedMessage(message, None) for message in messages)
+    start = time.perf_counter()
+    while event_server._ingestion_queue:
+        event_server.process_ingestion_queue()
+    rate = len(messages) / (time.perf_counter() - start)
+    event_server._stop_parsing_workers()
+    return (
+        rate,
+        sorted((e["rule_id"], e["host"], e["text"]) for e in event_status.events()),
+        perfcounters._counters["rule_tries"],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--rules", type=int, default=200)
+    parser.add_argument("--hosts", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    messages = _generate_messages(args.messages, args.hosts, rnd)
+    config = make_config(ec.default_config())
+    config["rule_packs"] = [ec.default_rule_pack(_make_rules(args.rules, args.hosts, rnd))]
+
+    print(f"Messages: {len(messages)}, rules: {args.rules}")
+    print(f"{'Workers':>8} {'msg/s':>10} {'speedup':>8} {'events':>8}")
+    expected = None
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for num_workers in args.workers:
+            rate, events, rule_tries = _run(Path(tmp_dir), config, messages, num_workers)
+            baseline = baseline or rate
+            print(f"{num_workers:8d} {rate:10.0f} {rate / baseline:8.2f} {len(events):8d}")
+            if expected is None:
+                expected = (events, rule_tries)
+            elif (events, rule_tries) != expected:
+                print("Mismatching events or rule tries")
+                raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
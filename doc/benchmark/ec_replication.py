@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compare the size and time of complete and delta replication responses of the event status
+
+Fills the event status of a master with open events, changes a number of them like between
+two syncs of a slave and measures the REPLICATE response of the master and the time the slave
+needs to apply it, for the complete event status and for the changes since the last sync. Run
+it from the repository root:
+
+    OMD_SITE=bench PYTHONPATH=. python3 doc/benchmark/ec_replication.py --events 200000
+"""
+
+import argparse
+import ast
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import cmk.ec.export as ec
+from cmk.ec.event import Event
+from cmk.ec.helpers import ECLock
+from cmk.ec.main import EventStatus, make_config, replication_send
+from cmk.ec.perfcounters import Perfcounters
+
+
+class _NoHistory:
+    def add(self, event: Event, what: str, who: str = "", addinfo: str = "") -> None:
+        pass
+
+
+def _event(rnd: random.Random, num: int) -> Event:
+    host = f"host{rnd.randrange(5000):05d}"
+    return {
+        "rule_id": f"rule{rnd.randrange(200)}",
+        "host": host,
+        "core_host": host,
+        "text": f"Something happened on {host}, occurrence {num}",
+        "phase": "open",
+        "state": rnd.randrange(4),
+        "count": 1,
+        "first": time.time(),
+        "last": time.time(),
+        "application": "bench",
+        "priority": 3,
+        "facility": 1,
+        "comment": "",
+        "contact": "",
+        "owner": "",
+        "match_groups": (),
+        "ipaddress": "",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--changes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    logger = logging.getLogger("bench")
+    config = make_config(ec.default_config())
+    lock = ECLock(logger)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        settings = ec.settings("bench", Path(tmp_dir), Path(tmp_dir) / "etc", ["mkeventd"])
+        master, slave = (
+            EventStatus(settings, config, Perfcounters(logger), _NoHistory(), logger)  # type: ignore[arg-type]
+            for _ in range(2)
+        )
+        for num in range(args.events):
+            master.new_event(_event(rnd, num))
+        slave.unpack_status(
+            ast.literal_eval(repr(replication_send(config, lock, master, 0)["status"]))
+        )
+
+        print(f"Events: {args.events}")
+        print(
+            f"{'Changes':>8} {'full bytes':>12} {'full ms':>8} {'delta bytes':>12} {'delta ms':>9}"
+        )
+        for num_changes in args.changes:
+            position = master.journal.position()
+            for event in rnd.sample(master.events(), num_changes // 2):
+                event["count"] += 1
+                master.event_changed(event)
+            for event in rnd.sample(master.events(), num_changes // 4):
+                master.remove_event(event, "DELETE")
+            for num in range(num_changes - num_changes // 2 - num_changes // 4):
+                master.new_event(_event(rnd, num))
+
+            results = []
+            for request_position in (None, position):
+                start = time.perf_counter()
+                response = repr(replication_send(config, lock, master, 0, request_position))
+                new_state = ast.literal_eval(response)
+                if "delta" in new_state:
+                    slave.unpack_status_delta(new_state["delta"])
+                else:
+                    slave.unpack_status(new_state["status"])
+                results.append((len(response), (time.perf_counter() - start) * 1000))
+            (full_bytes, full_ms), (delta_bytes, delta_ms) = results
+            print(
+                f"{num_changes:8d} {full_bytes:12d} {full_ms:8.0f} {delta_bytes:12d} {delta_ms:9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
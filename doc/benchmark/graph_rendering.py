@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compare the point by point and the vectorized computation of combined graphs
+
+Computes the curves of a combined graph over many services like the GUI does after fetching
+the RRD data: the time series with a finer resolution are downsampled to the resolution of
+the first one, then the sum, the maximum and the average of all time series are evaluated.
+The previous way does this point by point in Python, the current way with NumPy on all
+points at once. Run it in a site from the repository root:
+
+    PYTHONPATH=. python3 doc/benchmark/graph_rendering.py --services 300 --days 365
+"""
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+from cmk.utils.prediction import rrd_timestamps, TimeSeries, TimeSeriesValues, TimeWindow
+from cmk.utils.prediction._prediction import aggregation_functions
+
+from cmk.gui.graphing._timeseries import _time_series_math, op_func_wrapper, time_series_operators
+from cmk.gui.graphing._type_defs import Operators
+
+_OPERATORS: list[Operators] = ["+", "MAX", "AVERAGE"]
+
+
+def _previous_downsample(series: TimeSeries, twindow: TimeWindow, cf: str) -> TimeSeriesValues:
+    dwsa = []
+    co: TimeSeriesValues = []
+    desired_times = rrd_timestamps(twindow)
+    i = 0
+    for t, val in series.time_data_pairs():
+        if t > desired_times[i]:
+            dwsa.append(aggregation_functions(co, cf))
+            co = []
+            i += 1
+        co.append(val)
+    diff_len = len(desired_times) - len(dwsa)
+    if diff_len > 0:
+        dwsa.append(aggregation_functions(co, cf))
+        dwsa += [None] * (diff_len - 1)
+    return dwsa
+
+
+def _previous(series: list[TimeSeries]) -> list[TimeSeries]:
+    twindow = series[0].twindow
+    aligned = [series[0]] + [
+        TimeSeries(_previous_downsample(s, twindow, "max"), twindow) for s in series[1:]
+    ]
+    operators = time_series_operators()
+    return [
+        TimeSeries([op_func_wrapper(operators[op][1], list(tsp)) for tsp in zip(*aligned)], twindow)
+        for op in _OPERATORS
+    ]
+
+
+def _current(series: list[TimeSeries]) -> list[TimeSeries]:
+    twindow = series[0].twindow
+    aligned = [series[0]] + [TimeSeries(s.downsample(twindow, "max"), twindow) for s in series[1:]]
+    return [result for op in _OPERATORS if (result := _time_series_math(op, aligned)) is not None]
+
+
+def _series(rnd: random.Random, start: int, end: int, step: int) -> TimeSeries:
+    return TimeSeries(
+        [None if rnd.random() < 0.02 else rnd.uniform(0, 100) for _t in range(start, end, step)],
+        (start, end, step),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--services", type=int, default=300)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--step", type=int, default=1800, help="seconds between the points")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    end = int(time.time()) // 86400 * 86400
+    start = end - args.days * 86400
+    # Every fourth service has RRD data of a finer resolution
+    series = [
+        _series(rnd, start, end, args.step // 6 if n % 4 == 3 else args.step)
+        for n in range(args.services)
+    ]
+
+    print(f"Services: {args.services}, points per curve: {len(series[0])}")
+    print(f"{'Way':>9} {'seconds':>8}")
+    results = []
+    compute: Callable[[list[TimeSeries]], list[TimeSeries]]
+    for name, compute in (("previous", _previous), ("current", _current)):
+        start_time = time.perf_counter()
+        results.append(compute(series))
+        print(f"{name:>9} {time.perf_counter() - start_time:8.2f}")
+
+    for previous, current in zip(*results):
+        assert all(
+            (p is None and c is None) or (p is not None and c is not None and abs(p - c) < 1e-6)
+            for p, c in zip(previous, current)
+        )
+
+
+if __name__ == "__main__":
+    main()
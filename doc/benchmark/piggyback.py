@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compare the piggyback storages "files" and "database"
+
+Stores the piggyback data of sources sending data for many piggybacked hosts, e.g. vSphere
+servers and their VMs, for some check cycles. After every cycle the piggyback data of all
+piggybacked hosts is read like the piggyback fetchers do, at the end the clean up runs. The
+storage "files" writes a file per piggybacked host, the storage "database" one transaction per
+source. Run it from the repository root, it only writes to a temporary directory:
+
+    PYTHONPATH=. python3 doc/benchmark/piggyback.py --sources 2 --hosts 6000 --cycles 3
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import cmk.utils.paths
+import cmk.utils.piggyback as piggyback
+from cmk.utils.hostaddress import HostName
+
+
+def _run(
+    storage: piggyback.PiggybackStorage,
+    directory: Path,
+    sources: int,
+    hosts: int,
+    cycles: int,
+    size: int,
+) -> tuple[float, float, float]:
+    cmk.utils.paths.piggyback_dir = directory / "piggyback"
+    cmk.utils.paths.piggyback_source_dir = directory / "piggyback_sources"
+    cmk.utils.paths.piggyback_database = directory / "piggyback.db"
+    piggyback.set_storage(storage)
+    time_settings: piggyback.PiggybackTimeSettings = [(None, "max_cache_age", 3600)]
+
+    lines = [b"<<<esx_vsphere_vm>>>", *(b"x" * 79 for _n in range(size // 80))]
+    raw_data = [
+        {HostName(f"vm-{source}-{host}"): lines for host in range(hosts)}
+        for source in range(sources)
+    ]
+
+    store_time = read_time = 0.0
+    for _cycle in range(cycles):
+        start = time.perf_counter()
+        for source, piggybacked_raw_data in enumerate(raw_data):
+            piggyback.store_piggyback_raw_data(HostName(f"source-{source}"), piggybacked_raw_data)
+        store_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for piggybacked_raw_data in raw_data:
+            for piggybacked_hostname in piggybacked_raw_data:
+                assert piggyback.get_piggyback_raw_data(piggybacked_hostname, time_settings)
+        read_time += time.perf_counter() - start
+
+    start = time.perf_counter()
+    piggyback.cleanup_piggyback_files(time_settings)
+    cleanup_time = time.perf_counter() - start
+    return store_time / cycles, read_time / cycles, cleanup_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--sources", type=int, default=2)
+    parser.add_argument("--hosts", type=int, default=6000, help="piggybacked hosts per source")
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--size", type=int, default=4000, help="bytes per piggybacked host")
+    args = parser.parse_args()
+
+    print(f"Sources: {args.sources}, piggybacked hosts per source: {args.hosts}")
+    print(f"{'Storage':>9} {'store s/cycle':>14} {'read s/cycle':>13} {'cleanup s':>10}")
+    storage: piggyback.PiggybackStorage
+    for storage in ("files", "database"):
+        with tempfile.TemporaryDirectory() as directory:
+            store_time, read_time, cleanup_time = _run(
+                storage, Path(directory), args.sources, args.hosts, args.cycles, args.size
+            )
+        print(f"{storage:>9} {store_time:14.2f} {read_time:13.2f} {cleanup_time:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compare the computation of predictive levels with one query per slice and with batched queries
+
+Computes the prediction data of services like the checks with predictive levels do after
+midnight: the RRD data of all slices within the horizon is fetched via Livestatus and
+statistically summarized. The Livestatus connection is simulated, every query takes the given
+latency and returns random data. The previous way fetches every slice with its own query and
+summarizes the data point by point in Python, the current way fetches all slices with one
+query and summarizes them with NumPy. Run it from the repository root:
+
+    PYTHONPATH=. python3 doc/benchmark/prediction.py --services 100 --horizon 90
+"""
+
+import argparse
+import math
+import random
+import re
+import time
+from collections.abc import Sequence
+
+from cmk.utils.prediction import _prediction
+from cmk.utils.prediction._prediction import DataStat, TimeSeries, TimeSeriesValues
+
+_COLUMN = re.compile(r"rrddata:m\d+:[^:]+:(\d+):(\d+):\d+:(\d+)")
+
+
+class _SimulatedConnection:
+    def __init__(self, latency: float, seed: int) -> None:
+        self.latency = latency
+        self.queries = 0
+        self._rnd = random.Random(seed)
+
+    def query_value(self, query: str) -> object:
+        return self.query_row(query)[0]
+
+    def query_row(self, query: str) -> list[object]:
+        self.queries += 1
+        time.sleep(self.latency)
+        return [self._rrddata(*map(int, m)) for m in _COLUMN.findall(query)]
+
+    def _rrddata(self, fromtime: int, untiltime: int, max_entries: int) -> list[object]:
+        # Like rrdtool: the finest resolution of at most max_entries points, stored by minute
+        step = 60 * math.ceil((untiltime - fromtime) / max_entries / 60)
+        start = fromtime - fromtime % step
+        end = untiltime + (-untiltime % step)
+        values = [
+            None if self._rnd.random() < 0.01 else self._rnd.uniform(0, 100)
+            for _t in range(start, end, step)
+        ]
+        return [start, end, step, *values]
+
+
+def _previous_data_stats(slices: list[TimeSeriesValues]) -> list[DataStat | None]:
+    descriptors: list[DataStat | None] = []
+    for time_column in zip(*slices):
+        point_line = [x for x in time_column if x is not None]
+        if point_line:
+            average = sum(point_line) / float(len(point_line))
+            samples = len(point_line)
+            descriptors.append(
+                DataStat(
+                    average=average,
+                    min_=min(point_line),
+                    max_=max(point_line),
+                    stdev=None
+                    if samples == 1
+                    else math.sqrt(
+                        abs(sum(p**2 for p in point_line) - average**2 * samples)
+                        / float(samples - 1)
+                    ),
+                )
+            )
+        else:
+            descriptors.append(None)
+    return descriptors
+
+
+def _previous(
+    connection: _SimulatedConnection, time_windows: Sequence[tuple[int, int]]
+) -> list[DataStat | None]:
+    from_time = time_windows[0][0]
+    raw_slices = []
+    for start, end in time_windows:
+        response = _prediction.get_rrd_data(
+            connection, "host", "CPU load", "load15", "MAX", start, end  # type: ignore[arg-type]
+        )
+        raw_slices.append((TimeSeries(list(response.values), response.window), from_time - start))
+    _twindow, slices = _prediction._upsample(raw_slices)  # pylint: disable=protected-access
+    return _previous_data_stats(slices)
+
+
+def _current(
+    connection: _SimulatedConnection, time_windows: Sequence[tuple[int, int]]
+) -> list[DataStat | None]:
+    from_time = time_windows[0][0]
+    responses = _prediction.get_rrd_data_of_time_ranges(
+        connection, "host", "CPU load", "load15", "MAX", time_windows  # type: ignore[arg-type]
+    )
+    raw_slices = [
+        (TimeSeries(list(response.values), response.window), from_time - start)
+        for response, (start, _end) in zip(responses, time_windows)
+    ]
+    _twindow, slices = _prediction._upsample(raw_slices)  # pylint: disable=protected-access
+    return _prediction._data_stats(slices)  # pylint: disable=protected-access
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--services", type=int, default=100)
+    parser.add_argument("--horizon", type=int, default=90, help="days")
+    parser.add_argument("--period", choices=list(_prediction.PREDICTION_PERIODS), default="hour")
+    parser.add_argument("--latency", type=float, default=2.0, help="ms per Livestatus query")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    now = int(time.time())
+    period_info = _prediction.PREDICTION_PERIODS[args.period]
+    timegroup = _prediction.get_timegroup_relative_time(now, period_info)[0]
+    time_windows = _prediction._time_slices(  # pylint: disable=protected-access
+        now, args.horizon * 86400, period_info, timegroup
+    )
+
+    print(f"Services: {args.services}, slices per service: {len(time_windows)}")
+    print(f"{'Way':>9} {'queries':>8} {'ms/service':>11}")
+    results = []
+    for name, compute in (("previous", _previous), ("current", _current)):
+        connection = _SimulatedConnection(args.latency / 1000, args.seed)
+        start = time.perf_counter()
+        for _n in range(args.services):
+            points = compute(connection, time_windows)
+        duration = time.perf_counter() - start
+        results.append(points)
+        print(
+            f"{name:>9} {connection.queries // args.services:8d} "
+            f"{duration * 1000 / args.services:11.2f}"
+        )
+
+    previous, current = results
+    assert len(previous) == len(current)
+    assert all(
+        (p is None and c is None)
+        or (p is not None and c is not None and math.isclose(p.average, c.average))
+        for p, c in zip(previous, current)
+    )
+
+
+if __name__ == "__main__":
+    main()
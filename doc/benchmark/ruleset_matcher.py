@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compare the host ruleset matching against a linear scan over all hosts
+
+Creates a synthetic configuration (hosts with tags, folders and labels plus a
+ruleset with mixed conditions) and computes the matching rule values of all
+hosts three times:
+
+* linear: every rule condition is evaluated against every host
+* indexed: the RulesetMatcher, which evaluates the conditions on host bitmaps
+* cached: a new RulesetMatcher using the matching hosts cache written by the
+  indexed run, like the helpers do after the core config has been created
+
+The results are compared to make sure the optimization does not change the
+outcome. Run it from the repository root:
+
+    PYTHONPATH=. python3 doc/benchmark/ruleset_matcher.py --hosts 50000 --rules 1000
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
+from cmk.utils.hostaddress import HostName
+from cmk.utils.rulesets.ruleset_matcher import (
+    LabelManager,
+    matches_labels,
+    MatchingHostsCacheFile,
+    RulesetMatcher,
+    RuleSpec,
+    TagsOfHosts,
+)
+from cmk.utils.tags import TagGroupID, TagID
+
+_TAG_GROUPS = {
+    TagGroupID("agent"): [TagID("cmk-agent"), TagID("no-agent"), TagID("special-agents")],
+    TagGroupID("snmp_ds"): [TagID("no-snmp"), TagID("snmp-v1"), TagID("snmp-v2")],
+    TagGroupID("criticality"): [TagID("prod"), TagID("critical"), TagID("test"), TagID("offline")],
+    TagGroupID("networking"): [TagID("lan"), TagID("wan"), TagID("dmz")],
+}
+_FOLDERS = ["/"] + [f"/dc{dc}/rack{rack}/" for dc in range(10) for rack in range(20)]
+_LABELS = {"os": ["linux", "windows", "aix"], "env": ["prod", "qa", "dev"]}
+
+
+def _make_config(
+    num_hosts: int, rnd: random.Random
+) -> tuple[set[HostName], TagsOfHosts, dict[HostName, str], dict[HostName, dict[str, str]]]:
+    hosts = {HostName(f"host{i:06d}") for i in range(num_hosts)}
+    host_tags: TagsOfHosts = {
+        hn: {group: rnd.choice(tags) for group, tags in _TAG_GROUPS.items()} for hn in hosts
+    }
+    host_paths = {hn: rnd.choice(_FOLDERS) for hn in hosts}
+    host_labels = {hn: {k: rnd.choice(v) for k, v in _LABELS.items()} for hn in hosts}
+    return hosts, host_tags, host_paths, host_labels
+
+
+def _make_ruleset(
+    num_rules: int, hosts: Sequence[HostName], rnd: random.Random
+) -> Sequence[RuleSpec[int]]:
+    rules: list[RuleSpec[int]] = []
+    for value in range(num_rules):
+        condition: dict = {}
+        if rnd.random() < 0.3:
+            condition["host_folder"] = rnd.choice(_FOLDERS)
+        if rnd.random() < 0.7:
+            group = rnd.choice(list(_TAG_GROUPS))
+            tag_id = rnd.choice(_TAG_GROUPS[group])
+            condition["host_tags"] = {
+                group: rnd.choice([tag_id, {"$ne": tag_id}, {"$or": _TAG_GROUPS[group][:2]}])
+            }
+        if rnd.random() < 0.2:
+            label = rnd.choice(list(_LABELS))
+            condition["host_labels"] = {label: rnd.choice(_LABELS[label])}
+        if rnd.random() < 0.2:
+            condition["host_name"] = rnd.sample(hosts, 20)
+        elif rnd.random() < 0.05:
+            condition["host_name"] = [{"$regex": f"host0{rnd.randint(0, 9)}"}]
+        rules.append({"id": str(value), "value": value, "condition": condition})
+    return rules
+
+
+def _make_matcher(
+    hosts: set[HostName],
+    host_tags: TagsOfHosts,
+    host_paths: dict[HostName, str],
+    host_labels: dict[HostName, dict[str, str]],
+    matching_hosts_cache: MatchingHostsCacheFile | None = None,
+) -> RulesetMatcher:
+    return RulesetMatcher(
+        tag_to_group_map={},
+        host_tags=host_tags,
+        host_paths=host_paths,
+        labels=LabelManager(
+            explicit_host_labels=host_labels,
+            host_label_rules=(),
+            service_label_rules=(),
+            discovered_labels_of_service=lambda *args, **kw: {},
+        ),
+        all_configured_hosts=hosts,
+        clusters_of={},
+        nodes_of={},
+        matching_hosts_cache=matching_hosts_cache,
+    )
+
+
+def _linear_scan(
+    matcher: RulesetMatcher,
+    ruleset: Sequence[RuleSpec[int]],
+    hosts: set[HostName],
+    host_tags: TagsOfHosts,
+    host_paths: dict[HostName, str],
+    host_labels: dict[HostName, dict[str, str]],
+) -> dict[HostName, list[int]]:
+    optimizer = matcher.ruleset_optimizer
+    tags_of_host = {hn: set(host_tags[hn].items()) for hn in hosts}
+    values: dict[HostName, list[int]] = {}
+    for rule in ruleset:
+        condition = rule["condition"]
+        for hostname in hosts:
+            if not host_paths.get(hostname, "/").startswith(condition.get("host_folder", "/")):
+                continue
+            if not optimizer.matches_host_tags(
+                tags_of_host[hostname], condition.get("host_tags", {})
+            ):
+                continue
+            if not matches_labels(host_labels[hostname], condition.get("host_labels", {})):
+                continue
+            if not optimizer.matches_host_name(condition.get("host_name"), hostname):
+                continue
+            values.setdefault(hostname, []).append(rule["value"])
+    return values
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--hosts", type=int, default=50000)
+    parser.add_argument("--rules", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    hosts, host_tags, host_paths, host_labels = _make_config(args.hosts, rnd)
+    ruleset = _make_ruleset(args.rules, sorted(hosts), rnd)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = MatchingHostsCacheFile(Path(tmp_dir, "ruleset_matcher_cache"), "benchmark")
+
+        start = time.perf_counter()
+        matcher = _make_matcher(hosts, host_tags, host_paths, host_labels, cache)
+        index_time = time.perf_counter() - start
+        print(f"Hosts: {len(hosts)}, rules: {len(ruleset)}")
+        print(f"Building the host index:  {index_time:8.3f}s")
+
+        start = time.perf_counter()
+        expected = _linear_scan(matcher, ruleset, hosts, host_tags, host_paths, host_labels)
+        print(f"Linear scan:              {time.perf_counter() - start:8.3f}s")
+
+        start = time.perf_counter()
+        indexed = {hn: matcher.get_host_values(hn, ruleset) for hn in hosts}
+        print(f"Indexed matching:         {time.perf_counter() - start:8.3f}s")
+
+        matcher.ruleset_optimizer.save_matching_hosts_cache()
+
+        start = time.perf_counter()
+        matcher = _make_matcher(hosts, host_tags, host_paths, host_labels, cache)
+        print(f"Loading the host index:   {time.perf_counter() - start:8.3f}s")
+
+        start = time.perf_counter()
+        cached = {hn: matcher.get_host_values(hn, ruleset) for hn in hosts}
+        print(f"Cached matching:          {time.perf_counter() - start:8.3f}s")
+
+    mismatches = [hn for hn in hosts if not expected.get(hn, []) == indexed[hn] == cached[hn]]
+    print(f"Mismatching hosts:        {len(mismatches):8d}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
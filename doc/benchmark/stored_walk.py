@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compare the walks on a stored walk file against rereading the file per walk
+
+Creates a synthetic walk file (interface like tables below a number of
+enterprise OIDs) and walks a random selection of table columns:
+
+* reread: the file is read and searched for every walk, like the stored walk
+  backend did before it indexed the walk files
+* indexed: the StoredWalkSNMPBackend, which indexes the file once
+
+Both results are compared to make sure the index does not change the outcome.
+Run it from the repository root:
+
+    PYTHONPATH=. python3 doc/benchmark/stored_walk.py --rows 200000 --walks 200
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from cmk.utils.hostaddress import HostAddress, HostName
+
+from cmk.snmplib import SNMPBackendEnum, SNMPHostConfig, SNMPRowInfo
+
+from cmk.fetchers.snmp_backend import StoredWalkSNMPBackend
+from cmk.fetchers.snmp_backend._utils import strip_snmp_value
+
+_COLUMNS = 20
+
+
+def _write_walk(path: Path, num_rows: int, num_tables: int) -> list[str]:
+    columns = []
+    with path.open("w") as f:
+        for table in range(num_tables):
+            for column in range(1, _COLUMNS + 1):
+                base = f".1.3.6.1.4.1.{table}.1.1.{column}"
+                columns.append(base)
+                for row in range(num_rows // num_tables // _COLUMNS):
+                    f.write(f'{base}.{row} "value {table} {column} {row}"\n')
+    return columns
+
+
+def _reread_walk(path: Path, oid: str) -> SNMPRowInfo:
+    def to_tuple(o: str) -> tuple[int, ...]:
+        return tuple(map(int, o.strip(".").split(".")))
+
+    lines = StoredWalkSNMPBackend.read_walk_from_path(path)
+    prefix = to_tuple(oid)
+    begin, end = 0, len(lines)
+    while begin < end:
+        current = (begin + end) // 2
+        if to_tuple(lines[current].split(None, 1)[0]) < prefix:
+            begin = current + 1
+        else:
+            end = current
+
+    rows: SNMPRowInfo = []
+    for line in lines[begin:]:
+        o, value = line.split(None, 1)
+        if to_tuple(o)[: len(prefix)] != prefix:
+            break
+        rows.append((o, strip_snmp_value(value)))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--tables", type=int, default=50)
+    parser.add_argument("--walks", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir, "walk")
+        columns = _write_walk(path, args.rows, args.tables)
+        oids = random.Random(args.seed).choices(columns, k=args.walks)
+        print(f"Walk file: {path.stat().st_size / 1024 / 1024:.1f} MB, walks: {len(oids)}")
+
+        start = time.perf_counter()
+        expected = [_reread_walk(path, oid) for oid in oids]
+        print(f"Reread per walk:   {time.perf_counter() - start:8.3f}s")
+
+        backend = StoredWalkSNMPBackend(
+            SNMPHostConfig(
+                is_ipv6_primary=False,
+                hostname=HostName("benchmark"),
+                ipaddress=HostAddress("127.0.0.1"),
+                credentials="",
+                port=161,
+                is_bulkwalk_host=False,
+                is_snmpv2or3_without_bulkwalk_host=False,
+                bulk_walk_size_of=0,
+                timing={},
+                oid_range_limits={},
+                snmpv3_contexts=[],
+                character_encoding="ascii",
+                snmp_backend=SNMPBackendEnum.STORED_WALK,
+            ),
+            logging.getLogger("benchmark"),
+            path=path,
+        )
+        start = time.perf_counter()
+        indexed = [backend.walk(oid) for oid in oids]
+        print(f"Indexed:           {time.perf_counter() - start:8.3f}s")
+
+    mismatches = sum(a != b for a, b in zip(expected, indexed))
+    print(f"Mismatching walks: {mismatches:8d}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compare the storage formats of the value store
+
+Simulates check cycles of hosts with rate based services: every cycle loads the value
+store of a host, updates the counters of all services and saves the changes. This is done
+for the standard format, the binary format and the binary format with the writes of all
+hosts of a cycle collected in a batch, like a keepalive checker would do. Run it from the
+repository root:
+
+    OMD_SITE=bench PYTHONPATH=. python3 doc/benchmark/value_store.py --hosts 200 --services 500
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from cmk.utils.hostaddress import HostName
+
+from cmk.checkengine.checking import CheckPluginName, ServiceID
+
+from cmk.base.api.agent_based.value_store import (
+    batched_value_store_writes,
+    get_value_store,
+    load_host_value_store,
+    ValueStoreFormat,
+    ValueStoreManager,
+)
+
+_SERVICES = ServiceID(CheckPluginName("interfaces"), None)
+
+
+def _check_cycle(
+    hosts: list[HostName], services: int, storage_format: ValueStoreFormat, now: float
+) -> None:
+    for host_name in hosts:
+        with load_host_value_store(
+            host_name, store_changes=True, storage_format=storage_format
+        ) as manager:
+            for item in range(services):
+                with manager.namespace(ServiceID(_SERVICES.name, str(item))):
+                    value_store = get_value_store()
+                    value_store["in_octets"] = (now, int(now) * item)
+                    value_store["out_octets"] = (now, int(now) * item * 2)
+
+
+def _run(
+    directory: Path,
+    hosts: list[HostName],
+    services: int,
+    cycles: int,
+    storage_format: ValueStoreFormat,
+    batched: bool,
+) -> float:
+    ValueStoreManager.STORAGE_PATH = directory
+    start = time.perf_counter()
+    for cycle in range(cycles):
+        if batched:
+            with batched_value_store_writes(max_hosts=len(hosts)):
+                _check_cycle(hosts, services, storage_format, cycle * 60.0)
+        else:
+            _check_cycle(hosts, services, storage_format, cycle * 60.0)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--hosts", type=int, default=200)
+    parser.add_argument("--services", type=int, default=500)
+    parser.add_argument("--cycles", type=int, default=10)
+    args = parser.parse_args()
+
+    hosts = [HostName(f"host{n:05d}") for n in range(args.hosts)]
+    print(f"Hosts: {args.hosts}, services per host: {args.services}, cycles: {args.cycles}")
+    print(f"{'format':>16} {'ms/host':>8} {'size/host':>10}")
+    for storage_format, batched in (("standard", False), ("binary", False), ("binary", True)):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            directory = Path(tmp_dir)
+            duration = _run(directory, hosts, args.services, args.cycles, storage_format, batched)
+            size = sum(p.stat().st_size for p in directory.iterdir()) / args.hosts
+        name = f"{storage_format}{' batched' if batched else ''}"
+        print(f"{name:>16} {duration * 1000 / args.hosts / args.cycles:8.2f} {size:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
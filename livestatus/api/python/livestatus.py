@@ -12,16 +12,17 @@ import json
 import os
 import re
 import select
+import selectors
 import socket
 import ssl
 import threading
 import time
-from collections.abc import Iterator, Sequence
+from collections.abc import Callable, Iterator, Sequence
 from dataclasses import dataclass, field
 from enum import Enum
 from functools import cache
 from io import BytesIO
-from typing import Any, Literal, NamedTuple, NewType
+from typing import Any, Final, Literal, NamedTuple, NewType
 
 from typing_extensions import TypedDict
 
@@ -144,10 +145,6 @@ class LivestatusTestingError(RuntimeError):
 #   |  Global variables and Exception classes                              |
 #   '----------------------------------------------------------------------'
 
-# TODO: This mechanism does not take different connection options into account
-# Keep a global array of persistent connections
-persistent_connections: dict[str, socket.socket] = {}
-
 # Regular expression for removing Cache: headers if caching is not allowed
 remove_cache_regex = re.compile("\nCache:[^\n]*")
 
@@ -498,6 +495,169 @@ def _parse_socket_url(url: str) -> tuple[socket.AddressFamily, str | tuple[str,
     )
 
 
+@dataclass(frozen=True)
+class ConnectionPoolStats:
+    """Statistics of the pooled connections to a site"""
+
+    idle: int
+    in_use: int
+    connects: int
+    connect_seconds: float
+    reuses: int
+    discarded: int
+
+    @property
+    def reuse_ratio(self) -> float:
+        acquired = self.connects + self.reuses
+        return self.reuses / acquired if acquired else 0.0
+
+    @property
+    def avg_connect_seconds(self) -> float:
+        return self.connect_seconds / self.connects if self.connects else 0.0
+
+
+@dataclass
+class _PooledSite:
+    idle: list[tuple[socket.socket, float]] = field(default_factory=list)
+    in_use: set[int] = field(default_factory=set)
+    connects: int = 0
+    connect_seconds: float = 0.0
+    reuses: int = 0
+    discarded: int = 0
+
+
+class ConnectionPool:
+    """Keeps the connections to the sites for later queries of the process
+
+    Connecting to a site, especially the TLS handshake with a remote site, is
+    expensive compared to most queries. Connections which are not needed
+    anymore are kept idle and handed out again later (the most recently used
+    one first). Before being handed out, an idle connection is checked: It is
+    closed in case it has been idle for longer than max_idle_time or in case
+    the other side has closed it (or sent unexpected data). At most
+    max_idle_connections idle connections are kept per site, further released
+    ones are closed. The number of connections in use is not limited.
+
+    The pool is not shared with forked processes: A child process starts with
+    an empty pool and does not use the connections of its parent.
+    """
+
+    def __init__(self, max_idle_time: float = 60.0, max_idle_connections: int = 4) -> None:
+        self.max_idle_time = max_idle_time
+        self.max_idle_connections = max_idle_connections
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._sites: dict[str, _PooledSite] = {}
+
+    def acquire(
+        self, socketurl: str, connect: Callable[[], socket.socket]
+    ) -> tuple[socket.socket, bool]:
+        """Returns a connection to the site and whether it is a reused one"""
+        with self._lock:
+            site = self._site(socketurl)
+            while site.idle:
+                site_socket, released_at = site.idle.pop()
+                if time.monotonic() - released_at <= self.max_idle_time and _is_idle_socket_usable(
+                    site_socket
+                ):
+                    site.in_use.add(id(site_socket))
+                    site.reuses += 1
+                    return site_socket, True
+                _close_quietly(site_socket)
+                site.discarded += 1
+
+        before = time.monotonic()
+        site_socket = connect()
+        with self._lock:
+            site = self._site(socketurl)
+            site.in_use.add(id(site_socket))
+            site.connects += 1
+            site.connect_seconds += time.monotonic() - before
+        return site_socket, False
+
+    def release(self, socketurl: str, site_socket: socket.socket) -> None:
+        """Takes back a connection, which must not have a response pending"""
+        with self._lock:
+            site = self._site(socketurl)
+            if id(site_socket) not in site.in_use:
+                # Not handed out by this pool, e.g. inherited from the parent process
+                _close_quietly(site_socket)
+                return
+            site.in_use.discard(id(site_socket))
+            if len(site.idle) >= self.max_idle_connections:
+                _close_quietly(site_socket)
+                site.discarded += 1
+                return
+            site.idle.append((site_socket, time.monotonic()))
+
+    def discard(self, socketurl: str, site_socket: socket.socket) -> None:
+        """Closes a connection handed out by the pool which can not be reused"""
+        with self._lock:
+            site = self._site(socketurl)
+            if id(site_socket) in site.in_use:
+                site.in_use.discard(id(site_socket))
+                site.discarded += 1
+        _close_quietly(site_socket)
+
+    def clear(self) -> None:
+        """Closes the idle connections"""
+        with self._lock:
+            for site in self._sites.values():
+                for site_socket, _released_at in site.idle:
+                    _close_quietly(site_socket)
+                site.idle.clear()
+
+    def stats(self) -> dict[str, ConnectionPoolStats]:
+        with self._lock:
+            self._check_pid()
+            return {
+                socketurl: ConnectionPoolStats(
+                    idle=len(site.idle),
+                    in_use=len(site.in_use),
+                    connects=site.connects,
+                    connect_seconds=site.connect_seconds,
+                    reuses=site.reuses,
+                    discarded=site.discarded,
+                )
+                for socketurl, site in self._sites.items()
+            }
+
+    def _site(self, socketurl: str) -> _PooledSite:
+        self._check_pid()
+        return self._sites.setdefault(socketurl, _PooledSite())
+
+    def _check_pid(self) -> None:
+        if self._pid == os.getpid():
+            return
+        # Forked: The connections belong to the parent process. Closing them here
+        # only closes the file descriptors of this process.
+        for site in self._sites.values():
+            for site_socket, _released_at in site.idle:
+                _close_quietly(site_socket)
+        self._sites.clear()
+        self._pid = os.getpid()
+
+
+def _is_idle_socket_usable(site_socket: socket.socket) -> bool:
+    # An idle connection must not have anything to read. Otherwise the other side
+    # has closed the connection or the data is left over from an earlier response.
+    try:
+        return not is_socket_readable(site_socket, 0.0)
+    except (OSError, ValueError):
+        return False
+
+
+def _close_quietly(site_socket: socket.socket) -> None:
+    try:
+        site_socket.close()
+    except OSError:
+        pass
+
+
+# The connections of the sites with persistent connections enabled
+connection_pool = ConnectionPool()
+
+
 class SingleSiteConnection(Helpers):
     # So we only collect in a specific thread, and not in all of them. We also use
     # a class-variable for this case, so we activate this across all sites at once.
@@ -528,6 +688,8 @@ class SingleSiteConnection(Helpers):
         self.socket: socket.socket | None = None
         self.timeout: int | None = None
         self.successful_persistence = False
+        # Whether a response has not been read completely from the socket
+        self.response_pending = False
         self._output_format = LivestatusOutputFormat.PYTHON
 
         # Whether to establish an encrypted connection
@@ -551,18 +713,17 @@ class SingleSiteConnection(Helpers):
         if self.socket:
             self.socket.settimeout(float(timeout))
 
-    def _try_get_persisted_connection(self) -> socket.socket | None:
-        if self.persist and self.socketurl in persistent_connections:
-            self.successful_persistence = True
-            return persistent_connections[self.socketurl]
-        return None
-
     def connect(self) -> None:
-        if (site_socket := self._try_get_persisted_connection()) is None:
-            site_socket = self._create_new_socket_connection()
-            if self.persist:
-                persistent_connections[self.socketurl] = site_socket
-        self.socket = site_socket
+        self.response_pending = False
+        if not self.persist:
+            self.socket = self._create_new_socket_connection()
+            return
+        self.socket, self.successful_persistence = connection_pool.acquire(
+            self.socketurl, self._create_new_socket_connection
+        )
+        if self.successful_persistence:
+            # The timeout of the previous user of the connection must not apply
+            self.socket.settimeout(float(self.timeout) if self.timeout else None)
 
     def _create_new_socket_connection(self) -> socket.socket:
         self.successful_persistence = False
@@ -632,23 +793,28 @@ class SingleSiteConnection(Helpers):
         )
 
     def disconnect(self) -> None:
+        """Gives up the connection, a persistent one is kept in the pool if it can be reused"""
+        if self.persist and self.socket is not None and not self.response_pending:
+            connection_pool.release(self.socketurl, self.socket)
+            self.socket = None
+            self.successful_persistence = False
+            return
         self._close_socket()
 
     def _close_socket(self) -> None:
         if self.socket is not None:
-            try:
-                self.socket.close()
-            except OSError:
-                pass
+            if self.persist:
+                connection_pool.discard(self.socketurl, self.socket)
+            else:
+                try:
+                    self.socket.close()
+                except OSError:
+                    pass
 
             self.socket = None
 
         if self.persist:
             self.successful_persistence = False
-            try:
-                del persistent_connections[self.socketurl]
-            except KeyError:
-                pass
 
     def receive_data(self, size: int, timeout: float | None = None) -> bytes:
         if self.socket is None:
@@ -714,6 +880,7 @@ class SingleSiteConnection(Helpers):
             raise MKLivestatusSocketError("Socket to '%s' is not connected" % self.socketurl)
 
         try:
+            self.response_pending = True
             self.socket.sendall(query.encode("utf-8") + b"\n\n")
             if getattr(self.collect_queries, "active", False):
                 self.collect_queries.queries.append(query)
@@ -738,34 +905,15 @@ class SingleSiteConnection(Helpers):
         timeout_at: float | None = None,
     ) -> bytes:
         try:
-            # Headers are always ASCII encoded
-            resp = self.receive_data(16)
-            code = resp[0:3].decode("ascii")
-            try:
-                length = int(resp[4:15].lstrip())
-            except Exception:
-                self.disconnect()
-                raise MKLivestatusSocketError(
-                    f"Malformed response header {resp!r}. Livestatus TCP socket might be unreachable or wrong encryption settings are used."
-                )
+            code, length = self._receive_response_header()
 
             # Apply a lower timeout for the content because the data is already available
             # in the socket. The liveproxyd (same system) has the complete data available
             # while the data from a standard connection can still take some time.
             # 30 seconds should be more than enough for the maximum telegram size of 100MB
             data = self.receive_data(length, 30)
-
-            if code == "200":
-                return data
-
-            error_info = data.decode("utf-8")
-            if code == "404":
-                raise MKLivestatusTableNotFoundError(f"Not Found ({code}): {error_info!r}")
-
-            if code == "502":
-                raise MKLivestatusBadGatewayError(error_info)
-
-            raise MKLivestatusQueryError(f"{code}: {error_info}")
+            self.response_pending = False
+            return self.check_response_code(code, data)
 
         except (MKLivestatusSocketClosed, OSError) as e:
             # In case of an IO error or the other side having
@@ -805,6 +953,62 @@ class SingleSiteConnection(Helpers):
             # FIXME: ? self.disconnect()
             raise MKLivestatusSocketError("Unhandled exception: %s" % e)
 
+    def _receive_response_header(self) -> tuple[str, int]:
+        """Reads the fixed16 header, returns the response code and the length of the content"""
+        # Headers are always ASCII encoded
+        resp = self.receive_data(16)
+        code = resp[0:3].decode("ascii")
+        try:
+            length = int(resp[4:15].lstrip())
+        except Exception:
+            self.disconnect()
+            raise MKLivestatusSocketError(
+                f"Malformed response header {resp!r}. Livestatus TCP socket might be unreachable or wrong encryption settings are used."
+            )
+        return code, length
+
+    def _receive_rows(self, query: str) -> Iterator[LivestatusRow]:
+        try:
+            code, length = self._receive_response_header()
+        except (MKLivestatusSocketClosed, OSError):
+            # Like receive_raw_response(): The other side may have closed a keepalive
+            # connection in the meantime, reconnect and send the query again (once).
+            self.disconnect()
+            time.sleep(0.1)
+            self.connect()
+            self.send_query(query)
+            code, length = self._receive_response_header()
+
+        if code != "200":
+            data = self.receive_data(length, 30)
+            self.response_pending = False
+            self.check_response_code(code, data)
+
+        # The content timeout applies to every chunk instead of the whole content
+        # because the rows are processed by the caller while the content is read.
+        parser = _ResponseRowParser(self._output_format)
+        while length > 0:
+            data = self.receive_data(min(length, 65536), 30)
+            length -= len(data)
+            yield from parser.feed(data)
+        self.response_pending = False
+        yield from parser.close()
+
+    @staticmethod
+    def check_response_code(code: str, data: bytes) -> bytes:
+        """Returns the data of a successful response, raises the error of a failed one"""
+        if code == "200":
+            return data
+
+        error_info = data.decode("utf-8")
+        if code == "404":
+            raise MKLivestatusTableNotFoundError(f"Not Found ({code}): {error_info!r}")
+
+        if code == "502":
+            raise MKLivestatusBadGatewayError(error_info)
+
+        raise MKLivestatusQueryError(f"{code}: {error_info}")
+
     def parse_raw_response(self, raw_response: bytes, query: Query) -> LivestatusResponse:
         data = raw_response.decode("utf-8")
         try:
@@ -847,6 +1051,36 @@ class SingleSiteConnection(Helpers):
                 row.insert(0, b"")
         return response
 
+    def query_iter(self, query: QueryTypes, add_headers: str = "") -> Iterator[LivestatusRow]:
+        """Like query(), but yields the rows while the response is being received
+
+        The rows are parsed line by line instead of decoding the whole response
+        at once, so large responses do not need to be held in memory. In case
+        the iteration is stopped early, the connection is closed.
+        """
+        normalized_query = Query(query) if not isinstance(query, Query) else query
+
+        if self.limit is not None:
+            normalized_query = Query(
+                "%sLimit: %d\n" % (normalized_query, self.limit),
+                normalized_query.suppress_exceptions,
+            )
+
+        with _livestatus_output_format_switcher(normalized_query, self):
+            str_query = self.build_query(normalized_query, add_headers)
+            self.send_query(str_query)
+            complete = False
+            try:
+                for row in self._receive_rows(str_query):
+                    if self.prepend_site:
+                        row.insert(0, b"")
+                    yield row
+                complete = True
+            finally:
+                # The rest of the response must not remain in the socket
+                if not complete:
+                    self.disconnect()
+
     def command(self, command: str, site: SiteId | None = None) -> None:
         command_str = command.rstrip("\n")
         if not command_str.startswith("["):
@@ -916,6 +1150,167 @@ class ConnectedSite(NamedTuple):
 ConnectedSites = list[ConnectedSite]
 
 
+class _ResponseRowParser:
+    """Parses the rows of a response while it is being received
+
+    Livestatus writes every row of the python3 and json output formats to a
+    line of its own, so the rows can be parsed line by line instead of
+    decoding the whole response at once. The last line received is only
+    parsed together with the following data, because it may end the response.
+    """
+
+    def __init__(self, output_format: LivestatusOutputFormat) -> None:
+        self._parse: Callable[[str], Any] = (
+            json.loads if output_format is LivestatusOutputFormat.JSON else ast.literal_eval
+        )
+        self._buffer = bytearray()
+        self._pending = ""
+        self._at_start = True
+
+    def feed(self, data: bytes) -> list[LivestatusRow]:
+        """Adds received data, returns the rows which are complete"""
+        self._buffer += data
+        if (end := self._buffer.rfind(b"\n")) == -1:
+            return []
+        if (end := self._buffer.rfind(b"\n", 0, end)) == -1:
+            return []
+        lines = bytes(self._buffer[:end])
+        del self._buffer[: end + 1]
+        return self._parse_lines(lines, final=False)
+
+    def close(self) -> list[LivestatusRow]:
+        """Returns the remaining rows once the response has been received completely"""
+        lines = bytes(self._buffer)
+        self._buffer.clear()
+        return self._parse_lines(lines, final=True)
+
+    def _parse_lines(self, lines: bytes, final: bool) -> list[LivestatusRow]:
+        try:
+            text = lines.decode("utf-8")
+        except UnicodeDecodeError:
+            raise MKLivestatusQueryError("Malformed raw response output")
+
+        # Strip the brackets around the whole response
+        if self._at_start:
+            text = text.lstrip()
+            if not text and not final:
+                return []
+            if not text.startswith("["):
+                raise MKLivestatusQueryError("Malformed raw response output")
+            text = text[1:]
+            self._at_start = False
+        if final:
+            text = text.rstrip()
+            if not text.endswith("]"):
+                raise MKLivestatusQueryError("Malformed raw response output")
+            text = text[:-1]
+
+        if not self._pending and (candidate := text.strip().rstrip(",")):
+            try:
+                # Usually all the lines hold complete rows, parse them at once
+                return self._parse(f"[{candidate}]")
+            except (ValueError, SyntaxError):
+                pass
+
+        rows: list[LivestatusRow] = []
+        for line in text.split("\n"):
+            self._pending = f"{self._pending}\n{line}" if self._pending else line
+            if not (candidate := self._pending.strip().rstrip(",")):
+                self._pending = ""
+                continue
+            try:
+                # A line may hold several rows, e.g. in case of a response in a single line
+                rows.extend(self._parse(f"[{candidate}]"))
+            except (ValueError, SyntaxError):
+                continue  # The row continues on the next line
+            self._pending = ""
+
+        if final and self._pending:
+            raise MKLivestatusQueryError("Malformed raw response output")
+        return rows
+
+
+class _SiteResponseReader:
+    """Receives the response to a query from a site without blocking
+
+    The data is read whenever it is available on the socket, which makes it
+    possible to receive the responses of many sites at the same time. The
+    response has to be received within the timeout of the site, the content
+    within 30 seconds after the response header (like receive_raw_response()).
+    The rows of a successful response are parsed while they are received.
+    """
+
+    def __init__(self, connected_site: ConnectedSite, query: str, retried: bool = False) -> None:
+        self.connected_site: Final = connected_site
+        self.query: Final = query
+        self.retried: Final = retried
+        self.timeout_at: float | None = (
+            time.time() + connected_site.connection.timeout
+            if connected_site.connection.timeout
+            else None
+        )
+        self._code: str | None = None
+        self._length = 16  # Size of the fixed16 response header
+        self._received = 0
+        self._buffer = bytearray()
+        self._parser = _ResponseRowParser(connected_site.connection.get_output_format())
+        self._rows = LivestatusResponse([])
+
+    @property
+    def socket(self) -> socket.socket:
+        if (site_socket := self.connected_site.connection.socket) is None:
+            raise MKLivestatusSocketError(
+                "Socket to '%s' is not connected" % self.connected_site.connection.socketurl
+            )
+        return site_socket
+
+    def read(self) -> LivestatusResponse | None:
+        """Reads the available data, returns the rows of the response once it is complete"""
+        site_socket = self.socket
+        site_socket.settimeout(0.0)
+        try:
+            while (wanted := self._length - self._received) > 0:
+                try:
+                    packet = site_socket.recv(min(wanted, 65536))
+                except (BlockingIOError, ssl.SSLWantReadError):
+                    return None
+                if not packet:
+                    raise MKLivestatusSocketClosed(
+                        "Read zero data from socket, remote peer closed connection."
+                    )
+                self._received += len(packet)
+
+                if self._code == "200":
+                    self._rows.extend(self._parser.feed(packet))
+                    continue
+
+                self._buffer += packet
+                if self._code is None and self._received == self._length:
+                    self._read_header()
+        finally:
+            site_socket.settimeout(self.connected_site.connection.timeout)
+
+        assert self._code is not None
+        self.connected_site.connection.response_pending = False
+        SingleSiteConnection.check_response_code(self._code, bytes(self._buffer))
+        self._rows.extend(self._parser.close())
+        return self._rows
+
+    def _read_header(self) -> None:
+        # Headers are always ASCII encoded
+        header = bytes(self._buffer)
+        try:
+            self._length = int(header[4:15].lstrip())
+        except ValueError:
+            raise MKLivestatusSocketError(
+                f"Malformed response header {header!r}. Livestatus TCP socket might be unreachable or wrong encryption settings are used."
+            )
+        self._code = header[0:3].decode("ascii")
+        self._received = 0
+        self._buffer.clear()
+        self.timeout_at = time.time() + 30
+
+
 class MultiSiteConnection(Helpers):
     def __init__(  # pylint: disable=too-many-branches
         self, sites: SiteConfigurations, disabled_sites: SiteConfigurations | None = None
@@ -1178,11 +1573,51 @@ class MultiSiteConnection(Helpers):
     # New parallelized version of query(). The semantics differs in the handling
     # of Limit: since all sites are queried in parallel, the Limit: is simply
     # applied to all sites - resulting in possibly more results then Limit requests.
-    def query_parallel(  # pylint: disable=too-many-branches
+    def query_parallel(
         self,
         query: Query,
         add_headers: str = "",
     ) -> LivestatusResponse:
+        # Keep the order of the sites, independent of the order of the responses
+        position = {connected_site.id: pos for pos, connected_site in enumerate(self.connections)}
+        site_responses = sorted(
+            self._receive_parallel(query, add_headers),
+            key=lambda site_response: position[site_response[0].id],
+        )
+
+        result = LivestatusResponse([])
+        for _connected_site, rows in site_responses:
+            result.extend(rows)
+        return result
+
+    def query_iter(self, query: QueryTypes, add_headers: str = "") -> Iterator[LivestatusRow]:
+        """Like query(), but yields the rows of every site as soon as they are available
+
+        The rows are not ordered by site. In case the iteration is stopped
+        early, the connections to the sites which have not responded yet are
+        closed.
+        """
+        normalized_query = Query(query) if not isinstance(query, Query) else query
+
+        with _livestatus_output_format_switcher(normalized_query, self):
+            if not self.parallelize:
+                yield from self.query_non_parallel(normalized_query, add_headers)
+                return
+
+            for _connected_site, rows in self._receive_parallel(normalized_query, add_headers):
+                yield from rows
+
+    def _receive_parallel(  # pylint: disable=too-many-branches
+        self,
+        query: Query,
+        add_headers: str,
+    ) -> Iterator[tuple[ConnectedSite, LivestatusResponse]]:
+        """Sends the query to all sites and yields the rows of every site as it has responded
+
+        The responses are received from all sites at the same time, so a slow
+        site does not delay the processing of the other responses. Sites not
+        responding within their timeout are considered dead.
+        """
         stillalive = []
         if self.only_sites is not None:
             connect_to_sites = [c for c in self.connections if c[0] in self.only_sites]
@@ -1198,12 +1633,13 @@ class MultiSiteConnection(Helpers):
             limit_header = ""
 
         # First send all queries
-        retrieve_responses: list[tuple[str, ConnectedSite]] = []
+        selector = selectors.DefaultSelector()
         for connected_site in connect_to_sites:
             try:
                 str_query = connected_site.connection.build_query(query, add_headers + limit_header)
                 connected_site.connection.send_query(str_query)
-                retrieve_responses.append((str_query, connected_site))
+                reader = _SiteResponseReader(connected_site, str_query)
+                selector.register(reader.socket, selectors.EVENT_READ, reader)
             except LivestatusTestingError:
                 raise
             except Exception as e:
@@ -1212,55 +1648,94 @@ class MultiSiteConnection(Helpers):
                     "site": connected_site.config,
                 }
 
-        # Then retrieve all raw responses. We will be as slow as the slowest of all connections.
-        site_responses: list[tuple[ConnectedSite, bytes]] = []
-        for str_query, connected_site in retrieve_responses:
+        def unregister(fileobj: selectors.FileDescriptorLike) -> None:
+            if fileobj in selector.get_map():
+                selector.unregister(fileobj)
+
+        def mark_dead(reader: _SiteResponseReader, exception: Exception) -> None:
+            reader.connected_site.connection.disconnect()
+            self.deadsites[reader.connected_site.id] = {
+                "exception": exception,
+                "site": reader.connected_site.config,
+            }
+
+        def retry(reader: _SiteResponseReader) -> None:
+            # In case of an IO error or the other side having closed the socket
+            # do a reconnect and try again, but only once.
+            reader.connected_site.connection.disconnect()
             try:
-                site_responses.append(
-                    (
-                        connected_site,
-                        connected_site.connection.receive_raw_response(
-                            str_query, query.suppress_exceptions
-                        ),
-                    )
+                reader.connected_site.connection.send_query(reader.query)
+                retried_reader = _SiteResponseReader(
+                    reader.connected_site, reader.query, retried=True
                 )
-            except query.suppress_exceptions:
-                # Mostly handles exception types MKLivestatusTableNotFoundError
-                stillalive.append(connected_site)
-                continue
+                selector.register(retried_reader.socket, selectors.EVENT_READ, retried_reader)
             except LivestatusTestingError:
                 raise
             except Exception as e:
-                connected_site.connection.disconnect()
-                self.deadsites[connected_site.id] = {
-                    "exception": e,
-                    "site": connected_site.config,
-                }
+                mark_dead(reader, e)
 
-        # Convert responses to python format
-        result = LivestatusResponse([])
-        for connected_site, raw_response in site_responses:
-            try:
-                rows = connected_site.connection.parse_raw_response(raw_response, query)
-                stillalive.append(connected_site)
-                if self.prepend_site:
-                    for row in rows:
-                        row.insert(0, connected_site.id)
-                result.extend(rows)
-            except query.suppress_exceptions:
-                stillalive.append(connected_site)
-                continue
-            except LivestatusTestingError:
-                raise
-            except Exception as e:
-                connected_site.connection.disconnect()
-                self.deadsites[connected_site.id] = {
-                    "exception": e,
-                    "site": connected_site.config,
-                }
+        # Then retrieve the responses as they arrive and convert them to python format
+        try:
+            while selector.get_map():
+                readers: list[_SiteResponseReader] = [
+                    key.data for key in selector.get_map().values()
+                ]
+                timeouts = [r.timeout_at for r in readers if r.timeout_at is not None]
+                ready = selector.select(max(0.0, min(timeouts) - time.time()) if timeouts else None)
+
+                for key, _events in ready:
+                    reader = key.data
+                    try:
+                        rows = reader.read()
+                        if rows is None:
+                            continue
+                        selector.unregister(key.fileobj)
+                    except query.suppress_exceptions:
+                        # Mostly handles exception types MKLivestatusTableNotFoundError
+                        unregister(key.fileobj)
+                        stillalive.append(reader.connected_site)
+                        continue
+                    except LivestatusTestingError:
+                        raise
+                    except (MKLivestatusSocketClosed, OSError) as e:
+                        unregister(key.fileobj)
+                        if reader.retried:
+                            mark_dead(reader, MKLivestatusSocketError(str(e)))
+                        else:
+                            retry(reader)
+                        continue
+                    except Exception as e:
+                        unregister(key.fileobj)
+                        mark_dead(reader, e)
+                        continue
 
-        self.connections = stillalive
-        return result
+                    stillalive.append(reader.connected_site)
+                    if self.prepend_site:
+                        for row in rows:
+                            row.insert(0, reader.connected_site.id)
+                    yield reader.connected_site, rows
+
+                now = time.time()
+                for key in list(selector.get_map().values()):
+                    reader = key.data
+                    if reader.timeout_at is not None and reader.timeout_at < now:
+                        selector.unregister(key.fileobj)
+                        mark_dead(
+                            reader,
+                            MKLivestatusSocketError("Timeout while waiting for the response"),
+                        )
+        finally:
+            # Responses which are not going to be read anymore must not remain
+            # in the sockets, the connections would be out of sync otherwise.
+            for key in selector.get_map().values():
+                key.data.connected_site.connection.disconnect()
+                stillalive.append(key.data.connected_site)
+            selector.close()
+            # Keep the order of the sites, independent of the order of the responses
+            position = {
+                connected_site.id: pos for pos, connected_site in enumerate(self.connections)
+            }
+            self.connections = sorted(stillalive, key=lambda c: position[c.id])
 
     def command(self, command: str, sitename: SiteId | None = SiteId("local")) -> None:
         if sitename in self.deadsites:
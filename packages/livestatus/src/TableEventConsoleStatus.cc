@@ -70,6 +70,24 @@ TableEventConsoleStatus::TableEventConsoleStatus(ICore *mc)
                                       offsets));
     addColumn(ECRow::makeDoubleColumn("status_average_event_rate",
                                       "The average event rate", offsets));
+    addColumn(ECRow::makeIntColumn(
+        "status_ingestion_drops",
+        "The number of received messages dropped because the queue of messages waiting to be processed was full",
+        offsets));
+    addColumn(ECRow::makeDoubleColumn("status_ingestion_drop_rate",
+                                      "The ingestion drop rate", offsets));
+    addColumn(ECRow::makeDoubleColumn("status_average_ingestion_drop_rate",
+                                      "The average ingestion drop rate",
+                                      offsets));
+    addColumn(ECRow::makeIntColumn(
+        "status_replication_bytes",
+        "The number of bytes received from the master by the replication since startup of the Event Console",
+        offsets));
+    addColumn(ECRow::makeDoubleColumn("status_replication_byte_rate",
+                                      "The replication byte rate", offsets));
+    addColumn(ECRow::makeDoubleColumn("status_average_replication_byte_rate",
+                                      "The average replication byte rate",
+                                      offsets));
 
     addColumn(ECRow::makeIntColumn(
         "status_rule_hits",
@@ -87,6 +105,9 @@ TableEventConsoleStatus::TableEventConsoleStatus(ICore *mc)
                                       offsets));
     addColumn(ECRow::makeDoubleColumn("status_average_sync_time",
                                       "The average sync time", offsets));
+    addColumn(ECRow::makeDoubleColumn(
+        "status_average_replication_lag_time",
+        "The average age of the replicated state when it is applied", offsets));
     addColumn(ECRow::makeStringColumn(
         "status_replication_slavemode",
         "The replication slavemode (empty or one of sync/takeover)", offsets));
@@ -116,6 +137,14 @@ TableEventConsoleStatus::TableEventConsoleStatus(ICore *mc)
     addColumn(ECRow::makeIntColumn(
         "status_event_limit_active_overall",
         "Whether or not the overall event limit is in effect (0/1)", offsets));
+
+    addColumn(ECRow::makeIntColumn(
+        "status_ingestion_queue_length",
+        "The number of received messages waiting to be processed", offsets));
+    addColumn(ECRow::makeIntColumn(
+        "status_ingestion_queue_peak",
+        "The highest number of received messages waiting to be processed since startup of the Event Console",
+        offsets));
 }
 
 std::string TableEventConsoleStatus::name() const {
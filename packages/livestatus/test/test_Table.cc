@@ -646,9 +646,12 @@ ColumnDefinitions event_console_status_columns() {
         {"status_average_connect_rate", ColumnType::double_},
         {"status_average_drop_rate", ColumnType::double_},
         {"status_average_event_rate", ColumnType::double_},
+        {"status_average_ingestion_drop_rate", ColumnType::double_},
         {"status_average_message_rate", ColumnType::double_},
         {"status_average_overflow_rate", ColumnType::double_},
         {"status_average_processing_time", ColumnType::double_},
+        {"status_average_replication_byte_rate", ColumnType::double_},
+        {"status_average_replication_lag_time", ColumnType::double_},
         {"status_average_request_time", ColumnType::double_},
         {"status_average_rule_hit_rate", ColumnType::double_},
         {"status_average_rule_trie_rate", ColumnType::double_},
@@ -666,11 +669,17 @@ ColumnDefinitions event_console_status_columns() {
         {"status_event_limit_rule", ColumnType::int_},
         {"status_event_rate", ColumnType::double_},
         {"status_events", ColumnType::int_},
+        {"status_ingestion_drop_rate", ColumnType::double_},
+        {"status_ingestion_drops", ColumnType::int_},
+        {"status_ingestion_queue_length", ColumnType::int_},
+        {"status_ingestion_queue_peak", ColumnType::int_},
         {"status_message_rate", ColumnType::double_},
         {"status_messages", ColumnType::int_},
         {"status_num_open_events", ColumnType::int_},
         {"status_overflow_rate", ColumnType::double_},
         {"status_overflows", ColumnType::int_},
+        {"status_replication_byte_rate", ColumnType::double_},
+        {"status_replication_bytes", ColumnType::int_},
         {"status_replication_last_sync", ColumnType::time},
         {"status_replication_slavemode", ColumnType::string},
         {"status_replication_success", ColumnType::int_},
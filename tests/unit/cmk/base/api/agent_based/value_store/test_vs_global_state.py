@@ -3,6 +3,8 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+from pathlib import Path
+
 from pytest import MonkeyPatch
 
 import cmk.utils.store as store
@@ -10,7 +12,9 @@ from cmk.utils.hostaddress import HostName
 
 from cmk.checkengine.checking import CheckPluginName, ServiceID
 
+from cmk.base.api.agent_based.value_store import ValueStoreManager
 from cmk.base.api.agent_based.value_store._global_state import (
+    batched_value_store_writes,
     get_value_store,
     load_host_value_store,
 )
@@ -34,3 +38,36 @@ def test_load_host_value_store_loads_file(monkeypatch: MonkeyPatch) -> None:
     ) as mgr:
         with mgr.namespace(service_id):
             assert get_value_store()["loaded_file"]
+
+
+def test_batched_value_store_writes(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(ValueStoreManager, "STORAGE_PATH", tmp_path)
+    service_id = ServiceID(CheckPluginName("test_service"), None)
+
+    def _check(host_name: HostName) -> None:
+        with load_host_value_store(host_name, store_changes=True, storage_format="binary") as mgr:
+            with mgr.namespace(service_id):
+                value_store = get_value_store()
+                value_store["count"] = value_store.get("count", 0) + 1
+
+    with batched_value_store_writes(max_hosts=3) as write_batch:
+        for host_name in (HostName("host1"), HostName("host2"), HostName("host1")):
+            _check(host_name)
+        assert len(write_batch) == 2
+        # Loading the values has only created the files
+        assert all(p.stat().st_size == 0 for p in tmp_path.iterdir())
+
+        _check(HostName("host3"))
+        assert len(write_batch) == 0
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "host1.journal",
+            "host2.journal",
+            "host3.journal",
+        ]
+        _check(HostName("host1"))
+
+    with load_host_value_store(
+        HostName("host1"), store_changes=False, storage_format="binary"
+    ) as mgr:
+        with mgr.namespace(service_id):
+            assert get_value_store()["count"] == 3
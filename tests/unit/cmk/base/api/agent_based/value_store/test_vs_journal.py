@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from pathlib import Path
+
+from cmk.base.api.agent_based.value_store._journal import (
+    encode_record,
+    MAX_RECORDS,
+    read_journal_file,
+    StaticJournaledMapping,
+)
+
+_Key = tuple[str, str | None, str]
+
+
+def _mapping(path: Path, legacy_path: Path | None = None) -> StaticJournaledMapping[_Key, object]:
+    return StaticJournaledMapping(path=path, log_debug=lambda msg: None, legacy_path=legacy_path)
+
+
+def test_changes_are_appended(tmp_path: Path) -> None:
+    path = tmp_path / "test-host.journal"
+    writer = _mapping(path)
+    reader = _mapping(path)
+
+    writer.disksync(updated=[(("check1", None, "key"), (1.5, 23)), (("check2", "item", "key"), [])])
+    size = path.stat().st_size
+    writer.disksync(removed={("check2", "item", "key")}, updated=[(("check1", None, "key"), 2)])
+    assert path.stat().st_size > size
+
+    reader.disksync()
+    assert dict(reader) == dict(writer) == {("check1", None, "key"): 2}
+    assert read_journal_file(path) == {("check1", None, "key"): 2}
+
+
+def test_compaction(tmp_path: Path) -> None:
+    path = tmp_path / "test-host.journal"
+    writer = _mapping(path)
+    reader = _mapping(path)
+
+    # Keep the records smaller than the first one
+    writer.disksync(updated=[(("check", None, "large"), "x" * 5000)])
+    for value in range(MAX_RECORDS - 1):
+        writer.disksync(updated=[(("check", None, "counter"), value)])
+    reader.disksync()
+    size = path.stat().st_size
+
+    writer.disksync(updated=[(("check", None, "counter"), "compacted")])
+    assert path.stat().st_size < size
+
+    # The reader notices the new file and reads it completely
+    reader.disksync()
+    assert dict(reader) == {
+        ("check", None, "large"): "x" * 5000,
+        ("check", None, "counter"): "compacted",
+    }
+
+
+def test_compaction_of_large_records(tmp_path: Path) -> None:
+    path = tmp_path / "test-host.journal"
+    writer = _mapping(path)
+    values = {("check", str(item), "counter"): item for item in range(100)}
+
+    writer.disksync(updated=values.items())
+    size = path.stat().st_size
+    writer.disksync(updated=values.items())
+    assert path.stat().st_size > size
+
+    # The appended records are larger than the first one
+    writer.disksync(updated=values.items())
+    assert path.stat().st_size == size
+    assert read_journal_file(path) == values
+
+
+def test_incomplete_record_is_ignored(tmp_path: Path) -> None:
+    path = tmp_path / "test-host.journal"
+    _mapping(path).disksync(updated=[(("check", None, "key"), 1)])
+    with path.open("ab") as f:
+        f.write(encode_record([], [(("check", None, "key"), 2)])[:-1])
+
+    mapping = _mapping(path)
+    assert dict(mapping) == {("check", None, "key"): 1}
+
+    mapping.disksync(updated=[(("check", None, "other"), 3)])
+    assert read_journal_file(path) == {("check", None, "key"): 1, ("check", None, "other"): 3}
+
+
+def test_values_of_subclasses(tmp_path: Path) -> None:
+    class Name(str):
+        pass
+
+    path = tmp_path / "test-host.journal"
+    _mapping(path).disksync(updated=[(("check", None, "key"), (Name("name"), 1))])
+    assert dict(_mapping(path)) == {("check", None, "key"): ("name", 1)}
+
+
+def test_legacy_values_are_taken_over(tmp_path: Path) -> None:
+    path = tmp_path / "test-host.journal"
+    legacy_path = tmp_path / "test-host"
+    legacy_path.write_text(repr({("check", None, "key"): 23, ("check", None, "other"): 42}))
+
+    mapping = _mapping(path, legacy_path)
+    assert not legacy_path.exists()
+    assert dict(mapping) == {("check", None, "key"): 23, ("check", None, "other"): 42}
+    assert read_journal_file(path) == dict(mapping)
@@ -257,3 +257,19 @@ class TestValueStoreManager:
             assert vsm.active_service_interface["key"] == "outer"
 
         assert vsm.active_service_interface is None
+
+    @staticmethod
+    def test_storage_format_change(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+        monkeypatch.setattr(ValueStoreManager, "STORAGE_PATH", tmp_path)
+        host_name = HostName("test-host")
+        service = ServiceID(CheckPluginName("unit_test"), None)
+
+        for storage_format, value in [("standard", 1), ("binary", 2), ("standard", 3)]:
+            vsm = ValueStoreManager(host_name, storage_format=storage_format)  # type: ignore[arg-type]
+            with vsm.namespace(service):
+                assert vsm.active_service_interface is not None
+                assert vsm.active_service_interface.get("key", 0) == value - 1
+                vsm.active_service_interface["key"] = value
+            vsm.save()
+
+        assert [p.name for p in tmp_path.iterdir()] == ["test-host"]
@@ -3,17 +3,24 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
-from collections.abc import Iterable, Sequence
+import logging
+import threading
+from collections.abc import Callable, Iterable, Mapping, Sequence
 
 import pytest
 from pytest import MonkeyPatch
 
 from tests.testlib.base import Scenario
 
+from cmk.utils.agentdatatype import AgentRawData
+from cmk.utils.exceptions import MKTimeout
 from cmk.utils.hostaddress import HostName
 
+from cmk.fetchers import Fetcher, FetcherType, Mode
+from cmk.fetchers.filecache import NoCache
+
 from cmk.checkengine.checkresults import ServiceCheckResult
-from cmk.checkengine.fetcher import HostKey, SourceType
+from cmk.checkengine.fetcher import HostKey, SourceInfo, SourceType
 from cmk.checkengine.legacy import LegacyCheckParameters
 from cmk.checkengine.parameters import TimespecificParameters, TimespecificParameterSet
 
@@ -328,3 +335,81 @@ def test_config_cache_get_clustered_service_node_keys_clustered(monkeypatch: Mon
         cluster_nodes=[node1, node2],
         get_effective_host=lambda hn, *args, **kw: hn,
     )
+
+
+class _WaitingFetcher(Fetcher[AgentRawData]):
+    def __init__(self, wait: Callable[[], object], raw_data: AgentRawData) -> None:
+        super().__init__(logger=logging.getLogger("test"))
+        self.wait = wait
+        self.raw_data = raw_data
+
+    @classmethod
+    def _from_json(cls, serialized: Mapping[str, object]) -> "_WaitingFetcher":
+        raise NotImplementedError()
+
+    def to_json(self) -> Mapping[str, object]:
+        raise NotImplementedError()
+
+    def open(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def _fetch_from_io(self, mode: Mode) -> AgentRawData:
+        self.wait()
+        return self.raw_data
+
+
+def _source_info(ident: str) -> SourceInfo:
+    return SourceInfo(HostName("host"), None, ident, FetcherType.TCP, SourceType.HOST)
+
+
+def test_fetch_concurrently() -> None:
+    # Both fetchers only return when they are fetched at the same time
+    barrier = threading.Barrier(2, timeout=10)
+    fetched = checkers._fetch_concurrently(
+        [
+            (_source_info(ident), NoCache(HostName("host")), _WaitingFetcher(barrier.wait, raw))
+            for ident, raw in (("first", AgentRawData(b"1")), ("second", AgentRawData(b"2")))
+        ],
+        mode=Mode.CHECKING,
+        max_threads=2,
+        deadline=None,
+    )
+    assert [(info.ident, raw_data.ok) for info, raw_data, _duration in fetched] == [
+        ("first", b"1"),
+        ("second", b"2"),
+    ]
+
+
+def test_fetch_concurrently_deadline() -> None:
+    hanging = threading.Event()
+    try:
+        fetched = checkers._fetch_concurrently(
+            [
+                (
+                    _source_info("fast"),
+                    NoCache(HostName("host")),
+                    _WaitingFetcher(lambda: None, AgentRawData(b"fast")),
+                ),
+                (
+                    _source_info("hanging"),
+                    NoCache(HostName("host")),
+                    _WaitingFetcher(hanging.wait, AgentRawData(b"")),
+                ),
+            ],
+            mode=Mode.CHECKING,
+            max_threads=2,
+            deadline=0.1,
+        )
+    finally:
+        hanging.set()
+
+    (_fast_info, fast_data, _fast_duration), (
+        _hanging_info,
+        hanging_data,
+        _hanging_duration,
+    ) = fetched
+    assert fast_data.ok == b"fast"
+    assert isinstance(hanging_data.error, MKTimeout)
@@ -18,7 +18,10 @@ from pytest import MonkeyPatch
 
 from tests.testlib.base import Scenario
 
+from tests.unit.conftest import DummyLicensingHandler
+
 import cmk.utils.exceptions as exceptions
+import cmk.utils.paths
 import cmk.utils.version as cmk_version
 from cmk.utils.config_path import VersionedConfigPath
 from cmk.utils.hostaddress import HostName
@@ -27,6 +30,7 @@ from cmk.checkengine.checking import CheckPluginName
 
 import cmk.base.config as config
 import cmk.base.core_nagios as core_nagios
+from cmk.base.config import ConfigCache
 
 
 def test_format_nagios_object() -> None:
@@ -917,3 +921,114 @@ def test_create_nagios_config_commands(
 
     assert license_counter["services"] == 1
     assert outfile.getvalue() == expected_result
+
+
+def _create_config(config_path: VersionedConfigPath) -> str:
+    outfile = io.StringIO()
+    core_nagios.create_config(
+        outfile, config_path, hostnames=None, licensing_handler=DummyLicensingHandler()
+    )
+    return outfile.getvalue()
+
+
+@pytest.fixture(name="host_config_scenario")
+def fixture_host_config_scenario(monkeypatch: MonkeyPatch) -> None:
+    ts = Scenario()
+    hostnames = [HostName(f"host{n}") for n in range(6)]
+    for hostname in hostnames:
+        ts.add_host(hostname)
+    ts.add_cluster(HostName("cluster"), nodes=hostnames[:2])
+    ts.set_option(
+        "ipaddresses", {hostname: f"127.0.0.{n}" for n, hostname in enumerate(hostnames, 1)}
+    )
+    # Host checks via the state of services are numbered over all hosts
+    ts.set_ruleset(
+        "host_check_commands",
+        [{"condition": {"host_name": ["host1", "host3", "host4"]}, "value": "agent"}],
+    )
+    ts.apply(monkeypatch)
+
+
+@pytest.mark.usefixtures("host_config_scenario")
+def test_create_config_in_workers(
+    monkeypatch: MonkeyPatch, config_path: VersionedConfigPath
+) -> None:
+    expected = _create_config(config_path)
+    assert "check-mk-host-custom-3\n" in expected
+
+    monkeypatch.setattr(config, "core_config_workers", 2)
+    assert _create_config(config_path) == expected
+
+
+@pytest.mark.usefixtures("host_config_scenario")
+def test_create_config_reuses_unchanged_host_configs(
+    monkeypatch: MonkeyPatch, config_path: VersionedConfigPath, tmp_path: Path
+) -> None:
+    expected = _create_config(config_path)
+
+    monkeypatch.setattr(config, "core_config_workers", 2)
+    monkeypatch.setattr(config, "_loaded_config_fingerprint", "loaded")
+    monkeypatch.setattr(cmk.utils.paths, "nagios_host_config_cache_file", tmp_path / "cache")
+    # The host configurations are created in the workers
+    created = tmp_path / "created"
+    create_host_config = core_nagios._create_host_config
+
+    def _record_created(
+        config_cache: ConfigCache, hostname: HostName, stored_passwords: Mapping[str, str]
+    ) -> core_nagios.HostConfig:
+        with created.open("a") as f:
+            f.write(f"{hostname}\n")
+        return create_host_config(config_cache, hostname, stored_passwords)
+
+    monkeypatch.setattr(core_nagios, "_create_host_config", _record_created)
+
+    def _run() -> set[str]:
+        created.write_text("")
+        assert _create_config(config_path) == expected
+        return set(created.read_text().split())
+
+    assert _run() == {"cluster", *(f"host{n}" for n in range(6))}
+    assert _run() == set()
+
+    autochecks_dir = Path(cmk.utils.paths.autochecks_dir)
+    autochecks_dir.mkdir(parents=True, exist_ok=True)
+    (autochecks_dir / "host4.mk").write_text("[]\n")
+    assert _run() == {"host4"}
+
+    # The configuration of a cluster depends on its nodes and vice versa
+    (autochecks_dir / "host0.mk").write_text("[]\n")
+    assert _run() == {"host0", "cluster"}
+
+
+def test_host_config_fingerprints_other_folder(monkeypatch: MonkeyPatch) -> None:
+    ts = Scenario()
+    ts.add_host(HostName("host0"), host_path="/wato/a/hosts.mk")
+    ts.add_host(HostName("host1"), host_path="/wato/b/hosts.mk")
+    config_cache = ts.apply(monkeypatch)
+    wato_dir = Path(cmk.utils.paths.check_mk_config_dir, "wato")
+    for folder in ["a", "b"]:
+        (wato_dir / folder).mkdir(parents=True, exist_ok=True)
+        (wato_dir / folder / "hosts.mk").write_text(f"# {folder}\n")
+        (wato_dir / folder / ".wato").write_text("{'num_hosts': 1}\n")
+    fingerprints = core_nagios._host_config_fingerprints(
+        config_cache, [HostName("host0"), HostName("host1")], {}
+    )
+
+    # A host is added to the folder b
+    monkeypatch.setitem(config.host_paths, HostName("host2"), "/wato/b/hosts.mk")
+    (wato_dir / "b" / "hosts.mk").write_text("# b, host2\n")
+    (wato_dir / "b" / ".wato").write_text("{'num_hosts': 2}\n")
+    new_fingerprints = core_nagios._host_config_fingerprints(
+        config_cache, [HostName("host0"), HostName("host1"), HostName("host2")], {}
+    )
+
+    assert new_fingerprints[HostName("host0")] == fingerprints[HostName("host0")]
+    assert new_fingerprints[HostName("host1")] != fingerprints[HostName("host1")]
+
+    # A rule changes the configuration of all hosts
+    (wato_dir / "a" / "rules.mk").write_text("# rules\n")
+    assert not set(
+        core_nagios._host_config_fingerprints(
+            config_cache, [HostName("host0"), HostName("host1"), HostName("host2")], {}
+        ).values()
+    ) & set(new_fingerprints.values())
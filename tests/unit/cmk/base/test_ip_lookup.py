@@ -35,7 +35,7 @@ _PatchMapping = Mapping[ip_lookup.IPLookupCacheId, str | None]
 
 
 def patch_config_cache(monkeypatch: MonkeyPatch, cache: _PatchMapping) -> None:
-    monkeypatch.setattr(cache_manager, "obtain_cache", lambda _x: cache)
+    monkeypatch.setattr(cache_manager, "obtain_bounded_cache", lambda _x, **_kw: cache)
 
 
 def patch_persisted_cache(monkeypatch: MonkeyPatch, cache: _PatchMapping) -> None:
@@ -201,9 +201,50 @@ def test_time_slices(
                 DataStat(2.0, 2, 2, None),
             ],
         ),
+        (
+            [
+                [None, 1],
+                [None, 3],
+            ],
+            [
+                None,
+                DataStat(2.0, 1, 3, pytest.approx(math.sqrt(2))),
+            ],
+        ),
+        ([], []),
     ],
 )
 def test_data_stats(
     slices: list[_prediction.TimeSeriesValues], result: list[DataStat | None]
 ) -> None:
     assert _prediction._data_stats(slices) == result
+
+
+class _RRDDataConnection:
+    def __init__(self) -> None:
+        self.queries: list[str] = []
+
+    def query_row(self, query: str) -> list[object]:
+        self.queries.append(query)
+        return [[0, 120, 60, 1.0, 2.0], [86400, 86520, 60, None, 3.0]]
+
+
+def test_get_rrd_data_of_time_ranges() -> None:
+    connection = _RRDDataConnection()
+    assert _prediction.get_rrd_data_of_time_ranges(
+        connection,  # type: ignore[arg-type]
+        "host",
+        "CPU load",
+        "load15",
+        "MAX",
+        [(0, 120), (86400, 86520)],
+    ) == [
+        _prediction._RRDResponse(0, 120, 60, [1.0, 2.0]),
+        _prediction._RRDResponse(86400, 86520, 60, [None, 3.0]),
+    ]
+
+    (query,) = connection.queries
+    assert (
+        "Columns: rrddata:m1:load15.max:0:120:1:400 rrddata:m2:load15.max:86400:86520:1:400\n"
+        in query
+    )
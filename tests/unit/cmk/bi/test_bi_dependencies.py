@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from livestatus import SiteId
+
+from cmk.utils.hostaddress import HostName
+
+from cmk.bi.data_fetcher import BIStructureFetcher
+from cmk.bi.dependencies import (
+    BIAggregationDependencies,
+    BIRecordingSearcher,
+    changed_hosts,
+    config_fingerprint,
+    host_fingerprints,
+)
+from cmk.bi.lib import BIHostData
+from cmk.bi.packs import BIAggregationPacks
+
+from .bi_test_data import sample_config
+
+
+def _host(name: str, tags: set[tuple[str, str]]) -> BIHostData:
+    return BIHostData("heute", tags, {}, "", {}, (), (), name, HostName(name))  # type: ignore[arg-type]
+
+
+def _compile_default_aggregation(
+    bi_packs: BIAggregationPacks, bi_structure_fetcher: BIStructureFetcher
+) -> BIAggregationDependencies:
+    bi_structure_fetcher.add_site_data(SiteId("heute"), sample_config.bi_structure_states)
+    searcher = BIRecordingSearcher()
+    searcher.set_hosts(bi_structure_fetcher.hosts)
+    searcher.start_recording()
+    bi_packs.get_aggregation_mandatory("default_aggregation").compile(searcher)
+    return searcher.dependencies("fingerprint")
+
+
+def test_affected_by_found_hosts(
+    bi_packs_sample_config: BIAggregationPacks, bi_structure_fetcher: BIStructureFetcher
+) -> None:
+    dependencies = _compile_default_aggregation(bi_packs_sample_config, bi_structure_fetcher)
+    assert {"heute", "heute_clone"} <= dependencies.host_names
+    assert dependencies.affected_by({"heute": None})
+    assert dependencies.affected_by({"heute_clone": _host("heute_clone", set())})
+
+
+def test_affected_by_searched_hosts(
+    bi_packs_sample_config: BIAggregationPacks, bi_structure_fetcher: BIStructureFetcher
+) -> None:
+    dependencies = _compile_default_aggregation(bi_packs_sample_config, bi_structure_fetcher)
+    # The aggregation searches for the hosts with the tag tcp
+    assert dependencies.affected_by({"new": _host("new", {("tcp", "tcp")})})
+    assert not dependencies.affected_by({"new": _host("new", {("tcp", "no-tcp")})})
+    assert not dependencies.affected_by({"vanished": None})
+    assert not dependencies.affected_by({})
+
+
+def test_changed_hosts(bi_structure_fetcher: BIStructureFetcher) -> None:
+    bi_structure_fetcher.add_site_data(SiteId("heute"), sample_config.bi_structure_states)
+    previous = host_fingerprints(bi_structure_fetcher.hosts)
+    assert not changed_hosts(previous, dict(previous), bi_structure_fetcher.hosts)
+
+    hosts = dict(bi_structure_fetcher.hosts)
+    hosts["heute"] = hosts["heute"]._replace(alias="changed")
+    hosts["new"] = _host("new", set())
+    del hosts["heute_clone"]
+    assert changed_hosts(previous, host_fingerprints(hosts), hosts) == {
+        "heute": hosts["heute"],
+        "heute_clone": None,
+        "new": hosts["new"],
+    }
+
+
+def test_config_fingerprint(bi_packs_sample_config: BIAggregationPacks) -> None:
+    aggregation = bi_packs_sample_config.get_aggregation_mandatory("default_aggregation")
+    fingerprint = config_fingerprint(bi_packs_sample_config, aggregation)
+    assert config_fingerprint(bi_packs_sample_config, aggregation) == fingerprint
+
+    # A rule called by the aggregation
+    bi_packs_sample_config.get_rule_mandatory("filesystem").properties.title = "Changed"
+    assert config_fingerprint(bi_packs_sample_config, aggregation) != fingerprint
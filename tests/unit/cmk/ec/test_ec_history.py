@@ -17,8 +17,12 @@ from cmk.ec.history import (
     _grep_pipeline,
     convert_history_line,
     History,
+    HistorySegments,
     parse_history_file,
 )
+from cmk.ec.main import StatusServer, StatusTableEvents, StatusTableHistory
+from cmk.ec.query import QueryGET
+from cmk.ec.settings import Settings
 
 
 @pytest.fixture(name="config_with_weekly_history_rotation")
@@ -82,3 +86,146 @@ def test_history_parse(history: History, tmp_path: Path) -> None:
 
     assert len(new_entries) == 4
     assert new_entries[0][1] == 1666942292.3000507
+
+
+@pytest.fixture(name="segments_history")
+def fixture_segments_history(settings: Settings, config: Config) -> History:
+    config = config.copy()
+    config["archive_mode"] = "segments"
+    history = History(
+        settings,
+        config,
+        logging.getLogger("cmk.mkeventd"),
+        StatusTableEvents.columns,
+        StatusTableHistory.columns,
+    )
+    history._segments = _small_segments(settings)
+    return history
+
+
+def _small_segments(settings: Settings) -> HistorySegments:
+    return HistorySegments(
+        settings.paths.history_dir.value,
+        StatusTableHistory.columns,
+        logging.getLogger("cmk.mkeventd"),
+        block_size=10,
+    )
+
+
+def _add_events(history: History, num: int) -> None:
+    for num_event in range(num):
+        history.add(
+            {
+                "id": num_event,
+                "host": f"Host{num_event % 7}",
+                "rule_id": f"rule{num_event % 3}",
+                "application": "app",
+                "text": f"text {num_event}",
+                "match_groups": ("a", "b"),
+                "host_in_downtime": num_event % 2 == 0,
+            },
+            "NEW",
+        )
+
+
+def _values(history_time: float) -> list[object]:
+    return [history_time, "NEW", "", ""] + [
+        defval for _colname, defval in StatusTableEvents.columns
+    ]
+
+
+def _query(status_server: StatusServer, *headers: str) -> QueryGET:
+    return QueryGET(status_server, ["GET history", *headers], logging.getLogger("cmk.mkeventd"))
+
+
+def test_segments_history_get(segments_history: History, status_server: StatusServer) -> None:
+    _add_events(segments_history, 95)
+    assert len(segments_history._segments._loaded()) == 1
+
+    entries = list(segments_history.get(_query(status_server)))
+    assert [entry[0] for entry in entries] == list(range(95, 0, -1))
+    assert entries[0][StatusTableHistory.columns.index(("event_id", 1))] == 94
+    assert entries[-1][7] == "text 0"
+    assert entries[-1][22] == ("a", "b")  # event_match_groups
+    assert entries[-1][28] is True  # event_host_in_downtime
+    assert len(entries[-1]) == len(StatusTableHistory.columns)
+
+    entries = list(
+        segments_history.get(
+            _query(status_server, "Filter: event_host = Host3", "Filter: event_rule_id = rule0")
+        )
+    )
+    assert [entry[5] for entry in entries] == [87, 66, 45, 24, 3]
+
+    entries = list(segments_history.get(_query(status_server, "Filter: event_id = 4")))
+    assert [entry[5] for entry in entries] == [4]
+    assert segments_history._segments.blocks_skipped == 8  # all blocks except one
+
+    entries = list(
+        segments_history.get(_query(status_server, "Filter: event_host in host1", "Limit: 3"))
+    )
+    assert [entry[5] for entry in entries] == [92, 85, 78]
+
+
+def test_segments_history_reload(
+    settings: Settings, segments_history: History, status_server: StatusServer
+) -> None:
+    _add_events(segments_history, 25)
+    segments_history._segments = _small_segments(settings)
+    _add_events(segments_history, 1)
+
+    entries = list(segments_history.get(_query(status_server)))
+    assert [entry[0] for entry in entries] == list(range(26, 0, -1))
+    assert entries[0][7] == "text 0"
+    assert entries[1][7] == "text 24"
+
+
+def test_segments_history_interrupted_sealing(
+    settings: Settings, segments_history: History, status_server: StatusServer
+) -> None:
+    _add_events(segments_history, 15)
+    (segment,) = segments_history._segments._loaded().values()
+    tail = segment.tail_path.read_bytes()
+    _add_events(segments_history, 5)
+    # The block has been written, but the tail has not been truncated and the writing of the
+    # next block has been interrupted.
+    segment.tail_path.write_bytes(tail + segment.tail_path.read_bytes() + b"[21, 17")
+    with segment.blocks_path.open(mode="ab") as f:
+        f.write(b"garbage")
+    with segment.index_path.open(mode="a") as f:
+        f.write('{"offset": ')
+
+    segments_history._segments = _small_segments(settings)
+    entries = list(segments_history.get(_query(status_server)))
+    assert [entry[0] for entry in entries] == list(range(20, 0, -1))
+    assert segment.index_path.read_text().count("\n") == 2
+
+
+def test_segments_history_rotation_and_expiry(
+    segments_history: History, status_server: StatusServer
+) -> None:
+    segments = segments_history._segments
+    segments.add(1000, _values(10.0))
+    segments.add(1000, _values(20.0))
+    segments.add(2000, _values(30.0))
+    segments.add(1000, _values(40.0))  # newer segments win
+
+    assert sorted(segments._loaded()) == [1000, 2000]
+    assert [entry[:2] for entry in segments_history.get(_query(status_server))] == [
+        [4, 40.0],
+        [3, 30.0],
+        [2, 20.0],
+        [1, 10.0],
+    ]
+    assert [
+        entry[:2]
+        for entry in segments_history.get(_query(status_server, "Filter: history_time < 25"))
+    ] == [[2, 20.0], [1, 10.0]]
+
+    segments.expire(25.0)
+    assert sorted(segments._loaded()) == [2000]
+    assert not (segments._directory / "1000.tail").exists()
+
+    segments_history.flush()
+    assert not list(segments._directory.iterdir())
+    assert not list(segments_history.get(_query(status_server)))
@@ -3,6 +3,8 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import ast
+import logging
 import time
 
 import pytest
@@ -13,9 +15,22 @@ from tests.unit.cmk.ec.helpers import FakeStatusSocket
 
 from cmk.utils.hostaddress import HostName
 
-from cmk.ec.config import ConfigFromWATO
+from cmk.ec.config import Config, ConfigFromWATO, Rule
 from cmk.ec.event import Event
-from cmk.ec.main import EventStatus, StatusServer
+from cmk.ec.helpers import ECLock
+from cmk.ec.history import History
+from cmk.ec.journal import JournalPosition
+from cmk.ec.main import (
+    EventServer,
+    EventStatus,
+    replication_pull,
+    replication_send,
+    SlaveStatus,
+    StatusServer,
+)
+from cmk.ec.perfcounters import Perfcounters
+from cmk.ec.query import MKClientError
+from cmk.ec.settings import Settings
 
 
 def test_handle_client(status_server: StatusServer) -> None:
@@ -132,3 +147,232 @@ def test_mkevent_query_filters(
     status_server.handle_client(status_socket, True, "127.0.0.1")
     response = status_socket.get_response()
     assert (len(response) == 2) is is_match
+
+
+def _add_events(event_status: EventStatus, rule_ids_and_hosts: list[tuple[str, str]]) -> None:
+    for rule_id, host in rule_ids_and_hosts:
+        event_status.new_event(
+            CMKEventConsole.new_event(
+                {"rule_id": rule_id, "host": HostName(host), "core_host": HostName(host)}
+            )
+        )
+
+
+def test_remove_oldest_event(event_status: EventStatus) -> None:
+    _add_events(event_status, [("1", "h1"), ("2", "h2"), ("1", "h2"), ("2", "h1")])
+
+    event_status.remove_oldest_event("by_rule", {"rule_id": "2"})
+    assert [e["id"] for e in event_status.events()] == [1, 3, 4]
+    event_status.remove_oldest_event("by_host", {"host": HostName("h1")})
+    assert [e["id"] for e in event_status.events()] == [3, 4]
+    event_status.remove_oldest_event("overall", {})
+    assert [e["id"] for e in event_status.events()] == [4]
+
+    assert [e["id"] for e in event_status.events_of_rule("2")] == [4]
+    assert not event_status.events_of_rule("1")
+    assert event_status.num_existing_events == 1
+    assert event_status.num_existing_events_by_rule == {"1": 0, "2": 1}
+    assert (
+        event_status.get_num_existing_events_by(
+            "by_host", {"host": HostName("h1"), "core_host": HostName("h1")}
+        )
+        == 1
+    )
+
+
+def test_count_event_up_changes_host(event_status: EventStatus) -> None:
+    _add_events(event_status, [("1", "h1")])
+    found = event_status.events()[0]
+
+    event_status.count_event_up(
+        found,
+        CMKEventConsole.new_event(
+            {"rule_id": "1", "host": HostName("h2"), "core_host": HostName("h2")}
+        ),
+    )
+
+    assert found["count"] == 2
+    assert event_status.num_existing_events_by_host == {
+        (HostName("h1"), HostName("h1")): 0,
+        (HostName("h2"), HostName("h2")): 1,
+    }
+    event_status.remove_oldest_event("by_host", {"host": HostName("h2")})
+    assert not event_status.events()
+
+
+def test_unpack_status_indexes_events(event_status: EventStatus) -> None:
+    _add_events(event_status, [("1", "h1"), ("2", "h1")])
+    status = event_status.pack_status()
+    event_status.flush()
+
+    event_status.unpack_status(status)
+
+    assert [e["id"] for e in event_status.events_of_rule("2")] == [2]
+    assert event_status.event(1) is event_status.events()[0]
+    assert (
+        event_status.get_num_existing_events_by(
+            "by_host", {"host": HostName("h1"), "core_host": HostName("h1")}
+        )
+        == 2
+    )
+
+
+def test_cancel_events(event_status: EventStatus, event_server: EventServer) -> None:
+    _add_events(event_status, [("1", "h1"), ("1", "h2"), ("2", "h1"), ("1", "h1")])
+    rule: Rule = {"id": "1"}
+
+    event_status.cancel_events(
+        event_server,
+        [],
+        CMKEventConsole.new_event({"rule_id": "1", "host": HostName("h1")}),
+        {"match_groups_message_ok": ()},
+        rule,
+    )
+
+    assert [e["id"] for e in event_status.events()] == [2, 3]
+
+
+def _transferred(value: object) -> object:
+    return ast.literal_eval(repr(value))
+
+
+def test_unpack_status_delta_replicates_changes(
+    event_status: EventStatus,
+    settings: Settings,
+    config: Config,
+    perfcounters: Perfcounters,
+    history: History,
+) -> None:
+    _add_events(event_status, [("1", "h1"), ("2", "h1"), ("1", "h2")])
+    slave_status = EventStatus(
+        settings, config, perfcounters, history, logging.getLogger("cmk.mkeventd.EventStatus")
+    )
+    slave_status.unpack_status(_transferred(event_status.pack_status()))
+    position = event_status.journal.position()
+
+    event_status.remove_event(event_status.events()[1], "DELETE")
+    event_status.count_event_up(
+        event_status.events()[0],
+        CMKEventConsole.new_event(
+            {"rule_id": "1", "host": HostName("h3"), "core_host": HostName("h3")}
+        ),
+    )
+    _add_events(event_status, [("2", "h2")])
+    assert event_status.journal.covers(position)
+    slave_status.unpack_status_delta(
+        _transferred(event_status.pack_status_delta(position.sequence))
+    )
+
+    assert slave_status.pack_status() == event_status.pack_status()
+    assert [e["id"] for e in slave_status.events_of_rule("1")] == [1, 3]
+    assert slave_status.num_existing_events == 3
+    assert slave_status.num_existing_events_by_host == event_status.num_existing_events_by_host
+
+
+def test_replication_send_only_sends_known_changes(
+    event_status: EventStatus, config: Config, lock_configuration: ECLock
+) -> None:
+    _add_events(event_status, [("1", "h1")])
+    position = event_status.journal.position()
+    _add_events(event_status, [("2", "h1")])
+
+    response = replication_send(config, lock_configuration, event_status, 0, position)
+    assert "status" not in response
+    assert response["journal"] == tuple(event_status.journal.position())
+    assert [e["id"] for e in response["delta"]["changed_events"]] == [2]  # type: ignore[index]
+
+    for unknown in (None, JournalPosition("other", position.sequence)):
+        response = replication_send(config, lock_configuration, event_status, 0, unknown)
+        assert "delta" not in response
+        assert len(response["status"]["events"]) == 2  # type: ignore[index]
+
+
+@pytest.mark.parametrize(
+    "argument, expect_delta",
+    [("0", False), ("0 %s 0", True), ("0 %s", None), ("0 %s x", None)],
+)
+def test_handle_replicate_arguments(
+    status_server: StatusServer, argument: str, expect_delta: bool | None
+) -> None:
+    argument = argument.replace("%s", status_server._event_status.journal.journal_id)
+    if expect_delta is None:
+        with pytest.raises(MKClientError):
+            status_server.handle_replicate(argument, "127.0.0.1")
+        return
+    response = status_server.handle_replicate(argument, "127.0.0.1")
+    assert ("delta" in response) is expect_delta  # type: ignore[operator]
+
+
+def test_replication_pull_full_after_takeover(
+    monkeypatch: pytest.MonkeyPatch,
+    settings: Settings,
+    config: Config,
+    lock_configuration: ECLock,
+    perfcounters: Perfcounters,
+    event_status: EventStatus,
+    event_server: EventServer,
+    slave_status: SlaveStatus,
+) -> None:
+    master_status = EventStatus(
+        settings, config, perfcounters, event_status._history, logging.getLogger("cmk.mkeventd")
+    )
+    _add_events(master_status, [("1", "h1")])
+    config["replication"] = {
+        "connect_timeout": 10,
+        "interval": 10,
+        "master": ("127.0.0.1", 6558),
+        "takeover": 0,
+        "fallback": 60,
+    }
+    slave_status.update(mode="sync", last_sync=1)
+    master_down = False
+    requested: list[JournalPosition | None] = []
+
+    def get_state_from_master(
+        _config: Config, _slave_status: SlaveStatus, position: JournalPosition | None = None
+    ) -> tuple[object, int]:
+        if master_down:
+            raise Exception("Master not responding")
+        requested.append(position)
+        return (
+            _transferred(
+                replication_send(
+                    config, ECLock(logging.getLogger("cmk.mkeventd")), master_status, 1, position
+                )
+            ),
+            0,
+        )
+
+    monkeypatch.setattr("cmk.ec.main.get_state_from_master", get_state_from_master)
+
+    def pull() -> None:
+        replication_pull(
+            settings,
+            config,
+            lock_configuration,
+            perfcounters,
+            event_status,
+            event_server,
+            slave_status,
+            logging.getLogger("cmk.mkeventd"),
+        )
+
+    pull()
+    pull()
+    assert requested == [None, master_status.journal.position()]
+
+    master_down = True
+    pull()
+    assert slave_status["mode"] == "takeover"
+    assert event_status.replicated_position is None
+
+    # The events may have been changed locally while taken over
+    event_status.remove_event(event_status.events()[0], "DELETE")
+    master_down = False
+    pull()
+    assert slave_status["mode"] == "sync"
+    assert requested[2] is None
+    assert [e["id"] for e in event_status.events()] == [1]
+
+    pull()
+    assert requested[3] == master_status.journal.position()
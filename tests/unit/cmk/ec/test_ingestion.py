@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import socket
+import threading
+
+from cmk.ec.ingestion import IngestionQueue, receive_datagrams, ReceivedMessage
+from cmk.ec.main import EventServer
+
+
+def _messages(num: int) -> list[ReceivedMessage]:
+    return [ReceivedMessage(f"message {n}".encode(), ("127.0.0.1", 514)) for n in range(num)]
+
+
+def test_ingestion_queue_rejects_when_full() -> None:
+    queue = IngestionQueue(5)
+    assert not queue.put(_messages(3))
+    assert queue.has_room()
+    assert queue.put(_messages(4)) == _messages(4)[2:]
+    assert not queue.has_room()
+    assert len(queue) == 5
+    assert queue.peak == 5
+
+    assert queue.get_batch(4) == _messages(3) + _messages(1)
+    assert queue.get_batch(4) == _messages(2)[1:]
+    assert not queue
+    assert queue.peak == 5
+
+
+def test_ingestion_queue_concurrent_put() -> None:
+    queue = IngestionQueue(1000)
+    threads = [threading.Thread(target=queue.put, args=(_messages(300),)) for _n in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(queue) == 1000
+    assert queue.peak == 1000
+
+
+def test_receive_datagrams() -> None:
+    receiver, sender = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    with receiver, sender:
+        receiver.setblocking(False)
+        assert not receive_datagrams(receiver, 4096, 10)
+        for n in range(5):
+            sender.send(f"datagram {n}".encode())
+        assert [data for data, _address in receive_datagrams(receiver, 4096, 3)] == [
+            b"datagram 0",
+            b"datagram 1",
+            b"datagram 2",
+        ]
+        assert [data for data, _address in receive_datagrams(receiver, 4096, 3)] == [
+            b"datagram 3",
+            b"datagram 4",
+        ]
+
+
+def test_process_ingestion_queue(event_server: EventServer) -> None:
+    event_server._ingestion_queue.put(
+        ReceivedMessage(f"<78>Oct 18 09:10:11 host{n} app: text {n}".encode(), None)
+        for n in range(600)
+    )
+    event_server.process_ingestion_queue()
+    assert len(event_server._ingestion_queue) == 100
+    assert event_server._perfcounters._counters["messages"] == 500
+    event_server.process_ingestion_queue()
+    assert not event_server._ingestion_queue
+    assert event_server._perfcounters._counters["messages"] == 600
+
+    status = dict(
+        zip(
+            (name for name, _default in event_server.status_columns()), event_server.get_status()[0]
+        )
+    )
+    assert status["status_ingestion_queue_length"] == 0
+    assert status["status_ingestion_queue_peak"] == 600
+    assert status["status_ingestion_drops"] == 0
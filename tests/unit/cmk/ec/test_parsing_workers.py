@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+import pytest
+
+from livestatus import SiteId
+
+from cmk.utils.hostaddress import HostName
+
+import cmk.ec.parsing_workers as parsing_workers
+from cmk.ec.config import Config, Rule, ServiceLevel
+from cmk.ec.defaults import default_rule_pack
+from cmk.ec.ingestion import ReceivedMessage
+from cmk.ec.main import EventServer
+from cmk.ec.parsing_workers import MessagePreparer, RuleSnapshot
+from cmk.ec.rule_matcher import compile_rule, MatchFailure, MatchSuccess
+
+_RULE = Rule(
+    actions=[],
+    actions_in_downtime=True,
+    autodelete=False,
+    cancel_action_phases="always",
+    cancel_actions=[],
+    comment="",
+    description="",
+    disabled=False,
+    docu_url="",
+    id="",
+    invert_matching=False,
+    sl=ServiceLevel(precedence="message", value=0),
+    state=1,
+)
+
+_RULES: list[Rule] = [
+    {**_RULE, "id": "skip", "match": "noise", "drop": "skip_pack"},
+    {**_RULE, "id": "time_period", "match": "backup", "match_timeperiod": "night"},
+    {**_RULE, "id": "failed", "match": "failed"},
+    {**_RULE, "id": "any"},
+]
+
+
+def _rules() -> list[Rule]:
+    rules = []
+    for rule in _RULES:
+        rule = rule.copy()
+        rule["pack"] = "default"
+        compile_rule(rule)
+        rules.append(rule)
+    return rules
+
+
+def _preparer() -> MessagePreparer:
+    return MessagePreparer(
+        RuleSnapshot(
+            generation=7,
+            rules=_rules(),
+            masks=None,
+            hostname_translation={"case": "upper"},
+            site=SiteId("test_site"),
+        )
+    )
+
+
+def test_prepare_stops_at_the_first_final_match() -> None:
+    prepared = _preparer().prepare(
+        ReceivedMessage(b"<78>Oct 18 09:10:11 web01 app: backup failed", ("10.0.0.1", 514))
+    )
+    assert prepared is not None
+    event, matches = prepared
+    assert event["host"] == "web01"
+    assert event["ipaddress"] == "10.0.0.1"
+    assert matches.generation == 7
+    assert matches.host == HostName("WEB01")
+    assert matches.num_candidates == 4
+    assert [(position, type(result)) for position, result in matches.results] == [
+        (0, MatchFailure),
+        (1, type(None)),  # time periods are evaluated by the event server
+        (2, MatchSuccess),
+    ]
+
+
+def test_prepare_continues_after_skipping_a_pack() -> None:
+    prepared = _preparer().prepare(ReceivedMessage(b"<78>Oct 18 09:10:11 web01 app: noise", None))
+    assert prepared is not None
+    assert [
+        (position, isinstance(result, MatchSuccess))
+        for position, result in prepared.matches.results
+    ] == [(0, True), (1, False), (2, False), (3, True)]
+
+
+def test_prepare_leaves_traps_to_the_event_server() -> None:
+    assert _preparer().prepare(ReceivedMessage(b"trap", ("10.0.0.1", 162), is_trap=True)) is None
+
+
+@pytest.fixture(name="no_core_hosts")
+def fixture_no_core_hosts(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        EventServer,
+        "_add_core_host_to_new_event",
+        lambda self, event: event.update(core_host=None, host_in_downtime=False),
+    )
+
+
+class _InProcessExecutor:
+    """Runs the workers in the test process, starting a process pool takes seconds
+
+    The end-to-end run with worker processes is doc/benchmark/ec_parsing.py.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        mp_context: object,
+        initializer: Callable[..., None],
+        initargs: tuple[Any, ...],
+    ) -> None:
+        initializer(*initargs)
+
+    def map(self, fn: Callable[[Any], Any], iterable: Iterable[Any]) -> Iterator[Any]:
+        return map(fn, iterable)
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        pass
+
+
+@pytest.fixture(name="in_process_workers")
+def fixture_in_process_workers(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(parsing_workers, "ProcessPoolExecutor", _InProcessExecutor)
+    monkeypatch.setattr(parsing_workers, "_preparer", None)
+
+
+def _process_messages(event_server: EventServer, config: Config, parsing_workers: int) -> None:
+    config = config.copy()
+    config["parsing_workers"] = parsing_workers
+    config["rule_packs"] = [default_rule_pack(_RULES)]
+    event_server.reload_configuration(config)
+    event_server._ingestion_queue.put(
+        ReceivedMessage(f"<78>Oct 18 09:10:11 host{n % 3} app: {text} {n}".encode(), None)
+        for n, text in enumerate(["noise", "backup failed", "failed", "other"] * 50)
+    )
+    while event_server._ingestion_queue:
+        event_server.process_ingestion_queue()
+    event_server._stop_parsing_workers()
+
+
+@pytest.mark.usefixtures("no_core_hosts", "in_process_workers")
+def test_parsing_workers_process_like_the_event_server(
+    event_server: EventServer, config: Config, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(event_server._time_period, "active", lambda name: name == "night")
+    _process_messages(event_server, config, 0)
+    expected = sorted(
+        (e["rule_id"], e["host"], e["text"]) for e in event_server._event_status.events()
+    )
+    expected_tries = event_server._perfcounters._counters["rule_tries"]
+
+    event_server._event_status.flush()
+    event_server._perfcounters._counters["rule_tries"] = 0
+    _process_messages(event_server, config, 2)
+    assert (
+        sorted((e["rule_id"], e["host"], e["text"]) for e in event_server._event_status.events())
+        == expected
+    )
+    assert event_server._perfcounters._counters["rule_tries"] == expected_tries
+    assert event_server._perfcounters._counters["messages"] == 400
+
+
+@pytest.mark.usefixtures("no_core_hosts")
+def test_outdated_rule_matches_are_ignored(event_server: EventServer, config: Config) -> None:
+    config = config.copy()
+    config["rule_packs"] = [default_rule_pack(_RULES)]
+    event_server.reload_configuration(config)
+    prepared = _preparer().prepare(ReceivedMessage(b"<78>Oct 18 09:10:11 web01 app: failed", None))
+    assert prepared is not None
+
+    event_server.process_potential_event(*prepared)
+    (event,) = event_server._event_status.events()
+    assert event["host"] == "web01"
+    assert event["rule_id"] == "failed"
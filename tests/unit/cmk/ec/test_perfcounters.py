@@ -136,3 +136,11 @@ def test_perfcounters_correct_status_values() -> None:
 
         else:
             raise NotImplementedError()
+
+
+def test_perfcounters_count_times() -> None:
+    c = Perfcounters(logger)
+    c.count("messages", 3)
+    assert c._counters["messages"] == 3
+    c.count_times("processing", [1.0, 1.0, 5.0])
+    assert c._times["processing"] == 1.04
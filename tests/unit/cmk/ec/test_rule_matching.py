@@ -3,6 +3,9 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import itertools
+import re
+
 import pytest
 
 from livestatus import SiteId
@@ -10,12 +13,15 @@ from livestatus import SiteId
 from cmk.ec.config import MatchGroups, Rule, TextMatchResult
 from cmk.ec.event import Event
 from cmk.ec.rule_matcher import (
+    _LiteralIndex,
     compile_rule,
     MatchFailure,
     MatchPriority,
     MatchResult,
     MatchSuccess,
+    required_literal,
     RuleMatcher,
+    RulePrefilter,
 )
 
 
@@ -409,3 +415,122 @@ def test_match_ipaddress(result: MatchResult, rule: Rule, event: Event) -> None:
 def test_match_facility(result: MatchResult, rule: Rule, event: Event) -> None:
     m = RuleMatcher(None, SiteId("test_site"), lambda time_period_name: True)
     assert m.event_rule_matches_facility(rule, event) == result
+
+
+@pytest.mark.parametrize(
+    "pattern, literal",
+    [
+        ("Foo Bar", "Foo Bar"),
+        ("f\u00fc", None),
+        (re.compile(r"^Disk (sd[a-z]+) FAILED", re.IGNORECASE), " failed"),
+        (re.compile(r"[Ee]rror: \d+ blocks? lost", re.IGNORECASE), "rror: "),
+        (re.compile(r"(?:warn|crit)ical", re.IGNORECASE), "ical"),
+        (re.compile(r"foo|bar", re.IGNORECASE), None),
+        (re.compile(r"\w+\s+\d", re.IGNORECASE), None),
+    ],
+)
+def test_required_literal(pattern: re.Pattern[str] | str, literal: str | None) -> None:
+    assert required_literal(pattern) == literal
+
+
+_PREFILTER_RULES: list[Rule] = [
+    {"id": "host", "match_host": "Web01", "match": "failed"},
+    {"id": "host_regex", "match_host": "^db\\d+$"},
+    {"id": "message", "match": "^Disk (sd[a-z]+) FAILED"},
+    {"id": "cancel", "match": "link down", "match_ok": "link up"},
+    {"id": "cancel_any", "match": "link down", "match_ok": "(up|ok)$"},
+    {"id": "application", "match_application": "sshd", "match": "[0-9]+"},
+    {"id": "cancel_application", "cancel_application": "cron", "match": "x"},
+    {"id": "inverted", "match": "failed", "invert_matching": True},
+    {"id": "any"},
+    {"id": "priority", "match_priority": (2, 0)},
+]
+
+
+def _prefilter_event(host: str, text: str, application: str, priority: int) -> Event:
+    return {
+        "host": host,
+        "text": text,
+        "application": application,
+        "facility": 1,
+        "priority": priority,
+        "ipaddress": "",
+    }
+
+
+def _prefilter_rules() -> list[tuple[Rule, int]]:
+    """The compiled rules with their masks for the syslog facility 1"""
+    rules = []
+    for rule in _PREFILTER_RULES:
+        rule = rule.copy()
+        rule["pack"] = "pack"
+        compile_rule(rule)
+        prios = (
+            range(rule["match_priority"][1], rule["match_priority"][0] + 1)
+            if "match_priority" in rule
+            else range(8)
+        )
+        rules.append((rule, sum(1 << (8 + p) for p in prios)))
+    return rules
+
+
+@pytest.mark.parametrize(
+    "event, rule_ids",
+    [
+        (
+            _prefilter_event("web01", "sync FAILED", "", 3),
+            ["host", "message", "cancel_any", "inverted", "any"],
+        ),
+        (
+            _prefilter_event("db7", "Disk sda failed", "", 3),
+            ["host_regex", "message", "cancel_any", "inverted", "any"],
+        ),
+        (
+            _prefilter_event("web02", "eth0: Link Up", "sshd", 1),
+            ["cancel", "cancel_any", "application", "inverted", "any", "priority"],
+        ),
+        (
+            _prefilter_event("web02", "backup done", "CROND", 5),
+            ["cancel_any", "cancel_application", "inverted", "any"],
+        ),
+    ],
+)
+def test_rule_prefilter_candidates(event: Event, rule_ids: list[str]) -> None:
+    prefilter = RulePrefilter(_prefilter_rules())
+    assert [rule["id"] for rule in prefilter.candidates(event)] == rule_ids
+
+
+@pytest.mark.parametrize(
+    "text, positions",
+    [
+        ("", []),
+        ("x", [0]),
+        ("disk sdb failed", [1, 3, 4]),
+        ("failed", [3]),
+        ("xy faile", [0, 2]),
+    ],
+)
+def test_literal_index_find(text: str, positions: list[int]) -> None:
+    index = _LiteralIndex()
+    for position, literal in enumerate(["x", "disk", "y f", "failed", "sd"]):
+        index.add(literal, position)
+    assert sorted(index.find(text)) == positions
+
+
+def test_rule_prefilter_keeps_matching_rules() -> None:
+    m = RuleMatcher(None, SiteId("test_site"), lambda time_period_name: True)
+    rules = _prefilter_rules()
+    prefilter = RulePrefilter(rules)
+    for host, text, application, priority in itertools.product(
+        ["web01", "WEB01", "db7", "dbx", "\u0131"],
+        ["Disk sdb FAILED", "link down", "LINK UP", "link ok", "x 12", "D\u0131sk sda failed", ""],
+        ["sshd", "crond", ""],
+        [0, 5],
+    ):
+        event = _prefilter_event(host, text, application, priority)
+        candidates = [rule["id"] for rule in prefilter.candidates(event)]
+        for rule, mask in rules:
+            if mask & 1 << (8 + priority) and isinstance(
+                m.event_rule_matches(rule, event), MatchSuccess
+            ):
+                assert rule["id"] in candidates, (rule["id"], event)
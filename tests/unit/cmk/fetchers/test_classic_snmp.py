@@ -331,3 +331,144 @@ def test_priv_proto(proto: str, result: str) -> None:
 def test_priv_proto_unknown(proto: str) -> None:
     with pytest.raises(MKGeneralException):
         classic_snmp._priv_proto_for(proto)
+
+
+def _bulkwalk_config(bulk_walk_size: int) -> SNMPHostConfig:
+    return SNMPHostConfig(
+        is_ipv6_primary=False,
+        hostname=HostName("localhost"),
+        ipaddress=HostAddress("127.0.0.1"),
+        credentials="public",
+        port=161,
+        is_bulkwalk_host=True,
+        is_snmpv2or3_without_bulkwalk_host=True,
+        bulk_walk_size_of=bulk_walk_size,
+        timing={},
+        oid_range_limits={},
+        snmpv3_contexts=[],
+        character_encoding=None,
+        snmp_backend=SNMPBackendEnum.CLASSIC,
+    )
+
+
+def test_snmp_bulkget_command() -> None:
+    backend = ClassicSNMPBackend(_bulkwalk_config(25), logger)
+    assert backend._snmp_base_command("bulkget", None)[:4] == [
+        "snmpbulkget",
+        "-Cn0",
+        "-Cr25",
+        "-v2c",
+    ]
+
+
+_MIB = (
+    [(".1.3.6.1.2.1.2.2.1.1.%d" % n, b"%d" % n) for n in range(1, 8)]
+    + [(".1.3.6.1.2.1.2.2.1.2.%d" % n, b"eth%d" % n) for n in range(1, 8)]
+    + [(".1.3.6.1.2.1.2.2.1.4.%d" % n, b"1500") for n in range(1, 4)]
+)
+
+
+def _key(oid: str) -> tuple[int, ...]:
+    return tuple(int(part) for part in oid.strip(".").split("."))
+
+
+class _FakeAgent:
+    """Answers the walk commands like an agent with _MIB would"""
+
+    def __init__(self, max_repetitions: int, max_varbinds: Sequence[int] = ()) -> None:
+        self.max_repetitions = max_repetitions
+        # Agents cut the responses to fit the maximum message size, the number of variable
+        # bindings of the responses depends on the size of the values
+        self.max_varbinds = list(max_varbinds)
+        self.commands: list[str] = []
+
+    def _next(self, oid: str) -> tuple[str, bytes | None]:
+        for mib_oid, value in _MIB:
+            if _key(mib_oid) > _key(oid):
+                return mib_oid, value
+        return oid, None
+
+    def run(self, command: list[str], oids: Sequence[str]) -> list[tuple[str, bytes | None] | None]:
+        self.commands.append(command[0])
+        if command[0] != "snmpbulkget":
+            return [(oid, value) for oid, value in _MIB if oid.startswith(oids[0] + ".")]
+        varbinds: list[tuple[str, bytes | None] | None] = []
+        current = list(oids)
+        for _repetition in range(self.max_repetitions):
+            for index, oid in enumerate(current):
+                next_oid, value = self._next(oid)
+                varbinds.append((next_oid, value))
+                current[index] = next_oid
+        return varbinds[: self.max_varbinds.pop(0)] if self.max_varbinds else varbinds
+
+
+@pytest.mark.parametrize("max_repetitions", [1, 3, 10])
+def test_walk_columns_interleaved(monkeypatch: pytest.MonkeyPatch, max_repetitions: int) -> None:
+    backend = ClassicSNMPBackend(_bulkwalk_config(max_repetitions), logger)
+    agent = _FakeAgent(max_repetitions)
+    monkeypatch.setattr(backend, "_run_walk_command", agent.run)
+    columns = [".1.3.6.1.2.1.2.2.1.2", ".1.3.6.1.2.1.2.2.1.4", ".1.3.6.1.2.1.2.2.1.3"]
+
+    assert backend.walk_columns(columns) == [
+        [(oid, value) for oid, value in _MIB if oid.startswith(column + ".")] for column in columns
+    ]
+    # One walk of its own for the column without rows
+    assert agent.commands.count("snmpbulkget") == -(-8 // max_repetitions)
+    assert agent.commands[-1] == "snmpbulkwalk"
+
+
+def test_walk_columns_without_bulkwalk(monkeypatch: pytest.MonkeyPatch) -> None:
+    backend = ClassicSNMPBackend(_bulkwalk_config(10)._replace(is_bulkwalk_host=False), logger)
+    agent = _FakeAgent(10)
+    monkeypatch.setattr(backend, "_run_walk_command", agent.run)
+
+    assert len(backend.walk_columns([".1.3.6.1.2.1.2.2.1.1", ".1.3.6.1.2.1.2.2.1.2"])) == 2
+    assert agent.commands == ["snmpwalk", "snmpwalk"]
+
+
+@pytest.mark.parametrize("max_varbinds", [[5, 2], [4, 1, 1, 3], [1, 2, 3, 4, 5]])
+def test_walk_columns_truncated_responses(
+    monkeypatch: pytest.MonkeyPatch, max_varbinds: Sequence[int]
+) -> None:
+    backend = ClassicSNMPBackend(_bulkwalk_config(10), logger)
+    agent = _FakeAgent(10, max_varbinds)
+    monkeypatch.setattr(backend, "_run_walk_command", agent.run)
+    columns = [".1.3.6.1.2.1.2.2.1.1", ".1.3.6.1.2.1.2.2.1.2", ".1.3.6.1.2.1.2.2.1.4"]
+
+    assert backend.walk_columns(columns) == [
+        [(oid, value) for oid, value in _MIB if oid.startswith(column + ".")] for column in columns
+    ]
+    assert set(agent.commands) == {"snmpbulkget"}
+
+
+def test_walk_columns_unparsable_line(monkeypatch: pytest.MonkeyPatch) -> None:
+    backend = ClassicSNMPBackend(_bulkwalk_config(10), logger)
+    agent = _FakeAgent(10)
+
+    def run(command: list[str], oids: Sequence[str]) -> list[tuple[str, bytes | None] | None]:
+        varbinds = agent.run(command, oids)
+        if len(agent.commands) == 1:
+            varbinds.insert(3, None)
+        return varbinds
+
+    monkeypatch.setattr(backend, "_run_walk_command", run)
+    columns = [".1.3.6.1.2.1.2.2.1.1", ".1.3.6.1.2.1.2.2.1.2"]
+
+    assert backend.walk_columns(columns) == [
+        [(oid, value) for oid, value in _MIB if oid.startswith(column + ".")] for column in columns
+    ]
+    assert len(agent.commands) == 2
+
+
+def test_get_varbinds_from_walk_output() -> None:
+    backend = ClassicSNMPBackend(_bulkwalk_config(10), logger)
+    assert list(
+        backend._get_varbinds_from_walk_output(
+            [
+                ".1.3.6.1.2.1.1.1.0 = foo",
+                "broken",
+                "",
+                ".1.3.6.1.2.1.1.2.0 = No more variables left in this MIB View",
+            ]
+        )
+    ) == [(".1.3.6.1.2.1.1.1.0", b"foo"), None, (".1.3.6.1.2.1.1.2.0", None)]
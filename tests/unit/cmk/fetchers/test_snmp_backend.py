@@ -7,6 +7,11 @@ from pathlib import Path
 
 import pytest
 
+from cmk.utils.hostaddress import HostAddress, HostName
+from cmk.utils.log import logger
+
+from cmk.snmplib import SNMPBackendEnum, SNMPHostConfig
+
 import cmk.fetchers.snmp_backend._utils as utils
 from cmk.fetchers.snmp_backend import StoredWalkSNMPBackend
 
@@ -24,22 +29,59 @@ def test_strip_snmp_value(value: str, expected: bytes) -> None:
     assert utils.strip_snmp_value(value) == expected
 
 
+SNMP_CONFIG = SNMPHostConfig(
+    is_ipv6_primary=False,
+    hostname=HostName("testhost"),
+    ipaddress=HostAddress("1.2.3.4"),
+    credentials="",
+    port=42,
+    is_bulkwalk_host=False,
+    is_snmpv2or3_without_bulkwalk_host=False,
+    bulk_walk_size_of=0,
+    timing={},
+    oid_range_limits={},
+    snmpv3_contexts=[],
+    character_encoding="ascii",
+    snmp_backend=SNMPBackendEnum.STORED_WALK,
+)
+
+
 @pytest.mark.usefixtures("create_files")
 class TestStoredWalkSNMPBackend:
     @pytest.mark.parametrize(
-        "a, b, result",
+        "oid, expected",
         [
-            ("1.2.3", "1.2.3", 0),
-            ("1.2.3", ".1.2.3", 0),
-            (".1.2.3", "1.2.3", 0),
-            (".1.2.3", ".1.2.3", 0),
-            ("1.2.3", "1.2.3.4", 0),
-            ("1.2.3.4", "1.2.3", 1),
-            ("1.2.3", "4.5.6", -1),
+            ("1.2.3", [(".1.2.3", b"foo")]),
+            (".1.2.3", [(".1.2.3", b"foo")]),
+            ("1.2", [(".1.2.3", b"foo"), (".1.2.4", b"bar\nfoobar"), (".1.2.10", b"ten")]),
+            ("1.2.*", [(".1.2.3", b"foo")]),
+            ("1.2.3.*", []),
+            ("1.2.1", []),
+            ("1.20", [(".1.20.1", b"other")]),
+            ("1.3", []),
         ],
     )
-    def test_compare_oids(self, a: str, b: str, result: int) -> None:
-        assert StoredWalkSNMPBackend._compare_oids(a, b) == result
+    def test_walk(self, tmpdir: Path, oid: str, expected: list[tuple[str, bytes]]) -> None:
+        backend = StoredWalkSNMPBackend(
+            SNMP_CONFIG, logger, path=Path(tmpdir / "walkdata" / "3.txt")
+        )
+        assert backend.walk(oid) == expected
+
+    def test_get(self, tmpdir: Path) -> None:
+        backend = StoredWalkSNMPBackend(
+            SNMP_CONFIG, logger, path=Path(tmpdir / "walkdata" / "3.txt")
+        )
+        assert backend.get(".1.2.3") == b"foo"
+        assert backend.get(".1.2.*") == b"foo"
+        assert backend.get(".1.2") is None
+
+    def test_walk_changed_file(self, tmpdir: Path) -> None:
+        path = Path(tmpdir / "walkdata" / "1.txt")
+        backend = StoredWalkSNMPBackend(SNMP_CONFIG, logger, path=path)
+        assert backend.walk("1.2.3") == [(".1.2.3", b"foo")]
+
+        path.write_text(".1.2.3 changed\n")
+        assert backend.walk("1.2.3") == [(".1.2.3", b"changed")]
 
     def test_read_walk_data(self, tmpdir: Path) -> None:
         assert StoredWalkSNMPBackend.read_walk_from_path(tmpdir / "walkdata" / "1.txt") == [
@@ -59,3 +101,5 @@ def create_files(tmpdir):
     p1.write(".1.2.3 foo\n.1.2.4 bar\nfoobar\n")
     p2 = (tmpdir / "walkdata").join("2.txt")
     p2.write(".1.2.3 foo\n\n\n.1.2.5 test\n")
+    p3 = (tmpdir / "walkdata").join("3.txt")
+    p3.write(".1.2.3 foo\n.1.2.4 bar\nfoobar\n.1.2.10 ten\n.1.20.1 other\n")
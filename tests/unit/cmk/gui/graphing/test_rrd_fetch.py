@@ -26,6 +26,7 @@ from cmk.gui.graphing._graph_specification import (
 from cmk.gui.graphing._rrd_fetch import (
     _needed_elements_of_expression,
     fetch_rrd_data_for_graph,
+    fetch_rrd_data_of_services,
     NeededElementForTranslation,
     translate_and_merge_rrd_columns,
 )
@@ -67,12 +68,10 @@ def _setup_livestatus(mock_livestatus: MockLiveStatusConnection) -> Iterator[Non
         )
         mock_live.expect_query(
             """GET services
-Columns: rrddata:temp:temp.max:1681985455:1681999855:20
+Columns: host_name service_description rrddata:temp:temp.max:1681985455:1681999855:20
 Filter: host_name = my-host
 Filter: service_description = Temperature Zone 6
-ColumnHeaders: off
-
-            """,
+""",
             sites=["NO_SITE"],
         )
         yield
@@ -145,6 +144,54 @@ def test_fetch_rrd_data_for_graph_with_conversion(
         }
 
 
+def test_fetch_rrd_data_of_services(mock_livestatus: MockLiveStatusConnection) -> None:
+    with mock_livestatus(expect_status_query=True) as mock_live:
+        mock_live.add_table(
+            "services",
+            [
+                {
+                    "host_name": host_name,
+                    "service_description": "CPU load",
+                    "rrddata:load1:load1.max:1681985455:1681999855:20": [1, 2, 3, value],
+                }
+                for host_name, value in (("host-a", 4), ("host-b", 5))
+            ],
+        )
+        mock_live.expect_query(
+            """GET services
+Columns: host_name service_description rrddata:load1:load1.max:1681985455:1681999855:20
+Filter: host_name = host-a
+Filter: service_description = CPU load
+And: 2
+Filter: host_name = host-b
+Filter: service_description = CPU load
+And: 2
+Filter: host_name = host-c
+Filter: service_description = CPU load
+And: 2
+Or: 3
+""",
+            sites=["NO_SITE"],
+        )
+        metrics = [(MetricName("load1"), "max", 1.0)]
+        expected = {
+            (SiteId("NO_SITE"), HostName("host-a"), "CPU load"): [(metrics[0], [1, 2, 3, 4])],
+            (SiteId("NO_SITE"), HostName("host-b"), "CPU load"): [(metrics[0], [1, 2, 3, 5])],
+        }
+        services = {
+            (SiteId("NO_SITE"), HostName(host_name), "CPU load"): metrics
+            for host_name in ("host-a", "host-b", "host-c")
+        }
+        assert fetch_rrd_data_of_services(services, "max", _GRAPH_DATA_RANGE) == expected
+        # The fetched data is reused during the request
+        assert (
+            fetch_rrd_data_of_services(
+                {service: metrics for service in expected}, "max", _GRAPH_DATA_RANGE
+            )
+            == expected
+        )
+
+
 def test_translate_and_merge_rrd_columns() -> None:
     assert translate_and_merge_rrd_columns(
         MetricName("my_metric"),
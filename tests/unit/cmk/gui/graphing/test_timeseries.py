@@ -47,3 +47,26 @@ def test__time_series_math_exc(args: tuple[Operators, list[TimeSeries]]) -> None
 def test__time_series_math_stable_singles(operator: Operators) -> None:
     test_ts = TimeSeries([0, 180, 60, 6, 5, 10, None, -2, -3.14])
     assert _time_series_math(operator, [test_ts]) == test_ts
+
+
+@pytest.mark.parametrize(
+    "operator, result",
+    [
+        pytest.param("+", [7.0, 2.0, None, 0.0], id="sum"),
+        pytest.param("*", [10.0, None, None, 0.0], id="product"),
+        pytest.param("-", [3.0, None, None, 0.0], id="difference"),
+        pytest.param("/", [2.5, None, None, None], id="fraction"),
+        pytest.param("MAX", [5.0, 2.0, None, 0.0], id="maximum"),
+        pytest.param("MIN", [2.0, 2.0, None, 0.0], id="minimum"),
+        pytest.param("AVERAGE", [3.5, 2.0, None, 0.0], id="average"),
+        pytest.param("MERGE", [5.0, 2.0, None, 0.0], id="merge"),
+    ],
+)
+def test__time_series_math_missing_values(operator: Operators, result: list[float | None]) -> None:
+    assert _time_series_math(
+        operator,
+        [
+            TimeSeries([0, 240, 60, 5, None, None, 0]),
+            TimeSeries([0, 240, 60, 2, 2, None, 0, 1]),
+        ],
+    ) == TimeSeries([0, 240, 60, *result])
@@ -140,6 +140,7 @@ def test_default_config_from_plugins() -> None:
         "bi_packs",
         "default_bi_layout",
         "bi_layouts",
+        "bi_compilation_workers",
         "bi_compile_log",
         "bi_precompile_on_demand",
         "bi_use_legacy_compilation",
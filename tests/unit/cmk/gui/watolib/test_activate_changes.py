@@ -3,6 +3,7 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import hashlib
 import io
 import logging
 import tarfile
@@ -19,6 +20,7 @@ import cmk.utils.paths
 import cmk.utils.version as cmk_version
 
 import cmk.gui.watolib.activate_changes as activate_changes
+import cmk.gui.watolib.automations
 import cmk.gui.watolib.utils
 from cmk.gui.http import Request
 from cmk.gui.watolib.activate_changes import ConfigSyncFileInfo
@@ -566,6 +568,10 @@ def test_get_sync_archive(tmp_path: Path) -> None:
 
 
 def _get_test_sync_archive(tmp_path: Path) -> bytes:
+    return activate_changes._get_sync_archive(_create_test_sync_files(tmp_path), tmp_path)
+
+
+def _create_test_sync_files(tmp_path: Path) -> list[str]:
     tmp_path.joinpath("etc").mkdir(parents=True, exist_ok=True)
     with tmp_path.joinpath("etc/abc").open("w", encoding="utf-8") as f:
         f.write("gä")
@@ -583,17 +589,112 @@ def _get_test_sync_archive(tmp_path: Path) -> bytes:
     tmp_path.joinpath("broken-symlink").symlink_to("eeg")
     tmp_path.joinpath("working-symlink").symlink_to("ding")
 
-    return activate_changes._get_sync_archive(
-        [
-            "etc/abc",
-            "file-to-dir/aaa",
-            "ding",
-            "dir-to-file",
-            "broken-symlink",
-            "working-symlink",
-        ],
-        tmp_path,
-    )
+    return [
+        "etc/abc",
+        "file-to-dir/aaa",
+        "ding",
+        "dir-to-file",
+        "broken-symlink",
+        "working-symlink",
+    ]
+
+
+def test_write_sync_archive(tmp_path: Path) -> None:
+    to_sync = _create_test_sync_files(tmp_path / "central")
+    with (tmp_path / "sync_archive").open("w+b") as sync_archive:
+        activate_changes._write_sync_archive(to_sync, tmp_path / "central", sync_archive)
+        sync_archive.seek(0)
+        with tarfile.open(mode="r:gz", fileobj=sync_archive) as f:
+            assert sorted(f.getnames()) == sorted(to_sync)
+
+
+def _upload_test_sync_archive(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, transfer_id: str, failures: int = 0
+) -> tuple[int, bytes]:
+    monkeypatch.setattr(cmk.utils.paths, "tmp_dir", tmp_path / "remote_tmp")
+    monkeypatch.setattr(activate_changes, "SYNC_ARCHIVE_CHUNK_SIZE", 5)
+    monkeypatch.setattr(activate_changes, "get_site_config", lambda site_id: {})
+    calls = []
+
+    def remote_automation(
+        site: object, command: str, vars_: list[tuple[str, str]], files: dict[str, io.BytesIO]
+    ) -> int:
+        calls.append(command)
+        if len(calls) <= failures:
+            raise activate_changes.MKGeneralException("connection lost")
+        vars_dict = dict(vars_)
+        return activate_changes.AutomationReceiveConfigSyncChunk().execute(
+            activate_changes.ReceiveConfigSyncChunkRequest(
+                site_id=SiteId("remote"),
+                transfer_id=vars_dict["transfer_id"],
+                offset=int(vars_dict["offset"]),
+                checksum=vars_dict["checksum"],
+                chunk=files["chunk"].getvalue(),
+            )
+        )
+
+    monkeypatch.setattr(cmk.gui.watolib.automations, "do_remote_automation", remote_automation)
+    content = b"sync archive content"
+    with (tmp_path / "sync_archive").open("w+b") as sync_archive:
+        sync_archive.write(content)
+        return (
+            activate_changes._upload_sync_archive(SiteId("remote"), transfer_id, sync_archive),
+            content,
+        )
+
+
+def test_upload_sync_archive(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    transfer_id = "0123456789abcdef0123456789abcdef"
+    size, content = _upload_test_sync_archive(monkeypatch, tmp_path, transfer_id, failures=2)
+    assert size == len(content)
+    assert activate_changes._sync_archive_upload_path(transfer_id).read_bytes() == content
+
+
+def test_upload_sync_archive_gives_up(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    with pytest.raises(activate_changes.MKGeneralException, match="connection lost"):
+        _upload_test_sync_archive(
+            monkeypatch, tmp_path, "0123456789abcdef0123456789abcdef", failures=3
+        )
+
+
+class TestAutomationReceiveConfigSyncChunk:
+    @pytest.fixture(autouse=True)
+    def fixture_tmp_dir(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+        monkeypatch.setattr(cmk.utils.paths, "tmp_dir", tmp_path)
+
+    @staticmethod
+    def _execute(offset: int, chunk: bytes, checksum: str | None = None) -> int:
+        return activate_changes.AutomationReceiveConfigSyncChunk().execute(
+            activate_changes.ReceiveConfigSyncChunkRequest(
+                site_id=SiteId("remote"),
+                transfer_id="0123456789abcdef0123456789abcdef",
+                offset=offset,
+                checksum=hashlib.sha256(chunk).hexdigest() if checksum is None else checksum,
+                chunk=chunk,
+            )
+        )
+
+    def test_execute(self) -> None:
+        assert self._execute(0, b"abc") == 3
+        assert self._execute(3, b"def") == 6
+        # A chunk sent again replaces everything after its offset
+        assert self._execute(3, b"xy") == 5
+        # Chunks after the received data are ignored
+        assert self._execute(7, b"z") == 5
+        assert (
+            activate_changes._sync_archive_upload_path(
+                "0123456789abcdef0123456789abcdef"
+            ).read_bytes()
+            == b"abcxy"
+        )
+
+    def test_execute_checks_checksum(self) -> None:
+        with pytest.raises(activate_changes.MKGeneralException, match="checksum"):
+            self._execute(0, b"abc", checksum="123")
+
+    def test_invalid_transfer_id(self) -> None:
+        with pytest.raises(activate_changes.MKGeneralException):
+            activate_changes._sync_archive_upload_path("../../etc/passwd")
 
 
 class TestAutomationReceiveConfigSync:
@@ -663,6 +764,42 @@ class TestAutomationReceiveConfigSync:
         assert file_to_dir.is_dir()
         assert file_to_dir.joinpath("aaa").exists()
 
+    def test_automation_receive_config_sync_uploaded_archive(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path,
+    ) -> None:
+        remote_path = tmp_path / "remote"
+        remote_path.mkdir()
+        monkeypatch.setattr(cmk.utils.paths, "omd_root", remote_path)
+        monkeypatch.setattr(cmk.utils.paths, "tmp_dir", tmp_path / "tmp")
+        monkeypatch.setattr(
+            cmk.gui.watolib.activate_changes,
+            "_execute_post_config_sync_actions",
+            lambda site_id: None,
+        )
+        sync_archive = activate_changes._sync_archive_upload_path(
+            "0123456789abcdef0123456789abcdef"
+        )
+        sync_archive.parent.mkdir(parents=True)
+        with sync_archive.open("wb") as f:
+            activate_changes._write_sync_archive(
+                _create_test_sync_files(tmp_path / "central"), tmp_path / "central", f
+            )
+
+        activate_changes.AutomationReceiveConfigSync().execute(
+            activate_changes.ReceiveConfigSyncRequest(
+                site_id=SiteId("remote"),
+                sync_archive=sync_archive,
+                to_delete=[],
+                config_generation=0,
+            )
+        )
+
+        assert remote_path.joinpath("etc/abc").read_text() == "gä"
+        assert remote_path.joinpath("working-symlink").is_symlink()
+        assert not sync_archive.exists()
+
     def test_get_request(
         self,
         monkeypatch: pytest.MonkeyPatch,
@@ -703,3 +840,54 @@ def test_get_current_config_generation() -> None:
     activate_changes.update_config_generation()
     activate_changes.update_config_generation()
     assert activate_changes._get_current_config_generation() == 3
+
+
+def test_get_config_sync_file_infos_with_hash_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Files are only cached once they are older than the file system timestamp resolution
+    monkeypatch.setattr(activate_changes, "_HASH_CACHE_MIN_AGE", -1)
+    base_dir = cmk.utils.paths.omd_root / "replication"
+    _create_get_config_sync_file_infos_test_config(base_dir)
+    replication_paths = [
+        ReplicationPath("dir", "d4-multiple-files", "etc/d4", []),
+        ReplicationPath("file", "f2", "bla/blub/f2", []),
+        ReplicationPath("dir", "links", "links", []),
+    ]
+    expected = activate_changes._get_config_sync_file_infos(replication_paths, base_dir)
+    cache_path = tmp_path / "config_sync_hashes.pkl"
+
+    hash_cache = activate_changes.ConfigSyncHashCache.load(cache_path)
+    assert (
+        activate_changes._get_config_sync_file_infos(
+            replication_paths, base_dir, hash_cache=hash_cache
+        )
+        == expected
+    )
+    assert (hash_cache.hits, hash_cache.misses) == (0, 5)
+    hash_cache.save()
+
+    base_dir.joinpath("etc/d4/x1").write_text("Däng3")
+    hash_cache = activate_changes.ConfigSyncHashCache.load(cache_path)
+    sync_infos = activate_changes._get_config_sync_file_infos(
+        replication_paths, base_dir, hash_cache=hash_cache
+    )
+    assert (hash_cache.hits, hash_cache.misses) == (4, 1)
+    assert sync_infos["etc/d4/x1"].file_hash == activate_changes._create_config_sync_file_hash(
+        str(base_dir.joinpath("etc/d4/x1"))
+    )
+    assert sync_infos["etc/d4/x1"].file_hash != expected["etc/d4/x1"].file_hash
+
+
+def test_hash_cache_skips_recently_changed_files(tmp_path: Path) -> None:
+    file_path = tmp_path / "file"
+    file_path.write_text("content")
+    cache_path = tmp_path / "config_sync_hashes.pkl"
+
+    hash_cache = activate_changes.ConfigSyncHashCache.load(cache_path)
+    hash_cache.file_hash(str(file_path), file_path.stat())
+    hash_cache.save()
+
+    hash_cache = activate_changes.ConfigSyncHashCache.load(cache_path)
+    hash_cache.file_hash(str(file_path), file_path.stat())
+    assert (hash_cache.hits, hash_cache.misses) == (0, 1)
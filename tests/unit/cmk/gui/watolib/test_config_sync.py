@@ -3,6 +3,7 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import email
 import time
 from collections.abc import Callable, Iterable, Iterator
 from contextlib import contextmanager
@@ -11,6 +12,7 @@ from pathlib import Path
 import pytest
 import responses
 from pytest_mock import MockerFixture
+from requests import PreparedRequest
 
 from tests.testlib.utils import is_enterprise_repo, is_managed_repo
 
@@ -546,6 +548,12 @@ def test_synchronize_site(
         ),
     )
 
+    mocked_responses.add_callback(
+        method=responses.POST,
+        url="http://localhost/unit_remote_1/check_mk/automation.py?command=receive-config-sync-chunk",
+        callback=_receive_sync_archive_chunk,
+    )
+
     mocked_responses.add(
         method=responses.POST,
         url="http://localhost/unit_remote_1/check_mk/automation.py?command=receive-config-sync",
@@ -568,6 +576,18 @@ def test_synchronize_site(
             _synchronize_site(activation_manager, site_id, snapshot_settings, file_filter_func)
 
 
+def _receive_sync_archive_chunk(request: PreparedRequest) -> tuple[int, dict[str, str], str]:
+    assert isinstance(request.body, bytes)
+    message = email.message_from_bytes(
+        b"Content-Type: %s\r\n\r\n%s" % (request.headers["Content-Type"].encode(), request.body)
+    )
+    fields = {
+        part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+        for part in message.get_payload()
+    }
+    return 200, {}, repr(int(fields["offset"]) + len(fields["chunk"]))
+
+
 def _synchronize_site(
     activation_manager: activate_changes.ActivateChangesManager,
     site_id: SiteId,
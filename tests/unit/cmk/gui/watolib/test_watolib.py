@@ -56,6 +56,7 @@ def test_registered_automation_commands() -> None:
         "ping",
         "get-config-sync-state",
         "receive-config-sync",
+        "receive-config-sync-chunk",
         "service-discovery-job",
         "checkmk-remote-automation-start",
         "checkmk-remote-automation-get-status",
@@ -87,10 +88,12 @@ def test_registered_configvars() -> None:
         "apache_process_tuning",
         "archive_orphans",
         "auth_by_http_header",
+        "bi_compilation_workers",
         "builtin_icon_visibility",
         "bulk_discovery_default_settings",
         "check_mk_perfdata_with_times",
         "cluster_max_cachefile_age",
+        "core_config_workers",
         "crash_report_target",
         "crash_report_url",
         "custom_service_attributes",
@@ -106,6 +109,8 @@ def test_registered_configvars() -> None:
         "event_limit",
         "eventsocket_queue_len",
         "failed_notification_horizon",
+        "fetcher_deadline",
+        "fetcher_threads",
         "hard_query_limit",
         "history_lifetime",
         "history_rotation",
@@ -137,8 +142,11 @@ def test_registered_configvars() -> None:
         "notification_plugin_timeout",
         "page_heading",
         "pagetitle_date_format",
+        "parsing_workers",
         "password_policy",
         "piggyback_max_cachefile_age",
+        "piggyback_storage",
+        "prediction_workers",
         "profile",
         "quicksearch_dropdown_limit",
         "quicksearch_search_order",
@@ -181,6 +189,7 @@ def test_registered_configvars() -> None:
         "user_downtime_timeranges",
         "user_icons_and_actions",
         "user_localizations",
+        "value_store_format",
         "view_action_defaults",
         "virtual_host_trees",
         "wato_activation_method",
@@ -101,6 +101,56 @@ def test_get_snmp_table(
     assert get_all_snmp_tables(snmp_info) == expected_values
 
 
+class SNMPColumnsTestBackend(SNMPTestBackend):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.walked_columns: list[Sequence[str]] = []
+
+    def walk_columns(self, oids, section_name=None, table_base_oid=None, context_name=None):
+        self.walked_columns.append(oids)
+        return [
+            [(f"{oid}.{r}", f"{oid[-1]}{r}".encode()) for r in (1, 2, 3) if int(oid[-1]) != r]
+            for oid in oids
+        ]
+
+
+def test_get_snmp_table_walks_columns_together() -> None:
+    backend = SNMPColumnsTestBackend(SNMPConfig, logger)
+    walk_cache = {".1.2.3.1": (False, [(".1.2.3.1.1", b"cached")])}
+    assert get_snmp_table(
+        section_name=SectionName("unit_test"),
+        tree=BackendSNMPTree(
+            base=".1.2.3",
+            oids=[
+                BackendOIDSpec(SpecialColumn.END, "string", False),
+                BackendOIDSpec("1", "string", False),
+                BackendOIDSpec("2", "string", True),
+                BackendOIDSpec("3", "string", False),
+            ],
+        ),
+        walk_cache=walk_cache,
+        backend=backend,
+    ) == [
+        ["1", "cached", "21", "31"],
+        ["", "", "", "32"],
+        ["3", "", "23", ""],
+    ]
+    assert backend.walked_columns == [[".1.2.3.2", ".1.2.3.3"]]
+    assert walk_cache[".1.2.3.2"] == (True, [(".1.2.3.2.1", b"21"), (".1.2.3.2.3", b"23")])
+
+
+def test_sanitize_snmp_table_columns_unsorted() -> None:
+    assert _snmp_table._sanitize_snmp_table_columns(
+        [
+            (".1.2", [(".1.2.10", b"a10"), (".1.2.2", b"a2")], "string"),
+            (".1.3", [(".1.3.1", b"b1"), (".1.3.2", b"b2"), (".1.3.10", b"b10")], "string"),
+        ]
+    ) == [
+        ([b"", b"a2", b"a10"], "string"),
+        ([b"b1", b"b2", b"b10"], "string"),
+    ]
+
+
 @pytest.mark.parametrize(
     "encoding, columns, expected",
     [
@@ -22,6 +22,8 @@ def test_ok_files_are_kept(tmp_path: Path) -> None:
 
     info_file.write_text(
         PredictionInfo(
+            host_name="my_host",
+            service_description="My Service",
             name=Timegroup("everyhour"),
             time=123456789,
             range=(23, 42),
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from pathlib import Path
+
+import pytest
+
+from tests.testlib import on_time
+
+from cmk.utils.prediction import _plugin_interface, _precompute
+from cmk.utils.prediction._prediction import (
+    PredictionData,
+    PredictionInfo,
+    PredictionParameters,
+    PredictionStore,
+    Timegroup,
+)
+
+# Tuesday, 2018-11-27 23:30 UTC
+_NOW = 1543361400
+_PARAMS = PredictionParameters(horizon=90, period="wday")
+_DATA = PredictionData(points=[], data_twindow=[0, 86400], step=86400)
+
+
+def _save(basedir: Path, timegroup: str, computed: int, params: PredictionParameters) -> None:
+    PredictionStore(basedir, "host", "CPU load", "load15").save_prediction(
+        PredictionInfo(
+            host_name="host",
+            service_description="CPU load",
+            name=Timegroup(timegroup),
+            time=computed,
+            range=(0, 86400),
+            cf="MAX",
+            dsname="load15",
+            slice=86400,
+            params=params,
+        ),
+        _DATA,
+    )
+
+
+def _fake_compute(computed: list[str]) -> object:
+    def compute_prediction(info: PredictionInfo, store: PredictionStore, *_args: object) -> None:
+        computed.append(info.name)
+        store.save_prediction(info, _DATA)
+
+    return compute_prediction
+
+
+def test_precompute_upcoming_timegroup(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    computed: list[str] = []
+    monkeypatch.setattr(_precompute, "compute_prediction", _fake_compute(computed))
+    _save(tmp_path, "tuesday", _NOW - 86400, _PARAMS)
+
+    with on_time(_NOW, "UTC"):
+        assert not _precompute.precompute_predictions(tmp_path, _NOW, 3600)
+        assert computed == ["wednesday"]
+
+        # Everything needed within the next hour is computed
+        assert not _precompute.precompute_predictions(tmp_path, _NOW, 3600)
+        assert computed == ["wednesday"]
+
+
+def test_precompute_outdated(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    computed: list[str] = []
+    monkeypatch.setattr(_precompute, "compute_prediction", _fake_compute(computed))
+    _save(tmp_path, "tuesday", _NOW - 7 * 86400 + 1800, _PARAMS)
+
+    with on_time(_NOW, "UTC"):
+        assert not _precompute.precompute_predictions(tmp_path, _NOW, 3600, max_workers=2)
+    # Computed in the worker processes
+    assert not computed
+    assert {
+        info.name: info.time
+        for info in PredictionStore(tmp_path, "host", "CPU load", "load15").available_predictions()
+    } == {"tuesday": _NOW, "wednesday": _NOW}
+
+
+def test_precompute_changed_parameters(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    computed: list[str] = []
+    monkeypatch.setattr(_precompute, "compute_prediction", _fake_compute(computed))
+    _save(tmp_path, "tuesday", _NOW - 3600, _PARAMS)
+    _save(tmp_path, "wednesday", _NOW - 7200, PredictionParameters(horizon=30, period="wday"))
+
+    with on_time(_NOW, "UTC"):
+        assert not _precompute.precompute_predictions(tmp_path, _NOW, 3600)
+    # The parameters of the latest prediction are used
+    assert computed == ["wednesday"]
+    assert {
+        info.params
+        for info in PredictionStore(tmp_path, "host", "CPU load", "load15").available_predictions()
+    } == {_PARAMS}
+
+
+def test_precompute_skips_unknown_host(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    computed: list[str] = []
+    monkeypatch.setattr(_precompute, "compute_prediction", _fake_compute(computed))
+    info_file = tmp_path / "host" / "CPU_load" / "load15" / "tuesday.info"
+    info_file.parent.mkdir(parents=True)
+    # Stored before the host and the service were part of the info
+    info_file.write_text(
+        '{"name": "tuesday", "time": %d, "range": [0, 86400], "cf": "MAX", "dsname": "load15",'
+        ' "slice": 86400, "params": {"horizon": 90, "period": "wday"}}' % (_NOW - 86400)
+    )
+
+    with on_time(_NOW, "UTC"):
+        assert not _precompute.precompute_predictions(tmp_path, _NOW, 3600)
+    assert not computed
+
+
+def test_get_info_invalid(tmp_path: Path) -> None:
+    info_file = tmp_path / "host" / "CPU_load" / "load15" / "tuesday.info"
+    info_file.parent.mkdir(parents=True)
+    info_file.write_text('{"name": "tuesday"}')
+    store = PredictionStore(tmp_path, "host", "CPU load", "load15")
+    assert store.get_info(Timegroup("tuesday")) is None
+    assert not list(store.available_predictions())
+
+
+@pytest.mark.usefixtures("disable_debug")
+def test_precompute_failure(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def compute_prediction(*_args: object) -> None:
+        raise RuntimeError("no data")
+
+    monkeypatch.setattr(_precompute, "compute_prediction", compute_prediction)
+    _save(tmp_path, "tuesday", _NOW - 86400, _PARAMS)
+
+    with on_time(_NOW, "UTC"):
+        assert _precompute.precompute_predictions(tmp_path, _NOW, 3600) == 1
+
+
+@pytest.mark.parametrize(
+    "computed, available",
+    [
+        pytest.param(_NOW - 86400, True, id="valid"),
+        pytest.param(_NOW - 7 * 86400 - 3600, True, id="outdated, not yet refreshed"),
+        pytest.param(_NOW - 8 * 86400 - 3600, False, id="outdated"),
+    ],
+)
+def test_get_prediction_outdated(tmp_path: Path, computed: int, available: bool) -> None:
+    _save(tmp_path, "tuesday", computed, _PARAMS)
+    store = PredictionStore(tmp_path, "host", "CPU load", "load15")
+    with on_time(_NOW, "UTC"):
+        assert (
+            _plugin_interface._get_prediction(store, Timegroup("tuesday"), _PARAMS) is not None
+        ) is available
@@ -4,6 +4,7 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 from collections.abc import Mapping, Sequence
+from pathlib import Path
 from typing import Any
 
 import pytest
@@ -15,6 +16,7 @@ from cmk.utils.hostaddress import HostName
 from cmk.utils.rulesets.ruleset_matcher import (
     LabelManager,
     matches_tag_condition,
+    MatchingHostsCacheFile,
     RuleConditionsSpec,
     RulesetMatcher,
     RulesetMatchObject,
@@ -882,3 +884,195 @@ def test_matches_tag_condition(
         )
         is expected_result
     )
+
+
+def _optimizer_for_host_index_tests(
+    matching_hosts_cache: MatchingHostsCacheFile | None = None,
+) -> RulesetMatcher:
+    return RulesetMatcher(
+        tag_to_group_map={},
+        host_tags={
+            HostName("host1"): {TagGroupID("agent"): TagID("cmk-agent")},
+            HostName("host2"): {TagGroupID("agent"): TagID("no-agent")},
+            HostName("host3"): {TagGroupID("agent"): TagID("no-agent")},
+            HostName("host4"): {TagGroupID("agent"): TagID("special-agents")},
+        },
+        host_paths={
+            HostName("host1"): "/lvl1/",
+            HostName("host2"): "/lvl1/lvl2/",
+            HostName("host3"): "/other/",
+        },
+        labels=LabelManager(
+            explicit_host_labels={
+                HostName("host1"): {"os": "linux"},
+                HostName("host2"): {"os": "windows"},
+                HostName("host3"): {"os": "linux"},
+            },
+            host_label_rules=(),
+            service_label_rules=(),
+            discovered_labels_of_service=lambda *args, **kw: {},
+        ),
+        all_configured_hosts={
+            HostName("host1"),
+            HostName("host2"),
+            HostName("host3"),
+            HostName("host4"),
+        },
+        clusters_of={},
+        nodes_of={},
+        matching_hosts_cache=matching_hosts_cache,
+    )
+
+
+@pytest.mark.parametrize(
+    "condition, expected_result",
+    [
+        pytest.param({}, {"host1", "host2", "host3", "host4"}, id="no condition"),
+        pytest.param({"host_folder": "/lvl1/"}, {"host1", "host2"}, id="folder"),
+        pytest.param(
+            {"host_tags": {TagGroupID("agent"): {"$or": [TagID("cmk-agent"), TagID("no-agent")]}}},
+            {"host1", "host2", "host3"},
+            id="or tag condition",
+        ),
+        pytest.param(
+            {"host_tags": {TagGroupID("agent"): {"$nor": [TagID("cmk-agent"), TagID("no-agent")]}}},
+            {"host4"},
+            id="nor tag condition",
+        ),
+        pytest.param(
+            {"host_tags": {TagGroupID("agent"): {"$ne": TagID("no-agent")}}},
+            {"host1", "host4"},
+            id="negated tag condition",
+        ),
+        pytest.param(
+            {"host_tags": {TagGroupID("agent"): TagID("unknown")}},
+            set(),
+            id="unknown tag",
+        ),
+        pytest.param({"host_labels": {"os": "linux"}}, {"host1", "host3"}, id="label"),
+        pytest.param(
+            {"host_labels": {"os": {"$ne": "linux"}}}, {"host2", "host4"}, id="negated label"
+        ),
+        pytest.param(
+            {"host_name": {"$nor": ["host1", "unknown"]}},
+            {"host2", "host3", "host4"},
+            id="negated host list",
+        ),
+        pytest.param(
+            {"host_name": [{"$regex": "host[12]"}, "host4"]},
+            {"host1", "host2", "host4"},
+            id="host regex",
+        ),
+        pytest.param(
+            {
+                "host_folder": "/lvl1/",
+                "host_tags": {TagGroupID("agent"): TagID("no-agent")},
+                "host_labels": {"os": "windows"},
+                "host_name": ["host2", "host3"],
+            },
+            {"host2"},
+            id="all conditions",
+        ),
+    ],
+)
+def test_all_matching_hosts_host_index(
+    condition: RuleConditionsSpec, expected_result: set[str]
+) -> None:
+    optimizer = _optimizer_for_host_index_tests().ruleset_optimizer
+    assert optimizer._all_matching_hosts(condition, with_foreign_hosts=False) == expected_result
+
+
+def test_all_matching_hosts_processed_hosts() -> None:
+    optimizer = _optimizer_for_host_index_tests().ruleset_optimizer
+    optimizer.set_all_processed_hosts({HostName("host1"), HostName("unknown")})
+
+    assert optimizer._all_matching_hosts({}, with_foreign_hosts=False) == {"host1"}
+    assert optimizer._all_matching_hosts({}, with_foreign_hosts=True) == {
+        "host1",
+        "host2",
+        "host3",
+        "host4",
+    }
+    assert optimizer.get_hosts_within_folder("/lvl1/", with_foreign_hosts=False) == {"host1"}
+
+
+def test_matching_hosts_cache_roundtrip(tmp_path: Path) -> None:
+    cache = MatchingHostsCacheFile(tmp_path / "ruleset_matcher_cache", "fingerprint")
+    condition: RuleConditionsSpec = {
+        "host_folder": "/lvl1/",
+        "host_tags": {TagGroupID("agent"): TagID("no-agent")},
+    }
+
+    writer = _optimizer_for_host_index_tests(cache).ruleset_optimizer
+    assert writer._all_matching_hosts(condition, with_foreign_hosts=False) == {"host2"}
+    writer.save_matching_hosts_cache()
+
+    reader = _optimizer_for_host_index_tests(cache).ruleset_optimizer
+    assert reader._persisted_host_index is not None
+    assert reader._persisted_host_index.all_matching_hosts() == writer._shared_matching_hosts
+    assert reader._host_index.hosts == writer._host_index.hosts
+    assert reader._host_index.tags == writer._host_index.tags
+    assert reader._host_index.paths == writer._host_index.paths
+
+    reader.set_all_processed_hosts({HostName("host1")})
+    assert reader._all_matching_hosts(condition, with_foreign_hosts=False) == set()
+    assert reader._all_matching_hosts(condition, with_foreign_hosts=True) == {"host2"}
+
+
+def test_matching_hosts_cache_lazy(tmp_path: Path) -> None:
+    cache = MatchingHostsCacheFile(tmp_path / "ruleset_matcher_cache", "fingerprint")
+    condition: RuleConditionsSpec = {
+        "host_folder": "/lvl1/",
+        "host_labels": {"os": "windows"},
+    }
+
+    writer = _optimizer_for_host_index_tests(cache).ruleset_optimizer
+    assert writer._all_matching_hosts(condition, with_foreign_hosts=False) == {"host2"}
+    writer.save_matching_hosts_cache()
+
+    reader = _optimizer_for_host_index_tests(cache).ruleset_optimizer
+    assert reader._persisted_host_index is not None
+    # The other conditions of a rule with labels are persisted
+    assert len(reader._persisted_host_index.all_matching_hosts()) == 1
+    assert reader._all_matching_hosts(condition, with_foreign_hosts=False) == {"host2"}
+    assert not reader._host_index.tags._bitmaps  # type: ignore[attr-defined]
+    assert reader._host_index.tags[(TagGroupID("agent"), TagID("no-agent"))] == 0b0110
+    assert len(reader._host_index.tags._bitmaps) == 1  # type: ignore[attr-defined]
+
+
+def test_matching_hosts_cache_other_config(tmp_path: Path) -> None:
+    cache_file = tmp_path / "ruleset_matcher_cache"
+    _optimizer_for_host_index_tests(
+        MatchingHostsCacheFile(cache_file, "fingerprint")
+    ).ruleset_optimizer.save_matching_hosts_cache()
+
+    optimizer = _optimizer_for_host_index_tests(
+        MatchingHostsCacheFile(cache_file, "other fingerprint")
+    ).ruleset_optimizer
+    assert optimizer._persisted_host_index is None
+
+
+def test_matching_hosts_cache_changed_hosts(tmp_path: Path) -> None:
+    cache = MatchingHostsCacheFile(tmp_path / "ruleset_matcher_cache", "fingerprint")
+    _optimizer_for_host_index_tests(cache).ruleset_optimizer.save_matching_hosts_cache()
+
+    matcher = RulesetMatcher(
+        tag_to_group_map={},
+        host_tags={HostName("host1"): {}},
+        host_paths={},
+        labels=LabelManager({}, (), (), lambda *args, **kw: {}),
+        all_configured_hosts={HostName("host1")},
+        clusters_of={},
+        nodes_of={},
+        matching_hosts_cache=cache,
+    )
+    assert matcher.ruleset_optimizer._persisted_host_index is None
+    assert matcher.ruleset_optimizer._host_index.hosts == ["host1"]
+
+
+def test_matching_hosts_cache_broken_file(tmp_path: Path) -> None:
+    cache = MatchingHostsCacheFile(tmp_path / "ruleset_matcher_cache", "fingerprint")
+    cache.path.write_bytes(b"")
+
+    optimizer = _optimizer_for_host_index_tests(cache).ruleset_optimizer
+    assert optimizer._persisted_host_index is None
@@ -3,6 +3,8 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import pytest
+
 import cmk.utils.caching
 
 
@@ -45,3 +47,96 @@ def test_populated() -> None:
     assert cache.is_populated()
     cache.clear()
     assert not cache.is_populated()
+
+
+def test_bounded_cache_lru_eviction() -> None:
+    cache = cmk.utils.caching.CacheManager().obtain_bounded_cache("test", max_entries=2)
+
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1
+    cache["c"] = 3
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.stats() == cmk.utils.caching.CacheStats(
+        entries=2, approx_bytes=cache.approx_bytes, hits=1, misses=1, evictions=1
+    )
+
+
+def test_bounded_cache_max_bytes() -> None:
+    cache: cmk.utils.caching.BoundedCache[str, str] = cmk.utils.caching.BoundedCache(max_bytes=1000)
+    for key in "abcdefgh":
+        cache[key] = key * 100
+
+    assert 0 < len(cache) < 8
+    assert cache.approx_bytes <= 1000
+    assert cache.evictions == 8 - len(cache)
+
+
+def test_bounded_cache_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 1000.0
+    monkeypatch.setattr(cmk.utils.caching.time, "monotonic", lambda: now)
+    cache: cmk.utils.caching.BoundedCache[str, int] = cmk.utils.caching.BoundedCache(ttl=10)
+    cache["a"] = 1
+
+    now += 5
+    assert cache["a"] == 1
+
+    now += 10
+    with pytest.raises(KeyError):
+        _ = cache["a"]
+    assert cache.is_empty()
+    assert cache.stats().evictions == 1
+
+
+def test_bounded_cache_setdefault_and_clear() -> None:
+    mgr = cmk.utils.caching.CacheManager()
+    cache = mgr.obtain_bounded_cache("test", max_entries=10)
+    assert mgr.obtain_bounded_cache("test") is cache
+
+    assert cache.setdefault("a", 1) == 1
+    assert cache.setdefault("a", 2) == 1
+    cache.set_populated()
+
+    mgr.clear_all()
+    assert cache.is_empty()
+    assert not cache.is_populated()
+    assert cache.approx_bytes == 0
+
+
+def test_dump_stats() -> None:
+    mgr = cmk.utils.caching.CacheManager()
+    mgr.obtain_cache("dict")["a"] = 1
+    bounded = mgr.obtain_bounded_cache("bounded", max_entries=10)
+    bounded["a"] = 1
+    assert bounded.get("a") == 1
+
+    stats = mgr.dump_stats()
+    assert stats["dict"].entries == 1
+    assert stats["dict"].hit_ratio is None
+    assert stats["bounded"].entries == 1
+    assert stats["bounded"].hit_ratio == 1.0
+
+
+def test_cache_names_unique() -> None:
+    mgr = cmk.utils.caching.CacheManager()
+    mgr.obtain_cache("dict")
+    mgr.obtain_bounded_cache("bounded")
+
+    with pytest.raises(ValueError):
+        mgr.obtain_bounded_cache("dict")
+    with pytest.raises(ValueError):
+        mgr.obtain_cache("bounded")
+
+
+def test_bounded_cache_pop() -> None:
+    cache: cmk.utils.caching.BoundedCache[str, int] = cmk.utils.caching.BoundedCache()
+    cache["a"] = 1
+
+    assert cache.pop("a") == 1
+    assert cache.approx_bytes == 0
+    assert cache.pop("a", None) is None
+    with pytest.raises(KeyError):
+        cache.pop("a")
@@ -4,10 +4,11 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import json
+import subprocess
 
 import pytest
 
-from cmk.utils.cpu_tracking import Snapshot
+from cmk.utils.cpu_tracking import CPUTracker, Snapshot
 
 
 def json_identity(serializable: object) -> object:
@@ -50,3 +51,17 @@ class TestCpuTracking:
 
     def test_json_serialization_now(self, now: Snapshot) -> None:
         assert Snapshot.deserialize(json_identity(now.serialize())) == now
+
+    def test_per_thread_tracker(self) -> None:
+        with CPUTracker(per_thread=True) as tracker:
+            sum(range(100000))
+        assert tracker.duration.process.elapsed >= 0.0
+
+    def test_per_thread_tracker_children(self) -> None:
+        with CPUTracker(per_thread=True) as tracker:
+            subprocess.run(
+                ["sh", "-c", "i=0; while [ $i -lt 300000 ]; do i=$((i+1)); done"], check=True
+            )
+        assert (
+            tracker.duration.process.children_user + tracker.duration.process.children_system > 0.0
+        )
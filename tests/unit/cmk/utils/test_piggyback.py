@@ -4,6 +4,7 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import os
+import threading
 from collections.abc import Iterable
 from datetime import datetime, timezone
 from pathlib import Path
@@ -589,3 +590,181 @@ def test_get_piggyback_matching_time_settings(
             [HostName("source-host")], HostName("piggybacked-host"), time_settings
         )._expanded_settings.keys()
     ) == sorted(expected_time_setting_keys)
+
+
+@pytest.fixture(name="database_storage")
+def fixture_database_storage(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr("cmk.utils.paths.piggyback_dir", tmp_path / "piggyback")
+    monkeypatch.setattr("cmk.utils.paths.piggyback_source_dir", tmp_path / "piggyback_source")
+    monkeypatch.setattr("cmk.utils.paths.piggyback_database", tmp_path / "piggyback.db")
+    monkeypatch.setattr(piggyback, "_storage", "database")
+
+
+def _store_in_database(source_hostname: str, piggybacked_hostnames: Iterable[str]) -> None:
+    with freeze_time(datetime.fromtimestamp(_REF_TIME, tz=timezone.utc)):
+        piggyback.store_piggyback_raw_data(
+            HostName(source_hostname),
+            {
+                HostName(h): [b"<<<check_mk>>>", source_hostname.encode()]
+                for h in piggybacked_hostnames
+            },
+        )
+
+
+@pytest.mark.usefixtures("database_storage")
+def test_store_piggyback_raw_data_database() -> None:
+    _store_in_database("source1", ["test-host", "test-host2"])
+
+    raw_data = _get_only_raw_data_element(
+        _TEST_HOST_NAME, [(None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE)]
+    )
+
+    assert not cmk.utils.paths.piggyback_dir.exists()
+    assert raw_data.info.source_hostname == "source1"
+    assert raw_data.info.file_path == cmk.utils.paths.piggyback_database
+    assert raw_data.info.successfully_processed is True
+    assert raw_data.info.message == "Successfully processed from source 'source1'"
+    assert raw_data.raw_data == b"<<<check_mk>>>\nsource1\n"
+
+
+@pytest.mark.usefixtures("database_storage")
+def test_get_piggyback_raw_data_database_other_thread() -> None:
+    _store_in_database("source1", ["test-host"])
+    # Connects to the database in the main thread, like the fetchers are created
+    with freeze_time(_FREEZE_DATETIME):
+        assert piggyback.has_piggyback_raw_data(
+            _TEST_HOST_NAME, [(None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE)]
+        )
+
+    raw_data: list[piggyback.PiggybackRawDataInfo] = []
+    fetcher = threading.Thread(
+        target=lambda: raw_data.append(
+            _get_only_raw_data_element(
+                _TEST_HOST_NAME, [(None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE)]
+            )
+        )
+    )
+    fetcher.start()
+    fetcher.join()
+    assert [r.raw_data for r in raw_data] == [b"<<<check_mk>>>\nsource1\n"]
+
+
+@pytest.mark.usefixtures("database_storage")
+def test_get_piggyback_raw_data_database_not_updated() -> None:
+    _store_in_database("source1", ["test-host", "test-host2"])
+    with freeze_time(datetime.fromtimestamp(_REF_TIME + 5.0, tz=timezone.utc)):
+        piggyback.store_piggyback_raw_data(HostName("source1"), {HostName("test-host2"): []})
+
+    raw_data = _get_only_raw_data_element(
+        _TEST_HOST_NAME,
+        [(None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE), ("source1", "validity_period", 60)],
+    )
+
+    assert raw_data.info.successfully_processed is True
+    assert raw_data.info.message.startswith(
+        "Piggyback file not updated by source 'source1' (still valid"
+    )
+
+
+@pytest.mark.usefixtures("database_storage")
+def test_remove_source_status_file_database() -> None:
+    _store_in_database("source1", ["test-host"])
+
+    assert piggyback.remove_source_status_file(HostName("source1")) is True
+    assert piggyback.remove_source_status_file(HostName("source1")) is False
+
+    raw_data = _get_only_raw_data_element(
+        _TEST_HOST_NAME, [(None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE)]
+    )
+    assert raw_data.info.successfully_processed is False
+    assert raw_data.info.message == "Source 'source1' not sending piggyback data"
+
+
+@pytest.mark.usefixtures("setup_files", "database_storage")
+def test_get_piggyback_raw_data_newer_storage() -> None:
+    time_settings: piggyback.PiggybackTimeSettings = [
+        (None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE)
+    ]
+    # The file of source1 is stored at _REF_TIME, source2 sends to both storages
+    _store_in_database("source2", ["test-host"])
+    source2_file = cmk.utils.paths.piggyback_dir / "test-host" / "source2"
+    source2_file.write_bytes(b"<<<check_mk>>>\nfile\n")
+    os.utime(source2_file, (_REF_TIME - 5, _REF_TIME - 5))
+
+    with freeze_time(_FREEZE_DATETIME):
+        raw_data = {
+            rd.info.source_hostname: rd.raw_data
+            for rd in piggyback.get_piggyback_raw_data(_TEST_HOST_NAME, time_settings)
+        }
+    assert raw_data == {"source1": _PAYLOAD, "source2": b"<<<check_mk>>>\nsource2\n"}
+
+    os.utime(source2_file, (_REF_TIME + 5, _REF_TIME + 5))
+    with freeze_time(_FREEZE_DATETIME):
+        raw_data_info = {
+            rd.info.source_hostname: rd
+            for rd in piggyback.get_piggyback_raw_data(_TEST_HOST_NAME, time_settings)
+        }
+    assert raw_data_info[HostName("source2")].raw_data == b"<<<check_mk>>>\nfile\n"
+
+
+@pytest.mark.parametrize(
+    "storage_before, storage_after",
+    [
+        pytest.param("files", "database", id="files to database"),
+        pytest.param("database", "files", id="database to files"),
+    ],
+)
+@pytest.mark.usefixtures("database_storage")
+def test_get_piggyback_raw_data_switched_storage(
+    monkeypatch: MonkeyPatch,
+    storage_before: piggyback.PiggybackStorage,
+    storage_after: piggyback.PiggybackStorage,
+) -> None:
+    time_settings: piggyback.PiggybackTimeSettings = [
+        (None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE)
+    ]
+    monkeypatch.setattr(piggyback, "_storage", storage_before)
+    piggyback.store_piggyback_raw_data(
+        HostName("source1"), {HostName("test-host"): [], HostName("test-host2"): []}
+    )
+    monkeypatch.setattr(piggyback, "_storage", storage_after)
+    piggyback.store_piggyback_raw_data(HostName("source1"), {HostName("test-host2"): []})
+
+    (raw_data,) = piggyback.get_piggyback_raw_data(_TEST_HOST_NAME, time_settings)
+    assert piggyback.has_piggyback_raw_data(HostName("test-host2"), time_settings)
+    assert raw_data.info.successfully_processed is False
+    assert raw_data.info.message == "Source 'source1' not sending piggyback data"
+
+
+@pytest.mark.usefixtures("database_storage")
+def test_get_source_and_piggyback_hosts_database() -> None:
+    _store_in_database("source1", ["test-host", "test-host2"])
+    _store_in_database("source2", ["test-host2"])
+
+    with freeze_time(_FREEZE_DATETIME):
+        assert sorted(
+            piggyback.get_source_and_piggyback_hosts(
+                [(None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE)]
+            )
+        ) == [
+            (HostName("source1"), HostName("test-host")),
+            (HostName("source1"), HostName("test-host2")),
+            (HostName("source2"), HostName("test-host2")),
+        ]
+    assert sorted(piggyback.get_source_hostnames(HostName("test-host2"))) == ["source1", "source2"]
+
+
+@pytest.mark.usefixtures("database_storage")
+def test_cleanup_piggyback_files_database() -> None:
+    _store_in_database("source1", ["test-host"])
+    _store_in_database("source2", ["test-host2"])
+    time_settings: piggyback.PiggybackTimeSettings = [
+        (None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE),
+        ("source1", "max_cache_age", -1),
+    ]
+
+    with freeze_time(_FREEZE_DATETIME):
+        piggyback.cleanup_piggyback_files(time_settings)
+
+    assert piggyback.get_source_hostnames() == ["source2"]
+    assert piggyback.remove_source_status_file(HostName("source1")) is False
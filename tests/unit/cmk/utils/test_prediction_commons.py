@@ -114,6 +114,12 @@ def test_time_series_upsampling(
             [15, 25, None, 45, None],
         ),
         ([10, 45, 5, 15, 20, 25, 30, 35, 40, 45], (0, 60, 10), "max", [None, 20, 30, 40, 45, None]),
+        (
+            [10, 45, 5, 15, 20, 25, 30, 35, 40, 45],
+            (-10, 60, 10),
+            "max",
+            [None, None, 20, 30, 40, 45, None],
+        ),
         ([10, 45, 5, 15, 20, 25, 30, 35, 40, 45], (10, 40, 10), "average", [17.5, 27.5, 37.5]),
         ([10, 45, 5, 15, 20, 25, 30, None, 40, 45], (10, 40, 10), "average", [17.5, 27.5, 40.0]),
     ],
@@ -8,6 +8,9 @@
 import errno
 import socket
 import ssl
+import threading
+import time
+from collections.abc import Iterator
 from contextlib import closing
 from pathlib import Path
 
@@ -274,3 +277,266 @@ def test_set_auth_user(
             return
 
         livestatus.LocalConnection().set_auth_user("mydomain", user_id)
+
+
+class _DelayedLivestatusServer:
+    """Answers the first query on a unix socket after the given delay (never in case of None)"""
+
+    def __init__(self, path: Path, delay: float | None, response: bytes) -> None:
+        self.path = path
+        self._delay = delay
+        self._response = response
+        self._stop = threading.Event()
+        self._sock = socket.socket(socket.AF_UNIX)
+        self._sock.bind(str(path))
+        self._sock.listen(1)
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self) -> None:
+        conn, _addr = self._sock.accept()
+        with conn:
+            data = b""
+            while not data.endswith(b"\n\n"):
+                data += conn.recv(4096)
+            if self._delay is not None and not self._stop.wait(self._delay):
+                conn.sendall(b"200 %11d\n" % len(self._response) + self._response)
+            self._stop.wait()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sock.close()
+
+
+@pytest.fixture
+def delayed_sites(tmp_path: Path) -> Iterator[livestatus.MultiSiteConnection]:
+    servers = {
+        livestatus.SiteId("fast"): _DelayedLivestatusServer(tmp_path / "fast", 0, b"[['fast']]"),
+        livestatus.SiteId("slow"): _DelayedLivestatusServer(tmp_path / "slow", 0.5, b"[['slow']]"),
+        livestatus.SiteId("dead"): _DelayedLivestatusServer(tmp_path / "dead", None, b""),
+    }
+    connection = livestatus.MultiSiteConnection(
+        livestatus.SiteConfigurations(
+            {
+                site_id: {"socket": f"unix:{server.path}", "timeout": 2}
+                for site_id, server in servers.items()
+            }
+        )
+    )
+    connection.set_prepend_site(True)
+    yield connection
+    connection.disconnect()
+    for server in servers.values():
+        server.close()
+
+
+def test_multisite_query_parallel_site_timeout(
+    delayed_sites: livestatus.MultiSiteConnection,
+) -> None:
+    start = time.time()
+    assert delayed_sites.query("GET hosts\nColumns: name") == [
+        ["fast", "fast"],
+        ["slow", "slow"],
+    ]
+    assert time.time() - start < 4
+    assert list(delayed_sites.dead_sites()) == ["dead"]
+    assert delayed_sites.alive_sites() == ["fast", "slow"]
+
+
+def test_multisite_query_iter(delayed_sites: livestatus.MultiSiteConnection) -> None:
+    rows = delayed_sites.query_iter("GET hosts\nColumns: name")
+    assert next(rows) == ["fast", "fast"]
+    rows.close()
+
+    # The sites not having responded are disconnected, but not dead
+    assert not delayed_sites.dead_sites()
+    assert sorted(delayed_sites.alive_sites()) == ["dead", "fast", "slow"]
+    assert delayed_sites.get_connection(livestatus.SiteId("slow")).socket is None
+
+
+@pytest.mark.parametrize(
+    "output_format, response",
+    [
+        (
+            livestatus.LivestatusOutputFormat.JSON,
+            b'[["h\xc3\xb6st", 1, [], {"a": "]"}],\n["host2", 2.5, ["x"], {}],\n["host3", null, [], {}]]\n',
+        ),
+        (
+            livestatus.LivestatusOutputFormat.PYTHON,
+            b"[['h\xc3\xb6st', 1, [], {'a': ']'}],\n['host2', 2.5, ['x'], {}],\n['host3', None, [], {}]]\n",
+        ),
+        (
+            livestatus.LivestatusOutputFormat.JSON,
+            b'[["h\xc3\xb6st", 1, [], {"a": "]"}], ["host2", 2.5, ["x"], {}], ["host3", null, [], {}]]',
+        ),
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+def test_response_row_parser(
+    output_format: livestatus.LivestatusOutputFormat, response: bytes, chunk_size: int
+) -> None:
+    parser = livestatus._ResponseRowParser(output_format)
+    rows = []
+    for pos in range(0, len(response), chunk_size):
+        rows.extend(parser.feed(response[pos : pos + chunk_size]))
+    rows.extend(parser.close())
+    assert rows == [
+        ["höst", 1, [], {"a": "]"}],
+        ["host2", 2.5, ["x"], {}],
+        ["host3", None, [], {}],
+    ]
+
+
+@pytest.mark.parametrize("response", [b"[]\n", b"[]"])
+def test_response_row_parser_empty(response: bytes) -> None:
+    parser = livestatus._ResponseRowParser(livestatus.LivestatusOutputFormat.JSON)
+    assert not parser.feed(response)
+    assert not parser.close()
+
+
+@pytest.mark.parametrize("response", [b"", b'[["host1"],\n["host2"\n', b'[["host1"], x]'])
+def test_response_row_parser_malformed(response: bytes) -> None:
+    parser = livestatus._ResponseRowParser(livestatus.LivestatusOutputFormat.JSON)
+    with pytest.raises(livestatus.MKLivestatusQueryError):
+        parser.feed(response)
+        parser.close()
+
+
+def test_single_site_query_iter(tmp_path: Path) -> None:
+    server = _DelayedLivestatusServer(tmp_path / "site", 0, b"[['host1'],\n['host2']]\n")
+    connection = livestatus.SingleSiteConnection(f"unix:{server.path}")
+    connection.set_prepend_site(True)
+    try:
+        assert list(connection.query_iter("GET hosts\nColumns: name")) == [
+            [b"", "host1"],
+            [b"", "host2"],
+        ]
+        assert connection.socket is not None
+    finally:
+        connection.disconnect()
+        server.close()
+
+
+def test_single_site_query_iter_stopped(tmp_path: Path) -> None:
+    server = _DelayedLivestatusServer(tmp_path / "site", 0, b"[['host1'],\n['host2'],\n['host3']]")
+    connection = livestatus.SingleSiteConnection(f"unix:{server.path}")
+    try:
+        rows = connection.query_iter("GET hosts\nColumns: name")
+        assert next(rows) == ["host1"]
+        rows.close()
+        # The rest of the response must not be read by the next query
+        assert connection.socket is None
+    finally:
+        server.close()
+
+
+class _SocketPairs:
+    """Creates connected sockets, the other ends play the role of the site"""
+
+    def __init__(self) -> None:
+        self.peers: list[socket.socket] = []
+
+    def connect(self) -> socket.socket:
+        client, peer = socket.socketpair()
+        self.peers.append(peer)
+        return client
+
+
+def test_connection_pool_reuse() -> None:
+    pool = livestatus.ConnectionPool()
+    pairs = _SocketPairs()
+
+    first, reused = pool.acquire("unix:/site", pairs.connect)
+    assert not reused
+    pool.release("unix:/site", first)
+
+    assert pool.acquire("unix:/site", pairs.connect) == (first, True)
+    second, reused = pool.acquire("unix:/site", pairs.connect)
+    assert second is not first
+    assert not reused
+
+    stats = pool.stats()["unix:/site"]
+    assert (stats.idle, stats.in_use, stats.connects, stats.reuses) == (0, 2, 2, 1)
+    assert stats.reuse_ratio == pytest.approx(1 / 3)
+
+
+def test_connection_pool_health_check() -> None:
+    pool = livestatus.ConnectionPool()
+    pairs = _SocketPairs()
+
+    site_socket, _reused = pool.acquire("unix:/site", pairs.connect)
+    pool.release("unix:/site", site_socket)
+    pairs.peers[0].close()  # The site closed the connection
+
+    new_socket, reused = pool.acquire("unix:/site", pairs.connect)
+    assert new_socket is not site_socket
+    assert not reused
+    assert site_socket.fileno() == -1
+    assert pool.stats()["unix:/site"].discarded == 1
+
+
+def test_connection_pool_max_idle_time(monkeypatch: MonkeyPatch) -> None:
+    pool = livestatus.ConnectionPool(max_idle_time=10)
+    pairs = _SocketPairs()
+
+    site_socket, _reused = pool.acquire("unix:/site", pairs.connect)
+    pool.release("unix:/site", site_socket)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+
+    assert pool.acquire("unix:/site", pairs.connect)[0] is not site_socket
+    assert site_socket.fileno() == -1
+
+
+def test_connection_pool_max_idle_connections() -> None:
+    pool = livestatus.ConnectionPool(max_idle_connections=1)
+    pairs = _SocketPairs()
+
+    first, _reused = pool.acquire("unix:/site", pairs.connect)
+    second, _reused = pool.acquire("unix:/site", pairs.connect)
+    pool.release("unix:/site", first)
+    pool.release("unix:/site", second)
+
+    assert second.fileno() == -1
+    stats = pool.stats()["unix:/site"]
+    assert (stats.idle, stats.in_use, stats.discarded) == (1, 0, 1)
+
+
+def test_connection_pool_forked(monkeypatch: MonkeyPatch) -> None:
+    pool = livestatus.ConnectionPool()
+    pairs = _SocketPairs()
+
+    idle_socket, _reused = pool.acquire("unix:/site", pairs.connect)
+    inherited_socket, _reused = pool.acquire("unix:/site", pairs.connect)
+    pool.release("unix:/site", idle_socket)
+    monkeypatch.setattr(livestatus.os, "getpid", lambda: -1)
+
+    # The child process must neither use the idle connections nor the ones in
+    # use by its parent
+    assert pool.acquire("unix:/site", pairs.connect)[0] is not idle_socket
+    pool.release("unix:/site", inherited_socket)
+    assert inherited_socket.fileno() == -1
+    assert pool.stats()["unix:/site"].idle == 0
+
+
+def test_single_site_connection_persist(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(livestatus, "connection_pool", livestatus.ConnectionPool())
+    server = _DelayedLivestatusServer(tmp_path / "site", 0, b"[['host1']]\n")
+    try:
+        connection = livestatus.SingleSiteConnection(f"unix:{server.path}", persist=True)
+        assert connection.query("GET hosts\nColumns: name") == [["host1"]]
+        connection.disconnect()
+
+        connection = livestatus.SingleSiteConnection(f"unix:{server.path}", persist=True)
+        connection.set_timeout(5)
+        connection.connect()
+        assert connection.successfully_persisted()
+        assert connection.socket is not None
+        assert connection.socket.gettimeout() == 5.0
+        # A connection with a pending response must not be reused
+        connection.send_query("GET hosts")
+        connection.disconnect()
+        assert livestatus.connection_pool.stats()[f"unix:{server.path}"].idle == 0
+    finally:
+        server.close()